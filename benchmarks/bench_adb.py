@@ -0,0 +1,60 @@
+"""
+Vishwakarma AI - ADB Session Benchmark
+© 2025 Vishwakarma Industries
+
+Sends the same input events (key events by default, which do nothing
+visible on most screens: 0 is KEYCODE_UNKNOWN) to a connected device, once
+with a new `adb shell` process per event as run_adb_command() used to do
+(without its one-second sleeps), and once through one persistent session,
+one by one and pipelined.
+
+Usage:
+    python -m benchmarks.bench_adb [--events 50] [--serial SERIAL]
+"""
+import argparse
+import shlex
+import statistics
+import subprocess
+import time
+
+from engine.adb import AdbShell, adb_command
+from engine.config import ADB_PATH
+
+
+def report(label, seconds, count):
+    print(f"{label:<28} {seconds * 1000 / count:7.1f} ms/event  ({seconds:.2f} s total)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--events', type=int, default=50)
+    parser.add_argument('--serial', help="device serial (adb -s)")
+    parser.add_argument('--adb', default=ADB_PATH, help="adb binary or command prefix")
+    parser.add_argument('--command', default="input keyevent 0", help="device command to repeat")
+    args = parser.parse_args()
+    adb = shlex.split(args.adb)
+
+    argv = adb_command(adb, args.serial) + ['shell', args.command]
+    start = time.perf_counter()
+    for _ in range(args.events):
+        subprocess.run(argv, check=True, capture_output=True)
+    report("one process per event", time.perf_counter() - start, args.events)
+
+    shell = AdbShell(args.serial, adb=adb)
+    try:
+        shell.run("true")  # start the session outside the timings
+        start = time.perf_counter()
+        steps = [shell.run(args.command, check=True) for _ in range(args.events)]
+        report("persistent session", time.perf_counter() - start, args.events)
+        print(f"  per-step p50 {statistics.median(s.elapsed for s in steps) * 1000:.1f} ms, "
+              f"max {max(s.elapsed for s in steps) * 1000:.1f} ms")
+
+        start = time.perf_counter()
+        shell.run_batch([args.command] * args.events, check=True)
+        report("persistent session, batch", time.perf_counter() - start, args.events)
+    finally:
+        shell.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Vishwakarma AI - Contact Import Benchmark
+© 2025 Vishwakarma Industries
+
+Imports a generated CSV phonebook (1,000,000 contacts by default, with
+some duplicate and invalid rows) through the streaming importer and
+reports throughput and peak memory, next to the row-by-row insert and
+commit loop it replaces, timed on a sample.
+
+Usage:
+    python -m benchmarks.bench_contact_import [--contacts 1000000]
+"""
+import argparse
+import csv
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from engine.contact_import import import_contacts, normalize_phone
+from engine.database import SCHEMA, close_database, get_database
+
+
+def write_csv(path, count, rng):
+    """Writes a Google-style export; about 2% duplicates and 1% without a number."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Name', 'Given Name', 'Family Name', 'Phone 1 - Type', 'Phone 1 - Value'])
+        for i in range(count):
+            number = f"98{rng.randrange(10 ** 8):08d}" if rng.random() > 0.01 else ''
+            if i and rng.random() < 0.02:
+                number = f"+91 {previous}"
+            previous = number or '9800000000'
+            writer.writerow([f"Contact {i}", 'Contact', str(i), 'Mobile', number])
+
+
+def row_by_row(path, db_name, limit):
+    """The old pattern: one INSERT and one commit per row."""
+    con = sqlite3.connect(db_name)
+    for statement in SCHEMA:
+        con.execute(statement)
+    start = time.perf_counter()
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)
+        for i, row in enumerate(reader):
+            if i == limit:
+                break
+            con.execute("INSERT INTO contacts VALUES (null, ?, ?, null)", (row[0], normalize_phone(row[4])))
+            con.commit()
+    rate = limit / (time.perf_counter() - start)
+    con.close()
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--contacts', type=int, default=1000000, help="rows in the generated file")
+    parser.add_argument('--sample', type=int, default=2000, help="rows timed with the old loop")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    csv_path = os.path.join(directory, 'contacts.csv')
+    db_name = os.path.join(directory, 'contacts.db')
+    try:
+        write_csv(csv_path, args.contacts, random.Random(7))
+        print(f"{args.contacts:,} rows, {os.path.getsize(csv_path) / 2 ** 20:.0f} MiB of CSV")
+
+        old_rate = row_by_row(csv_path, os.path.join(directory, 'old.db'), args.sample)
+        print(f"row-by-row commits: {old_rate:,.0f} rows/s "
+              f"(~{args.contacts / old_rate / 60:.0f} min for the whole file)")
+
+        result = import_contacts(csv_path, db=get_database(db_name))
+        print(f"streaming import:   {result.records / result.elapsed:,.0f} rows/s ({result.elapsed:.1f} s)")
+        if resource is not None:
+            # Stays flat as the file grows (ru_maxrss is in KiB on Linux)
+            print(f"  peak process memory {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+        print(f"  {result.imported:,} imported, {result.duplicates:,} duplicates, {result.invalid:,} invalid")
+    finally:
+        close_database(db_name)
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
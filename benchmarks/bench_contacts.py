@@ -0,0 +1,163 @@
+"""
+Vishwakarma AI - Contact Search Benchmark
+© 2025 Vishwakarma Industries
+
+Searches a synthetic phonebook (100,000 contacts by default) with exact,
+misspelled and phonetically respelled names, and compares latency and
+top-5 accuracy of the old LIKE '%name%' scan with the in-memory index.
+
+Usage:
+    python -m benchmarks.bench_contacts [--contacts 100000] [--queries 500]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from engine.contact_index import ContactIndex
+from engine.database import close_database, get_database
+
+FIRST_NAMES = ['aarav', 'aditi', 'akash', 'amit', 'ananya', 'anil', 'anita', 'arjun', 'bhavesh',
+               'deepak', 'divya', 'gaurav', 'geeta', 'harish', 'isha', 'jaya', 'karan', 'kavita',
+               'kunal', 'lakshmi', 'manish', 'meena', 'mohan', 'neha', 'nikhil', 'pawan', 'pooja',
+               'prakash', 'priya', 'rahul', 'rajesh', 'ramesh', 'ravi', 'rohit', 'sachin', 'sanjay',
+               'seeta', 'shreya', 'sneha', 'sunil', 'suresh', 'tanvi', 'uday', 'varun', 'vikram',
+               'vinod', 'yash', 'zoya']
+LAST_NAMES = ['agarwal', 'bhat', 'chopra', 'das', 'desai', 'gupta', 'iyer', 'jain', 'joshi',
+              'kapoor', 'khan', 'kulkarni', 'kumar', 'mehta', 'menon', 'mishra', 'nair', 'patel',
+              'pillai', 'rao', 'reddy', 'saxena', 'shah', 'sharma', 'singh', 'sinha', 'thakur',
+              'trivedi', 'verma', 'yadav']
+# How speech recognition tends to respell names
+RESPELLINGS = [('oo', 'u'), ('ee', 'i'), ('w', 'v'), ('k', 'c'), ('aa', 'a'), ('sh', 's'),
+               ('v', 'w'), ('i', 'ee'), ('a', 'aa')]
+
+
+def generate_contacts(count, rng):
+    """Returns (id, name, mobile_no) rows built from common Indian names."""
+    rows = []
+    for contact_id in range(1, count + 1):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        # Nicknames and initials keep full names from being too repetitive
+        suffix = rng.choice(['', '', '', f' {rng.choice("abcdefghjkmnprstv")}',
+                             f' {rng.choice(FIRST_NAMES)[:4]}'])
+        rows.append((contact_id, f"{first.title()} {last.title()}{suffix}",
+                     f"9{rng.randrange(10 ** 9):09d}"))
+    return rows
+
+
+def typo(word, rng):
+    """Drops, doubles or swaps one inner letter."""
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return word[:i] + word[i + 1:]
+    if kind == 1:
+        return word[:i] + word[i] + word[i:]
+    return word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]
+
+
+def respell(word, rng):
+    """Applies one speech-recognition style respelling, if any fits."""
+    options = [(a, b) for a, b in RESPELLINGS if a in word]
+    if not options:
+        return word
+    a, b = rng.choice(options)
+    return word.replace(a, b, 1)
+
+
+def generate_queries(rows, count, rng):
+    """Returns (kind, query, expected first and last name) tuples."""
+    queries = []
+    for _ in range(count):
+        contact_id, name, _ = rng.choice(rows)
+        words = name.lower().split()
+        full = ' '.join(words[:2])
+        kind = rng.choice(['exact', 'typo', 'phonetic'])
+        if kind == 'exact':
+            query = full
+        elif kind == 'typo':
+            query = f"{typo(words[0], rng)} {words[1]}"
+        else:
+            query = f"{respell(words[0], rng)} {respell(words[1], rng)}"
+        # Any contact with the same first and last name is a correct answer
+        queries.append((kind, query, full))
+    return queries
+
+
+def like_search(db, query):
+    """The old findContact() lookup: first row of a substring scan."""
+    rows = db.query("SELECT name FROM contacts WHERE LOWER(name) LIKE ?", (f'%{query}%',))
+    return [row[0] for row in rows[:5]]
+
+
+def index_search(index, query):
+    """The new lookup: top five ranked matches."""
+    return [match.name for match in index.search(query, limit=5)]
+
+
+def measure(label, search, queries):
+    """Prints latency percentiles and top-5 accuracy per query kind."""
+    latencies = []
+    correct = {}
+    for kind, query, expected in queries:
+        start = time.perf_counter()
+        names = search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hit = any(' '.join(name.lower().split()[:2]) == expected for name in names)
+        total, hits = correct.get(kind, (0, 0))
+        correct[kind] = (total + 1, hits + hit)
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    accuracy = '  '.join(f"{kind} {hits / total:6.1%}" for kind, (total, hits) in sorted(correct.items()))
+    print(f"{label:<8} p50 {statistics.median(latencies):8.3f} ms   p95 {p95:8.3f} ms   {accuracy}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--contacts', type=int, default=100000, help="phonebook size")
+    parser.add_argument('--queries', type=int, default=500, help="searches per method")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = generate_contacts(args.contacts, rng)
+    queries = generate_queries(rows, args.queries, rng)
+
+    directory = tempfile.mkdtemp()
+    db_name = os.path.join(directory, 'contacts.db')
+    try:
+        db = get_database(db_name)
+        db.executemany("INSERT INTO contacts (id, name, mobile_no) VALUES (?, ?, ?)", rows)
+
+        index = ContactIndex(db)
+        start = time.perf_counter()
+        index.refresh()
+        build = time.perf_counter() - start
+        stats = index.stats()
+        print(f"{args.contacts:,} contacts: index built in {build:.2f} s, "
+              f"{stats['words']:,} distinct words, {stats['trigrams']:,} trigrams, "
+              f"~{stats['memory_bytes'] / 2 ** 20:.0f} MiB")
+
+        db.executemany("UPDATE contacts SET name = name || ' x' WHERE id = ?",
+                       [(contact_id,) for contact_id in range(1, 101)])
+        start = time.perf_counter()
+        changed = index.refresh()
+        print(f"incremental refresh of {changed} changed contacts: "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+        print(f"\n{args.queries} queries, top-5 accuracy")
+        measure("LIKE", lambda query: like_search(db, query), queries)
+        measure("index", lambda query: index_search(index, query), queries)
+    finally:
+        close_database(db_name)
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
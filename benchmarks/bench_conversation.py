@@ -0,0 +1,90 @@
+"""
+Vishwakarma AI - Conversation Memory Benchmark
+© 2025 Vishwakarma Industries
+
+Simulates a long chatbot session and tracks the prompt size per turn with the
+token-budgeted memory, compared with sending the full history every time.
+It also times prompt building and turn recording against SQLite.
+
+Usage:
+    python -m benchmarks.bench_conversation [--turns 500] [--budget 1200]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from engine.config import CHATBOT_SYSTEM_PROMPT, CONVERSATION_SUMMARY_TOKENS
+from engine.conversation import (ConversationMemory, ConversationStore,
+                                 message_tokens)
+
+TOPICS = ["the weather", "cricket scores", "a pasta recipe", "python decorators",
+          "the history of Delhi", "train timings", "a birthday gift", "exam tips"]
+
+
+def synthetic_turn(rng, i):
+    """Returns a (user_input, response) pair of varying length."""
+    topic = rng.choice(TOPICS)
+    question = f"Turn {i}: can you tell me about {topic}?" + " Please be specific." * rng.randint(0, 3)
+    answer = (f"Sure, here is something about {topic}. "
+              + "This sentence adds more detail to the answer. " * rng.randint(1, 6))
+    return question, answer
+
+
+def percentile(values, fraction):
+    """Returns the value at the given fraction of the sorted list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--turns', type=int, default=500)
+    parser.add_argument('--budget', type=int, default=1200, help="context token budget")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    db_fd, db_name = tempfile.mkstemp(suffix='.db')
+    os.close(db_fd)
+
+    try:
+        memory = ConversationMemory(1, store=ConversationStore(db_name),
+                                    context_tokens=args.budget,
+                                    summary_tokens=CONVERSATION_SUMMARY_TOKENS)
+        history = [{'role': 'system', 'content': CHATBOT_SYSTEM_PROMPT}]
+        windowed, naive, build_ms, record_ms = [], [], [], []
+
+        for i in range(args.turns):
+            user_input, response = synthetic_turn(rng, i)
+
+            start = time.perf_counter()
+            messages = memory.build_messages(CHATBOT_SYSTEM_PROMPT, user_input)
+            build_ms.append((time.perf_counter() - start) * 1000)
+            windowed.append(sum(message_tokens(m) for m in messages))
+
+            history.append({'role': 'user', 'content': user_input})
+            naive.append(sum(message_tokens(m) for m in history))
+            history.append({'role': 'assistant', 'content': response})
+
+            start = time.perf_counter()
+            memory.add_exchange(user_input, response)
+            record_ms.append((time.perf_counter() - start) * 1000)
+    finally:
+        os.remove(db_name)
+
+    print(f"{args.turns} turns, context budget {args.budget} tokens")
+    print(f"{'':<16}{'first':>8}{'mean':>8}{'p95':>8}{'max':>8}{'last':>8}")
+    for name, series in (("full history", naive), ("memory window", windowed)):
+        print(f"{name:<16}{series[0]:>8}{statistics.mean(series):>8.0f}"
+              f"{percentile(series, 0.95):>8}{max(series):>8}{series[-1]:>8}")
+    print(f"build prompt    mean {statistics.mean(build_ms):.3f} ms   "
+          f"p95 {percentile(build_ms, 0.95):.3f} ms")
+    print(f"record exchange mean {statistics.mean(record_ms):.3f} ms   "
+          f"p95 {percentile(record_ms, 0.95):.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
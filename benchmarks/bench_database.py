@@ -0,0 +1,128 @@
+"""
+Vishwakarma AI - Database Access Benchmark
+© 2025 Vishwakarma Industries
+
+Compares operations per second of the shared, WAL-mode connection manager
+with the previous pattern of opening and closing a connection (and re-running
+the table DDL) for every ProfileManager call.
+
+Usage:
+    python -m benchmarks.bench_database [--ops 2000]
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from engine.database import SCHEMA, close_database
+from engine.profile_manager import ProfileManager
+
+
+class PerCallProfileStore:
+    """The old access pattern: one connection per call, DDL per instance."""
+
+    def __init__(self, db_name):
+        self.db_name = db_name
+        con = sqlite3.connect(db_name)
+        for statement in SCHEMA:
+            con.execute(statement)
+        con.commit()
+        con.close()
+
+    def get_profile(self, user_id):
+        con = sqlite3.connect(self.db_name)
+        row = con.execute('SELECT user_id, name, age, preferences, created_at, last_login, '
+                          'is_active FROM profiles WHERE user_id = ?', (user_id,)).fetchone()
+        con.close()
+        return row
+
+    def has_profiles(self):
+        con = sqlite3.connect(self.db_name)
+        count = con.execute('SELECT COUNT(*) FROM profiles WHERE is_active = 1').fetchone()[0]
+        con.close()
+        return count > 0
+
+    def get_preference(self, user_id, key):
+        con = sqlite3.connect(self.db_name)
+        row = con.execute('SELECT setting_value FROM profile_settings '
+                          'WHERE user_id = ? AND setting_key = ?', (user_id, key)).fetchone()
+        con.close()
+        return row
+
+    def set_preference(self, user_id, key, value):
+        con = sqlite3.connect(self.db_name)
+        cursor = con.cursor()
+        cursor.execute('SELECT id FROM profile_settings WHERE user_id = ? AND setting_key = ?',
+                       (user_id, key))
+        if cursor.fetchone():
+            cursor.execute('UPDATE profile_settings SET setting_value = ? '
+                           'WHERE user_id = ? AND setting_key = ?', (value, user_id, key))
+        else:
+            cursor.execute('INSERT INTO profile_settings (user_id, setting_key, setting_value) '
+                           'VALUES (?, ?, ?)', (user_id, key, value))
+        con.commit()
+        con.close()
+
+
+def seed(db_name, profiles=50):
+    """Creates profiles with one preference each."""
+    manager = ProfileManager(db_name)
+    for i in range(profiles):
+        user_id = manager.create_profile(f"User {i}", 20 + i)
+        manager.set_preference(user_id, 'voice', 'default')
+
+
+def run(label, make_store, ops):
+    """Times each operation and prints ops/sec."""
+    store = make_store()
+    operations = {
+        'new manager': lambda i: make_store(),
+        'get_profile': lambda i: store.get_profile(i % 50 + 1),
+        'has_profiles': lambda i: store.has_profiles(),
+        'get_preference': lambda i: store.get_preference(i % 50 + 1, 'voice'),
+        'set_preference': lambda i: store.set_preference(i % 50 + 1, 'voice', f"v{i}"),
+    }
+    results = {}
+    for name, operation in operations.items():
+        start = time.perf_counter()
+        for i in range(ops):
+            operation(i)
+        results[name] = ops / (time.perf_counter() - start)
+    print(f"{label:<12}" + ''.join(f"{rate:>16,.0f}" for rate in results.values()))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--ops', type=int, default=2000, help="operations per measurement")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    per_call_db = os.path.join(directory, 'per_call.db')
+    shared_db = os.path.join(directory, 'shared.db')
+    try:
+        seed(per_call_db)
+        close_database(per_call_db)
+        # The old code never enabled WAL
+        con = sqlite3.connect(per_call_db)
+        con.execute("PRAGMA journal_mode=DELETE")
+        con.close()
+        seed(shared_db)
+
+        print(f"ops/sec ({args.ops} operations each)")
+        print(f"{'':<12}" + ''.join(f"{name:>16}" for name in
+                                    ['new manager', 'get_profile', 'has_profiles',
+                                     'get_preference', 'set_preference']))
+        before = run("per-call", lambda: PerCallProfileStore(per_call_db), args.ops)
+        after = run("shared", lambda: ProfileManager(shared_db), args.ops)
+        print(f"{'speedup':<12}" + ''.join(f"{after[k] / before[k]:>15.1f}x" for k in before))
+    finally:
+        close_database(shared_db)
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Vishwakarma AI - Face Authentication Benchmark
+© 2025 Vishwakarma Industries
+
+Runs face authentication on recorded video files instead of the camera,
+with the original every-frame detection and with performance mode (Haar
+cascade and, when its model files are present, the res10 SSD), and
+reports frames per second, time to authenticate and how many detector and
+recognizer runs each mode needed. Needs a trained model (TRAINER_FILE).
+
+Usage:
+    python -m benchmarks.bench_face_auth videos/*.mp4 [--modes baseline haar dnn]
+"""
+import argparse
+
+from engine.auth.recognize import DnnDetector, FaceAuthenticator, HaarDetector
+from engine.config import FACE_DETECTION_WIDTH
+
+MODES = ('baseline', 'haar', 'dnn')
+
+
+def create_authenticator(mode):
+    """Returns a FaceAuthenticator for a mode, or None if it cannot run."""
+    if mode == 'baseline':
+        return FaceAuthenticator(performance=False)
+    if mode == 'haar':
+        return FaceAuthenticator(performance=True, detector=HaarDetector(detection_width=FACE_DETECTION_WIDTH))
+    try:
+        return FaceAuthenticator(performance=True, detector=DnnDetector())
+    except FileNotFoundError as e:
+        print(f"{mode:<10} unavailable: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('videos', nargs='+')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    print(f"{'mode':<10} {'video':<28} {'fps':>7} {'auth (s)':>9} {'frames':>7} {'detect':>7} {'predict':>8}")
+    for mode in args.modes:
+        authenticator = create_authenticator(mode)
+        if authenticator is None:
+            continue
+        for path in args.videos:
+            authenticator.authenticate(path, show_preview=False, stop_on_auth=False)
+            stats = authenticator.last_stats
+            auth = f"{stats['time_to_auth']:.2f}" if stats['time_to_auth'] is not None else "never"
+            print(f"{mode:<10} {path[-28:]:<28} {stats['fps']:7.1f} {auth:>9} {stats['frames']:7d} "
+                  f"{stats['detections']:7d} {stats['predictions']:8d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Vishwakarma AI - Fallback TTS Benchmark
+© 2025 Vishwakarma Industries
+
+Compares per-utterance latency of initializing pyttsx3 for every sentence
+(the original fallback_speak behaviour) with the long-lived engine thread.
+A stubbed driver with a fixed startup cost stands in for SAPI/espeak.
+
+Usage:
+    python -m benchmarks.bench_fallback_tts [--utterances N] [--init-ms MS]
+"""
+import argparse
+import statistics
+import time
+
+from engine.fallback_tts import FallbackTTSEngine
+
+
+class StubVoice:
+    def __init__(self, voice_id):
+        self.id = voice_id
+
+
+class StubDriverEngine:
+    """A pyttsx3-like engine whose construction and speech take fixed time."""
+
+    def __init__(self, init_seconds, speak_seconds):
+        time.sleep(init_seconds)
+        self.speak_seconds = speak_seconds
+
+    def getProperty(self, name):
+        return [StubVoice('stub')] if name == 'voices' else None
+
+    def setProperty(self, name, value):
+        pass
+
+    def connect(self, topic, cb):
+        pass
+
+    def say(self, text):
+        pass
+
+    def runAndWait(self):
+        time.sleep(self.speak_seconds)
+
+    def stop(self):
+        pass
+
+
+def per_call_speak(text, init_fn):
+    """The original fallback_speak: a fresh engine for every utterance."""
+    engine = init_fn('sapi5')
+    voices = engine.getProperty('voices')
+    engine.setProperty('voice', voices[0].id)
+    engine.setProperty('rate', 174)
+    engine.say(text)
+    engine.runAndWait()
+
+
+def measure(speak_fn, utterances):
+    """Returns per-utterance latencies in milliseconds."""
+    latencies = []
+    for i in range(utterances):
+        start = time.perf_counter()
+        speak_fn(f"Sentence number {i}")
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(label, latencies):
+    print(f"{label:<22} mean {statistics.mean(latencies):8.2f} ms   "
+          f"first {latencies[0]:8.2f} ms   "
+          f"rest {statistics.mean(latencies[1:] or latencies):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--utterances', type=int, default=20)
+    parser.add_argument('--init-ms', type=float, default=250.0,
+                        help="simulated driver startup cost")
+    parser.add_argument('--speak-ms', type=float, default=5.0,
+                        help="simulated time to speak one sentence")
+    args = parser.parse_args()
+
+    def init_fn(driver_name=None):
+        return StubDriverEngine(args.init_ms / 1000, args.speak_ms / 1000)
+
+    per_call = measure(lambda text: per_call_speak(text, init_fn), args.utterances)
+
+    engine = FallbackTTSEngine(driver_name='stub', init_fn=init_fn)
+    try:
+        long_lived = measure(engine.say, args.utterances)
+    finally:
+        engine.shutdown(timeout=5)
+
+    print(f"{args.utterances} utterances, driver startup {args.init_ms:.0f} ms, "
+          f"speech {args.speak_ms:.0f} ms")
+    report("init per utterance", per_call)
+    report("long-lived engine", long_lived)
+    print(f"speedup (mean): {statistics.mean(per_call) / statistics.mean(long_lived):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Vishwakarma AI - Speech-to-Text Benchmark
+© 2025 Vishwakarma Industries
+
+Measures per-utterance recognition latency of the STT backends on recorded
+WAV files, without a microphone. If a file has a matching .txt transcript
+next to it, the word error rate is reported as well.
+
+Usage:
+    python -m benchmarks.bench_stt path/to/wavs [--backends google vosk whispercpp]
+"""
+import argparse
+import glob
+import os
+import statistics
+
+import speech_recognition as sr
+
+from engine.stt import STT_BACKENDS, get_stt_backend, transcribe_file
+
+
+def word_error_rate(reference, hypothesis):
+    """Returns the word-level edit distance divided by the reference length."""
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / max(len(ref), 1)
+
+
+def run_backend(name, wav_files):
+    """Transcribes every file with one backend and prints a summary."""
+    try:
+        backend = get_stt_backend(name)
+    except sr.RequestError as e:
+        print(f"{name:<12} unavailable: {e}")
+        return
+
+    latencies = []
+    errors = []
+    failures = 0
+    for path in wav_files:
+        try:
+            text, latency = transcribe_file(path, backend=backend)
+        except (sr.UnknownValueError, sr.RequestError):
+            failures += 1
+            continue
+        latencies.append(latency * 1000)
+
+        transcript = os.path.splitext(path)[0] + '.txt'
+        if os.path.exists(transcript):
+            with open(transcript, 'r', encoding='utf-8') as f:
+                errors.append(word_error_rate(f.read(), text))
+
+    if not latencies:
+        print(f"{name:<12} no utterances recognized ({failures} failed)")
+        return
+
+    summary = (f"{name:<12} n={len(latencies):<4} "
+               f"mean {statistics.mean(latencies):8.1f} ms   "
+               f"median {statistics.median(latencies):8.1f} ms   "
+               f"max {max(latencies):8.1f} ms   failed {failures}")
+    if errors:
+        summary += f"   WER {statistics.mean(errors):.1%}"
+    print(summary)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('directory', help="directory of .wav fixtures")
+    parser.add_argument('--backends', nargs='+', default=list(STT_BACKENDS),
+                        choices=list(STT_BACKENDS))
+    args = parser.parse_args()
+
+    wav_files = sorted(glob.glob(os.path.join(args.directory, '*.wav')))
+    if not wav_files:
+        parser.error(f"no .wav files in {args.directory}")
+
+    print(f"{len(wav_files)} utterances from {args.directory}")
+    for name in args.backends:
+        run_backend(name, wav_files)
+
+
+if __name__ == '__main__':
+    main()
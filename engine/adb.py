@@ -0,0 +1,444 @@
+"""
+Vishwakarma AI - ADB Session Manager
+© 2025 Vishwakarma Industries
+
+This module keeps one `adb shell` process open per device and sends
+commands to it over stdin, instead of starting a new adb process (and
+sleeping a second) for every tap, key event and text input. Commands are
+pipelined: a batch is written in one go and the results are read back in
+order, each marked with its exit status and how long it took. Screen
+changes are awaited by polling the focused window rather than with fixed
+sleeps.
+"""
+import re
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+
+from engine.config import (ADB_COMMAND_TIMEOUT, ADB_PATH, ADB_POLL_INTERVAL,
+                           ADB_WAIT_TIMEOUT)
+
+FOCUS_COMMAND = "dumpsys window | grep mCurrentFocus"
+# "mCurrentFocus=Window{5b1c3a u0 com.android.mms/com.android.mms.ui.ConversationList}"
+HOME_COMMAND = ("cmd package resolve-activity --brief "
+                "-a android.intent.action.MAIN -c android.intent.category.HOME")
+FOCUS_PATTERN = re.compile(r'mCurrentFocus=Window\{\S+ \S+ ([^}\s]+)\}')
+KEYCODE_HOME = 3
+KEYCODE_BACK = 4
+KEYCODE_ENTER = 66
+
+
+class AdbError(RuntimeError):
+    """Raised when adb is missing, the shell dies or a command times out."""
+
+
+class AdbResult:
+    """The outcome of one shell command."""
+
+    __slots__ = ('command', 'output', 'status', 'elapsed')
+
+    def __init__(self, command, output, status, elapsed):
+        self.command = command
+        self.output = output
+        self.status = status
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.status == 0
+
+    def __repr__(self):
+        return f"AdbResult({self.command!r}, status={self.status}, {self.elapsed * 1000:.1f} ms)"
+
+
+def adb_command(adb=None, serial=None):
+    """
+    Builds the adb argument prefix for a device.
+
+    Args:
+        adb (str or list): The adb binary, or a command prefix; ADB_PATH if None.
+        serial (str): The device serial for `adb -s`; any single device if None.
+
+    Returns:
+        list: E.g. ['adb', '-s', 'emulator-5554'].
+    """
+    argv = list(adb) if isinstance(adb, (list, tuple)) else [adb or ADB_PATH]
+    if serial:
+        argv += ['-s', serial]
+    return argv
+
+
+def input_text_command(message):
+    """
+    Builds an `input text` command; `input` reads "%s" as a space.
+
+    Args:
+        message (str): The text to type.
+
+    Returns:
+        str: The shell command.
+    """
+    return f"input text {shlex.quote(message.replace(' ', '%s'))}"
+
+
+def format_timings(results):
+    """
+    Formats per-step timings for the log.
+
+    Args:
+        results (list): AdbResult objects.
+
+    Returns:
+        str: One line per step and a total.
+    """
+    lines = [f"{r.elapsed * 1000:8.1f} ms  {'ok ' if r.ok else 'ERR'}  {r.command}" for r in results]
+    lines.append(f"{sum(r.elapsed for r in results) * 1000:8.1f} ms  total ({len(results)} steps)")
+    return '\n'.join(lines)
+
+
+class AdbShell:
+    """One persistent `adb shell` session with pipelined commands."""
+
+    def __init__(self, serial=None, adb=None, timeout=ADB_COMMAND_TIMEOUT):
+        """
+        Args:
+            serial (str): The device serial; any single device if None.
+            adb (str or list): The adb binary or command prefix; ADB_PATH if None.
+            timeout (float): Seconds to wait for a command before giving up
+                and restarting the session.
+        """
+        self.serial = serial
+        self.timeout = timeout
+        self._argv = adb_command(adb, serial) + ['shell']
+        self._write_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._process = None
+        self._pending = deque()  # (future, command, started, seq), in write order
+        self._recorders = []
+        self._marker = None
+        self._launcher = None
+        self._seq = 0
+        self.commands = 0
+        self.restarts = 0
+
+    def submit(self, command):
+        """
+        Sends a command without waiting for it.
+
+        Args:
+            command (str): A device shell command, e.g. "input tap 540 1200".
+
+        Returns:
+            concurrent.futures.Future: Resolves to an AdbResult.
+        """
+        future = Future()
+        # The write lock keeps commands and their pending entries in the
+        # same order; the reader thread only ever needs the state lock
+        with self._write_lock:
+            self._ensure_started()
+            self._seq += 1
+            # Grouped so "a && b" reports b's status and both outputs; the
+            # marker goes on its own line even after output without "\n"
+            line = f"{{ {command}\n}} 2>&1; echo \"\n{self._marker}{self._seq}:$?\"\n"
+            with self._lock:
+                if self._process is None:
+                    raise AdbError("ADB shell exited")
+                self._pending.append((future, command, time.perf_counter(), self._seq))
+            try:
+                self._process.stdin.write(line)
+                self._process.stdin.flush()
+            except (OSError, ValueError) as e:
+                self._reap(self._stop())
+                raise AdbError(f"ADB shell closed: {e}") from e
+            self.commands += 1
+        return future
+
+    def run(self, command, check=False, timeout=None):
+        """
+        Runs a command and waits for its result.
+
+        Args:
+            command (str): A device shell command.
+            check (bool): Raise AdbError if the command fails.
+            timeout (float): Seconds to wait; the session timeout if None.
+
+        Returns:
+            AdbResult: The command's output, exit status and duration.
+        """
+        return self._result(self.submit(command), command, check, timeout)
+
+    def run_batch(self, commands, check=False, timeout=None):
+        """
+        Runs commands back to back: all are written before any is awaited,
+        so the batch costs one round trip instead of one per command.
+
+        Args:
+            commands (list): Device shell commands, run in order.
+            check (bool): Raise AdbError if any command fails.
+            timeout (float): Seconds to wait for each command.
+
+        Returns:
+            list: An AdbResult per command.
+        """
+        futures = [self.submit(command) for command in commands]
+        return [self._result(f, c, check, timeout) for f, c in zip(futures, commands)]
+
+    def tap(self, x, y):
+        """Taps the screen at (x, y)."""
+        return self.run(f"input tap {int(x)} {int(y)}", check=True)
+
+    def key(self, *key_codes):
+        """Sends key events, pipelined."""
+        return self.run_batch([f"input keyevent {int(code)}" for code in key_codes], check=True)
+
+    def text(self, message):
+        """Types text into the focused field."""
+        return self.run(input_text_command(message), check=True)
+
+    def back(self, times=1):
+        """Presses Back several times in one batch."""
+        if times < 1:
+            return []
+        return self.key(*[KEYCODE_BACK] * times)
+
+    def home(self, timeout=ADB_WAIT_TIMEOUT):
+        """
+        Presses Home and waits for the launcher to have focus.
+
+        Args:
+            timeout (float): Seconds to wait.
+
+        Returns:
+            str: The focused launcher component, or None on timeout.
+        """
+        if self._launcher is None:
+            # The last line is the component, e.g. "com.android.launcher3/.Launcher"
+            lines = self.run(HOME_COMMAND).output.split()
+            self._launcher = lines[-1].partition('/')[0] if lines and '/' in lines[-1] else ''
+        self.key(KEYCODE_HOME)
+        if not self._launcher:
+            return self.current_focus()
+        return self.wait_for_focus(self._launcher + '/', timeout)
+
+    def current_focus(self):
+        """
+        Returns the focused window.
+
+        Returns:
+            str: The "package/activity" component, or None (e.g. while an
+                activity is starting).
+        """
+        match = FOCUS_PATTERN.search(self.run(FOCUS_COMMAND).output)
+        return match.group(1) if match else None
+
+    def wait_for(self, command, predicate, timeout=ADB_WAIT_TIMEOUT, interval=ADB_POLL_INTERVAL):
+        """
+        Polls a command until its result satisfies a condition.
+
+        Args:
+            command (str): The device shell command to poll.
+            predicate (callable): Called with each AdbResult.
+            timeout (float): Seconds to keep polling.
+            interval (float): Seconds between polls.
+
+        Returns:
+            AdbResult: The first satisfying result, or None on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            result = self.run(command)
+            if predicate(result):
+                return result
+            if time.monotonic() + interval > deadline:
+                return None
+            time.sleep(interval)
+
+    def wait_for_focus(self, condition, timeout=ADB_WAIT_TIMEOUT, interval=ADB_POLL_INTERVAL):
+        """
+        Waits until the focused window satisfies a condition.
+
+        Args:
+            condition (str or callable): A substring of the focused
+                component (e.g. a package name), or a predicate on it.
+            timeout (float): Seconds to wait.
+            interval (float): Seconds between polls.
+
+        Returns:
+            str: The focused component, or None on timeout.
+        """
+        if isinstance(condition, str):
+            expected = condition
+            condition = lambda focus: expected in focus
+
+        def focused(result):
+            match = FOCUS_PATTERN.search(result.output)
+            return bool(match and condition(match.group(1)))
+
+        result = self.wait_for(FOCUS_COMMAND, focused, timeout, interval)
+        return FOCUS_PATTERN.search(result.output).group(1) if result else None
+
+    def wait_for_focus_change(self, previous, timeout=ADB_WAIT_TIMEOUT, interval=ADB_POLL_INTERVAL):
+        """
+        Waits until another window than `previous` has focus.
+
+        Args:
+            previous (str): The component focused before the action.
+            timeout (float): Seconds to wait.
+            interval (float): Seconds between polls.
+
+        Returns:
+            str: The newly focused component, or None on timeout.
+        """
+        return self.wait_for_focus(lambda focus: focus != previous, timeout, interval)
+
+    @contextmanager
+    def record(self):
+        """
+        Collects the results of the commands that finish inside the block.
+
+        Yields:
+            list: The AdbResult objects, in completion order.
+        """
+        results = []
+        with self._lock:
+            self._recorders.append(results)
+        try:
+            yield results
+        finally:
+            with self._lock:
+                self._recorders.remove(results)
+
+    @property
+    def alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    def close(self):
+        """Ends the shell session; the next command starts a new one."""
+        with self._write_lock:
+            process = self._stop()
+        self._reap(process)
+
+    def _result(self, future, command, check, timeout):
+        try:
+            result = future.result(self.timeout if timeout is None else timeout)
+        except FutureTimeoutError as e:
+            # Everything queued behind a hung command would hang too
+            self.close()
+            raise AdbError(f"ADB command timed out: {command}") from e
+        if check and not result.ok:
+            raise AdbError(f"ADB command failed ({result.status}): {command}: {result.output.strip()}")
+        return result
+
+    def _ensure_started(self):
+        # Called with the write lock held
+        if self.alive:
+            return
+        self._reap(self._stop())
+        if self._marker is not None:
+            self.restarts += 1
+        try:
+            process = subprocess.Popen(self._argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                       stderr=subprocess.STDOUT, text=True, encoding='utf-8',
+                                       errors='replace', bufsize=1)
+        except FileNotFoundError as e:
+            raise AdbError("ADB not found. Please ensure it's installed and in your system's PATH.") from e
+        self._process = process
+        self._marker = f"__vk_{uuid.uuid4().hex[:12]}_"
+        threading.Thread(target=self._read, args=(process, self._marker),
+                         name="adb-shell-reader", daemon=True).start()
+
+    def _read(self, process, marker):
+        output = []
+        for line in process.stdout:
+            if not line.startswith(marker):
+                output.append(line)
+                continue
+            seq, _, status = line[len(marker):].partition(':')
+            status = int(status or -1)
+            # Drop the newline the marker line was prefixed with
+            text = ''.join(output)[:-1]
+            output = []
+            with self._lock:
+                # A session that was replaced (e.g. after a timeout) may
+                # still have output buffered; its commands were already
+                # failed, and the new session's belong to the new reader
+                if self._process is not process:
+                    return
+                if not self._pending or str(self._pending[0][3]) != seq.strip():
+                    continue
+                future, command, started, _ = self._pending.popleft()
+                result = AdbResult(command, text, status, time.perf_counter() - started)
+                for results in self._recorders:
+                    results.append(result)
+            future.set_result(result)
+
+        # The shell exited (device unplugged, adb server killed, ...); the
+        # next command starts a new session
+        with self._lock:
+            if self._process is not process:
+                return
+            self._process = None
+            pending, self._pending = list(self._pending), deque()
+        self._reap(process)
+        detail = ''.join(output).strip()
+        for future, command, _, _ in pending:
+            future.set_exception(AdbError(f"ADB shell exited: {detail or command}"))
+
+    def _stop(self):
+        # Called with the write lock held
+        with self._lock:
+            process, self._process = self._process, None
+            pending, self._pending = list(self._pending), deque()
+        for future, command, _, _ in pending:
+            future.set_exception(AdbError(f"ADB shell closed before: {command}"))
+        return process
+
+    @staticmethod
+    def _reap(process):
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+_shells = {}
+_shells_lock = threading.Lock()
+
+
+def get_adb_shell(serial=None):
+    """
+    Returns the shared shell session of a device, creating it on first use.
+
+    Args:
+        serial (str): The device serial; any single device if None.
+
+    Returns:
+        AdbShell: The session.
+    """
+    with _shells_lock:
+        shell = _shells.get(serial)
+        if shell is None:
+            shell = _shells[serial] = AdbShell(serial)
+        return shell
+
+
+def close_adb_shells():
+    """Ends every shared shell session."""
+    with _shells_lock:
+        shells = list(_shells.values())
+        _shells.clear()
+    for shell in shells:
+        shell.close()
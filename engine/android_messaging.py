@@ -0,0 +1,412 @@
+"""
+Vishwakarma AI - Android Messaging
+© 2025 Vishwakarma Industries
+
+This module sends SMS and places calls on connected Android phones with
+intents (`am start`) instead of driving the SMS app through its screens.
+An SMS intent opens the conversation with the number and text already
+filled in, so sending costs one command and one tap on Send; with
+SMS_BACKEND=service_call the message goes straight to the telephony
+service and no screen is involved at all. Bulk sends are queued, paced
+per device to stay under carrier and Android sending limits, retried
+once when they failed before Send was tapped, and spread over every
+connected phone (`adb -s`), with a status per message. A message whose
+Send tap is not followed by the compose screen closing is marked unknown
+rather than sent again, so nobody gets it twice.
+
+Usage:
+    python -m engine.android_messaging "Meeting moved to 5pm" --to 9876543210 --to 9876543211
+    python -m engine.android_messaging "Reminder: rent is due" --numbers numbers.txt
+"""
+import argparse
+import queue
+import re
+import shlex
+import subprocess
+import threading
+import time
+
+from engine.adb import AdbError, AdbShell, adb_command, get_adb_shell
+from engine.android_ui import get_ui_automator
+from engine.config import (ADB_WAIT_TIMEOUT, SMS_BACKEND, SMS_MAX_ATTEMPTS,
+                           SMS_RATE_PER_MINUTE, SMS_SERVICE_CALL)
+
+# The Send control of the compose screen an SMS intent opens (Google
+# Messages first, then labels most messaging apps share)
+SEND_SELECTORS = [{'resource_id': 'send_message_button_icon'}, {'resource_id': 'send_message_button'},
+                  {'desc': 'Send SMS'}, {'desc': 'Send'}]
+DIAL_CHARACTERS = re.compile(r'[^\d+*#]')
+
+QUEUED = 'queued'
+SENDING = 'sending'
+SENT = 'sent'
+FAILED = 'failed'
+# Send was tapped, but whether the message went out could not be confirmed
+UNKNOWN = 'unknown'
+
+
+class SmsUnconfirmedError(AdbError):
+    """Raised when Send was tapped but the message was not seen to go out."""
+
+
+def dial_string(number):
+    """
+    Strips a number down to what a dialer accepts.
+
+    Args:
+        number (str): E.g. "+91 98765-43210".
+
+    Returns:
+        str: E.g. "+919876543210".
+
+    Raises:
+        ValueError: If no digits are left.
+    """
+    digits = DIAL_CHARACTERS.sub('', str(number or ''))
+    if not any(c.isdigit() for c in digits):
+        raise ValueError(f"Not a phone number: {number!r}")
+    return digits
+
+
+def list_devices(adb=None):
+    """
+    Lists the connected, authorized devices.
+
+    Args:
+        adb (str or list): The adb binary or command prefix; ADB_PATH if None.
+
+    Returns:
+        list: Device serials.
+    """
+    try:
+        result = subprocess.run(adb_command(adb) + ['devices'], capture_output=True, text=True,
+                                timeout=10)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"Error listing ADB devices: {e}")
+        return []
+    devices = []
+    for line in result.stdout.splitlines()[1:]:
+        serial, _, state = line.partition('\t')
+        if state.strip() == 'device':
+            devices.append(serial.strip())
+    return devices
+
+
+def place_call(number, shell=None):
+    """
+    Starts a phone call.
+
+    Args:
+        number (str): The number to call.
+        shell (AdbShell): The phone's session; the default device if None.
+
+    Returns:
+        AdbResult: The `am start` result.
+    """
+    shell = shell or get_adb_shell()
+    command = f"am start -W -a android.intent.action.CALL -d {shlex.quote('tel:' + dial_string(number))}"
+    result = shell.run(command, check=True)
+    if 'Error' in result.output:
+        raise AdbError(f"Could not start the call: {result.output.strip()}")
+    return result
+
+
+class IntentSmsSender:
+    """Sends SMS through the SENDTO intent and the compose screen's Send button."""
+
+    def __init__(self, shell, timeout=ADB_WAIT_TIMEOUT):
+        """
+        Args:
+            shell (AdbShell): The phone's session.
+            timeout (float): Seconds to wait for the compose screen to
+                close after Send.
+        """
+        self.shell = shell
+        self.timeout = timeout
+        self.ui = get_ui_automator(shell)
+
+    def send(self, number, text):
+        """
+        Sends one message.
+
+        Args:
+            number (str): The recipient.
+            text (str): The message; any characters, it is not typed.
+
+        Raises:
+            AdbError: If the compose screen did not open.
+            LookupError: If it has no Send button.
+            SmsUnconfirmedError: If Send was tapped but the compose screen
+                did not close; the message may or may not have gone out.
+        """
+        command = (f"am start -W -a android.intent.action.SENDTO "
+                   f"-d {shlex.quote('smsto:' + dial_string(number))} "
+                   f"--es sms_body {shlex.quote(text)} --ez exit_on_sent true")
+        result = self.shell.run(command, check=True)
+        if 'Error' in result.output:
+            raise AdbError(f"Could not open the SMS app: {result.output.strip()}")
+        # -W returned once the screen was up. The Send button is looked up
+        # on a fresh dump: a cached layout from before the keyboard or a
+        # banner moved it would tap whatever is there now
+        compose = self.shell.current_focus()
+        element = self.ui.find(SEND_SELECTORS, cached=False)
+        if element is None:
+            raise LookupError(f"No control on screen matches {SEND_SELECTORS}")
+        # From here on the message may have gone out: never report a
+        # failure that would make the caller send it again
+        try:
+            self.shell.tap(*element.center)
+            # exit_on_sent closes the compose screen once the message is sent
+            closed = self.shell.wait_for_focus_change(compose, self.timeout)
+        except AdbError as e:
+            raise SmsUnconfirmedError(f"Lost the phone after tapping Send: {e}") from e
+        if closed is None:
+            raise SmsUnconfirmedError("Tapped Send, but the compose screen stayed open")
+
+
+class ServiceCallSmsSender:
+    """
+    Sends SMS straight through the telephony service (`service call isms`).
+
+    The transaction code and its arguments change between Android
+    versions, so the call is configured (SMS_SERVICE_CALL) for the phones
+    in use, with {number} and {text} placeholders.
+    """
+
+    def __init__(self, shell, template=SMS_SERVICE_CALL):
+        """
+        Args:
+            shell (AdbShell): The phone's session.
+            template (str): The `service call isms ...` command.
+        """
+        if not template:
+            raise ValueError("SMS_BACKEND=service_call needs SMS_SERVICE_CALL")
+        self.shell = shell
+        self.template = template
+
+    def send(self, number, text):
+        """
+        Sends one message.
+
+        Args:
+            number (str): The recipient.
+            text (str): The message.
+
+        Raises:
+            AdbError: If the service reported an error.
+        """
+        command = self.template.format(number=shlex.quote(dial_string(number)), text=shlex.quote(text))
+        result = self.shell.run(command, check=True)
+        # A successful call returns an empty parcel: "Result: Parcel(00000000    '....')"
+        if 'Parcel(00000000' not in result.output:
+            raise AdbError(f"service call failed: {result.output.strip()}")
+
+
+def create_sms_sender(shell, backend=SMS_BACKEND):
+    """
+    Creates the configured SMS sender for a phone.
+
+    Args:
+        shell (AdbShell): The phone's session.
+        backend (str): "intent" or "service_call".
+
+    Returns:
+        IntentSmsSender or ServiceCallSmsSender: The sender.
+    """
+    if backend == 'intent':
+        return IntentSmsSender(shell)
+    if backend == 'service_call':
+        return ServiceCallSmsSender(shell)
+    raise ValueError(f"Unknown SMS backend '{backend}'. Use 'intent' or 'service_call'.")
+
+
+class RateLimiter:
+    """Spaces events evenly: at most `per_minute` per minute."""
+
+    def __init__(self, per_minute, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next = None
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Blocks until the next event may happen."""
+        with self._lock:
+            now = self._clock()
+            if self._next is not None and self._next > now:
+                self._sleep(self._next - now)
+                now = self._next
+            self._next = now + self.interval
+
+
+class SmsStatus:
+    """The delivery state of one queued message."""
+
+    __slots__ = ('number', 'text', 'name', 'state', 'device', 'attempts', 'error', 'elapsed')
+
+    def __init__(self, number, text, name=None):
+        self.number = number
+        self.text = text
+        self.name = name
+        self.state = QUEUED
+        self.device = None
+        self.attempts = 0
+        self.error = None
+        self.elapsed = 0.0
+
+    def as_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self):
+        return f"SmsStatus({self.number!r}, {self.state!r}, device={self.device!r})"
+
+
+class SmsDispatcher:
+    """Sends a queue of messages, paced per phone, over every connected phone."""
+
+    def __init__(self, devices=None, rate_per_minute=SMS_RATE_PER_MINUTE,
+                 max_attempts=SMS_MAX_ATTEMPTS, backend=SMS_BACKEND, adb=None):
+        """
+        Args:
+            devices (list): Device serials; every connected device if None.
+            rate_per_minute (float): Messages per minute per device; 0 for
+                no limit.
+            max_attempts (int): Tries per message before it is marked
+                failed; a message whose Send tap was not confirmed is never
+                tried again.
+            backend (str): "intent" or "service_call".
+            adb (str or list): The adb binary or command prefix; the shared
+                sessions (ADB_PATH) if None.
+        """
+        self.devices = devices
+        self.rate_per_minute = rate_per_minute
+        self.max_attempts = max_attempts
+        self.backend = backend
+        self.adb = adb
+        self._shells = {}
+
+    def send(self, messages, progress=None):
+        """
+        Sends messages and waits until each is sent or has failed.
+
+        Args:
+            messages (list): (number, text) or (number, text, name) tuples.
+            progress (callable): Called with an SmsStatus whenever one
+                changes state.
+
+        Returns:
+            list: An SmsStatus per message, in the given order.
+        """
+        statuses = [SmsStatus(*message) for message in messages]
+        devices = self.devices if self.devices is not None else list_devices(self.adb)
+        if not devices:
+            # Let adb pick the only device, or report why it cannot
+            devices = [None]
+
+        pending = queue.Queue()
+        for status in statuses:
+            pending.put(status)
+        workers = [threading.Thread(target=self._work, args=(serial, pending, progress),
+                                    name=f"sms-{serial or 'default'}", daemon=True)
+                   for serial in devices]
+        for worker in workers:
+            worker.start()
+        pending.join()
+        for _ in workers:
+            pending.put(None)
+        for worker in workers:
+            worker.join()
+        return statuses
+
+    def broadcast(self, numbers, text, progress=None):
+        """Sends the same text to several numbers."""
+        return self.send([(number, text) for number in numbers], progress)
+
+    def close(self):
+        """Ends the sessions this dispatcher opened itself."""
+        for shell in self._shells.values():
+            shell.close()
+        self._shells.clear()
+
+    def _shell(self, serial):
+        if self.adb is None:
+            return get_adb_shell(serial)
+        if serial not in self._shells:
+            self._shells[serial] = AdbShell(serial, adb=self.adb)
+        return self._shells[serial]
+
+    def _work(self, serial, pending, progress):
+        limiter = RateLimiter(self.rate_per_minute)
+        try:
+            sender = create_sms_sender(self._shell(serial), self.backend)
+        except ValueError as e:
+            sender, setup_error = None, e
+        while True:
+            status = pending.get()
+            if status is None:
+                pending.task_done()
+                return
+            status.device = serial
+            status.attempts += 1
+            status.state = SENDING
+            _notify(progress, status)
+            start = time.perf_counter()
+            try:
+                if sender is None:
+                    raise setup_error
+                limiter.wait()
+                sender.send(status.number, status.text)
+                status.state, status.error = SENT, None
+            except SmsUnconfirmedError as e:
+                # Sending it again could deliver it twice
+                status.state, status.error = UNKNOWN, str(e)
+            except (AdbError, LookupError, ValueError) as e:
+                status.error = str(e)
+                retry = status.attempts < self.max_attempts and not isinstance(e, ValueError)
+                status.state = QUEUED if retry else FAILED
+                if retry:
+                    # Any device may take it, this one might be the problem
+                    pending.put(status)
+            except Exception as e:
+                # Anything else (e.g. an OSError from the shell) must not
+                # end this worker: send() waits for every message
+                status.state, status.error = FAILED, str(e)
+            finally:
+                status.elapsed += time.perf_counter() - start
+                _notify(progress, status)
+                pending.task_done()
+
+
+def _notify(progress, status):
+    if progress is None:
+        return
+    try:
+        progress(status)
+    except Exception as e:
+        print(f"Error reporting SMS progress: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send an SMS to several numbers from the connected phones.")
+    parser.add_argument('text')
+    parser.add_argument('--to', action='append', default=[], help="a recipient (repeatable)")
+    parser.add_argument('--numbers', help="file with one number per line")
+    parser.add_argument('--device', action='append', help="device serial (default: all connected)")
+    parser.add_argument('--rate', type=float, default=SMS_RATE_PER_MINUTE, help="messages per minute per device")
+    args = parser.parse_args()
+
+    numbers = list(args.to)
+    if args.numbers:
+        with open(args.numbers, encoding='utf-8') as f:
+            numbers += [line.strip() for line in f if line.strip()]
+    dispatcher = SmsDispatcher(devices=args.device, rate_per_minute=args.rate)
+    statuses = dispatcher.broadcast(numbers, args.text, progress=lambda s: print(
+        f"{s.number:<16} {s.state:<8} {s.device or ''} {s.error or ''}"))
+    sent = sum(status.state == SENT for status in statuses)
+    unknown = sum(status.state == UNKNOWN for status in statuses)
+    print(f"Sent {sent} of {len(statuses)} messages" + (f", {unknown} unconfirmed" if unknown else ""))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,369 @@
+"""
+Vishwakarma AI - Android UI Automation
+© 2025 Vishwakarma Industries
+
+This module finds on-screen controls on the connected Android device by
+resource-id, text or content description instead of by hard-coded screen
+coordinates. The UI hierarchy (`uiautomator dump`) is parsed into an
+element tree with lookup indexes, cached per screen (the focused activity,
+its orientation and whether the keyboard is up) so controls that were
+already seen are tapped without dumping again, and polled until a control
+appears rather than waiting a fixed time.
+"""
+import re
+import threading
+import time
+import weakref
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+from engine.adb import FOCUS_COMMAND, FOCUS_PATTERN, AdbError
+from engine.config import (ADB_POLL_INTERVAL, ADB_WAIT_TIMEOUT, UI_CACHE_ACTIVITIES,
+                           UI_DUMP_PATH, UI_SETTLE_SECONDS)
+
+BOUNDS_PATTERN = re.compile(r'\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]')
+# The focused window plus what moves controls around within it
+SCREEN_COMMAND = (f"{FOCUS_COMMAND}; dumpsys window | grep -E 'mCurrentRotation|mRotation='; "
+                  f"dumpsys input_method | grep mInputShown")
+# "mCurrentRotation=ROTATION_90", "mRotation=1", "mInputShown=true"
+SCREEN_STATE_PATTERN = re.compile(r'(mCurrentRotation|mRotation|mInputShown)=(\w+)')
+
+
+def parse_bounds(bounds):
+    """
+    Parses a uiautomator bounds attribute.
+
+    Args:
+        bounds (str): E.g. "[0,63][1080,210]".
+
+    Returns:
+        tuple: (left, top, right, bottom), or None if malformed.
+    """
+    match = BOUNDS_PATTERN.fullmatch(bounds or '')
+    return tuple(int(n) for n in match.groups()) if match else None
+
+
+def normalize_label(label):
+    """Casefolds text and collapses its whitespace, for matching."""
+    return ' '.join((label or '').split()).casefold()
+
+
+def parse_screen(output):
+    """
+    Parses the output of SCREEN_COMMAND.
+
+    Args:
+        output (str): The command's output.
+
+    Returns:
+        tuple: (activity, rotation and keyboard state), the cache key of
+            the screen; None while nothing has focus.
+    """
+    match = FOCUS_PATTERN.search(output)
+    if match is None:
+        return None
+    return match.group(1), tuple(sorted(SCREEN_STATE_PATTERN.findall(output)))
+
+
+class UiElement:
+    """One node of the UI hierarchy."""
+
+    __slots__ = ('resource_id', 'text', 'desc', 'class_name', 'package', 'bounds',
+                 'clickable', 'enabled', 'parent', 'children')
+
+    def __init__(self, attributes, parent=None):
+        self.resource_id = attributes.get('resource-id', '')
+        self.text = attributes.get('text', '')
+        self.desc = attributes.get('content-desc', '')
+        self.class_name = attributes.get('class', '')
+        self.package = attributes.get('package', '')
+        self.bounds = parse_bounds(attributes.get('bounds'))
+        self.clickable = attributes.get('clickable') == 'true'
+        self.enabled = attributes.get('enabled', 'true') == 'true'
+        self.parent = parent
+        self.children = []
+
+    @property
+    def short_id(self):
+        """The resource-id without its package: "send_button"."""
+        return self.resource_id.rpartition(':id/')[2]
+
+    @property
+    def center(self):
+        """The point to tap, or None for an element without bounds."""
+        if self.bounds is None:
+            return None
+        left, top, right, bottom = self.bounds
+        return (left + right) // 2, (top + bottom) // 2
+
+    @property
+    def visible(self):
+        return self.bounds is not None and self.bounds[2] > self.bounds[0] and self.bounds[3] > self.bounds[1]
+
+    def __repr__(self):
+        label = self.resource_id or self.text or self.desc or self.class_name
+        return f"UiElement({label!r}, {self.bounds})"
+
+
+class UiHierarchy:
+    """A parsed `uiautomator dump`, indexed by resource-id, text and description."""
+
+    def __init__(self, xml):
+        """
+        Args:
+            xml (str): The dump's XML.
+
+        Raises:
+            ValueError: If the XML cannot be parsed.
+        """
+        try:
+            root = ET.fromstring(xml)
+        except ET.ParseError as e:
+            raise ValueError(f"Malformed UI hierarchy: {e}") from e
+        self.elements = []
+        self._by_id = {}
+        self._by_text = {}
+        self._by_desc = {}
+        for node in root:
+            self._add(node, None)
+
+    def find(self, resource_id=None, text=None, desc=None, class_name=None):
+        """
+        Finds the first visible element matching every given criterion.
+
+        Args:
+            resource_id (str): With or without "package:id/".
+            text (str): The text, ignoring case and extra whitespace.
+            desc (str): The content description, matched like text.
+            class_name (str): E.g. "android.widget.EditText".
+
+        Returns:
+            UiElement: The element, or None.
+        """
+        for element in self.find_all(resource_id, text, desc, class_name):
+            return element
+        return None
+
+    def find_all(self, resource_id=None, text=None, desc=None, class_name=None):
+        """
+        Lists the visible elements matching every given criterion, in
+        document order.
+
+        Returns:
+            list: The elements.
+        """
+        if resource_id is not None:
+            candidates = self._by_id.get(resource_id.rpartition(':id/')[2], [])
+        elif text is not None:
+            candidates = self._by_text.get(normalize_label(text), [])
+        elif desc is not None:
+            candidates = self._by_desc.get(normalize_label(desc), [])
+        else:
+            candidates = self.elements
+        return [e for e in candidates if e.visible
+                and (resource_id is None or resource_id in (e.resource_id, e.short_id))
+                and (text is None or normalize_label(e.text) == normalize_label(text))
+                and (desc is None or normalize_label(e.desc) == normalize_label(desc))
+                and (class_name is None or e.class_name == class_name)]
+
+    def find_any(self, selectors):
+        """
+        Finds the first element matching any of several selectors.
+
+        Args:
+            selectors (dict or list): Keyword arguments for find(), or a list
+                of them tried in order (e.g. an app's id, then its label).
+
+        Returns:
+            UiElement: The element, or None.
+        """
+        for selector in ([selectors] if isinstance(selectors, dict) else selectors):
+            element = self.find(**selector)
+            if element is not None:
+                return element
+        return None
+
+    def __len__(self):
+        return len(self.elements)
+
+    def _add(self, node, parent):
+        element = UiElement(node.attrib, parent)
+        self.elements.append(element)
+        if parent is not None:
+            parent.children.append(element)
+        if element.resource_id:
+            self._by_id.setdefault(element.short_id, []).append(element)
+        if element.text:
+            self._by_text.setdefault(normalize_label(element.text), []).append(element)
+        if element.desc:
+            self._by_desc.setdefault(normalize_label(element.desc), []).append(element)
+        for child in node:
+            self._add(child, element)
+
+
+class UiAutomator:
+    """Taps and types into controls found in the device's UI hierarchy."""
+
+    def __init__(self, shell, dump_path=UI_DUMP_PATH, max_activities=UI_CACHE_ACTIVITIES,
+                 settle_seconds=UI_SETTLE_SECONDS):
+        """
+        Args:
+            shell (AdbShell): The device's shell session.
+            dump_path (str): Where uiautomator writes the dump on the device.
+            max_activities (int): How many screens' hierarchies to keep.
+            settle_seconds (float): How long a cached screen without the
+                wanted control stays focused before it is dumped again.
+        """
+        self.shell = shell
+        self.max_activities = max_activities
+        self.settle_seconds = settle_seconds
+        self._dump_command = f"uiautomator dump {dump_path} >/dev/null && cat {dump_path}"
+        self._cache = OrderedDict()  # parse_screen() key -> UiHierarchy
+        self._lock = threading.Lock()
+        self.dumps = 0
+        self.cache_hits = 0
+
+    def dump(self):
+        """
+        Dumps the current screen and caches it under its activity,
+        orientation and keyboard state.
+
+        Returns:
+            tuple: (activity, UiHierarchy); the activity is None while
+                nothing has focus.
+        """
+        # Both commands in one round trip
+        screen, dump = self.shell.run_batch([SCREEN_COMMAND, self._dump_command])
+        if not dump.ok:
+            raise AdbError(f"uiautomator dump failed: {dump.output.strip()}")
+        start = dump.output.find('<?xml')
+        try:
+            hierarchy = UiHierarchy(dump.output[start if start >= 0 else 0:])
+        except ValueError as e:
+            # E.g. a dump read back while it was still being written
+            raise AdbError(f"uiautomator dump failed: {e}") from e
+        key = parse_screen(screen.output)
+        self.dumps += 1
+        if key is not None:
+            with self._lock:
+                self._cache[key] = hierarchy
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_activities:
+                    self._cache.popitem(last=False)
+        return key and key[0], hierarchy
+
+    def find(self, selectors, timeout=ADB_WAIT_TIMEOUT, interval=ADB_POLL_INTERVAL, cached=True):
+        """
+        Finds a control, polling the screen until it appears.
+
+        Args:
+            selectors (dict or list): See UiHierarchy.find_any().
+            timeout (float): Seconds to keep polling; 0 looks once.
+            interval (float): Seconds between polls.
+            cached (bool): Try the hierarchy cached for the current screen
+                before dumping. Lists, other changing content and controls
+                that must not be missed (e.g. Send) should be looked up
+                with cached=False.
+
+        Returns:
+            UiElement: The control, or None on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        first_seen = {}
+        while True:
+            last = time.monotonic() + interval > deadline
+            dump = True
+            if cached:
+                # A focus check is far cheaper than a dump; a rotated
+                # screen or the keyboard coming up moves controls, so
+                # those are part of the key
+                key = parse_screen(self.shell.run(SCREEN_COMMAND).output)
+                with self._lock:
+                    hierarchy = self._cache.get(key)
+                element = hierarchy.find_any(selectors) if hierarchy is not None else None
+                if element is not None:
+                    self.cache_hits += 1
+                    return element
+                if hierarchy is not None or key is None:
+                    # A known screen without the control, or no focus at
+                    # all: usually the next activity is still starting, so
+                    # dump only once this has lasted a while
+                    now = time.monotonic()
+                    dump = last or now - first_seen.setdefault(key, now) >= self.settle_seconds
+
+            if dump:
+                _, hierarchy = self.dump()
+                element = hierarchy.find_any(selectors)
+                if element is not None:
+                    return element
+            if last:
+                return None
+            time.sleep(interval)
+
+    def tap(self, selectors, timeout=ADB_WAIT_TIMEOUT, cached=True):
+        """
+        Taps the center of a control.
+
+        Args:
+            selectors (dict or list): See UiHierarchy.find_any().
+            timeout (float): Seconds to wait for the control to appear.
+            cached (bool): See find().
+
+        Returns:
+            UiElement: The control that was tapped.
+
+        Raises:
+            LookupError: If the control did not appear in time.
+        """
+        element = self.find(selectors, timeout, cached=cached)
+        if element is None:
+            raise LookupError(f"No control on screen matches {selectors}")
+        self.shell.tap(*element.center)
+        return element
+
+    def set_text(self, selectors, text, timeout=ADB_WAIT_TIMEOUT, cached=True):
+        """
+        Focuses a text field and types into it.
+
+        Args:
+            selectors (dict or list): See UiHierarchy.find_any().
+            text (str): The text to type.
+            timeout (float): Seconds to wait for the field to appear.
+            cached (bool): See find().
+
+        Returns:
+            UiElement: The field.
+        """
+        element = self.tap(selectors, timeout, cached)
+        self.shell.text(text)
+        return element
+
+    def invalidate(self, activity=None):
+        """Forgets the cached hierarchies of one activity, or of all."""
+        with self._lock:
+            if activity is None:
+                self._cache.clear()
+            else:
+                for key in [key for key in self._cache if key[0] == activity]:
+                    del self._cache[key]
+
+
+_automators = weakref.WeakKeyDictionary()
+_automators_lock = threading.Lock()
+
+
+def get_ui_automator(shell):
+    """
+    Returns the shared UI automator of a shell session.
+
+    Args:
+        shell (AdbShell): The device's shell session.
+
+    Returns:
+        UiAutomator: The automator, whose cache lives as long as the session.
+    """
+    with _automators_lock:
+        automator = _automators.get(shell)
+        if automator is None:
+            automator = _automators[shell] = UiAutomator(shell)
+        return automator
@@ -0,0 +1,400 @@
+"""
+Vishwakarma AI - Installed Application Index
+© 2025 Vishwakarma Industries
+
+This module finds installed applications on Linux (and other non-Windows
+systems) for openCommand(). It reads freedesktop .desktop entries and the
+executables on $PATH into a searchable index. Desktop applications are
+also found by prefix or a close (misheard) name; a bare executable only by
+its exact name, and never a system tool such as "reboot" or "mkfs". The
+index is cached on disk, and each directory is rescanned only when its
+modification time changes. Matches are launched with subprocess.Popen,
+detached and without a shell.
+"""
+import bisect
+import difflib
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+import threading
+import time
+
+from engine.config import APP_INDEX_PATH, APP_INDEX_REFRESH_SECONDS
+
+CACHE_VERSION = 2
+# Exec= field codes (file, URL and icon arguments) dropped when launching
+FIELD_CODE = re.compile(r'%[fFuUdDnNickvm]')
+# Close matches below this difflib ratio are not launched
+MIN_FUZZY_RATIO = 0.75
+# Executables on $PATH that are never launched by voice: power, process,
+# disk, privilege and destructive file tools
+DENIED_EXECUTABLES = re.compile(
+    r'poweroff|reboot|shutdown|halt|suspend|hibernate|init|telinit|systemctl|loginctl|'
+    r'kill|killall|pkill|xkill|skill|'
+    r'mkfs(\..*)?|mke2fs|mkswap|swapon|swapoff|fdisk|sfdisk|cfdisk|gdisk|parted|wipefs|'
+    r'mount|umount|fsck(\..*)?|dd|shred|rm|rmdir|unlink|truncate|'
+    r'sudo|su|doas|pkexec|passwd|chmod|chown|chgrp|useradd|userdel|usermod|crontab')
+
+
+def desktop_dirs():
+    """Returns the XDG application directories, highest precedence first."""
+    data_home = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    data_dirs = os.environ.get('XDG_DATA_DIRS') or '/usr/local/share:/usr/share'
+    dirs = [data_home] + [d for d in data_dirs.split(':') if d]
+    dirs += [os.path.expanduser('~/.local/share/flatpak/exports/share'),
+             '/var/lib/flatpak/exports/share']
+    apps = [os.path.join(d, 'applications') for d in dirs]
+    apps.append('/var/lib/snapd/desktop/applications')
+    return list(dict.fromkeys(apps))
+
+
+def path_dirs():
+    """Returns the directories on $PATH."""
+    return list(dict.fromkeys(d for d in os.environ.get('PATH', '').split(os.pathsep) if d))
+
+
+def normalize_app_name(name):
+    """Lowercases a name and keeps its alphanumeric words."""
+    return ' '.join(re.findall(r'[a-z0-9+]+', (name or '').lower()))
+
+
+def parse_exec(command):
+    """
+    Turns a desktop entry's Exec= line into an argument list.
+
+    Args:
+        command (str): E.g. 'firefox %u' or 'env FOO=1 "/opt/My App/app" --new'.
+
+    Returns:
+        list: The arguments, without field codes; empty if unparsable.
+    """
+    try:
+        args = shlex.split(command)
+    except ValueError:
+        return []
+    argv = []
+    for arg in args:
+        if FIELD_CODE.fullmatch(arg):
+            continue
+        argv.append(FIELD_CODE.sub('', arg).replace('%%', '%'))
+    return argv
+
+
+def read_desktop_entry(path):
+    """
+    Reads the launchable application described by a .desktop file.
+
+    Args:
+        path (str): The file.
+
+    Returns:
+        dict: name, argv and search keys, or None for hidden entries,
+            non-applications and unreadable files.
+    """
+    fields = {}
+    in_entry = False
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith('['):
+                    if in_entry:
+                        break
+                    in_entry = line == '[Desktop Entry]'
+                elif in_entry and '=' in line and not line.startswith('#'):
+                    key, _, value = line.partition('=')
+                    # Only untranslated keys: "Name", not "Name[de]"
+                    fields.setdefault(key.strip(), value.strip())
+    except OSError:
+        return None
+
+    # Terminal programs would start without a window to show them
+    if (fields.get('Type') != 'Application' or fields.get('Hidden') == 'true'
+            or fields.get('NoDisplay') == 'true' or fields.get('Terminal') == 'true'
+            or not fields.get('Name')):
+        return None
+    argv = parse_exec(fields.get('Exec', ''))
+    if not argv:
+        return None
+
+    desktop_id = os.path.splitext(os.path.basename(path))[0]
+    keys = [fields['Name'], fields.get('GenericName', ''), desktop_id.split('.')[-1],
+            os.path.basename(argv[0])]
+    keys += fields.get('Keywords', '').split(';')
+    return {'name': fields['Name'], 'argv': argv, 'source': 'desktop',
+            'keys': [k for k in dict.fromkeys(normalize_app_name(k) for k in keys) if k]}
+
+
+def scan_desktop_dir(directory):
+    """Reads every .desktop file in a directory and its subdirectories."""
+    apps = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.endswith('.desktop'):
+                app = read_desktop_entry(os.path.join(root, name))
+                if app is not None:
+                    apps.append(app)
+    return apps
+
+
+def scan_path_dir(directory):
+    """Lists the executables in a $PATH directory, except DENIED_EXECUTABLES."""
+    apps = []
+    try:
+        entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+    except OSError:
+        return apps
+    for entry in entries:
+        if DENIED_EXECUTABLES.fullmatch(entry.name):
+            continue
+        try:
+            if entry.is_file() and os.access(entry.path, os.X_OK):
+                apps.append({'name': entry.name, 'argv': [entry.path], 'source': 'path',
+                             'keys': [normalize_app_name(entry.name)]})
+        except OSError:
+            continue
+    return apps
+
+
+def _mtime(directory):
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+
+class AppEntry:
+    """An installed application and how to start it."""
+
+    __slots__ = ('name', 'argv', 'source')
+
+    def __init__(self, name, argv, source):
+        self.name = name
+        self.argv = argv
+        self.source = source
+
+    def __repr__(self):
+        return f"AppEntry({self.name!r}, {self.argv!r}, {self.source!r})"
+
+
+class AppIndex:
+    """A searchable, disk-cached index of installed applications."""
+
+    def __init__(self, desktop_dirs=None, path_dirs=None, cache_path=APP_INDEX_PATH,
+                 refresh_seconds=APP_INDEX_REFRESH_SECONDS):
+        """
+        Args:
+            desktop_dirs (list): Directories of .desktop files, highest
+                precedence first; the XDG directories if None.
+            path_dirs (list): Executable directories; $PATH if None.
+            cache_path (str): JSON cache file; None disables the cache.
+            refresh_seconds (float): Minimum time between directory checks.
+        """
+        self.desktop_dirs = desktop_dirs
+        self.path_dirs = path_dirs
+        self.cache_path = cache_path
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._scans = {}  # directory -> {'mtime': ns, 'apps': [...]}
+        # (key -> entry, sorted word-started tails of desktop keys, their
+        # entries), swapped whole
+        self._view = ({}, [], [])
+        self._refreshed_at = None
+        self._refreshing = False
+        self._processes = []
+        self.rescanned = 0
+        self._load_cache()
+
+    def refresh(self):
+        """
+        Rescans the directories whose modification time changed.
+
+        Returns:
+            int: How many directories were rescanned.
+        """
+        with self._lock:
+            dirs = [('desktop', d) for d in (self.desktop_dirs or desktop_dirs())]
+            dirs += [('path', d) for d in (self.path_dirs or path_dirs())]
+            rescanned = 0
+            scans = {}
+            for kind, directory in dirs:
+                mtime = _mtime(directory)
+                scan = self._scans.get(directory)
+                if scan is None or scan['mtime'] != mtime:
+                    if mtime is None:
+                        apps = []
+                    elif kind == 'desktop':
+                        apps = scan_desktop_dir(directory)
+                    else:
+                        apps = scan_path_dir(directory)
+                    scan = {'mtime': mtime, 'apps': apps}
+                    rescanned += 1
+                scans[directory] = scan
+
+            changed = rescanned or list(scans) != list(self._scans)
+            self._scans = scans
+            self._refreshed_at = time.monotonic()
+            if changed or not self._view[0]:
+                self._build()
+            if changed:
+                self._save_cache()
+            self.rescanned += rescanned
+            return rescanned
+
+    def refresh_in_background(self):
+        """Starts a refresh on a daemon thread unless one is running."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error indexing applications: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="app-indexer", daemon=True).start()
+
+    def lookup(self, query):
+        """
+        Finds the application a spoken name refers to.
+
+        Tries the name, keyword and executable keys exactly, then any
+        word-started part of a desktop application's keys as a prefix
+        ("chrome" for "Google Chrome", "code" for "Visual Studio Code"),
+        then as a close (misheard) match. Desktop applications win over
+        bare executables, which are only found by their exact name.
+
+        Args:
+            query (str): E.g. "firefox", "text editor" or "calc".
+
+        Returns:
+            AppEntry: The application, or None.
+        """
+        if self._refreshed_at is None:
+            # First use: search the cached index while the real scan runs
+            if self._view[0]:
+                self.refresh_in_background()
+            else:
+                self.refresh()
+        elif time.monotonic() - self._refreshed_at > self.refresh_seconds:
+            self.refresh_in_background()
+
+        exact, keys, entries = self._view
+        key = normalize_app_name(query)
+        if not key:
+            return None
+        entry = exact.get(key) or exact.get(key.replace(' ', ''))
+        if entry is not None:
+            return entry
+
+        # Only desktop applications from here on: a partial or misheard
+        # name must not start an arbitrary executable
+        i = bisect.bisect_left(keys, key)
+        best = None
+        while i < len(keys) and keys[i].startswith(key):
+            # The closest (shortest) key
+            if best is None or len(keys[i]) < len(keys[best]):
+                best = i
+            i += 1
+        if best is not None:
+            return entries[best]
+
+        close = difflib.get_close_matches(key, keys, n=1, cutoff=MIN_FUZZY_RATIO)
+        return entries[bisect.bisect_left(keys, close[0])] if close else None
+
+    def launch(self, entry):
+        """
+        Starts an application without a shell and without waiting for it.
+
+        Args:
+            entry (AppEntry): The application.
+
+        Returns:
+            subprocess.Popen: The started process.
+        """
+        # Reap earlier launches that have exited
+        self._processes = [p for p in self._processes if p.poll() is None]
+        process = subprocess.Popen(entry.argv, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL, close_fds=True,
+                                   start_new_session=True)
+        self._processes.append(process)
+        return process
+
+    def __len__(self):
+        return len(self._view[0])
+
+    def _build(self):
+        exact = {}
+        # Desktop entries first, then $PATH; earlier directories win
+        for source in ('desktop', 'path'):
+            for scan in self._scans.values():
+                for app in scan['apps']:
+                    if app['source'] != source:
+                        continue
+                    entry = AppEntry(app['name'], app['argv'], app['source'])
+                    for key in app['keys']:
+                        exact.setdefault(key, entry)
+                        exact.setdefault(key.replace(' ', ''), entry)
+        # Whole desktop keys, then every word-started tail of them, so that
+        # "chrome" finds "google chrome"; whole keys win over tails
+        desktop = [(key, entry) for key, entry in exact.items() if entry.source == 'desktop']
+        tails = dict(desktop)
+        for key, entry in desktop:
+            words = key.split()
+            for i in range(1, len(words)):
+                tails.setdefault(' '.join(words[i:]), entry)
+        keys = sorted(tails)
+        self._view = (exact, keys, [tails[key] for key in keys])
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                self._scans = data['dirs']
+                self._build()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring application index cache: {e}")
+            self._scans = {}
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            temp_path = f"{self.cache_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'dirs': self._scans}, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"Error saving application index: {e}")
+
+
+_app_index = None
+_app_index_lock = threading.Lock()
+
+
+def get_app_index():
+    """
+    Returns the shared application index, creating it on first use.
+
+    Returns:
+        AppIndex: The index, or None on Windows, where "start" finds apps.
+    """
+    global _app_index
+    if sys.platform == 'win32':
+        return None
+    if _app_index is None:
+        with _app_index_lock:
+            if _app_index is None:
+                _app_index = AppIndex()
+    return _app_index
@@ -0,0 +1,247 @@
+"""
+Vishwakarma AI - TTS Audio Cache
+© 2025 Vishwakarma Industries
+
+This module keeps synthesized speech on disk so repeated phrases play
+without another round trip to the TTS service.
+"""
+import ast
+import glob
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from engine.config import (ELEVENLABS_MODEL_ID, ELEVENLABS_VOICE_ID,
+                           ELEVENLABS_VOICE_SETTINGS, TTS_CACHE_MAX_BYTES,
+                           TTS_CACHE_PATH)
+
+
+def speech_cache_key(text, output_format, voice_id=None, model_id=None,
+                     voice_settings=None):
+    """
+    Builds the content address for a rendered phrase.
+
+    Args:
+        text (str): The spoken text.
+        output_format (str): The ElevenLabs output format.
+        voice_id (str, optional): Defaults to the configured voice.
+        model_id (str, optional): Defaults to the configured model.
+        voice_settings (dict, optional): Defaults to the configured settings.
+
+    Returns:
+        str: A hex digest identifying the audio.
+    """
+    material = json.dumps({
+        'text': text,
+        'voice_id': voice_id or ELEVENLABS_VOICE_ID,
+        'model_id': model_id or ELEVENLABS_MODEL_ID,
+        'voice_settings': voice_settings or ELEVENLABS_VOICE_SETTINGS,
+        'output_format': output_format
+    }, sort_keys=True)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class AudioCache:
+    """A size-bounded, least-recently-used cache of audio files."""
+
+    def __init__(self, cache_dir=TTS_CACHE_PATH, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # path -> size, oldest first
+        self._total_bytes = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuilds the LRU order from file modification times."""
+        files = [path for path in glob.glob(os.path.join(self.cache_dir, '*'))
+                 if not path.endswith('.tmp')]
+        for path in sorted(files, key=os.path.getmtime):
+            size = os.path.getsize(path)
+            self._entries[path] = size
+            self._total_bytes += size
+
+    def _path(self, key, output_format):
+        extension = output_format.split('_')[0]
+        return os.path.join(self.cache_dir, f"{key}.{extension}")
+
+    def has(self, key, output_format):
+        """Checks for cached audio without touching the counters."""
+        path = self._path(key, output_format)
+        with self._lock:
+            return path in self._entries and os.path.exists(path)
+
+    def get(self, key, output_format):
+        """
+        Looks up cached audio.
+
+        Args:
+            key (str): The cache key from speech_cache_key().
+            output_format (str): The ElevenLabs output format.
+
+        Returns:
+            str: Path to the cached audio, or None on a miss.
+        """
+        path = self._path(key, output_format)
+        with self._lock:
+            if path not in self._entries or not os.path.exists(path):
+                self._entries.pop(path, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+        try:
+            # Persist recency so the LRU order survives a restart
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def put(self, key, output_format, data):
+        """
+        Stores rendered audio and evicts old entries if over budget.
+
+        Args:
+            key (str): The cache key from speech_cache_key().
+            output_format (str): The ElevenLabs output format.
+            data (bytes): The audio content.
+
+        Returns:
+            str: Path to the cached audio.
+        """
+        path = self._path(key, output_format)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._total_bytes -= self._entries.pop(path, 0)
+            self._entries[path] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+        return path
+
+    def _evict(self):
+        """Removes least recently used files until under the size limit."""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            path, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"Error evicting cached audio: {e}")
+
+    def stats(self):
+        """
+        Returns cache counters.
+
+        Returns:
+            dict: Hits, misses, hit rate, entry count and size in bytes.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes
+            }
+
+
+_audio_cache = None
+
+
+def get_audio_cache():
+    """Returns the process-wide audio cache."""
+    global _audio_cache
+    if _audio_cache is None:
+        _audio_cache = AudioCache()
+    return _audio_cache
+
+
+def _speak_literals(path):
+    """Yields string literals passed directly to speak() in a source file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id == 'speak' and node.args
+                and isinstance(node.args[0], ast.Constant)
+                and isinstance(node.args[0].value, str)):
+            yield node.args[0].value
+
+
+def static_phrases(root='.'):
+    """
+    Collects every fixed phrase the assistant can speak.
+
+    This covers literal speak() calls in the codebase, the canned fallback
+    chatbot answers and the greeting for each existing profile.
+
+    Args:
+        root (str): The project root directory.
+
+    Returns:
+        list: Unique phrases in discovery order.
+    """
+    from engine.features import FALLBACK_DEFAULT_RESPONSE, FALLBACK_RESPONSES
+    from engine.profile_manager import ProfileManager, build_greeting
+
+    sources = [os.path.join(root, 'main.py')]
+    sources += glob.glob(os.path.join(root, 'engine', '**', '*.py'), recursive=True)
+
+    phrases = []
+    for path in sources:
+        phrases.extend(_speak_literals(path))
+    phrases.extend(r for r in FALLBACK_RESPONSES.values() if isinstance(r, str))
+    phrases.append(FALLBACK_DEFAULT_RESPONSE)
+    phrases.append(build_greeting())
+    phrases.extend(build_greeting(p) for p in ProfileManager().get_all_profiles())
+
+    return list(dict.fromkeys(phrases))
+
+
+def warm_up(phrases=None):
+    """
+    Pre-renders phrases into the cache so they play without a network call.
+
+    Args:
+        phrases (list, optional): Defaults to static_phrases().
+
+    Returns:
+        dict: The number of phrases 'rendered', 'cached' already and 'failed'.
+    """
+    from engine.tts import cache_format, render_speech
+
+    cache = get_audio_cache()
+    output_format = cache_format()
+    result = {'rendered': 0, 'cached': 0, 'failed': 0}
+
+    for text in phrases if phrases is not None else static_phrases():
+        key = speech_cache_key(text, output_format)
+        if cache.has(key, output_format):
+            result['cached'] += 1
+            continue
+        try:
+            cache.put(key, output_format, render_speech(text, output_format))
+            result['rendered'] += 1
+        except Exception as e:
+            print(f"Failed to pre-render '{text}': {e}")
+            result['failed'] += 1
+
+    return result
+
+
+if __name__ == '__main__':
+    summary = warm_up()
+    print(f"TTS cache warm-up: {summary['rendered']} rendered, "
+          f"{summary['cached']} already cached, {summary['failed']} failed")
+    print(f"Cache stats: {get_audio_cache().stats()}")
@@ -3,24 +3,223 @@ Vishwakarma AI - Face Authentication Module
 © 2025 Vishwakarma Industries
 
 This module handles face authentication using a trained model.
+
+In performance mode (FACE_PERFORMANCE_MODE) faces are detected on a
+downscaled frame and only every FACE_DETECT_EVERY frames. Between those
+frames each face is tracked by searching a small region around its last
+position. A face whose prediction came out the same FACE_STABLE_MATCHES
+times in a row is not predicted again every frame. Detection uses the
+Haar cascade or, with FACE_DETECTOR=dnn, OpenCV's res10 SSD on the CPU.
 """
 import cv2
 import os
-from engine.config import TRAINER_FILE, CASCADE_PATH
+import time
+from engine.config import (TRAINER_FILE, CASCADE_PATH, FACE_DETECTOR, FACE_DETECT_EVERY,
+                           FACE_DETECTION_WIDTH, FACE_DNN_CONFIDENCE, FACE_DNN_CONFIG,
+                           FACE_DNN_MODEL, FACE_PERFORMANCE_MODE, FACE_RECHECK_FRAMES,
+                           FACE_SHOW_PREVIEW, FACE_STABLE_MATCHES)
 
 # Constants
 FONT = cv2.FONT_HERSHEY_SIMPLEX
 CONFIDENCE_THRESHOLD = 100
+# Tracked faces are searched for in their box grown by this much per side
+TRACK_MARGIN = 0.5
+# Detections overlapping a track at least this much (IoU) continue it
+TRACK_MIN_OVERLAP = 0.3
+
+
+class HaarDetector:
+    """Finds faces with a Haar cascade, optionally on a downscaled image."""
+
+    def __init__(self, cascade_path=CASCADE_PATH, detection_width=None, scale_factor=1.2,
+                 min_neighbors=5):
+        """
+        Args:
+            cascade_path (str): The cascade XML file.
+            detection_width (int): Images wider than this are shrunk to it
+                before detection; full size if None.
+            scale_factor (float): detectMultiScale's pyramid step.
+            min_neighbors (int): detectMultiScale's minNeighbors.
+        """
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        self.detection_width = detection_width
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+
+    def detect(self, img, gray_img, min_size):
+        """
+        Finds faces in an image.
+
+        Args:
+            img (numpy.ndarray): The BGR image (unused).
+            gray_img (numpy.ndarray): The same image in grayscale.
+            min_size (tuple): Smallest face (width, height) at full size.
+
+        Returns:
+            list: (x, y, w, h) boxes in the image's coordinates.
+        """
+        scale = 1.0
+        if self.detection_width and gray_img.shape[1] > self.detection_width:
+            scale = self.detection_width / gray_img.shape[1]
+            gray_img = cv2.resize(gray_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        faces = self.cascade.detectMultiScale(
+            gray_img,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            minSize=(max(int(min_size[0] * scale), 1), max(int(min_size[1] * scale), 1))
+        )
+        return [tuple(int(round(v / scale)) for v in face) for face in faces]
+
+
+class DnnDetector:
+    """Finds faces with OpenCV's res10 300x300 SSD on the CPU."""
+
+    def __init__(self, model_path=FACE_DNN_MODEL, config_path=FACE_DNN_CONFIG,
+                 confidence=FACE_DNN_CONFIDENCE):
+        """
+        Args:
+            model_path (str): res10_300x300_ssd_iter_140000.caffemodel.
+            config_path (str): Its deploy.prototxt.
+            confidence (float): Lowest detection score (0-1) kept.
+
+        Raises:
+            FileNotFoundError: If the model files are missing.
+        """
+        for path in (model_path, config_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No face detection model found at {path}")
+        self.net = cv2.dnn.readNetFromCaffe(config_path, model_path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.confidence = confidence
+
+    def detect(self, img, gray_img, min_size):
+        """
+        Finds faces in an image; see HaarDetector.detect().
+
+        Returns:
+            list: (x, y, w, h) boxes in the image's coordinates.
+        """
+        h, w = img.shape[:2]
+        # The network takes 300x300 whatever the image size
+        blob = cv2.dnn.blobFromImage(cv2.resize(img, (300, 300)), 1.0, (300, 300), (104.0, 177.0, 123.0))
+        self.net.setInput(blob)
+        detections = self.net.forward()
+        faces = []
+        for i in range(detections.shape[2]):
+            if detections[0, 0, i, 2] < self.confidence:
+                continue
+            left, top, right, bottom = detections[0, 0, i, 3:7] * (w, h, w, h)
+            left, top = max(int(left), 0), max(int(top), 0)
+            right, bottom = min(int(right), w), min(int(bottom), h)
+            if right - left >= min_size[0] and bottom - top >= min_size[1]:
+                faces.append((left, top, right - left, bottom - top))
+        return faces
+
+
+def create_face_detector(name=FACE_DETECTOR, detection_width=FACE_DETECTION_WIDTH):
+    """
+    Creates the configured face detector.
+
+    Args:
+        name (str): "haar" or "dnn".
+        detection_width (int): Downscaling width for the Haar cascade.
+
+    Returns:
+        HaarDetector or DnnDetector: The detector; the Haar cascade if the
+            DNN model files are missing.
+    """
+    if name == 'dnn':
+        try:
+            return DnnDetector()
+        except (FileNotFoundError, cv2.error) as e:
+            print(f"{e}. Using the Haar cascade.")
+    return HaarDetector(detection_width=detection_width)
+
+
+def box_overlap(a, b):
+    """Returns the intersection over union of two (x, y, w, h) boxes."""
+    width = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    height = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    intersection = width * height
+    return intersection / (a[2] * a[3] + b[2] * b[3] - intersection)
+
+
+def expand_box(box, margin, frame_width, frame_height):
+    """Grows a box by `margin` of its size on every side, within the frame."""
+    x, y, w, h = box
+    left, top = max(int(x - w * margin), 0), max(int(y - h * margin), 0)
+    right, bottom = min(int(x + w * (1 + margin)), frame_width), min(int(y + h * (1 + margin)), frame_height)
+    return left, top, right - left, bottom - top
+
+
+class FaceTrack:
+    """A face followed from frame to frame, with its latest prediction."""
+
+    __slots__ = ('box', 'user_id', 'confidence', 'streak', 'predicted_at')
+
+    def __init__(self, box):
+        self.box = box
+        self.user_id = None
+        self.confidence = None
+        self.streak = 0
+        self.predicted_at = None
+
+    @property
+    def recognized(self):
+        return self.confidence is not None and self.confidence < CONFIDENCE_THRESHOLD
+
+    def needs_prediction(self, frame_index, stable_matches, recheck_frames):
+        """
+        Whether to run the recognizer on this face in this frame.
+
+        Args:
+            frame_index (int): The current frame.
+            stable_matches (int): Same results in a row after which the
+                prediction is reused; 0 predicts every frame.
+            recheck_frames (int): How often a reused prediction is checked.
+        """
+        if not stable_matches or self.streak < stable_matches:
+            return True
+        return frame_index - self.predicted_at >= recheck_frames
+
+    def update(self, user_id, confidence, frame_index):
+        """Records a prediction, extending the streak if it agrees."""
+        recognized = confidence < CONFIDENCE_THRESHOLD
+        same = self.confidence is not None and recognized == self.recognized \
+            and (not recognized or user_id == self.user_id)
+        self.streak = self.streak + 1 if same else 1
+        self.user_id, self.confidence, self.predicted_at = user_id, confidence, frame_index
+
 
 class FaceAuthenticator:
     """
     Handles face authentication using a pre-trained LBPH face recognizer.
     """
-    def __init__(self):
+    def __init__(self, performance=FACE_PERFORMANCE_MODE, detector=None):
+        """
+        Args:
+            performance (bool): Use downscaled, every-Nth-frame detection with
+                tracking and skip predictions for stable faces.
+            detector: A face detector; the configured one if None.
+        """
         self.recognizer = cv2.face.LBPHFaceRecognizer_create()
-        self.face_cascade = cv2.CascadeClassifier(CASCADE_PATH)
+        self.performance = performance
+        if detector is None:
+            detector = create_face_detector() if performance else HaarDetector()
+        self.detector = detector
         self.authenticated_user_id = None
         self.names = ['', 'User']  # Names corresponding to user IDs
+        self.last_stats = None
+
+        if performance:
+            self.detect_every = max(FACE_DETECT_EVERY, 1)
+            self.stable_matches = FACE_STABLE_MATCHES
+        else:
+            self.detect_every = 1
+            self.stable_matches = 0
 
         if not os.path.exists(TRAINER_FILE):
             raise FileNotFoundError(f"No trained model found at {TRAINER_FILE}. Please train the model first.")
@@ -32,75 +231,144 @@ class FaceAuthenticator:
         """
         return self.authenticated_user_id
 
-    def authenticate(self):
+    def authenticate(self, source=0, show_preview=FACE_SHOW_PREVIEW, stop_on_auth=True):
         """
         Starts the face authentication process.
 
+        Args:
+            source (int or str): A camera index, or a recorded video file.
+            show_preview (bool): Show the annotated frames in a window.
+            stop_on_auth (bool): Stop at the first recognized face; False
+                reads the whole video (for benchmarks).
+
         Returns:
             bool: True if authentication is successful, False otherwise.
         """
-        cam = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-        cam.set(3, 640)
-        cam.set(4, 480)
-
-        min_w = 0.1 * cam.get(3)
-        min_h = 0.1 * cam.get(4)
+        cam = _open_capture(source)
+        min_size = None
+        tracks = []
+        auth_successful = False
+        stats = {'frames': 0, 'detections': 0, 'predictions': 0, 'time_to_auth': None}
+        start = time.perf_counter()
 
         while True:
             ret, img = cam.read()
             if not ret:
-                print("Failed to grab frame")
+                if isinstance(source, int):
+                    print("Failed to grab frame")
                 break
 
+            frame_index = stats['frames']
+            stats['frames'] += 1
+            if min_size is None:
+                min_size = (int(0.1 * img.shape[1]), int(0.1 * img.shape[0]))
+
             gray_img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(
-                gray_img,
-                scaleFactor=1.2,
-                minNeighbors=5,
-                minSize=(int(min_w), int(min_h))
-            )
+            tracks = self._track(img, gray_img, tracks, frame_index, min_size, stats)
 
-            auth_successful = self._process_faces(img, gray_img, faces)
-            cv2.imshow('camera', img)
+            if self._process_faces(gray_img, tracks, frame_index, stats) and not auth_successful:
+                auth_successful = True
+                stats['time_to_auth'] = time.perf_counter() - start
 
-            if cv2.waitKey(10) & 0xFF == 27 or auth_successful:
+            if show_preview:
+                self._draw_tracks(img, tracks)
+                cv2.imshow('camera', img)
+                if cv2.waitKey(1 if self.performance else 10) & 0xFF == 27:
+                    break
+            if auth_successful and stop_on_auth:
                 break
 
         cam.release()
-        cv2.destroyAllWindows()
+        if show_preview:
+            cv2.destroyAllWindows()
+        elapsed = time.perf_counter() - start
+        stats['seconds'] = elapsed
+        stats['fps'] = stats['frames'] / elapsed if elapsed > 0 else 0.0
+        self.last_stats = stats
         return auth_successful
 
-    def _process_faces(self, img, gray_img, faces):
+    def _track(self, img, gray_img, tracks, frame_index, min_size, stats):
+        """
+        Finds this frame's faces: a full detection every Nth frame, else a
+        search around each tracked face.
+
+        Returns:
+            list: The FaceTrack objects in this frame.
+        """
+        height, width = gray_img.shape[:2]
+        if frame_index % self.detect_every == 0:
+            stats['detections'] += 1
+            current = []
+            for box in self.detector.detect(img, gray_img, min_size):
+                # A face that was already tracked keeps its predictions
+                best = max(tracks, key=lambda track: box_overlap(track.box, box), default=None)
+                if best is not None and best not in current and box_overlap(best.box, box) >= TRACK_MIN_OVERLAP:
+                    best.box = box
+                    current.append(best)
+                else:
+                    current.append(FaceTrack(box))
+            return current
+
+        current = []
+        for track in tracks:
+            x, y, w, h = expand_box(track.box, TRACK_MARGIN, width, height)
+            stats['detections'] += 1
+            found = self.detector.detect(img[y:y + h, x:x + w], gray_img[y:y + h, x:x + w], min_size)
+            if found:
+                # Back to frame coordinates; the closest face if there are several
+                boxes = [(fx + x, fy + y, fw, fh) for fx, fy, fw, fh in found]
+                track.box = max(boxes, key=lambda box: box_overlap(track.box, box))
+                current.append(track)
+        return current
+
+    def _process_faces(self, gray_img, tracks, frame_index, stats):
         """
-        Processes detected faces and predicts the user.
+        Predicts the user of each tracked face that needs it.
 
         Args:
-            img (numpy.ndarray): The original image.
-            gray_img (numpy.ndarray): The grayscale image.
-            faces (list): A list of detected faces.
+            gray_img (numpy.ndarray): The grayscale frame.
+            tracks (list): The FaceTrack objects in this frame.
+            frame_index (int): The current frame.
+            stats (dict): Counters to update.
 
         Returns:
             bool: True if a user is successfully authenticated, False otherwise.
         """
         auth_successful = False
-        for (x, y, w, h) in faces:
-            cv2.rectangle(img, (x, y), (x + w, y + h), (0, 255, 0), 2)
-            user_id, confidence = self.recognizer.predict(gray_img[y:y+h, x:x+w])
+        for track in tracks:
+            if track.needs_prediction(frame_index, self.stable_matches, FACE_RECHECK_FRAMES):
+                x, y, w, h = track.box
+                user_id, confidence = self.recognizer.predict(gray_img[y:y+h, x:x+w])
+                stats['predictions'] += 1
+                track.update(user_id, confidence, frame_index)
 
-            if confidence < CONFIDENCE_THRESHOLD:
-                self.authenticated_user_id = user_id
-                display_name = self.names[user_id] if user_id < len(self.names) else "User"
-                confidence_text = f"{round(100 - confidence)}%"
+            if track.recognized:
+                self.authenticated_user_id = track.user_id
                 auth_successful = True
-            else:
+            elif not auth_successful:
                 self.authenticated_user_id = None
-                display_name = "Unknown"
-                confidence_text = f"{round(100 - confidence)}%"
+        return auth_successful
 
-            self._draw_text(img, display_name, x + 5, y - 5)
-            self._draw_text(img, confidence_text, x + 5, y + h - 5, color=(255, 255, 0))
+    def _draw_tracks(self, img, tracks):
+        """
+        Draws each face's box, name and confidence on the frame.
 
-        return auth_successful
+        Args:
+            img (numpy.ndarray): The image to draw on.
+            tracks (list): The FaceTrack objects in this frame.
+        """
+        for track in tracks:
+            x, y, w, h = track.box
+            cv2.rectangle(img, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            if track.confidence is None:
+                continue
+            if track.recognized:
+                user_id = track.user_id
+                display_name = self.names[user_id] if user_id < len(self.names) else "User"
+            else:
+                display_name = "Unknown"
+            self._draw_text(img, display_name, x + 5, y - 5)
+            self._draw_text(img, f"{round(100 - track.confidence)}%", x + 5, y + h - 5, color=(255, 255, 0))
 
     def _draw_text(self, img, text, x, y, color=(255, 255, 255)):
         """
@@ -115,6 +383,17 @@ class FaceAuthenticator:
         """
         cv2.putText(img, text, (x, y), FONT, 1, color, 2)
 
+
+def _open_capture(source):
+    """Opens the camera at 640x480, or a video file."""
+    if not isinstance(source, int):
+        return cv2.VideoCapture(source)
+    cam = cv2.VideoCapture(source, cv2.CAP_DSHOW)
+    cam.set(3, 640)
+    cam.set(4, 480)
+    return cam
+
+
 if __name__ == '__main__':
     try:
         authenticator = FaceAuthenticator()
@@ -0,0 +1,106 @@
+"""
+Vishwakarma AI - Streaming Chat Module
+© 2025 Vishwakarma Industries
+
+This module consumes streamed chatbot token deltas and cuts them into
+sentences, so each sentence can be spoken while the model keeps generating.
+"""
+import re
+
+# Sentence-ending punctuation (plus closing quotes/brackets) followed by
+# whitespace, or a line break
+SENTENCE_END = re.compile(r'([.!?]+["\')\]]*)\s+|\n+')
+ABBREVIATIONS = {'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc', 'e.g', 'i.e'}
+
+
+class SentenceSplitter:
+    """Accumulates streamed text and releases complete sentences."""
+
+    def __init__(self, min_chars=12):
+        """
+        Args:
+            min_chars (int): Shorter fragments are joined to the next
+                sentence so speech isn't split into tiny clips.
+        """
+        self.min_chars = min_chars
+        self._buffer = ''
+
+    def feed(self, text):
+        """
+        Adds streamed text.
+
+        Args:
+            text (str): The next delta.
+
+        Returns:
+            list: Sentences completed by this delta.
+        """
+        self._buffer += text
+        sentences = []
+        start = 0
+
+        for match in SENTENCE_END.finditer(self._buffer):
+            end = match.end(1) if match.group(1) else match.start()
+            candidate = self._buffer[start:end].strip()
+            if not candidate:
+                start = match.end()
+                continue
+
+            last_word = candidate.split()[-1].rstrip('.').lower()
+            if match.group(1) == '.' and last_word in ABBREVIATIONS:
+                continue
+            if len(candidate) < self.min_chars:
+                continue
+
+            sentences.append(candidate)
+            start = match.end()
+
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self):
+        """
+        Returns whatever text is left once the stream has ended.
+
+        Returns:
+            str: The final sentence, or an empty string.
+        """
+        remainder = self._buffer.strip()
+        self._buffer = ''
+        return remainder
+
+
+def consume_chat_stream(chunks, on_sentence, on_partial=None, splitter=None):
+    """
+    Reads a streamed chat completion, handing out sentences as they finish.
+
+    Args:
+        chunks: An iterable of OpenAI-style chat completion chunks.
+        on_sentence (callable): Called with each complete sentence.
+        on_partial (callable, optional): Called with the text so far after
+            every delta.
+        splitter (SentenceSplitter, optional): Defaults to a new splitter.
+
+    Returns:
+        str: The full response text.
+    """
+    splitter = splitter or SentenceSplitter()
+    parts = []
+
+    for chunk in chunks:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+
+        parts.append(delta)
+        if on_partial is not None:
+            on_partial(''.join(parts))
+        for sentence in splitter.feed(delta):
+            on_sentence(sentence)
+
+    remainder = splitter.flush()
+    if remainder:
+        on_sentence(remainder)
+    return ''.join(parts)
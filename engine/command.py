@@ -4,114 +4,191 @@ Vishwakarma AI - Command Processing Module
 
 This module handles speech recognition, text-to-speech, and command processing.
 """
-import os
 import time
 import requests
 import speech_recognition as sr
-import pyttsx3
 import eel
-from playsound import playsound
-from engine.config import ELEVENLABS_API_KEY, ELEVENLABS_VOICE_ID
+from engine.config import (ASSISTANT_NAME, CONTINUOUS_LISTENING,
+                           ELEVENLABS_API_KEY, WAKE_WORD_ENABLED)
+from engine.fallback_tts import get_fallback_engine
+from engine.intent_classifier import classify_command, get_intent_classifier
+from engine.intents import get_intent_router
+from engine.listener import ContinuousListener, MicrophoneFrameSource
+from engine.speech_queue import PRIORITY_NORMAL, SpeechWorker
+from engine.stt import get_recognizer, get_stt_backend
+from engine.tts import PartialPlaybackError, play_elevenlabs
 
-def speak(text):
+def speak(text, priority=PRIORITY_NORMAL, interrupt=False, display=True):
     """
-    Text-to-speech using ElevenLabs API with fallback to pyttsx3.
+    Queues text for speech and shows it in the UI right away.
+
+    Audio is played by the background speech worker, so this returns
+    immediately. Call wait() on the returned handle when the caller must not
+    continue until the text has been spoken (e.g. before listening).
 
     Args:
         text (str): The text to be spoken.
+        priority (int): Lower values are spoken first.
+        interrupt (bool): Cancel current and pending speech first.
+        display (bool): Also show the text in the UI. Callers that update
+            the chat themselves (e.g. streamed replies) pass False.
+
+    Returns:
+        SpeechHandle: A handle to wait on or cancel the utterance.
     """
     text = str(text)
-    eel.DisplayMessage(text)
-    eel.receiverText(text)
+    if display:
+        eel.DisplayMessage(text)
+        eel.receiverText(text)
+    return get_speech_worker().say(text, priority=priority, interrupt=interrupt)
+
+def speak_now(text, cancel_event=None):
+    """
+    Text-to-speech using ElevenLabs API with fallback to pyttsx3.
 
+    Repeated phrases are played from the TTS cache. Otherwise, when streaming
+    is enabled, audio is played from the ElevenLabs streaming endpoint as it
+    arrives; if not, the full clip is downloaded first. This blocks until the
+    audio has finished and runs on the speech worker thread. The fallback
+    voice is only used when no ElevenLabs audio was played, so a stream
+    that breaks mid-sentence is not repeated from the start.
+
+    Args:
+        text (str): The text to be spoken.
+        cancel_event (threading.Event, optional): Stops playback when set.
+    """
     if not ELEVENLABS_API_KEY:
         print("ElevenLabs API key not configured. Using fallback TTS.")
-        fallback_speak(text)
+        fallback_speak(text, cancel_event)
         return
 
     try:
-        url = f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE_ID}"
-        headers = {
-            "xi-api-key": ELEVENLABS_API_KEY,
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "text": text,
-            "model_id": "eleven_multilingual_v2",
-            "voice_settings": {
-                "stability": 0.61,
-                "similarity_boost": 0.24,
-                "style": 0.0,
-                "use_speaker_boost": True
-            }
-        }
-
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
-        response.raise_for_status()
-
-        audio_file = "www/assets/audio/temp_speech.mp3"
-        os.makedirs(os.path.dirname(audio_file), exist_ok=True)
-
-        with open(audio_file, 'wb') as f:
-            f.write(response.content)
-
-        playsound(audio_file)
-
-        try:
-            os.remove(audio_file)
-        except OSError as e:
-            print(f"Error removing temp audio file: {e}")
-
+        play_elevenlabs(text, cancel_event=cancel_event)
+    except PartialPlaybackError as e:
+        # Part of the sentence was heard; the fallback would start it over
+        print(f"ElevenLabs API Error: {e}")
     except requests.exceptions.RequestException as e:
         print(f"ElevenLabs API Error: {e}")
-        fallback_speak(text)
+        fallback_speak(text, cancel_event)
     except Exception as e:
         print(f"An unexpected error occurred in speak function: {e}")
-        fallback_speak(text)
+        fallback_speak(text, cancel_event)
+
+_speech_worker = None
+
+def get_speech_worker():
+    """Returns the process-wide speech worker."""
+    global _speech_worker
+    if _speech_worker is None:
+        _speech_worker = SpeechWorker(speak_now)
+    return _speech_worker
+
+def stop_speaking():
+    """Cancels the current utterance and anything still queued (barge-in)."""
+    if _speech_worker is not None:
+        _speech_worker.interrupt()
+
+def fallback_speak(text, cancel_event=None):
+    """Fallback TTS using the shared offline pyttsx3 engine."""
+    get_fallback_engine().say(text, cancel_event=cancel_event)
 
-def fallback_speak(text):
-    """Fallback TTS using pyttsx3."""
+def recognize_audio(audio):
+    """
+    Transcribes a recorded utterance with the configured STT backend.
+
+    Args:
+        audio (sr.AudioData): The recorded utterance.
+
+    Returns:
+        str: The recognized text in lowercase, or an empty string if recognition fails.
+    """
+    print('Recognizing...')
+    eel.DisplayMessage('Recognizing...')
     try:
-        engine = pyttsx3.init('sapi5')
-        voices = engine.getProperty('voices')
-        engine.setProperty('voice', voices[0].id)
-        engine.setProperty('rate', 174)
-        engine.say(text)
-        engine.runAndWait()
+        start = time.perf_counter()
+        query = get_stt_backend().transcribe(audio)
+        print(f"User said: {query} "
+              f"(recognized in {(time.perf_counter() - start) * 1000:.0f} ms)")
+        eel.DisplayMessage(query)
+        return query.lower()
+    except sr.UnknownValueError:
+        print("Could not understand audio")
+        return ""
+    except sr.RequestError as e:
+        print(f"Could not request results; {e}")
+        return ""
     except Exception as e:
-        print(f"Fallback TTS Error: {e}")
+        print(f"Error in speech recognition: {e}")
+        return ""
 
 def takecommand():
     """
-    Recognizes speech using the Google Web Speech API.
+    Recognizes speech using the configured speech-to-text backend.
+
+    With continuous listening enabled, the next utterance is read from the
+    persistent listener instead of opening the microphone again.
 
     Returns:
         str: The recognized command in lowercase, or an empty string if recognition fails.
     """
-    r = sr.Recognizer()
+    if CONTINUOUS_LISTENING:
+        return take_queued_command()
+
+    recognizer, calibrator = get_recognizer()
     with sr.Microphone() as source:
         print('Listening...')
         eel.DisplayMessage('Listening...')
-        r.pause_threshold = 1
-        r.adjust_for_ambient_noise(source)
         try:
-            audio = r.listen(source, timeout=10, phrase_time_limit=6)
-            print('Recognizing...')
-            eel.DisplayMessage('Recognizing...')
-            query = r.recognize_google(audio, language='en-in')
-            print(f"User said: {query}")
-            eel.DisplayMessage(query)
-            time.sleep(2)
-            return query.lower()
-        except sr.UnknownValueError:
-            print("Could not understand audio")
-            return ""
-        except sr.RequestError as e:
-            print(f"Could not request results; {e}")
+            calibrator.calibrate(source)
+            audio = recognizer.listen(source, timeout=10, phrase_time_limit=6)
+        except sr.WaitTimeoutError:
+            print("No speech detected")
             return ""
         except Exception as e:
             print(f"Error in speech recognition: {e}")
             return ""
+    return recognize_audio(audio)
+
+def take_queued_command(timeout=10):
+    """
+    Reads the next utterance segmented by the continuous listener.
+
+    Args:
+        timeout (float): Maximum seconds to wait for speech.
+
+    Returns:
+        str: The recognized command in lowercase, or an empty string.
+    """
+    print('Listening...')
+    eel.DisplayMessage('Listening...')
+    utterance = get_listener().next_utterance(timeout=timeout)
+    if utterance is None:
+        print("No speech detected")
+        return ""
+    if utterance.text:
+        # Already transcribed while checking for the wake word
+        print(f"User said: {utterance.text}")
+        eel.DisplayMessage(utterance.text)
+        return utterance.text.lower()
+    return recognize_audio(utterance.audio)
+
+_listener = None
+
+def get_listener():
+    """Returns the process-wide continuous listener, (re)starting it when it is not running."""
+    global _listener
+    if _listener is None:
+        _listener = ContinuousListener(
+            MicrophoneFrameSource(),
+            wake_word=ASSISTANT_NAME if WAKE_WORD_ENABLED else None,
+            transcriber=lambda audio: get_stt_backend().transcribe(audio),
+            on_wake=lambda: eel.wakeWordDetected(),
+            # Don't transcribe the assistant's own voice
+            mute_fn=get_speech_worker().is_speaking
+        )
+    if not _listener.is_running():
+        _listener.start()
+    return _listener
 
 @eel.expose
 def allCommands(message=None):
@@ -121,6 +198,8 @@ def allCommands(message=None):
     Args:
         message (str, optional): A text command. If None, listens for a voice command.
     """
+    # New user input cancels whatever the assistant is still saying
+    stop_speaking()
     query = message if message else takecommand()
     eel.senderText(query)
 
@@ -137,6 +216,13 @@ def allCommands(message=None):
     finally:
         eel.ShowHood()
 
+# Communication intents and the action handle_communication_command performs
+COMMUNICATION_ACTIONS = {
+    'send_message': 'message',
+    'phone_call': 'call',
+    'video_call': 'video_call',
+}
+
 def process_command(query):
     """
     Determines the type of command and calls the appropriate function.
@@ -145,53 +231,83 @@ def process_command(query):
         query (str): The command to be processed.
     """
     from engine.features import (openCommand, PlayYoutube, findContact,
-                                 whatsApp, makeCall, sendMessage, chatBot)
-
-    if "open" in query:
-        openCommand(query)
-    elif "on youtube" in query:
-        PlayYoutube(query)
-    elif any(keyword in query for keyword in ["send message", "phone call", "video call"]):
-        handle_communication_command(query, findContact, whatsApp, makeCall, sendMessage)
+                                 whatsApp, makeCall, sendMessage, chatBot,
+                                 app_available, contact_known)
+
+    match = get_intent_router().route(query)
+    if match is not None and match.loose:
+        # "call of duty release date" is only a call if "of duty..." is a contact
+        if 'contact' in match.slots:
+            known = contact_known(match.slots['contact'])
+        else:
+            known = 'app' in match.slots and app_available(match.slots['app'])
+        if not known:
+            match = None
+
+    if match is None:
+        # Paraphrased commands are recognized locally instead of by the
+        # chatbot; only predictions above INTENT_CONFIDENCE_THRESHOLD count
+        classifier = get_intent_classifier()
+        if classifier is not None:
+            match = classify_command(query, classifier)
+
+    if match is None:
+        chatBot(query)
+    elif match.name == 'open_app':
+        openCommand(match.slots['app'])
+    elif match.name == 'play_youtube':
+        PlayYoutube(f"play {match.slots['term']} on youtube")
+    elif match.name in COMMUNICATION_ACTIONS:
+        handle_communication_command(match.slots['contact'], findContact, whatsApp, makeCall,
+                                     sendMessage, action=COMMUNICATION_ACTIONS[match.name])
     else:
         chatBot(query)
 
-def handle_communication_command(query, findContact, whatsApp, makeCall, sendMessage):
+def handle_communication_command(query, findContact, whatsApp, makeCall, sendMessage,
+                                 action=None):
     """
     Handles communication-related commands (WhatsApp, call, SMS).
 
     Args:
-        query (str): The user's command.
+        query (str): The user's command, or just the contact name.
         findContact (function): Function to find a contact.
         whatsApp (function): Function to interact with WhatsApp.
         makeCall (function): Function to make a phone call.
         sendMessage (function): Function to send an SMS.
+        action (str, optional): 'message', 'call' or 'video_call'. Worked
+            out from the query when not given.
     """
+    if action is None:
+        if "send message" in query or "send sms" in query:
+            action = 'message'
+        elif "phone call" in query:
+            action = 'call'
+        else:
+            action = 'video_call'
+
     contact_no, name = findContact(query)
     if not contact_no:
         return
 
-    speak("Which mode would you like to use: WhatsApp or mobile?")
+    speak("Which mode would you like to use: WhatsApp or mobile?").wait()
     preference = takecommand()
     print(preference)
 
     if "mobile" in preference:
-        if "send message" in query or "send sms" in query:
-            speak("What message would you like to send?")
+        if action == 'message':
+            speak("What message would you like to send?").wait()
             message = takecommand()
             sendMessage(message, contact_no, name)
-        elif "phone call" in query:
+        elif action == 'call':
             makeCall(name, contact_no)
         else:
             speak("Please try again.")
     elif "whatsapp" in preference:
-        if "send message" in query:
-            speak("What message would you like to send?")
+        if action == 'message':
+            speak("What message would you like to send?").wait()
             message_content = takecommand()
             whatsApp(contact_no, message_content, 'message', name)
-        elif "phone call" in query:
-            whatsApp(contact_no, "", 'call', name)
         else:
-            whatsApp(contact_no, "", 'video call', name)
+            whatsApp(contact_no, "", action, name)
     else:
         speak("Invalid mode selected. Please try again.")
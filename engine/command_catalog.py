@@ -0,0 +1,318 @@
+"""
+Vishwakarma AI - Command Catalog
+© 2025 Vishwakarma Industries
+
+This module keeps the "open X" catalog (sys_command, web_command and
+command_aliases) in memory, so openCommand() resolves a name with a dict
+lookup instead of two SQL queries. Names also match by alias, by any word
+("chrome" for "google chrome") and by unique prefix ("vs" for "vs code").
+The catalog reloads when catalog_version, which triggers bump on every
+change, moves; it checks that version only after a write through this
+process's database manager or every CATALOG_RECHECK_SECONDS, so plain
+lookups never touch the database.
+
+Usage:
+    python -m engine.command_catalog list
+    python -m engine.command_catalog add "vs code" "C:\\...\\Code.exe" --alias code
+    python -m engine.command_catalog import commands.csv
+    python -m engine.command_catalog remove "vs code"
+"""
+import argparse
+import bisect
+import csv
+import re
+import threading
+import time
+import weakref
+
+from engine.config import CATALOG_RECHECK_SECONDS
+from engine.database import get_database
+
+# Words people add around a name: "open the youtube website"
+LEADING_WORDS = ('the',)
+TRAILING_WORDS = ('app', 'application', 'program', 'website', 'site', 'web site')
+# Shorter prefixes match too much ("open a")
+MIN_PREFIX = 2
+
+
+def normalize_command_name(name):
+    """
+    Normalizes a command name or spoken query.
+
+    Args:
+        name (str): The raw name.
+
+    Returns:
+        str: Lowercase words without filler words around the name.
+    """
+    words = re.findall(r"[a-z0-9.+#&'-]+", (name or '').lower())
+    text = ' '.join(words)
+    for word in LEADING_WORDS:
+        if text.startswith(word + ' '):
+            text = text[len(word) + 1:]
+    for word in TRAILING_WORDS:
+        if text.endswith(' ' + word):
+            text = text[:-len(word) - 1]
+    return text
+
+
+def is_url(target):
+    """Tells whether a command target is a website rather than a program."""
+    return bool(re.match(r'(https?://|www\.)', target.strip(), re.IGNORECASE))
+
+
+class CatalogEntry:
+    """One command: a program path ("app") or a URL ("web")."""
+
+    __slots__ = ('name', 'kind', 'target', 'aliases')
+
+    def __init__(self, name, kind, target, aliases=()):
+        self.name = name
+        self.kind = kind
+        self.target = target
+        self.aliases = list(aliases)
+
+    def as_dict(self):
+        return {'name': self.name, 'kind': self.kind, 'target': self.target,
+                'aliases': list(self.aliases)}
+
+    def __repr__(self):
+        return f"CatalogEntry({self.name!r}, {self.kind!r}, {self.target!r})"
+
+
+class CommandCatalog:
+    """An in-memory view of the command tables, reloaded when they change."""
+
+    def __init__(self, db, recheck_seconds=CATALOG_RECHECK_SECONDS, clock=time.monotonic):
+        """
+        Args:
+            db (Database): The database holding the command tables.
+            recheck_seconds (float): How often to look for changes made by
+                other processes.
+            clock (callable): Time source, for tests.
+        """
+        self.db = db
+        self.recheck_seconds = recheck_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (names, aliases, sorted word suffixes, suffix entries), swapped
+        # whole so lookups need no lock
+        self._view = ({}, {}, [], [])
+        self._version = None
+        self._write_count = None
+        self._checked_at = None
+        self.reloads = 0
+
+    def lookup(self, query):
+        """
+        Finds the command a spoken name refers to.
+
+        Args:
+            query (str): The name as heard, e.g. "the youtube website".
+
+        Returns:
+            CatalogEntry: The command, or None.
+        """
+        self._sync()
+        names, aliases, keys, entries = self._view
+        key = normalize_command_name(query)
+        if not key:
+            return None
+
+        entry = names.get(key) or aliases.get(key)
+        if entry is not None or len(key) < MIN_PREFIX:
+            return entry
+
+        # Names, and every word-started tail of a name, in sorted order: the
+        # keys starting with the query are one contiguous run
+        i = bisect.bisect_left(keys, key)
+        best = None
+        while i < len(keys) and keys[i].startswith(key):
+            if best is None or len(keys[i]) < len(keys[best]):
+                best = i
+            i += 1
+        return entries[best] if best is not None else None
+
+    def list_commands(self, kind=None):
+        """
+        Lists the catalog.
+
+        Args:
+            kind (str): "app" or "web" to list only one kind.
+
+        Returns:
+            list: Entries sorted by name.
+        """
+        self._sync()
+        entries = self._view[0].values()
+        return sorted((e for e in entries if kind is None or e.kind == kind), key=lambda e: e.name)
+
+    def add_commands(self, commands):
+        """
+        Adds or replaces commands in one transaction.
+
+        Args:
+            commands (list): (name, target) or (name, target, aliases)
+                tuples, or dicts with those keys. URLs become web commands,
+                anything else a program path.
+
+        Returns:
+            int: How many commands were written.
+        """
+        rows = []
+        for command in commands:
+            if isinstance(command, dict):
+                command = (command['name'], command['target'], command.get('aliases', ()))
+            name, target = normalize_command_name(command[0]), command[1].strip()
+            aliases = command[2] if len(command) > 2 else ()
+            if isinstance(aliases, str):
+                aliases = [aliases]
+            if not name or not target:
+                raise ValueError(f"Command needs a name and a target: {command!r}")
+            rows.append((name, target, [normalize_command_name(a) for a in aliases if a]))
+
+        with self.db.transaction() as con:
+            con.executemany("DELETE FROM sys_command WHERE LOWER(name) = ?", [(r[0],) for r in rows])
+            con.executemany("DELETE FROM web_command WHERE LOWER(name) = ?", [(r[0],) for r in rows])
+            con.executemany("INSERT INTO web_command (name, url) VALUES (?, ?)",
+                            [(name, target) for name, target, _ in rows if is_url(target)])
+            con.executemany("INSERT INTO sys_command (name, path) VALUES (?, ?)",
+                            [(name, target) for name, target, _ in rows if not is_url(target)])
+            con.executemany("INSERT OR REPLACE INTO command_aliases (alias, name) VALUES (?, ?)",
+                            [(alias, name) for name, _, aliases in rows for alias in aliases])
+        return len(rows)
+
+    def remove_commands(self, names):
+        """
+        Removes commands, and their aliases, in one transaction.
+
+        Args:
+            names (list): Command names or aliases.
+
+        Returns:
+            int: How many command rows were deleted.
+        """
+        self._sync()
+        aliases = self._view[1]
+        keys = []
+        for name in names:
+            key = normalize_command_name(name)
+            keys.append((aliases[key].name if key in aliases else key,))
+
+        with self.db.transaction() as con:
+            deleted = con.executemany("DELETE FROM sys_command WHERE LOWER(name) = ?", keys).rowcount
+            deleted += con.executemany("DELETE FROM web_command WHERE LOWER(name) = ?", keys).rowcount
+            con.executemany("DELETE FROM command_aliases WHERE name = ?", keys)
+        return deleted
+
+    def remove_aliases(self, aliases):
+        """Removes aliases; the commands stay."""
+        with self.db.transaction() as con:
+            con.executemany("DELETE FROM command_aliases WHERE alias = ?",
+                            [(normalize_command_name(alias),) for alias in aliases])
+
+    def reload(self):
+        """Reads the command tables into memory."""
+        with self._lock:
+            self._load()
+
+    def _sync(self):
+        now = self._clock()
+        if (self._write_count == self.db.write_count and self._checked_at is not None
+                and now - self._checked_at < self.recheck_seconds):
+            return
+        with self._lock:
+            # Read the counter first: a write racing with the check is
+            # caught on the next lookup
+            write_count = self.db.write_count
+            version = self.db.query_one("SELECT version FROM catalog_version WHERE id = 1")[0]
+            if version != self._version:
+                self._load(version)
+            self._write_count = write_count
+            self._checked_at = now
+
+    def _load(self, version=None):
+        if version is None:
+            version = self.db.query_one("SELECT version FROM catalog_version WHERE id = 1")[0]
+        names = {}
+        # Programs win over websites of the same name, as before
+        for kind, table, column in (('web', 'web_command', 'url'), ('app', 'sys_command', 'path')):
+            for name, target in self.db.query(f"SELECT name, {column} FROM {table} ORDER BY id"):
+                key = normalize_command_name(name)
+                if key and target:
+                    names[key] = CatalogEntry(name, kind, target)
+
+        aliases = {}
+        for alias, name in self.db.query("SELECT alias, name FROM command_aliases"):
+            entry = names.get(normalize_command_name(name))
+            if entry is not None:
+                aliases[alias] = entry
+                entry.aliases.append(alias)
+
+        suffixes = {}
+        for key, entry in list(names.items()) + list(aliases.items()):
+            words = key.split()
+            for i in range(len(words)):
+                suffixes.setdefault(' '.join(words[i:]), entry)
+        keys = sorted(suffixes)
+        self._view = (names, aliases, keys, [suffixes[key] for key in keys])
+        self._version = version
+        self.reloads += 1
+
+
+_catalogs = weakref.WeakKeyDictionary()
+_catalogs_lock = threading.Lock()
+
+
+def get_command_catalog(db=None):
+    """
+    Returns the shared command catalog of a database.
+
+    Args:
+        db (Database): The database manager; the default database if None.
+
+    Returns:
+        CommandCatalog: The catalog.
+    """
+    db = db or get_database()
+    with _catalogs_lock:
+        catalog = _catalogs.get(db)
+        if catalog is None:
+            catalog = _catalogs[db] = CommandCatalog(db)
+        return catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the commands \"open ...\" understands.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    list_parser = subparsers.add_parser('list', help="list commands")
+    list_parser.add_argument('--kind', choices=['app', 'web'])
+    add_parser = subparsers.add_parser('add', help="add or replace a command")
+    add_parser.add_argument('name')
+    add_parser.add_argument('target', help="program path or URL")
+    add_parser.add_argument('--alias', action='append', default=[])
+    import_parser = subparsers.add_parser('import', help="add commands from a name,target[,alias|alias] CSV")
+    import_parser.add_argument('path')
+    remove_parser = subparsers.add_parser('remove', help="remove commands")
+    remove_parser.add_argument('names', nargs='+')
+    args = parser.parse_args()
+
+    catalog = get_command_catalog()
+    if args.command == 'list':
+        for entry in catalog.list_commands(args.kind):
+            aliases = f"  (also: {', '.join(entry.aliases)})" if entry.aliases else ''
+            print(f"{entry.kind:<4} {entry.name:<24} {entry.target}{aliases}")
+    elif args.command == 'add':
+        catalog.add_commands([(args.name, args.target, args.alias)])
+        print(f"Added {args.name}")
+    elif args.command == 'import':
+        with open(args.path, newline='', encoding='utf-8-sig') as f:
+            rows = [(row[0], row[1], row[2].split('|') if len(row) > 2 else ())
+                    for row in csv.reader(f) if len(row) >= 2]
+        print(f"Added {catalog.add_commands(rows)} commands")
+    else:
+        print(f"Removed {catalog.remove_commands(args.names)} commands")
+
+
+if __name__ == '__main__':
+    main()
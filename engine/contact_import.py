@@ -0,0 +1,442 @@
+"""
+Vishwakarma AI - Contact Importer
+© 2025 Vishwakarma Industries
+
+This module bulk-imports contacts from CSV exports (Google, Outlook or a
+plain name,number file) and vCard files. Files are parsed as a stream, so
+memory use does not grow with the file. Numbers are normalized to E.164
+once, at import time (numbers stored the old way are rewritten once, by a
+database migration), and contacts whose number is already stored are
+skipped. Rows are inserted with
+batched executemany() calls, and every checkpoint commits together with the
+import's position in the file, so an interrupted import resumes where it
+stopped. Instead of a change log entry per imported contact, each
+checkpoint asks the contact index for one full rebuild.
+
+Usage:
+    python -m engine.contact_import contacts.csv
+    python -m engine.contact_import contacts.vcf --restart
+"""
+import argparse
+import csv
+import io
+import itertools
+import os
+import quopri
+import re
+import sys
+import time
+
+from engine.config import (CONTACT_IMPORT_BATCH_SIZE,
+                           CONTACT_IMPORT_CHECKPOINT, DEFAULT_COUNTRY_CODE)
+from engine.contact_index import FULL_REBUILD
+from engine.database import get_database
+
+NAME_COLUMNS = ('name', 'full name', 'display name', 'contact name', 'file as')
+FIRST_NAME_COLUMNS = ('first name', 'given name')
+LAST_NAME_COLUMNS = ('last name', 'family name', 'surname')
+PHONE_WORDS = {'mobile', 'phone', 'cell', 'tel', 'telephone', 'number'}
+EMAIL_COLUMN = re.compile(r'e-?mail')
+MOBILE_LABEL = re.compile(r'mobile|cell', re.IGNORECASE)
+NON_DIGITS = re.compile(r'\D')
+# "Phone 1 - Type" describes the column next to it
+LABEL_COLUMN = re.compile(r'type|label')
+
+INSERT_CONTACT = '''
+    INSERT INTO contacts (name, mobile_no, email)
+    SELECT ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM contacts WHERE mobile_no = ?)
+'''
+INSERT_LOG_TRIGGER = 'contacts_logged_insert'
+
+
+def normalize_phone(number, country_code=DEFAULT_COUNTRY_CODE):
+    """
+    Normalizes a phone number to E.164 ("+919876543210").
+
+    Args:
+        number (str): The number as written, with any spaces, dashes,
+            brackets, "00" international prefix or trunk "0".
+        country_code (str): Country calling code for national numbers.
+
+    Returns:
+        str: The normalized number, or None if it is not a phone number.
+    """
+    number = str(number or '').strip()
+    digits = NON_DIGITS.sub('', number)
+    if number.startswith('+'):
+        pass
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    elif len(digits) == 10 + len(country_code) and digits.startswith(country_code):
+        pass
+    else:
+        digits = country_code + digits.lstrip('0')
+    if not 8 <= len(digits) <= 15:
+        return None
+    return f'+{digits}'
+
+
+class ContactRecord:
+    """A parsed contact, before normalization."""
+
+    __slots__ = ('name', 'phones', 'email')
+
+    def __init__(self, name, phones, email=None):
+        self.name = name
+        self.phones = phones
+        self.email = email
+
+
+def _is_mobile(label):
+    return MOBILE_LABEL.search(label) is not None
+
+
+def _pick_columns(header):
+    """
+    Maps a CSV header to column indices.
+
+    Returns:
+        tuple: name, first and last name and email indices (or None), and
+            a list of (number, label) index pairs; label is the matching
+            "Phone N - Type" column, or None.
+    """
+    columns = [column.strip().lower() for column in header]
+    name = first = last = email = None
+    phones = []
+    for i, column in enumerate(columns):
+        if column in NAME_COLUMNS and name is None:
+            name = i
+        elif column in FIRST_NAME_COLUMNS and first is None:
+            first = i
+        elif column in LAST_NAME_COLUMNS and last is None:
+            last = i
+        elif LABEL_COLUMN.search(column):
+            continue
+        elif EMAIL_COLUMN.search(column):
+            if email is None:
+                email = i
+        elif PHONE_WORDS.intersection(re.findall(r'[a-z]+', column)):
+            label = column.replace('value', 'type')
+            phones.append((i, columns.index(label) if label != column and label in columns else None))
+    return name, first, last, phones, email
+
+
+def read_csv(stream, name_column=None, phone_column=None):
+    """
+    Parses contacts from a CSV file, one row at a time.
+
+    The columns are found from the header. Files without a recognizable
+    header are read as name,number rows unless explicit columns are given.
+
+    Args:
+        stream (file): The open text file.
+        name_column (int): Index of the name column, overriding the header.
+        phone_column (int): Index of the number column, overriding the header.
+
+    Yields:
+        ContactRecord: One per data row.
+    """
+    rows = csv.reader(stream)
+    header = next(rows, None)
+    if header is None:
+        return
+
+    name, first, last, phones, email = _pick_columns(header)
+    if name_column is not None or phone_column is not None:
+        name = name_column if name_column is not None else name
+        phones = [(phone_column, None)] if phone_column is not None else phones
+        first = last = None
+    if (name is None and first is None) or not phones:
+        # No header: the first row is data
+        name, first, last, phones, email = 0, None, None, [(1, None)], None
+        rows = itertools.chain([header], rows)
+
+    def cell(row, i):
+        return row[i].strip() if i is not None and i < len(row) else ''
+
+    for row in rows:
+        full_name = cell(row, name) or ' '.join(filter(None, (cell(row, first), cell(row, last))))
+        mobile, other = [], []
+        for i, label in phones:
+            # Mobile numbers first: they are the ones that can take WhatsApp and SMS
+            numbers = mobile if _is_mobile(header[i] + cell(row, label)) else other
+            # Google exports several numbers in one cell, separated by ":::"
+            numbers.extend(part.strip() for part in cell(row, i).split(':::') if part.strip())
+        yield ContactRecord(full_name, mobile + other, cell(row, email) or None)
+
+
+def _unfold(stream):
+    """Joins folded vCard lines and quoted-printable soft line breaks."""
+    pending = None
+    for line in stream:
+        line = line.rstrip('\r\n')
+        if pending is not None and line[:1] in (' ', '\t'):
+            pending += line[1:]
+        elif pending is not None and pending.endswith('=') and 'QUOTED-PRINTABLE' in pending.upper():
+            pending = pending[:-1] + line
+        else:
+            if pending is not None:
+                yield pending
+            pending = line
+    if pending is not None:
+        yield pending
+
+
+def _vcard_value(params, value):
+    if 'ENCODING=QUOTED-PRINTABLE' in params or 'QUOTED-PRINTABLE' in params.split(';'):
+        charset = re.search(r'CHARSET=([\w-]+)', params)
+        value = quopri.decodestring(value.encode('latin-1')).decode(
+            charset.group(1) if charset else 'utf-8', errors='replace')
+    return value.replace('\\n', ' ').replace('\\,', ',').replace('\\;', ';').replace('\\\\', '\\')
+
+
+def read_vcards(stream):
+    """
+    Parses contacts from a vCard (2.1, 3.0 or 4.0) file, one card at a time.
+
+    Args:
+        stream (file): The open text file.
+
+    Yields:
+        ContactRecord: One per card.
+    """
+    card = None
+    for line in _unfold(stream):
+        key, _, value = line.partition(':')
+        prop, _, params = key.partition(';')
+        # Drop group prefixes such as "item1.TEL"
+        prop = prop.rsplit('.', 1)[-1].upper()
+        params = params.upper()
+
+        if prop == 'BEGIN' and value.strip().upper() == 'VCARD':
+            card = {'fn': '', 'n': '', 'mobile': [], 'other': [], 'email': None}
+        elif card is None:
+            continue
+        elif prop == 'END':
+            name = card['fn'] or ' '.join(filter(None, reversed(card['n'].split(';')[:2])))
+            yield ContactRecord(name.strip(), card['mobile'] + card['other'], card['email'])
+            card = None
+        elif prop == 'FN':
+            card['fn'] = _vcard_value(params, value)
+        elif prop == 'N':
+            card['n'] = _vcard_value(params, value)
+        elif prop == 'TEL':
+            number = value[4:] if value.lower().startswith('tel:') else value
+            card['mobile' if _is_mobile(params) else 'other'].append(number)
+        elif prop == 'EMAIL' and card['email'] is None:
+            card['email'] = value.strip()
+
+
+class ImportProgress:
+    """Counts of an import in progress, passed to the progress callback."""
+
+    def __init__(self, source, total_bytes):
+        self.source = source
+        self.total_bytes = total_bytes
+        self.bytes_read = 0
+        self.records = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.resumed_from = 0
+        self.done = False
+        self._start = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._start
+
+    @property
+    def percent(self):
+        if self.done:
+            return 100.0
+        return 100.0 * self.bytes_read / self.total_bytes if self.total_bytes else 0.0
+
+    @property
+    def rate(self):
+        """Records processed per second in this run."""
+        return (self.records - self.resumed_from) / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"ImportProgress(records={self.records}, imported={self.imported}, "
+                f"duplicates={self.duplicates}, invalid={self.invalid}, done={self.done})")
+
+
+def normalize_stored_numbers(con, country_code=DEFAULT_COUNTRY_CODE):
+    """
+    Rewrites stored numbers that are not in E.164 yet ("9876543210",
+    "+91 98765 43210").
+
+    Contacts saved before the importer kept the number as typed; without
+    this the importer's duplicate check would miss them. It runs once, as a
+    database migration, and asks the contact index for one full rebuild
+    instead of a change log entry per rewritten row.
+
+    Args:
+        con (sqlite3.Connection): The write connection, inside a transaction.
+        country_code (str): Calling code for numbers without one.
+
+    Returns:
+        int: How many rows were rewritten.
+    """
+    updates = []
+    # Anything but "+" followed by digits only
+    for contact_id, mobile_no in con.execute('''
+            SELECT id, mobile_no FROM contacts
+            WHERE mobile_no NOT GLOB '+[0-9]*' OR substr(mobile_no, 2) GLOB '*[^0-9]*'
+            ''').fetchall():
+        number = normalize_phone(mobile_no, country_code)
+        if number and number != mobile_no:
+            updates.append((number, contact_id))
+    if updates:
+        con.executemany("UPDATE contacts SET mobile_no = ? WHERE id = ?", updates)
+        _log_full_rebuild(con)
+    return len(updates)
+
+
+def _log_full_rebuild(con):
+    # The index re-reads everything anyway, so the pending entries can go
+    con.execute("DELETE FROM contact_changes")
+    con.execute("INSERT INTO contact_changes (contact_id) VALUES (?)", (FULL_REBUILD,))
+
+
+def _fingerprint(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _save_checkpoint(con, progress, fingerprint):
+    con.execute('''
+        INSERT INTO contact_imports (source, fingerprint, records_done, imported, duplicates,
+                                     invalid, completed, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (source) DO UPDATE SET
+            fingerprint = excluded.fingerprint, records_done = excluded.records_done,
+            imported = excluded.imported, duplicates = excluded.duplicates,
+            invalid = excluded.invalid, completed = excluded.completed,
+            updated_at = excluded.updated_at
+    ''', (progress.source, fingerprint, progress.records, progress.imported,
+          progress.duplicates, progress.invalid, int(progress.done)))
+
+
+def import_contacts(path, db=None, file_format=None, resume=True, progress=None,
+                    batch_size=CONTACT_IMPORT_BATCH_SIZE, checkpoint_every=CONTACT_IMPORT_CHECKPOINT,
+                    country_code=DEFAULT_COUNTRY_CODE, name_column=None, phone_column=None):
+    """
+    Imports a CSV or vCard file into the contacts table.
+
+    Args:
+        path (str): The file.
+        db (Database): Target database; the default database if None.
+        file_format (str): "csv" or "vcard"; guessed from the extension if None.
+        resume (bool): Continue an interrupted import of the same, unchanged
+            file instead of starting over.
+        progress (callable): Called with the ImportProgress after each batch.
+        batch_size (int): Rows per executemany() call.
+        checkpoint_every (int): Records per transaction; each commit saves
+            the position to resume from. None imports in one transaction.
+        country_code (str): Calling code for numbers without one.
+        name_column (int): CSV name column index, overriding the header.
+        phone_column (int): CSV number column index, overriding the header.
+
+    Returns:
+        ImportProgress: The final counts.
+    """
+    db = db or get_database()
+    source = os.path.abspath(path)
+    fingerprint = _fingerprint(path)
+    if file_format is None:
+        file_format = 'vcard' if path.lower().endswith(('.vcf', '.vcard')) else 'csv'
+
+    result = ImportProgress(source, os.path.getsize(path))
+    state = db.query_one('SELECT fingerprint, records_done, imported, duplicates, invalid, completed '
+                         'FROM contact_imports WHERE source = ?', (source,))
+    if resume and state and state[0] == fingerprint:
+        result.records, result.imported, result.duplicates, result.invalid = state[1:5]
+        result.resumed_from = result.records
+        if state[5]:
+            result.done = True
+            return result
+
+    with open(path, 'rb') as raw:
+        # Binary underneath, so the byte position is known for progress
+        text = io.TextIOWrapper(raw, encoding='utf-8-sig', errors='replace', newline='')
+        if file_format == 'vcard':
+            records = read_vcards(text)
+        else:
+            records = read_csv(text, name_column, phone_column)
+        records = itertools.islice(records, result.records, None)
+
+        while True:
+            chunk = itertools.islice(records, checkpoint_every)
+            with db.transaction() as con:
+                # No change log entry per row: other writers wait for this
+                # transaction, so nothing else is missed while it is off
+                trigger = con.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?",
+                                      (INSERT_LOG_TRIGGER,)).fetchone()
+                if trigger:
+                    con.execute(f"DROP TRIGGER {INSERT_LOG_TRIGGER}")
+                count = imported = 0
+                for batch in iter(lambda: list(itertools.islice(chunk, batch_size)), []):
+                    rows = []
+                    for record in batch:
+                        mobile_no = next(filter(None, (normalize_phone(number, country_code)
+                                                       for number in record.phones)), None)
+                        if record.name and mobile_no:
+                            rows.append((record.name, mobile_no, record.email, mobile_no))
+                    inserted = con.executemany(INSERT_CONTACT, rows).rowcount if rows else 0
+                    count += len(batch)
+                    result.records += len(batch)
+                    result.imported += inserted
+                    imported += inserted
+                    result.duplicates += len(rows) - inserted
+                    result.invalid += len(batch) - len(rows)
+                    result.bytes_read = raw.tell()
+                    if progress:
+                        progress(result)
+
+                if trigger:
+                    con.execute(trigger[0])
+                if imported:
+                    _log_full_rebuild(con)
+                result.done = checkpoint_every is None or count < checkpoint_every
+                _save_checkpoint(con, result, fingerprint)
+            if result.done:
+                break
+
+    if progress:
+        progress(result)
+    return result
+
+
+def print_progress(progress):
+    """Prints a one-line progress report, overwritten in place."""
+    sys.stdout.write(f"\r{progress.percent:5.1f}%  {progress.records:,} records  "
+                     f"{progress.imported:,} imported  {progress.duplicates:,} duplicates  "
+                     f"{progress.invalid:,} invalid  {progress.rate:,.0f}/s")
+    if progress.done:
+        sys.stdout.write('\n')
+    sys.stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import contacts from a CSV or vCard file.")
+    parser.add_argument('path', help="CSV export or .vcf file")
+    parser.add_argument('--format', choices=['csv', 'vcard'], dest='file_format')
+    parser.add_argument('--restart', action='store_true',
+                        help="start over instead of resuming an interrupted import")
+    parser.add_argument('--name-column', type=int, help="CSV name column index (0-based)")
+    parser.add_argument('--phone-column', type=int, help="CSV number column index (0-based)")
+    parser.add_argument('--country-code', default=DEFAULT_COUNTRY_CODE)
+    args = parser.parse_args()
+
+    result = import_contacts(args.path, file_format=args.file_format, resume=not args.restart,
+                             progress=print_progress, country_code=args.country_code,
+                             name_column=args.name_column, phone_column=args.phone_column)
+    if result.resumed_from and result.resumed_from == result.records:
+        print(f"{args.path} was already imported")
+    print(f"Imported {result.imported:,} of {result.records:,} contacts in {result.elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
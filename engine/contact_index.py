@@ -0,0 +1,438 @@
+"""
+Vishwakarma AI - Contact Search Index
+© 2025 Vishwakarma Industries
+
+This module keeps the phonebook in memory for findContact(). The distinct
+words of all names form a small vocabulary, indexed by character trigrams,
+which tolerate typos and partial names, and by a phonetic key, which
+catches names speech recognition spelled differently ("Pooja" / "Puja",
+"Kunal" / "Conal"), and by single-letter deletions, which match words one
+typo apart in a few dictionary lookups. A query is matched word by word against the vocabulary
+and contacts are ranked by how well their words cover it. The index
+follows the contacts table through the change log its triggers write, so
+edits are applied incrementally instead of rebuilding the whole index.
+"""
+import heapq
+import re
+import sys
+import threading
+import weakref
+from collections import Counter
+
+from engine.config import CONTACT_SEARCH_MIN_SCORE
+
+# Soundex consonant groups
+PHONETIC_CODES = {}
+for _digit, _letters in enumerate(['bfpv', 'cgjkqsxz', 'dt', 'l', 'mn', 'r'], start=1):
+    for _letter in _letters:
+        PHONETIC_CODES[_letter] = str(_digit)
+
+# Vocabulary words less similar than this to a query word are ignored
+MIN_WORD_SIMILARITY = 0.5
+# Similarity of words one typo apart (a dropped, added, changed or swapped letter)
+TYPO_SIMILARITY = 0.8
+# Full rebuild instead of replaying more changes than this
+MAX_INCREMENTAL_CHANGES = 5000
+# Logged as the contact id by bulk writers (the importer) instead of one
+# change per row; asks every index for a full rebuild
+FULL_REBUILD = 0
+
+
+def normalize_name(name):
+    """
+    Normalizes a contact name or query.
+
+    Args:
+        name (str): The raw name.
+
+    Returns:
+        str: Lowercase alphanumeric words separated by single spaces.
+    """
+    return ' '.join(re.findall(r'[a-z0-9]+', (name or '').lower()))
+
+
+def word_trigrams(word):
+    """Returns the set of character trigrams of a space-padded word."""
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def deletions(word):
+    """
+    Returns the word and every variant with one letter removed.
+
+    Two words are at most one typo apart exactly when these sets overlap.
+    """
+    variants = {word[:i] + word[i + 1:] for i in range(len(word))}
+    variants.add(word)
+    return variants
+
+
+def phonetic_key(word):
+    """
+    Returns a Soundex-style key for a word.
+
+    Unlike classic Soundex the first letter is coded like the others, so
+    "Kunal" and "Conal" agree, and w is read as v, which Indian English
+    speech recognition mixes up ("Pawan" / "Pavan").
+
+    Args:
+        word (str): A lowercase word.
+
+    Returns:
+        str: Up to four digits, or the word itself if it has no consonants.
+    """
+    digits = []
+    last = None
+    for letter in word.replace('w', 'v'):
+        code = PHONETIC_CODES.get(letter)
+        if code is None:
+            # Vowels separate repeated codes; h does not
+            if letter != 'h':
+                last = None
+        elif code != last:
+            digits.append(code)
+            last = code
+    return ''.join(digits[:4]) or word
+
+
+def spelling_trigrams(word):
+    """
+    Returns the inner trigrams of a word with its vowels folded together.
+
+    Respellings mostly differ in vowels ("pooja" / "puja" both become
+    "paja"), so these overlap for them but not for unrelated names that
+    merely share a phonetic key ("mohit" / "amit").
+    """
+    folded = re.sub(r'[aeiouy]+', 'a', word.replace('w', 'v'))
+    return {folded[i:i + 3] for i in range(len(folded) - 2)}
+
+
+class ContactMatch:
+    """A ranked search result."""
+
+    __slots__ = ('contact_id', 'name', 'mobile_no', 'score', 'exact')
+
+    def __init__(self, contact_id, name, mobile_no, score, exact=False):
+        self.contact_id = contact_id
+        self.name = name
+        self.mobile_no = mobile_no
+        self.score = score
+        # Every query word is one of the contact's words, spelled the same
+        self.exact = exact
+
+    def __repr__(self):
+        return f"ContactMatch({self.name!r}, {self.mobile_no!r}, score={self.score:.2f})"
+
+
+class ContactIndex:
+    """An in-memory, word-level fuzzy and phonetic index of the contacts table."""
+
+    def __init__(self, db=None, min_score=CONTACT_SEARCH_MIN_SCORE):
+        """
+        Args:
+            db (Database): The database to follow; None for a standalone
+                index filled with add().
+            min_score (float): Lowest score returned by search().
+        """
+        self.db = db
+        self.min_score = min_score
+        self._lock = threading.RLock()
+        self._contacts = {}  # contact_id -> (name, mobile_no, word count)
+        self._words = {}  # word -> set of contact ids
+        self._word_grams = {}  # word -> trigram count
+        self._trigrams = {}  # trigram -> set of words
+        self._phonetic = {}  # phonetic key -> set of words
+        self._deletions = {}  # word with one letter removed -> set of words
+        self._seq = None  # last change log entry applied
+        self.full_rebuilds = 0
+        self.incremental_updates = 0
+
+    def __len__(self):
+        return len(self._contacts)
+
+    def add(self, contact_id, name, mobile_no):
+        """
+        Indexes a contact, replacing any previous entry with the same id.
+
+        Args:
+            contact_id (int): The contact's row id.
+            name (str): The contact's name.
+            mobile_no (str): The contact's number.
+        """
+        with self._lock:
+            self.remove(contact_id)
+            words = set(normalize_name(name).split())
+            self._contacts[contact_id] = (name, mobile_no, len(words))
+            for word in words:
+                contacts = self._words.get(word)
+                if contacts is None:
+                    contacts = self._words[word] = set()
+                    self._add_word(word)
+                contacts.add(contact_id)
+
+    def remove(self, contact_id):
+        """Drops a contact from the index, if present."""
+        with self._lock:
+            entry = self._contacts.pop(contact_id, None)
+            if entry is None:
+                return
+            for word in set(normalize_name(entry[0]).split()):
+                contacts = self._words[word]
+                contacts.discard(contact_id)
+                if not contacts:
+                    del self._words[word]
+                    self._remove_word(word)
+
+    def clear(self):
+        """Empties the index."""
+        with self._lock:
+            self._contacts.clear()
+            self._words.clear()
+            self._word_grams.clear()
+            self._trigrams.clear()
+            self._phonetic.clear()
+            self._deletions.clear()
+            self._seq = None
+
+    def refresh(self):
+        """
+        Brings the index up to date with the database.
+
+        The first call loads every contact. Later calls replay the
+        contact_changes log and re-read only the contacts it names, then
+        delete the rows they replayed. This assumes the index is the log's
+        only reader, as the one get_contact_index() returns is: a second
+        index following the same database would miss the trimmed changes.
+
+        Returns:
+            int: How many contacts were re-read.
+        """
+        if self.db is None:
+            return 0
+
+        with self._lock:
+            # AUTOINCREMENT keeps counting after the log is trimmed
+            row = self.db.query_one(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'contact_changes'")
+            latest = row[0] if row else 0
+            if self._seq is not None and latest == self._seq:
+                return 0
+
+            changed = None
+            if self._seq is not None and latest > self._seq:
+                changed = [row[0] for row in self.db.query(
+                    "SELECT DISTINCT contact_id FROM contact_changes WHERE seq > ? AND seq <= ?",
+                    (self._seq, latest))]
+                if len(changed) > MAX_INCREMENTAL_CHANGES or FULL_REBUILD in changed:
+                    changed = None
+
+            if changed is None:
+                self._rebuild(latest)
+                count = len(self._contacts)
+            else:
+                self._apply(changed)
+                self.incremental_updates += 1
+                count = len(changed)
+
+            self._seq = latest
+            # The log is only needed until the index has caught up (it has
+            # no other reader)
+            self.db.execute("DELETE FROM contact_changes WHERE seq <= ?", (latest,))
+            return count
+
+    def search(self, query, limit=5):
+        """
+        Finds the contacts that best match a spoken name.
+
+        Each query word is scored against the contact's most similar word
+        (1 for the same word); contacts with fewer extra words rank higher.
+
+        Args:
+            query (str): The name as heard.
+            limit (int): Maximum number of results.
+
+        Returns:
+            list: ContactMatch objects, best first.
+        """
+        words = list(dict.fromkeys(normalize_name(query).split()))
+        if not words:
+            return []
+
+        with self._lock:
+            if all(word in self._words for word in words):
+                # Recognized speech is usually spelled like the contact; those
+                # contacts outrank fuzzy matches, so the rest can be skipped
+                exact = [{word: 1.0} for word in words]
+                matches = self._rank(words, exact, limit)
+                if len(matches) == limit:
+                    return matches
+            return self._rank(words, [self._similar_words(word) for word in words], limit)
+
+    def stats(self):
+        """
+        Returns index statistics.
+
+        Returns:
+            dict: contacts, words, trigrams, phonetic_keys, full_rebuilds,
+                  incremental_updates and memory_bytes.
+        """
+        with self._lock:
+            return {
+                'contacts': len(self._contacts),
+                'words': len(self._words),
+                'trigrams': len(self._trigrams),
+                'phonetic_keys': len(self._phonetic),
+                'full_rebuilds': self.full_rebuilds,
+                'incremental_updates': self.incremental_updates,
+                'memory_bytes': self._memory_bytes(),
+            }
+
+    def _rank(self, words, similar, limit):
+        """Scores the contacts holding the similar words of each query word."""
+        # Contacts matching every query word, else any of them
+        matching = sorted((set().union(*(self._words[w] for w in matches))
+                           for matches in similar if matches), key=len)
+        if not matching:
+            return []
+        candidates = matching[0].intersection(*matching[1:]) or set().union(*matching)
+
+        totals = dict.fromkeys(candidates, 0.0)
+        hits = dict.fromkeys(candidates, 0)
+        for matches in similar:
+            remaining = set(candidates)
+            for word, similarity in sorted(matches.items(), key=lambda item: -item[1]):
+                found = remaining & self._words[word]
+                for cid in found:
+                    totals[cid] += similarity
+                    hits[cid] += 1
+                remaining -= found
+                if not remaining:
+                    break
+
+        scored = []
+        for cid, total in totals.items():
+            name, _, word_count = self._contacts[cid]
+            score = 0.9 * total / len(words) + 0.1 * hits[cid] / max(word_count, 1)
+            if score >= self.min_score:
+                scored.append((score, -len(name), -cid))
+        return [ContactMatch(-negative_id, *self._contacts[-negative_id][:2], score,
+                             exact=totals[-negative_id] == len(words))
+                for score, _, negative_id in heapq.nlargest(limit, scored)]
+
+    def _similar_words(self, query_word):
+        """Maps vocabulary words to their similarity (0-1) with a query word."""
+        similar = {}
+        grams = word_trigrams(query_word)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigrams.get(gram, ()))
+
+        for word, overlap in shared.items():
+            similarity = 2 * overlap / (len(grams) + self._word_grams[word])
+            if len(query_word) >= 3 and word.startswith(query_word):
+                # "raj" for "rajesh"
+                similarity = max(similarity, 0.6 + 0.4 * len(query_word) / len(word))
+            if similarity >= MIN_WORD_SIMILARITY:
+                similar[word] = max(similar.get(word, 0.0), similarity)
+
+        if len(query_word) >= 4:
+            typos = set()
+            for variant in deletions(query_word):
+                typos.update(self._deletions.get(variant, ()))
+            for word in typos:
+                # A different first letter is a different name ("rohan" / "mohan")
+                if word[0] == query_word[0]:
+                    similar[word] = max(similar.get(word, 0.0), TYPO_SIMILARITY)
+
+        spelling = None
+        for word in self._phonetic.get(phonetic_key(query_word), ()):
+            # Short keys collide a lot ("jain" / "sinha", "mohit" / "amit"):
+            # keep the respellings, which share a trigram as spelled and
+            # an inner one once vowels are folded, and are not much shorter
+            # than what was heard
+            if 2 * len(word) < len(query_word):
+                continue
+            if spelling is None:
+                spelling = spelling_trigrams(query_word)
+            overlap = shared.get(word)
+            if overlap and spelling & spelling_trigrams(word):
+                similarity = 0.6 + 0.4 * 2 * overlap / (len(grams) + self._word_grams[word])
+                similar[word] = max(similar.get(word, 0.0), similarity)
+        return similar
+
+    def _add_word(self, word):
+        grams = word_trigrams(word)
+        self._word_grams[word] = len(grams)
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(word)
+        self._phonetic.setdefault(phonetic_key(word), set()).add(word)
+        for variant in deletions(word):
+            self._deletions.setdefault(variant, set()).add(word)
+
+    def _remove_word(self, word):
+        del self._word_grams[word]
+        for gram in word_trigrams(word):
+            self._discard(self._trigrams, gram, word)
+        self._discard(self._phonetic, phonetic_key(word), word)
+        for variant in deletions(word):
+            self._discard(self._deletions, variant, word)
+
+    def _rebuild(self, seq):
+        self.clear()
+        rows = self.db.query("SELECT id, name, mobile_no FROM contacts")
+        for contact_id, name, mobile_no in rows:
+            self.add(contact_id, name, mobile_no)
+        self._seq = seq
+        self.full_rebuilds += 1
+
+    def _apply(self, contact_ids):
+        for contact_id in contact_ids:
+            row = self.db.query_one("SELECT name, mobile_no FROM contacts WHERE id = ?",
+                                    (contact_id,))
+            if row is None:
+                self.remove(contact_id)
+            else:
+                self.add(contact_id, *row)
+
+    @staticmethod
+    def _discard(postings, key, value):
+        values = postings.get(key)
+        if values is not None:
+            values.discard(value)
+            if not values:
+                del postings[key]
+
+    def _memory_bytes(self):
+        postings = (self._words, self._trigrams, self._phonetic, self._deletions)
+        size = sys.getsizeof(self._contacts) + sys.getsizeof(self._word_grams)
+        for entry in self._contacts.values():
+            size += sys.getsizeof(entry) + sys.getsizeof(entry[0]) + sys.getsizeof(entry[1])
+        for index in postings:
+            size += sys.getsizeof(index)
+            for key, values in index.items():
+                size += sys.getsizeof(key) + sys.getsizeof(values)
+        return size
+
+
+_contact_indexes = weakref.WeakKeyDictionary()
+_contact_indexes_lock = threading.Lock()
+
+
+def get_contact_index(db):
+    """
+    Returns the shared contact index of a database, synced with its
+    contacts table.
+
+    Args:
+        db (Database): The database manager.
+
+    Returns:
+        ContactIndex: The up-to-date index.
+    """
+    with _contact_indexes_lock:
+        index = _contact_indexes.get(db)
+        if index is None:
+            index = _contact_indexes[db] = ContactIndex(db)
+    index.refresh()
+    return index
@@ -0,0 +1,296 @@
+"""
+Vishwakarma AI - Conversation Memory
+© 2025 Vishwakarma Industries
+
+This module stores chatbot turns per profile and builds the message list sent
+to the model. Recent turns are kept verbatim inside a token budget; older
+turns are folded into a rolling summary, so the prompt stays bounded however
+long a session runs.
+"""
+import math
+import re
+import threading
+from datetime import datetime
+
+from engine.config import (CONVERSATION_CONTEXT_TOKENS, CONVERSATION_MEMORY,
+                           CONVERSATION_SUMMARY_TOKENS, DATABASE_NAME)
+from engine.database import get_database
+
+# Rough per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+GUEST_USER_ID = 0
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def estimate_tokens(text):
+    """
+    Estimates the token count of a text (about four characters per token).
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: The estimated number of tokens.
+    """
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def message_tokens(message):
+    """Returns the estimated token cost of one chat message."""
+    return estimate_tokens(message['content']) + MESSAGE_OVERHEAD_TOKENS
+
+
+def first_sentence(text, max_chars=160):
+    """Returns the first sentence of a text, cut to max_chars."""
+    sentence = SENTENCE_END.split(text.strip(), maxsplit=1)[0]
+    if len(sentence) > max_chars:
+        sentence = sentence[:max_chars - 3].rstrip() + '...'
+    return sentence
+
+
+def extractive_summary(previous, turns, max_tokens):
+    """
+    Folds turns into a summary without calling a model.
+
+    Each turn contributes its first sentence; when the summary grows past
+    max_tokens the oldest lines are dropped.
+
+    Args:
+        previous (str): The summary so far ('' if none).
+        turns (list): Turn dicts with 'role' and 'content'.
+        max_tokens (int): Size limit of the summary.
+
+    Returns:
+        str: The new summary.
+    """
+    lines = previous.splitlines() if previous else []
+    for turn in turns:
+        speaker = 'User' if turn['role'] == 'user' else 'Assistant'
+        lines.append(f"{speaker}: {first_sentence(turn['content'])}")
+
+    while len(lines) > 1 and estimate_tokens('\n'.join(lines)) > max_tokens:
+        lines.pop(0)
+    return '\n'.join(lines)
+
+
+class ConversationStore:
+    """SQLite storage for conversation turns and rolling summaries."""
+
+    def __init__(self, db_name=DATABASE_NAME):
+        self.db_name = db_name
+        self.db = get_database(db_name)
+
+    def add_turn(self, user_id, role, content):
+        """
+        Stores one turn.
+
+        Args:
+            user_id (int): The profile the turn belongs to.
+            role (str): 'user' or 'assistant'.
+            content (str): The message text.
+
+        Returns:
+            dict: The stored turn.
+        """
+        tokens = estimate_tokens(content)
+        cursor = self.db.execute('''
+            INSERT INTO conversation_turns (user_id, role, content, tokens, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (user_id, role, content, tokens, datetime.now()))
+
+        return {'turn_id': cursor.lastrowid, 'role': role, 'content': content, 'tokens': tokens}
+
+    def get_summary(self, user_id):
+        """
+        Returns the rolling summary of a profile.
+
+        Args:
+            user_id (int): The profile.
+
+        Returns:
+            tuple: (summary, summarized_to), or ('', 0) if there is none.
+        """
+        row = self.db.query_one('''
+            SELECT summary, summarized_to FROM conversation_summaries
+            WHERE user_id = ?
+        ''', (user_id,))
+
+        return (row[0], row[1]) if row else ('', 0)
+
+    def save_summary(self, user_id, summary, summarized_to):
+        """
+        Replaces the rolling summary of a profile.
+
+        Args:
+            user_id (int): The profile.
+            summary (str): The new summary.
+            summarized_to (int): The last turn_id it covers.
+        """
+        self.db.execute('''
+            INSERT OR REPLACE INTO conversation_summaries
+                (user_id, summary, summarized_to, updated_at)
+            VALUES (?, ?, ?, ?)
+        ''', (user_id, summary, summarized_to, datetime.now()))
+
+    def get_turns_after(self, user_id, turn_id):
+        """
+        Returns the turns of a profile newer than turn_id, oldest first.
+
+        Args:
+            user_id (int): The profile.
+            turn_id (int): Only turns with a larger id are returned.
+
+        Returns:
+            list: Turn dicts.
+        """
+        rows = self.db.query('''
+            SELECT turn_id, role, content, tokens FROM conversation_turns
+            WHERE user_id = ? AND turn_id > ?
+            ORDER BY turn_id
+        ''', (user_id, turn_id))
+
+        return [{'turn_id': row[0], 'role': row[1], 'content': row[2], 'tokens': row[3]}
+                for row in rows]
+
+    def clear(self, user_id):
+        """Deletes the stored conversation of a profile."""
+        with self.db.transaction() as con:
+            con.execute('DELETE FROM conversation_turns WHERE user_id = ?', (user_id,))
+            con.execute('DELETE FROM conversation_summaries WHERE user_id = ?', (user_id,))
+
+
+class ConversationMemory:
+    """
+    The working context of one profile's conversation.
+
+    Unsummarized turns are kept in memory, so building a prompt never
+    touches the database. Once they exceed the context budget, the oldest
+    ones are folded into the summary until the rest fits again.
+    """
+
+    def __init__(self, user_id, store=None, context_tokens=CONVERSATION_CONTEXT_TOKENS,
+                 summary_tokens=CONVERSATION_SUMMARY_TOKENS, summarizer=extractive_summary):
+        """
+        Args:
+            user_id (int): The profile this conversation belongs to.
+            store (ConversationStore, optional): Defaults to the app database.
+            context_tokens (int): Budget for summary plus recent turns.
+            summary_tokens (int): Size limit of the rolling summary.
+            summarizer (callable): (previous, turns, max_tokens) -> summary.
+        """
+        self.user_id = user_id
+        self.store = store or ConversationStore()
+        self.context_tokens = context_tokens
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer
+        self._lock = threading.Lock()
+        self.summary, self.summarized_to = self.store.get_summary(user_id)
+        self.turns = self.store.get_turns_after(user_id, self.summarized_to)
+        self._compact()
+
+    def build_messages(self, system_prompt, user_input):
+        """
+        Builds the message list for the next request.
+
+        Args:
+            system_prompt (str): The chatbot's system prompt.
+            user_input (str): The new user message.
+
+        Returns:
+            list: OpenAI-style messages: system, summary, history, user.
+        """
+        with self._lock:
+            system = system_prompt
+            if self.summary:
+                system += f"\n\nSummary of the earlier conversation:\n{self.summary}"
+            history = [{'role': turn['role'], 'content': turn['content']} for turn in self.turns]
+
+        return ([{'role': 'system', 'content': system}] + history
+                + [{'role': 'user', 'content': user_input}])
+
+    def add_exchange(self, user_input, response):
+        """
+        Records a user message and the assistant's reply.
+
+        Args:
+            user_input (str): What the user said.
+            response (str): What the assistant answered.
+        """
+        with self._lock:
+            self.turns.append(self.store.add_turn(self.user_id, 'user', user_input))
+            self.turns.append(self.store.add_turn(self.user_id, 'assistant', response))
+            self._compact()
+
+    def context_size(self):
+        """Returns the estimated tokens of the summary plus recent turns."""
+        with self._lock:
+            return self._context_size()
+
+    def clear(self):
+        """Forgets the conversation."""
+        with self._lock:
+            self.store.clear(self.user_id)
+            self.summary, self.summarized_to = '', 0
+            self.turns = []
+
+    def _context_size(self):
+        return (estimate_tokens(self.summary)
+                + sum(turn['tokens'] + MESSAGE_OVERHEAD_TOKENS for turn in self.turns))
+
+    def _compact(self):
+        if self._context_size() <= self.context_tokens:
+            return
+
+        # Fold whole exchanges, oldest first, leaving room for the summary
+        budget = self.context_tokens - self.summary_tokens
+        folded = []
+        while self.turns and (sum(t['tokens'] + MESSAGE_OVERHEAD_TOKENS for t in self.turns)
+                              > budget or self.turns[0]['role'] != 'user'):
+            folded.append(self.turns.pop(0))
+        if not folded:
+            return
+
+        self.summary = self.summarizer(self.summary, folded, self.summary_tokens)
+        self.summarized_to = folded[-1]['turn_id']
+        self.store.save_summary(self.user_id, self.summary, self.summarized_to)
+
+
+_active_user_id = GUEST_USER_ID
+_memories = {}
+_memory_lock = threading.Lock()
+
+
+def set_active_user(user_id):
+    """
+    Sets the profile whose conversation the chatbot continues.
+
+    Args:
+        user_id (int): The authenticated profile, or None for a guest.
+    """
+    global _active_user_id
+    _active_user_id = GUEST_USER_ID if user_id is None else user_id
+
+
+def get_active_user():
+    """Returns the profile the assistant is talking to (GUEST_USER_ID if none)."""
+    return _active_user_id
+
+
+def get_conversation(user_id=None):
+    """
+    Returns the conversation memory of a profile (the active one by default).
+
+    Args:
+        user_id (int, optional): The profile.
+
+    Returns:
+        ConversationMemory: The memory, or None if CONVERSATION_MEMORY is off.
+    """
+    if not CONVERSATION_MEMORY:
+        return None
+    user_id = _active_user_id if user_id is None else user_id
+    with _memory_lock:
+        if user_id not in _memories:
+            _memories[user_id] = ConversationMemory(user_id)
+        return _memories[user_id]
@@ -0,0 +1,431 @@
+"""
+Vishwakarma AI - Database Connection Manager
+© 2025 Vishwakarma Industries
+
+This module owns the SQLite connections shared by the profile manager, the
+command features and the conversation store. They are opened once per
+database file in WAL mode with tuned pragmas, keep their prepared statements
+cached, and the schema is created only the first time the file is opened.
+Later schema changes are numbered migrations, tracked in PRAGMA user_version.
+"""
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+
+from engine.config import (DATABASE_BUSY_TIMEOUT_MS, DATABASE_CACHE_KB,
+                           DATABASE_NAME, DATABASE_STATEMENT_CACHE)
+
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    # Safe with WAL: a power loss can drop the last commits, never corrupt
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA temp_store=MEMORY",
+    f"PRAGMA cache_size=-{DATABASE_CACHE_KB}",
+    f"PRAGMA busy_timeout={DATABASE_BUSY_TIMEOUT_MS}",
+]
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS profiles (
+        user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name VARCHAR(100) NOT NULL,
+        age INTEGER,
+        preferences TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_login TIMESTAMP,
+        is_active BOOLEAN DEFAULT 1
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS profile_settings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        setting_key VARCHAR(100),
+        setting_value TEXT,
+        FOREIGN KEY (user_id) REFERENCES profiles(user_id)
+    )
+    ''',
+    "CREATE TABLE IF NOT EXISTS sys_command(id integer primary key, name VARCHAR(100), path VARCHAR(1000))",
+    "CREATE TABLE IF NOT EXISTS web_command(id integer primary key, name VARCHAR(100), url VARCHAR(1000))",
+    '''
+    CREATE TABLE IF NOT EXISTS contacts (
+        id integer primary key,
+        name VARCHAR(200),
+        mobile_no VARCHAR(255),
+        email VARCHAR(255) NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS conversation_turns (
+        turn_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        role VARCHAR(16) NOT NULL,
+        content TEXT NOT NULL,
+        tokens INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_conversation_turns_user
+    ON conversation_turns (user_id, turn_id)
+    ''',
+    # One rolling summary per profile, covering turns up to summarized_to
+    '''
+    CREATE TABLE IF NOT EXISTS conversation_summaries (
+        user_id INTEGER PRIMARY KEY,
+        summary TEXT NOT NULL,
+        summarized_to INTEGER NOT NULL,
+        updated_at TIMESTAMP
+    )
+    ''',
+]
+
+
+def _normalize_contact_numbers(con):
+    # Imported lazily: the importer itself opens databases through this module
+    from engine.contact_import import normalize_stored_numbers
+    normalize_stored_numbers(con)
+
+
+# (version, description, statements), applied in order to files whose
+# user_version is lower. A statement is SQL or a function taking the
+# connection, for data fixes SQL cannot express. Append new migrations;
+# never edit applied ones.
+MIGRATIONS = [
+    (1, "Case-insensitive name lookups", [
+        # Lookups filter on LOWER(name); only an index on that exact
+        # expression can serve them
+        "CREATE INDEX IF NOT EXISTS idx_sys_command_name ON sys_command (LOWER(name))",
+        "CREATE INDEX IF NOT EXISTS idx_web_command_name ON web_command (LOWER(name))",
+        "CREATE INDEX IF NOT EXISTS idx_contacts_name ON contacts (LOWER(name))",
+    ]),
+    (2, "One row per profile setting", [
+        # Older versions could store a key twice; keep the latest value
+        '''
+        DELETE FROM profile_settings WHERE id NOT IN (
+            SELECT MAX(id) FROM profile_settings GROUP BY user_id, setting_key
+        )
+        ''',
+        '''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_profile_settings_key
+        ON profile_settings (user_id, setting_key)
+        ''',
+    ]),
+    (3, "Active profiles by last login", [
+        "CREATE INDEX IF NOT EXISTS idx_profiles_active_login ON profiles (is_active, last_login)",
+    ]),
+    (4, "Contact change log", [
+        # Lets the in-memory contact index re-read only the rows that changed
+        '''
+        CREATE TABLE IF NOT EXISTS contact_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            contact_id INTEGER NOT NULL
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS contacts_logged_insert AFTER INSERT ON contacts BEGIN
+            INSERT INTO contact_changes (contact_id) VALUES (NEW.id);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS contacts_logged_update AFTER UPDATE ON contacts BEGIN
+            INSERT INTO contact_changes (contact_id) SELECT OLD.id UNION SELECT NEW.id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS contacts_logged_delete AFTER DELETE ON contacts BEGIN
+            INSERT INTO contact_changes (contact_id) VALUES (OLD.id);
+        END
+        ''',
+    ]),
+    (5, "Resumable contact imports", [
+        # Imports skip numbers that are already stored
+        "CREATE INDEX IF NOT EXISTS idx_contacts_mobile ON contacts (mobile_no)",
+        '''
+        CREATE TABLE IF NOT EXISTS contact_imports (
+            source TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            records_done INTEGER NOT NULL,
+            imported INTEGER NOT NULL,
+            duplicates INTEGER NOT NULL,
+            invalid INTEGER NOT NULL,
+            completed BOOLEAN NOT NULL,
+            updated_at TIMESTAMP
+        )
+        ''',
+    ]),
+    (6, "Command aliases and catalog version", [
+        '''
+        CREATE TABLE IF NOT EXISTS command_aliases (
+            alias VARCHAR(100) PRIMARY KEY,
+            name VARCHAR(100) NOT NULL
+        )
+        ''',
+        # Bumped by triggers, so the in-memory catalog sees changes made
+        # by any connection, including other processes
+        '''
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        ''',
+        "INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0)",
+    ] + [
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_catalog_{event.lower()} AFTER {event} ON {table} BEGIN
+            UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+        END
+        '''
+        for table in ('sys_command', 'web_command', 'command_aliases')
+        for event in ('INSERT', 'UPDATE', 'DELETE')
+    ]),
+    (7, "Contact numbers in E.164", [
+        _normalize_contact_numbers,
+    ]),
+]
+
+
+def migrate(con):
+    """
+    Brings a database up to the latest schema version.
+
+    Each migration runs in its own transaction together with the
+    user_version bump, so an interrupted upgrade resumes where it stopped.
+
+    Args:
+        con (sqlite3.Connection): An autocommit connection to the file.
+
+    Returns:
+        list: The versions that were applied.
+    """
+    applied = []
+    for version, description, statements in MIGRATIONS:
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-read under the write lock in case another process migrated
+            if con.execute("PRAGMA user_version").fetchone()[0] >= version:
+                con.execute("COMMIT")
+                continue
+            for statement in statements:
+                if callable(statement):
+                    statement(con)
+                else:
+                    con.execute(statement)
+            con.execute(f"PRAGMA user_version = {version}")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        con.execute("COMMIT")
+        applied.append(version)
+    return applied
+
+
+class _ReadConnection(sqlite3.Connection):
+    """A read-only connection; unlike sqlite3.Connection it can be weakly referenced."""
+
+
+class Database:
+    """
+    Thread-safe access to one SQLite file.
+
+    Writes go through a single connection behind a lock, since SQLite
+    allows one writer at a time. Reads use a read-only connection per
+    thread, so lookups from different threads run in parallel (WAL lets
+    them proceed while a write is in progress). Greenlets on one thread
+    share that thread's reader: a query never yields to another greenlet
+    mid-statement, and every query runs on its own fully fetched cursor.
+    """
+
+    def __init__(self, path=DATABASE_NAME):
+        self.path = path
+        self._lock = threading.RLock()
+        self._con = None
+        self._local = threading.local()
+        # Readers close when their thread ends; this only tracks live ones
+        self._readers = weakref.WeakSet()
+        self._generation = 0
+        # Writes committed through this manager; caches compare it to
+        # notice in-process changes without running a query
+        self.write_count = 0
+
+    def _connection(self):
+        if self._con is None:
+            con = sqlite3.connect(self.path, check_same_thread=False,
+                                  isolation_level=None,
+                                  cached_statements=DATABASE_STATEMENT_CACHE)
+            for pragma in PRAGMAS:
+                con.execute(pragma)
+            con.execute("BEGIN")
+            for statement in SCHEMA:
+                con.execute(statement)
+            con.execute("COMMIT")
+            migrate(con)
+            self._con = con
+        return self._con
+
+    def _reader(self):
+        con = getattr(self._local, 'con', None)
+        if con is not None and self._local.generation == self._generation:
+            return con
+
+        with self._lock:
+            # The writer creates the file and schema before anyone reads
+            self._connection()
+            con = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True,
+                                  check_same_thread=False, isolation_level=None,
+                                  cached_statements=DATABASE_STATEMENT_CACHE,
+                                  factory=_ReadConnection)
+            for pragma in PRAGMAS[1:]:
+                con.execute(pragma)
+            con.execute("PRAGMA query_only=ON")
+            self._readers.add(con)
+            self._local.con = con
+            self._local.generation = self._generation
+        return con
+
+    @contextmanager
+    def _read_connection(self):
+        if self.path == ':memory:':
+            # An in-memory database has only the write connection, so reads
+            # must not run while another thread is inside a transaction
+            with self._lock:
+                yield self._connection()
+        else:
+            yield self._reader()
+
+    def query(self, sql, params=()):
+        """
+        Runs a SELECT on this thread's read-only connection.
+
+        Args:
+            sql (str): The statement.
+            params (tuple): Its parameters.
+
+        Returns:
+            list: All result rows.
+        """
+        with self._read_connection() as con:
+            return con.execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        """
+        Runs a SELECT and returns the first row.
+
+        Returns:
+            tuple: The row, or None if there is none.
+        """
+        with self._read_connection() as con:
+            cursor = con.execute(sql, params)
+            row = cursor.fetchone()
+            cursor.close()
+            return row
+
+    def execute(self, sql, params=()):
+        """
+        Runs a single write statement, committed on its own.
+
+        Args:
+            sql (str): The statement.
+            params (tuple): Its parameters.
+
+        Returns:
+            sqlite3.Cursor: For lastrowid and rowcount.
+        """
+        with self._lock:
+            cursor = self._connection().execute(sql, params)
+            self.write_count += 1
+            return cursor
+
+    def executemany(self, sql, rows):
+        """Runs one statement for many parameter rows in a single transaction."""
+        with self.transaction() as con:
+            return con.executemany(sql, rows)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups statements into one transaction on the write connection.
+
+        Yields:
+            sqlite3.Connection: Use it for the statements inside the block,
+                including reads that must see the transaction's writes.
+        """
+        with self._lock:
+            con = self._connection()
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                yield con
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+            con.execute("COMMIT")
+            self.write_count += 1
+
+    def schema_version(self):
+        """Returns the file's migration version (PRAGMA user_version)."""
+        return self.query_one("PRAGMA user_version")[0]
+
+    def query_plan(self, sql, params=()):
+        """
+        Explains how SQLite will run a query.
+
+        Args:
+            sql (str): The statement.
+            params (tuple): Its parameters.
+
+        Returns:
+            list: The EXPLAIN QUERY PLAN detail lines.
+        """
+        return [row[3] for row in self.query(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+    def reader_count(self):
+        """Returns how many per-thread read connections are open."""
+        with self._lock:
+            return len(self._readers)
+
+    def close(self):
+        """Closes all connections; they reopen on next use."""
+        with self._lock:
+            for con in list(self._readers):
+                con.close()
+            self._readers = weakref.WeakSet()
+            self._generation += 1
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(path=DATABASE_NAME):
+    """
+    Returns the shared connection manager for a database file.
+
+    Args:
+        path (str): The SQLite file.
+
+    Returns:
+        Database: The manager.
+    """
+    with _databases_lock:
+        if path not in _databases:
+            _databases[path] = Database(path)
+        return _databases[path]
+
+
+def close_database(path=DATABASE_NAME):
+    """
+    Closes and forgets the manager of a database file, e.g. before the
+    file is deleted.
+
+    Args:
+        path (str): The SQLite file.
+    """
+    with _databases_lock:
+        database = _databases.pop(path, None)
+    if database is not None:
+        database.close()
@@ -3,59 +3,32 @@ Vishwakarma AI - Database Module
 © 2025 Vishwakarma Industries
 """
 
-import csv
-import sqlite3
+from engine.database import get_database
 
-con = sqlite3.connect("vishwakarma.db")
-cursor = con.cursor()
+# The tables (sys_command, web_command, contacts, ...) are created by
+# engine/database.py the first time the shared connection is opened
+db = get_database()
 
-query = "CREATE TABLE IF NOT EXISTS sys_command(id integer primary key, name VARCHAR(100), path VARCHAR(1000))"
-cursor.execute(query)
+# db.execute("INSERT INTO sys_command VALUES (null,'one note', 'C:\\Program Files\\Microsoft Office\\root\\Office16\\ONENOTE.exe')")
 
-# query = "INSERT INTO sys_command VALUES (null,'one note', 'C:\\Program Files\\Microsoft Office\\root\\Office16\\ONENOTE.exe')"
-# cursor.execute(query)
-# con.commit()
-
-# query = "CREATE TABLE IF NOT EXISTS web_command(id integer primary key, name VARCHAR(100), url VARCHAR(1000))"
-# cursor.execute(query)
-
-# query = "INSERT INTO web_command VALUES (null,'youtube', 'https://www.youtube.com/')"
-# cursor.execute(query)
-# con.commit()
+# db.execute("INSERT INTO web_command VALUES (null,'youtube', 'https://www.youtube.com/')")
 
 
 # testing module
 # app_name = "android studio"
-# cursor.execute('SELECT path FROM sys_command WHERE name IN (?)', (app_name,))
-# results = cursor.fetchall()
+# results = db.query('SELECT path FROM sys_command WHERE name IN (?)', (app_name,))
 # print(results[0][0])
 
-# Create a table with the desired columns
-#cursor.execute('''CREATE TABLE IF NOT EXISTS contacts (id integer primary key, name VARCHAR(200), mobile_no VARCHAR(255), email VARCHAR(255) NULL)''')
-
 
-# Specify the column indices you want to import (0-based index)
-# Example: Importing the 1st and 3rd columns
-# desired_columns_indices = [0, 30]
+# Import contacts from a CSV export or a vCard file (streamed, deduplicated
+# and resumable); columns are found from the header or given explicitly
+# from engine.contact_import import import_contacts
+# import_contacts('contacts.csv', name_column=0, phone_column=30)
 
-# # Read data from CSV and insert into SQLite table for the desired columns
-# with open('contacts.csv', 'r', encoding='utf-8') as csvfile:
-#     csvreader = csv.reader(csvfile)
-#     for row in csvreader:
-#         selected_data = [row[i] for i in desired_columns_indices]
-#         cursor.execute(''' INSERT INTO contacts (id, 'name', 'mobile_no') VALUES (null, ?, ?);''', tuple(selected_data))
-
-# # Commit changes and close connection
-# con.commit()
-# con.close()
-
-# query = "INSERT INTO contacts VALUES (null,'pawan', '1234567890', 'null')"
-# cursor.execute(query)
-# con.commit()
+# db.execute("INSERT INTO contacts VALUES (null,'pawan', '1234567890', 'null')")
 
 # query = 'kunal'
 # query = query.strip().lower()
 
-# cursor.execute("SELECT mobile_no FROM contacts WHERE LOWER(name) LIKE ? OR LOWER(name) LIKE ?", ('%' + query + '%', query + '%'))
-# results = cursor.fetchall()
-# print(results[0][0])
\ No newline at end of file
+# results = db.query("SELECT mobile_no FROM contacts WHERE LOWER(name) LIKE ? OR LOWER(name) LIKE ?", ('%' + query + '%', query + '%'))
+# print(results[0][0])
@@ -0,0 +1,179 @@
+"""
+Vishwakarma AI - Offline Fallback TTS Engine
+© 2025 Vishwakarma Industries
+
+This module keeps one pyttsx3 engine alive on a dedicated thread. The
+driver is started on first use (and again on the next utterance if that
+failed), and utterances are sent to it through a command queue instead of
+re-initializing the driver for every sentence.
+"""
+import queue
+import sys
+import threading
+
+import pyttsx3
+
+from engine.config import TTS_FALLBACK_DRIVER, TTS_RATE, TTS_VOICE_INDEX
+
+PLATFORM_DRIVERS = {
+    'win32': 'sapi5',
+    'darwin': 'nsss',
+}
+
+
+def default_driver(platform=None):
+    """
+    Picks the pyttsx3 driver for a platform.
+
+    Args:
+        platform (str, optional): Defaults to sys.platform.
+
+    Returns:
+        str: 'sapi5' on Windows, 'nsss' on macOS and 'espeak' elsewhere.
+    """
+    return PLATFORM_DRIVERS.get(platform or sys.platform, 'espeak')
+
+
+class _Command:
+    """A unit of work for the engine thread."""
+
+    def __init__(self, action, args=(), cancel_event=None):
+        self.action = action
+        self.args = args
+        self.cancel_event = cancel_event
+        self.done = threading.Event()
+        self.error = None
+
+
+class FallbackTTSEngine:
+    """Owns a single pyttsx3 engine and feeds it from a command queue."""
+
+    def __init__(self, driver_name=None, rate=TTS_RATE, voice_index=TTS_VOICE_INDEX,
+                 init_fn=pyttsx3.init):
+        """
+        Args:
+            driver_name (str, optional): The pyttsx3 driver; auto-selected if None.
+            rate (int): Speaking rate in words per minute.
+            voice_index (int): Index into the driver's voice list.
+            init_fn (callable): Builds the engine; replaceable for testing.
+        """
+        self.driver_name = driver_name or TTS_FALLBACK_DRIVER or default_driver()
+        self.rate = rate
+        self.voice_index = voice_index
+        self._init_fn = init_fn
+        self._commands = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._engine = None
+        self._current = None
+
+    def say(self, text, cancel_event=None, timeout=None):
+        """
+        Speaks text and blocks until it has been spoken.
+
+        Args:
+            text (str): The text to speak.
+            cancel_event (threading.Event, optional): Stops speech when set.
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            bool: True if the text was spoken without error.
+        """
+        return self._submit(_Command('say', (text,), cancel_event), timeout)
+
+    def set_property(self, name, value, timeout=None):
+        """
+        Sets an engine property such as 'rate', 'volume' or 'voice'.
+
+        Args:
+            name (str): The property name.
+            value: The property value.
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            bool: True if the property was applied.
+        """
+        return self._submit(_Command('set', (name, value)), timeout)
+
+    def shutdown(self, timeout=None):
+        """Stops the engine thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._commands.put(None)
+            thread.join(timeout)
+
+    def _submit(self, command, timeout):
+        self._ensure_started()
+        self._commands.put(command)
+        if not command.done.wait(timeout):
+            return False
+        if command.error is not None:
+            print(f"Fallback TTS Error: {command.error}")
+            return False
+        return True
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="fallback-tts",
+                                                daemon=True)
+                self._thread.start()
+
+    def _start_engine(self):
+        engine = self._init_fn(self.driver_name)
+        voices = engine.getProperty('voices')
+        if voices:
+            engine.setProperty('voice', voices[min(self.voice_index, len(voices) - 1)].id)
+        engine.setProperty('rate', self.rate)
+        engine.connect('started-word', self._on_word)
+        return engine
+
+    def _on_word(self, name, location, length):
+        """Stops the utterance at the next word once it has been cancelled."""
+        command = self._current
+        if command is not None and command.cancel_event is not None \
+                and command.cancel_event.is_set():
+            self._engine.stop()
+
+    def _run(self):
+        while True:
+            command = self._commands.get()
+            if command is None:
+                break
+            if self._engine is None:
+                # Started on first use, and again on the next command if that
+                # failed (e.g. the audio device was not ready yet)
+                try:
+                    self._engine = self._start_engine()
+                except Exception as e:
+                    command.error = e
+                    command.done.set()
+                    continue
+            try:
+                if command.action == 'say':
+                    if command.cancel_event is None or not command.cancel_event.is_set():
+                        self._current = command
+                        self._engine.say(command.args[0])
+                        self._engine.runAndWait()
+                elif command.action == 'set':
+                    self._engine.setProperty(*command.args)
+            except Exception as e:
+                command.error = e
+            finally:
+                self._current = None
+                command.done.set()
+
+
+_fallback_engine = None
+_fallback_engine_lock = threading.Lock()
+
+
+def get_fallback_engine():
+    """Returns the process-wide fallback TTS engine."""
+    global _fallback_engine
+    with _fallback_engine_lock:
+        if _fallback_engine is None:
+            _fallback_engine = FallbackTTSEngine()
+        return _fallback_engine
@@ -6,34 +6,50 @@ This module contains the core features of the Vishwakarma AI assistant.
 """
 
 import os
-import sqlite3
-import subprocess
 import time
 import webbrowser
-from pipes import quote
 from datetime import datetime
 
 import eel
-import pyautogui
 import pywhatkit as kit
-from openai import OpenAI
 from playsound import playsound
 
-from engine.command import speak
-from engine.config import ASSISTANT_NAME, NVIDIA_API_KEY, NVIDIA_MODEL
-from engine.helper import (adbInput, extract_yt_term, goback, keyEvent,
-                           remove_words, replace_spaces_with_percent_s,
-                           tapEvents)
-
-# Database connection
-try:
-    con = sqlite3.connect("vishwakarma.db")
-    cursor = con.cursor()
-except sqlite3.Error as e:
-    print(f"Database connection error: {e}")
-    # Handle the error gracefully, maybe by disabling database-dependent features
-    con = None
-    cursor = None
+from engine.chat_stream import consume_chat_stream
+from engine.command import speak, takecommand
+from engine.config import (ASSISTANT_NAME, CHATBOT_STREAMING,
+                           CHATBOT_SYSTEM_PROMPT, NVIDIA_API_KEY,
+                           NVIDIA_BASE_URL, NVIDIA_MODEL)
+from engine.adb import AdbError, format_timings, get_adb_shell
+from engine.android_messaging import (SENT, UNKNOWN, SmsUnconfirmedError, create_sms_sender,
+                                      place_call)
+from engine.app_index import get_app_index
+from engine.command_catalog import get_command_catalog
+from engine.contact_import import normalize_phone
+from engine.contact_index import get_contact_index
+from engine.conversation import get_active_user, get_conversation
+from engine.database import get_database
+from engine.helper import extract_yt_term, remove_words
+from engine.http_pool import get_llm_client
+from engine.response_cache import get_response_cache
+from engine.whatsapp import (WhatsAppBroadcast, WhatsAppError, WhatsAppUnconfirmedError,
+                             get_whatsapp_session)
+
+# Canned answers used when the chatbot API is unavailable. Callables are
+# evaluated at answer time; plain strings are pre-rendered by the TTS cache.
+FALLBACK_RESPONSES = {
+    'hello': "Hello! How can I assist you today?",
+    'hi': "Hello! How can I assist you today?",
+    'hey': "Hello! How can I assist you today?",
+    'how are you': "I'm functioning well, thank you for asking! How can I help you?",
+    'your name': "I am Vishwakarma AI, your intelligent voice assistant.",
+    'who are you': "I am Vishwakarma AI, your intelligent voice assistant.",
+    'time': lambda: f"The current time is {datetime.now().strftime('%I:%M %p')}",
+    'date': lambda: f"Today is {datetime.now().strftime('%B %d, %Y')}",
+    'thank': "You're welcome! Happy to help.",
+    'bye': "Goodbye! Have a great day!",
+    'goodbye': "Goodbye! Have a great day!"
+}
+FALLBACK_DEFAULT_RESPONSE = "I understand. How else can I assist you?"
 
 @eel.expose
 def playAssistantSound():
@@ -51,42 +67,62 @@ def openCommand(query):
     Args:
         query (str): The user's command.
     """
-    app_name = query.replace(ASSISTANT_NAME, "").replace("open", "").strip().lower()
+    app_name = remove_words(query, [ASSISTANT_NAME, "open"]).strip().lower()
 
     if not app_name:
         speak("Please specify what to open.")
         return
 
-    if not cursor:
-        speak("Database not connected. Cannot open commands.")
-        return
-
     try:
-        # Check for system commands
-        cursor.execute('SELECT path FROM sys_command WHERE LOWER(name) = ?', (app_name,))
-        sys_results = cursor.fetchall()
-        if sys_results:
+        command = get_command_catalog(get_database()).lookup(app_name)
+        if command is not None:
             speak(f"Opening {app_name}")
-            os.startfile(sys_results[0][0])
+            if command.kind == 'web':
+                webbrowser.open(command.target)
+            else:
+                os.startfile(command.target)
             return
 
-        # Check for web commands
-        cursor.execute('SELECT url FROM web_command WHERE LOWER(name) = ?', (app_name,))
-        web_results = cursor.fetchall()
-        if web_results:
+        app_index = get_app_index()
+        if app_index is None:
+            # Fallback to system command
             speak(f"Opening {app_name}")
-            webbrowser.open(web_results[0][0])
+            os.system(f'start {app_name}')
             return
 
-        # Fallback to system command
-        speak(f"Opening {app_name}")
-        os.system(f'start {app_name}')
+        app = app_index.lookup(app_name)
+        if app is None:
+            speak(f"Sorry, I couldn't find {app_name} on this computer.")
+            return
+        speak(f"Opening {app.name}")
+        app_index.launch(app)
 
     except Exception as e:
         print(f"Error in openCommand: {e}")
         speak(f"Sorry, I couldn't open {app_name}. Application not found.")
 
 
+def app_available(name):
+    """
+    Checks, without speaking, whether openCommand() knows what to open.
+
+    Args:
+        name (str): The application or website, as heard or typed.
+
+    Returns:
+        bool: True if the name is in the command catalog or the app index.
+              Without an app index, short names are assumed to be apps.
+    """
+    name = name.strip().lower()
+    if get_command_catalog(get_database()).lookup(name) is not None:
+        return True
+    app_index = get_app_index()
+    if app_index is None:
+        # openCommand() hands the name to the shell; a sentence is no app name
+        return 0 < len(name.split()) <= 2
+    return app_index.lookup(name) is not None
+
+
 def PlayYoutube(query):
     """
     Plays a YouTube video based on the query.
@@ -99,6 +135,68 @@ def PlayYoutube(query):
     kit.playonyt(search_term)
 
 
+def resolve_contact(name, confirm=None):
+    """
+    Looks a contact up by name.
+
+    Only a single contact matching every word as spelled is taken as is.
+    A fuzzy or phonetic match, or a tie between the best matches, goes
+    through confirm, and without it counts as no match.
+
+    Args:
+        name (str): The contact's name, as heard or typed.
+        confirm (callable, optional): Called with the candidate
+            ContactMatch objects (two or more on a tie); returns the one
+            the user picked, or None.
+
+    Returns:
+        tuple: The mobile number and the contact's stored name, or
+               (None, None) if there is no match.
+    """
+    matches = get_contact_index(get_database()).search(name, limit=3)
+    if not matches:
+        return None, None
+    best = matches[0]
+    tied = [match for match in matches if match.score >= best.score]
+    if len(tied) > 1 or not best.exact:
+        best = confirm(tied) if confirm is not None else None
+        if best is None:
+            return None, None
+    # Imported numbers are stored normalized; older rows may not be
+    return normalize_phone(best.mobile_no) or str(best.mobile_no), best.name
+
+
+def contact_known(name):
+    """Checks, without speaking, whether a name matches any contact, even loosely."""
+    return bool(get_contact_index(get_database()).search(name, limit=1))
+
+
+def confirm_contact(candidates):
+    """
+    Asks the user which of the candidate contacts they meant.
+
+    Args:
+        candidates (list): ContactMatch objects, best first.
+
+    Returns:
+        ContactMatch: The confirmed contact, or None.
+    """
+    if len(candidates) == 1:
+        speak(f"Did you mean {candidates[0].name}?").wait()
+        answer = takecommand().split()
+        if any(word in answer for word in ('yes', 'yeah', 'haan', 'correct')):
+            return candidates[0]
+        return None
+
+    names = [match.name for match in candidates]
+    speak(f"Did you mean {', '.join(names[:-1])} or {names[-1]}?").wait()
+    answer = takecommand()
+    for match in candidates:
+        if match.name.lower() in answer:
+            return match
+    return None
+
+
 def findContact(query):
     """
     Finds a contact in the database.
@@ -113,22 +211,13 @@ def findContact(query):
     words_to_remove = [ASSISTANT_NAME, 'make', 'a', 'to', 'phone', 'call', 'send', 'message', 'whatsapp', 'video']
     contact_name = remove_words(query, words_to_remove).strip().lower()
 
-    if not cursor:
-        speak("Database not connected. Cannot find contacts.")
-        return None, None
-
     try:
-        cursor.execute("SELECT mobile_no FROM contacts WHERE LOWER(name) LIKE ?", (f'%{contact_name}%',))
-        results = cursor.fetchall()
+        mobile_number_str, _ = resolve_contact(contact_name, confirm=confirm_contact)
 
-        if not results:
+        if not mobile_number_str:
             speak('Contact not found in your list.')
             return None, None
 
-        mobile_number_str = str(results[0][0])
-        if not mobile_number_str.startswith('+91'):
-            mobile_number_str = f'+91{mobile_number_str}'
-
         return mobile_number_str, contact_name
     except Exception as e:
         print(f"Error finding contact: {e}")
@@ -146,37 +235,65 @@ def whatsApp(mobile_no, message, flag, name):
         flag (str): The action to perform ('message', 'call', or 'video_call').
         name (str): The name of the contact.
     """
-    actions = {
-        'message': {'tab': 12, 'message': f"Message sent successfully to {name}"},
-        'call': {'tab': 7, 'message': f"Calling {name}"},
-        'video_call': {'tab': 6, 'message': f"Starting video call with {name}"}
+    confirmations = {
+        'message': f"Message sent successfully to {name}",
+        'call': f"Calling {name}",
+        'video_call': f"Starting video call with {name}"
     }
-
-    action = actions.get(flag)
-    if not action:
+    if flag not in confirmations:
         speak("Invalid WhatsApp action.")
         return
 
-    encoded_message = quote(message if flag == 'message' else "")
-    whatsapp_url = f"whatsapp://send?phone={mobile_no}&text={encoded_message}"
-    full_command = f'start "" "{whatsapp_url}"'
-
+    session = get_whatsapp_session()
     try:
-        subprocess.run(full_command, shell=True, check=True)
-        time.sleep(5)
-        pyautogui.hotkey('ctrl', 'f')
-        for _ in range(action['tab']):
-            pyautogui.hotkey('tab')
-        pyautogui.hotkey('enter')
-        speak(action['message'])
-    except subprocess.CalledProcessError as e:
-        print(f"Error opening WhatsApp: {e}")
+        with session.record() as steps:
+            if flag == 'message':
+                session.send_message(mobile_no, message)
+            else:
+                session.call(mobile_no, video=flag == 'video_call')
+        print(f"whatsApp timings:\n{format_timings(steps)}")
+        speak(confirmations[flag])
+    except WhatsAppUnconfirmedError as e:
+        print(f"Error using WhatsApp: {e}")
+        speak(f"I pressed send, but could not confirm the message reached {name}. Please check WhatsApp.")
+    except WhatsAppError as e:
+        print(f"Error using WhatsApp: {e}")
         speak("Failed to open WhatsApp.")
     except Exception as e:
         print(f"An unexpected error occurred in whatsApp: {e}")
         speak("An unexpected error occurred.")
 
 
+def whatsAppBulk(recipients, template, progress=None):
+    """
+    Sends one WhatsApp message, filled in per recipient, to several contacts.
+
+    A name is only sent to when it matches one contact exactly; misheard
+    or ambiguous names fail instead of messaging a lookalike contact.
+
+    Args:
+        recipients (list): Contact names, or dicts with a 'name', an
+            optional 'number' and extra template fields.
+        template (str): The message, e.g. "Hi {first_name}, we start at 5pm".
+        progress (callable): Called with a WhatsAppStatus on every change.
+
+    Returns:
+        list: A WhatsAppStatus per recipient.
+    """
+    start = time.perf_counter()
+    broadcast = WhatsAppBroadcast(get_whatsapp_session(), resolve_contact)
+    statuses = broadcast.send(recipients, template, progress)
+    sent = sum(status.state == SENT for status in statuses)
+    print(f"whatsAppBulk: {sent} of {len(statuses)} sent in {time.perf_counter() - start:.1f}s")
+    for status in statuses:
+        if status.error:
+            print(f"  {status.recipient}: {status.error}")
+    unknown = sum(status.state == UNKNOWN for status in statuses)
+    speak(f"Sent {sent} of {len(statuses)} WhatsApp messages"
+          + (f", {unknown} could not be confirmed" if unknown else ""))
+    return statuses
+
+
 def chatBot(query):
     """
     AI chatbot using NVIDIA API with comprehensive error handling.
@@ -196,32 +313,55 @@ def chatBot(query):
         print("NVIDIA API key not configured. Using fallback chatbot.")
         return fallback_chatbot(user_input)
 
+    memory = get_conversation()
+    cache = get_response_cache()
+    user_id = get_active_user()
+    cached = cache.get(user_input, user_id) if cache is not None else None
+    if cached is not None:
+        stats = cache.stats()
+        print(f"Cached response: {cached} (hit rate {stats['hit_rate']:.0%}, "
+              f"{stats['latency_saved']:.1f}s saved, {stats['memory_bytes'] // 1024} KB)")
+        speak(cached)
+        if memory is not None:
+            memory.add_exchange(user_input, cached)
+        return cached
+
+    if memory is not None:
+        messages = memory.build_messages(CHATBOT_SYSTEM_PROMPT, user_input)
+    else:
+        messages = [
+            {"role": "system", "content": CHATBOT_SYSTEM_PROMPT},
+            {"role": "user", "content": user_input}
+        ]
+    spoken = []
+
     try:
-        client = OpenAI(
-            base_url="https://integrate.api.nvidia.com/v1",
-            api_key=NVIDIA_API_KEY
-        )
+        client = get_llm_client(NVIDIA_BASE_URL, NVIDIA_API_KEY)
 
         print(f"Sending to NVIDIA AI: {user_input}")
+        start = time.perf_counter()
 
         completion = client.chat.completions.create(
             model=NVIDIA_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are Vishwakarma AI, an intelligent voice assistant. Keep responses brief and conversational."
-                },
-                {"role": "user", "content": user_input}
-            ],
+            messages=messages,
             temperature=0.7,
             top_p=0.9,
             max_tokens=200,
-            stream=False
+            stream=CHATBOT_STREAMING
         )
 
-        response = completion.choices[0].message.content
-        print(f"NVIDIA AI response: {response}")
-        speak(response)
+        if not CHATBOT_STREAMING:
+            response = completion.choices[0].message.content
+            print(f"NVIDIA AI response: {response}")
+            speak(response)
+        else:
+            response = stream_chat_reply(completion, spoken)
+            print(f"NVIDIA AI response: {response}")
+
+        if cache is not None:
+            cache.put(user_input, response, latency=time.perf_counter() - start, user_id=user_id)
+        if memory is not None and response:
+            memory.add_exchange(user_input, response)
         return response
 
     except Exception as e:
@@ -235,9 +375,42 @@ def chatBot(query):
         else:
             print(f"NVIDIA API error: {e}")
 
+        if spoken:
+            # Part of the reply was already spoken; don't talk over it
+            response = ' '.join(spoken)
+            if memory is not None:
+                memory.add_exchange(user_input, response)
+            return response
         return fallback_chatbot(user_input)
 
 
+def stream_chat_reply(completion, spoken):
+    """
+    Speaks a streamed chatbot reply sentence by sentence.
+
+    Each finished sentence is queued for speech while later tokens are
+    still arriving, and the chat bubble is updated with the partial text.
+
+    Args:
+        completion: The streamed chat completion.
+        spoken (list): Collects the sentences queued for speech.
+
+    Returns:
+        str: The full response text.
+    """
+    message_id = f"reply-{time.monotonic_ns()}"
+
+    def on_sentence(sentence):
+        spoken.append(sentence)
+        eel.DisplayMessage(sentence)
+        speak(sentence, display=False)
+
+    def on_partial(text):
+        eel.receiverText(text, message_id)
+
+    return consume_chat_stream(completion, on_sentence, on_partial)
+
+
 def fallback_chatbot(query):
     """
     Fallback responses when the API is unavailable.
@@ -249,31 +422,18 @@ def fallback_chatbot(query):
         str: The fallback response.
     """
     query = query.lower()
-    
-    responses = {
-        'hello': "Hello! How can I assist you today?",
-        'hi': "Hello! How can I assist you today?",
-        'hey': "Hello! How can I assist you today?",
-        'how are you': "I'm functioning well, thank you for asking! How can I help you?",
-        'your name': "I am Vishwakarma AI, your intelligent voice assistant.",
-        'who are you': "I am Vishwakarma AI, your intelligent voice assistant.",
-        'time': f"The current time is {datetime.now().strftime('%I:%M %p')}",
-        'date': f"Today is {datetime.now().strftime('%B %d, %Y')}",
-        'thank': "You're welcome! Happy to help.",
-        'bye': "Goodbye! Have a great day!",
-        'goodbye': "Goodbye! Have a great day!"
-    }
 
-    for keyword, response in responses.items():
+    for keyword, response in FALLBACK_RESPONSES.items():
         if keyword in query:
+            if callable(response):
+                response = response()
             print(f"Fallback response: {response}")
             speak(response)
             return response
 
-    default_response = "I understand. How else can I assist you?"
-    print(f"Fallback response: {default_response}")
-    speak(default_response)
-    return default_response
+    print(f"Fallback response: {FALLBACK_DEFAULT_RESPONSE}")
+    speak(FALLBACK_DEFAULT_RESPONSE)
+    return FALLBACK_DEFAULT_RESPONSE
 
 
 def makeCall(name, mobileNo):
@@ -284,10 +444,12 @@ def makeCall(name, mobileNo):
         name (str): The name of the person to call.
         mobileNo (str): The mobile number to call.
     """
-    mobileNo_clean = mobileNo.replace(" ", "")
     speak(f"Calling {name}")
-    command = f'adb shell am start -a android.intent.action.CALL -d tel:{mobileNo_clean}'
-    os.system(command)
+    try:
+        place_call(mobileNo)
+    except (AdbError, ValueError) as e:
+        print(f"Error placing call via ADB: {e}")
+        speak("Failed to place the call.")
 
 
 def sendMessage(message, mobileNo, name):
@@ -299,29 +461,17 @@ def sendMessage(message, mobileNo, name):
         mobileNo (str): The recipient's mobile number.
         name (str): The recipient's name.
     """
-    message_formatted = replace_spaces_with_percent_s(message)
-    mobileNo_formatted = replace_spaces_with_percent_s(mobileNo)
     speak("Sending message")
 
+    adb = get_adb_shell()
     try:
-        goback(4)
-        time.sleep(1)
-        keyEvent(3)
-        # Open SMS app
-        tapEvents(136, 2220)
-        # Start chat
-        tapEvents(819, 2192)
-        # Search mobile no
-        adbInput(mobileNo_formatted)
-        # Tap on name
-        tapEvents(601, 574)
-        # Tap on input
-        tapEvents(390, 2270)
-        # Message
-        adbInput(message_formatted)
-        # Send
-        tapEvents(957, 1397)
+        with adb.record() as steps:
+            create_sms_sender(adb).send(mobileNo, message)
+        print(f"sendMessage timings:\n{format_timings(steps)}")
         speak(f"Message sent successfully to {name}")
+    except SmsUnconfirmedError as e:
+        print(f"Error sending message via ADB: {e}")
+        speak(f"I tapped send, but could not confirm the message reached {name}. Please check your phone.")
     except Exception as e:
         print(f"Error sending message via ADB: {e}")
         speak("Failed to send the message.")
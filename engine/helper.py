@@ -4,10 +4,9 @@ Vishwakarma AI - Helper Utilities Module
 
 This module provides helper functions for various tasks.
 """
-import os
 import re
-import time
-import subprocess
+
+from engine.adb import KEYCODE_BACK, AdbError, get_adb_shell, input_text_command
 
 def extract_yt_term(command):
     """
@@ -39,20 +38,25 @@ def remove_words(input_string, words_to_remove):
     return ' '.join(filtered_words)
 
 
-def run_adb_command(command):
+def run_adb_command(command, batch=False):
     """
-    Executes an ADB command and handles potential errors.
+    Runs commands on the connected Android device through the shared
+    `adb shell` session and handles potential errors.
 
     Args:
-        command (str): The ADB command to execute.
+        command (str or list): The device shell command, e.g.
+            "input keyevent 3", or a list of commands to pipeline.
+        batch (bool): Whether `command` is a list.
+
+    Returns:
+        AdbResult or list: The result(s), or None if ADB failed.
     """
     try:
-        subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
-        time.sleep(1)
-    except subprocess.CalledProcessError as e:
-        print(f"ADB command failed: {e.stderr}")
-    except FileNotFoundError:
-        print("ADB not found. Please ensure it's installed and in your system's PATH.")
+        shell = get_adb_shell()
+        return shell.run_batch(command, check=True) if batch else shell.run(command, check=True)
+    except AdbError as e:
+        print(f"ADB command failed: {e}")
+        return None
 
 
 def keyEvent(key_code):
@@ -62,7 +66,7 @@ def keyEvent(key_code):
     Args:
         key_code (int): The key code to send.
     """
-    run_adb_command(f'adb shell input keyevent {key_code}')
+    run_adb_command(f'input keyevent {key_code}')
 
 
 def tapEvents(x, y):
@@ -73,7 +77,7 @@ def tapEvents(x, y):
         x (int): The x-coordinate.
         y (int): The y-coordinate.
     """
-    run_adb_command(f'adb shell input tap {x} {y}')
+    run_adb_command(f'input tap {x} {y}')
 
 
 def adbInput(message):
@@ -83,8 +87,7 @@ def adbInput(message):
     Args:
         message (str): The text to send.
     """
-    escaped_message = message.replace('"', '\\"')
-    run_adb_command(f'adb shell input text "{escaped_message}"')
+    run_adb_command(input_text_command(message))
 
 
 def goback(times=6):
@@ -94,8 +97,8 @@ def goback(times=6):
     Args:
         times (int): The number of times to press the back button.
     """
-    for _ in range(times):
-        keyEvent(4)  # Key code for the back button is 4
+    # Key code for the back button is 4; all presses go in one batch
+    run_adb_command([f'input keyevent {KEYCODE_BACK}'] * times, batch=True)
 
 
 def replace_spaces_with_percent_s(input_string):
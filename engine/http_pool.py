@@ -0,0 +1,220 @@
+"""
+Vishwakarma AI - HTTP Connection Management
+© 2025 Vishwakarma Industries
+
+This module owns the long-lived HTTP connections used by the engine: one
+pooled keep-alive session for REST calls (ElevenLabs) and one cached LLM
+client per base URL and API key (NVIDIA). Reusing them avoids paying TCP
+and TLS setup on every turn, and the reuse is counted per host.
+"""
+import importlib.util
+import threading
+
+import requests
+from openai import DefaultHttpxClient, OpenAI
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from engine.config import (HTTP2_ENABLED, HTTP_CONNECT_TIMEOUT,
+                           HTTP_KEEPALIVE_EXPIRY, HTTP_MAX_RETRIES,
+                           HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE,
+                           HTTP_READ_TIMEOUT, LLM_TIMEOUT)
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class ConnectionStats:
+    """Counts requests and connection reuse per host."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def record(self, host, reused):
+        """
+        Records one request.
+
+        Args:
+            host (str): The host the request went to.
+            reused (bool): Whether it ran on an already open connection.
+        """
+        with self._lock:
+            counts = self._hosts.setdefault(host, {'requests': 0, 'new_connections': 0,
+                                                   'reused': 0})
+            counts['requests'] += 1
+            counts['reused' if reused else 'new_connections'] += 1
+
+    def snapshot(self):
+        """
+        Returns the counters collected so far.
+
+        Returns:
+            dict: Per host: requests, new_connections, reused and reuse_rate.
+        """
+        with self._lock:
+            return {
+                host: dict(counts, reuse_rate=counts['reused'] / counts['requests'])
+                for host, counts in self._hosts.items()
+            }
+
+    def reset(self):
+        """Clears all counters."""
+        with self._lock:
+            self._hosts.clear()
+
+
+connection_stats = ConnectionStats()
+
+
+class _CountingPoolMixin:
+    """Marks each urllib3 response with whether its connection was reused."""
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn.vk_request_count = 0
+        return conn
+
+    def _make_request(self, conn, *args, **kwargs):
+        reused = getattr(conn, 'vk_request_count', 0) > 0
+        conn.vk_request_count = getattr(conn, 'vk_request_count', 0) + 1
+        response = super()._make_request(conn, *args, **kwargs)
+        response.connection_reused = reused
+        connection_stats.record(self.host, reused)
+        return response
+
+
+class CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """An HTTPAdapter whose connection pools record reuse statistics."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CountingHTTPConnectionPool,
+            'https': CountingHTTPSConnectionPool,
+        }
+
+
+def create_http_session(pool_connections=HTTP_POOL_CONNECTIONS,
+                        pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=HTTP_MAX_RETRIES):
+    """
+    Builds a keep-alive session with bounded connection pools.
+
+    Args:
+        pool_connections (int): Number of hosts to keep pools for.
+        pool_maxsize (int): Connections kept open per host.
+        max_retries (int): Retries for failed connects (not for responses).
+
+    Returns:
+        requests.Session: The session.
+    """
+    session = requests.Session()
+    adapter = PooledHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                max_retries=Retry(connect=max_retries, read=0,
+                                                  status=0, backoff_factor=0.2))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """Returns the process-wide pooled HTTP session."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_http_session()
+        return _session
+
+
+def http_timeout():
+    """Returns the (connect, read) timeout used with the shared session."""
+    return (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+
+def http2_available():
+    """Whether HTTP/2 is enabled and the h2 package is installed."""
+    return HTTP2_ENABLED and importlib.util.find_spec('h2') is not None
+
+
+def _record_httpx_response(response):
+    """httpx response hook: counts reuse by the underlying network stream."""
+    stream = response.extensions.get('network_stream')
+    host = response.request.url.host
+    if stream is None:
+        connection_stats.record(host, False)
+        return
+    # Marked on the stream itself, like the urllib3 connections above, so a
+    # closed stream takes its count with it and a new one is never mistaken
+    # for it
+    with _llm_lock:
+        count = getattr(stream, 'vk_request_count', 0)
+        try:
+            stream.vk_request_count = count + 1
+        except AttributeError:
+            count = 0
+    connection_stats.record(host, count > 0)
+
+
+_llm_clients = {}
+_llm_lock = threading.Lock()
+
+
+def get_llm_client(base_url, api_key):
+    """
+    Returns the cached OpenAI-compatible client for a base URL and key.
+
+    The client keeps its connections alive between turns and negotiates
+    HTTP/2 when the h2 package is installed.
+
+    Args:
+        base_url (str): The API base URL.
+        api_key (str): The API key.
+
+    Returns:
+        OpenAI: The client.
+    """
+    key = (base_url, api_key)
+    with _llm_lock:
+        client = _llm_clients.get(key)
+    if client is not None:
+        return client
+
+    options = {
+        'http2': http2_available(),
+        'timeout': LLM_TIMEOUT,
+        'event_hooks': {'response': [_record_httpx_response]},
+    }
+    if httpx is not None:
+        options['limits'] = httpx.Limits(max_connections=HTTP_POOL_MAXSIZE,
+                                         max_keepalive_connections=HTTP_POOL_MAXSIZE,
+                                         keepalive_expiry=HTTP_KEEPALIVE_EXPIRY)
+    client = OpenAI(base_url=base_url, api_key=api_key,
+                    http_client=DefaultHttpxClient(**options))
+
+    with _llm_lock:
+        return _llm_clients.setdefault(key, client)
+
+
+def get_connection_stats():
+    """
+    Returns connection reuse counters for all pooled HTTP traffic.
+
+    Returns:
+        dict: Per host: requests, new_connections, reused and reuse_rate.
+    """
+    return connection_stats.snapshot()
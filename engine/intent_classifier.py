@@ -0,0 +1,331 @@
+"""
+Vishwakarma AI - Local Intent Classifier
+© 2025 Vishwakarma Industries
+
+This module recognizes paraphrased commands ("launch chrome", "ring mom on
+whatsapp") on the CPU, so they are executed directly instead of being sent
+to the chatbot. It is a TF-IDF character n-gram model with a softmax linear
+layer, written in plain Python and stored as JSON. No trained model ships:
+the model is loaded on first use, and until one is trained every command
+the intent patterns miss goes to the chatbot as before.
+
+Usage:
+    python -m engine.intent_classifier train data.jsonl [--model PATH]
+    python -m engine.intent_classifier eval data.jsonl [--model PATH]
+
+Each JSONL line holds {"text": ..., "intent": ...}; utterances that are not
+commands use the intent "chat".
+"""
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter
+
+from engine.config import (INTENT_CLASSIFIER_ENABLED, INTENT_CONFIDENCE_THRESHOLD,
+                           INTENT_MODEL_PATH)
+from engine.intents import INTENTS, IntentMatch, normalize_command
+
+CHAT_LABEL = 'chat'
+
+
+def text_features(text, sizes=(2, 3, 4)):
+    """
+    Extracts character n-grams within words, plus the words themselves.
+
+    Args:
+        text (str): A normalized query.
+        sizes (tuple): The n-gram lengths.
+
+    Returns:
+        Counter: Feature counts.
+    """
+    features = Counter()
+    for word in text.split():
+        features['w:' + word] += 1
+        padded = f' {word} '
+        for n in sizes:
+            for i in range(len(padded) - n + 1):
+                features[padded[i:i + n]] += 1
+    return features
+
+
+def softmax(scores):
+    """Turns raw scores into probabilities."""
+    top = max(scores)
+    exps = [math.exp(score - top) for score in scores]
+    total = sum(exps)
+    return [e / total for e in exps]
+
+
+class IntentClassifier:
+    """A multinomial logistic regression over TF-IDF n-gram features."""
+
+    def __init__(self, labels=(), idf=None, weights=None, bias=None):
+        self.labels = list(labels)
+        self.idf = idf or {}
+        self.weights = weights or {}  # feature -> per-label weights
+        self.bias = bias or [0.0] * len(self.labels)
+
+    def vectorize(self, text):
+        """
+        Builds the L2-normalized TF-IDF vector of a query.
+
+        Args:
+            text (str): A normalized query.
+
+        Returns:
+            dict: feature -> weight, for features seen in training.
+        """
+        vector = {feature: (1 + math.log(count)) * self.idf[feature]
+                  for feature, count in text_features(text).items() if feature in self.idf}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {feature: v / norm for feature, v in vector.items()}
+
+    def _scores(self, vector):
+        scores = list(self.bias)
+        for feature, value in vector.items():
+            row = self.weights.get(feature)
+            if row is not None:
+                for k, weight in enumerate(row):
+                    scores[k] += weight * value
+        return scores
+
+    def fit(self, texts, labels, epochs=12, learning_rate=0.5, l2=1e-5, seed=7):
+        """
+        Trains on normalized texts with stochastic gradient descent.
+
+        Args:
+            texts (list): Normalized queries.
+            labels (list): Their intent names.
+            epochs (int): Passes over the data.
+            learning_rate (float): Initial step size (decays per epoch).
+            l2 (float): Weight decay.
+            seed (int): Shuffle seed.
+
+        Returns:
+            IntentClassifier: self
+        """
+        self.labels = sorted(set(labels))
+        index = {label: k for k, label in enumerate(self.labels)}
+
+        document_frequency = Counter()
+        for text in texts:
+            document_frequency.update(set(text_features(text)))
+        self.idf = {feature: math.log((1 + len(texts)) / (1 + df)) + 1
+                    for feature, df in document_frequency.items()}
+
+        examples = [(self.vectorize(text), index[label]) for text, label in zip(texts, labels)]
+        self.weights = {feature: [0.0] * len(self.labels) for feature in self.idf}
+        self.bias = [0.0] * len(self.labels)
+        rng = random.Random(seed)
+
+        for epoch in range(epochs):
+            rng.shuffle(examples)
+            rate = learning_rate / (1 + epoch)
+            for vector, target in examples:
+                probabilities = softmax(self._scores(vector))
+                probabilities[target] -= 1.0
+                for k, gradient in enumerate(probabilities):
+                    self.bias[k] -= rate * gradient
+                for feature, value in vector.items():
+                    row = self.weights[feature]
+                    for k, gradient in enumerate(probabilities):
+                        row[k] -= rate * (gradient * value + l2 * row[k])
+
+        # Drop features that ended up with no influence
+        self.weights = {feature: [round(w, 5) for w in row]
+                        for feature, row in self.weights.items()
+                        if max(abs(w) for w in row) > 1e-4}
+        self.idf = {feature: round(self.idf[feature], 5) for feature in self.weights}
+        return self
+
+    def predict(self, text):
+        """
+        Classifies a normalized query.
+
+        Args:
+            text (str): A normalized query.
+
+        Returns:
+            tuple: (intent name, probability)
+        """
+        probabilities = softmax(self._scores(self.vectorize(text)))
+        best = max(range(len(self.labels)), key=probabilities.__getitem__)
+        return self.labels[best], probabilities[best]
+
+    def save(self, path):
+        """Writes the model to a JSON file."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'labels': self.labels, 'idf': self.idf, 'weights': self.weights,
+                       'bias': self.bias}, f)
+
+    @classmethod
+    def load(cls, path):
+        """Reads a model written by save()."""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['labels'], data['idf'], data['weights'], data['bias'])
+
+
+def classify_command(query, classifier, threshold=INTENT_CONFIDENCE_THRESHOLD):
+    """
+    Recognizes a command the intent patterns missed.
+
+    Args:
+        query (str): The raw command.
+        classifier (IntentClassifier): A trained model.
+        threshold (float): Minimum probability to act on the prediction.
+
+    Returns:
+        IntentMatch: The intent and its slots, or None if the query looks
+                     like chat, the model is unsure, or no slot was found.
+    """
+    text = normalize_command(query)
+    label, probability = classifier.predict(text)
+    if label == CHAT_LABEL or probability < threshold:
+        return None
+
+    intent = next((i for i in INTENTS if i.name == label), None)
+    if intent is None:
+        return None
+    slots = intent.extract_slots(text)
+    if intent.slot is not None and not slots:
+        return None
+    return IntentMatch(label, slots, probability)
+
+
+def load_dataset(path):
+    """
+    Reads a JSONL dataset.
+
+    Args:
+        path (str): File with one {"text", "intent"} object per line.
+
+    Returns:
+        list: (normalized text, intent) pairs.
+    """
+    examples = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                examples.append((normalize_command(record['text']), record['intent']))
+    return examples
+
+
+def evaluate(classifier, examples, threshold=INTENT_CONFIDENCE_THRESHOLD):
+    """
+    Measures a model on labeled examples.
+
+    Args:
+        classifier (IntentClassifier): The model.
+        examples (list): (normalized text, intent) pairs.
+        threshold (float): The routing confidence threshold.
+
+    Returns:
+        dict: accuracy, per-label precision/recall, and for the threshold:
+              the share of commands routed directly, how often those were
+              right, and the cost per query in microseconds.
+    """
+    true_positive, predicted, actual = Counter(), Counter(), Counter()
+    routed = routed_correct = commands = 0
+    start = time.perf_counter()
+    predictions = [classifier.predict(text) for text, _ in examples]
+    elapsed = time.perf_counter() - start
+
+    for (_, label), (prediction, probability) in zip(examples, predictions):
+        predicted[prediction] += 1
+        actual[label] += 1
+        true_positive[label] += prediction == label
+        commands += label != CHAT_LABEL
+        if prediction != CHAT_LABEL and probability >= threshold:
+            routed += 1
+            routed_correct += prediction == label
+
+    return {
+        'accuracy': sum(true_positive.values()) / max(len(examples), 1),
+        'labels': {label: {'precision': true_positive[label] / predicted[label]
+                           if predicted[label] else 0.0,
+                           'recall': true_positive[label] / actual[label]}
+                   for label in sorted(actual)},
+        'routed': routed / max(commands, 1),
+        'routed_precision': routed_correct / routed if routed else 0.0,
+        'us_per_query': elapsed / max(len(examples), 1) * 1e6,
+    }
+
+
+def print_report(report):
+    """Prints the result of evaluate()."""
+    print(f"accuracy {report['accuracy']:.1%}   {report['us_per_query']:.0f} us/query")
+    print(f"routed directly {report['routed']:.1%} of commands, "
+          f"{report['routed_precision']:.1%} correct")
+    for label, scores in report['labels'].items():
+        print(f"    {label:<14} precision {scores['precision']:6.1%}   "
+              f"recall {scores['recall']:6.1%}")
+
+
+_classifier = None
+_classifier_loaded = False
+_classifier_lock = threading.Lock()
+
+
+def get_intent_classifier():
+    """
+    Returns the trained classifier, loading it on first use.
+
+    Returns:
+        IntentClassifier: The model, or None if disabled or not trained yet.
+    """
+    global _classifier, _classifier_loaded
+    if not INTENT_CLASSIFIER_ENABLED:
+        return None
+    with _classifier_lock:
+        if not _classifier_loaded:
+            # Tried once: a missing model is reported once, not per command
+            _classifier_loaded = True
+            try:
+                _classifier = IntentClassifier.load(INTENT_MODEL_PATH)
+            except FileNotFoundError:
+                print(f"No intent model at {INTENT_MODEL_PATH}. "
+                      "Train one with: python -m engine.intent_classifier train data.jsonl")
+            except (ValueError, KeyError) as e:
+                print(f"Could not load intent model: {e}")
+        return _classifier
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or evaluate the local intent classifier.")
+    parser.add_argument('command', choices=['train', 'eval'])
+    parser.add_argument('dataset', help="JSONL file of {\"text\", \"intent\"} records")
+    parser.add_argument('--model', default=INTENT_MODEL_PATH)
+    parser.add_argument('--holdout', type=float, default=0.2,
+                        help="share of the data held out for evaluation when training")
+    parser.add_argument('--threshold', type=float, default=INTENT_CONFIDENCE_THRESHOLD)
+    args = parser.parse_args()
+
+    examples = load_dataset(args.dataset)
+
+    if args.command == 'train':
+        random.Random(7).shuffle(examples)
+        split = int(len(examples) * (1 - args.holdout))
+        train, test = examples[:split], examples[split:]
+        start = time.perf_counter()
+        classifier = IntentClassifier().fit([t for t, _ in train], [l for _, l in train])
+        print(f"Trained on {len(train)} examples in {time.perf_counter() - start:.1f}s, "
+              f"{len(classifier.weights)} features")
+        classifier.save(args.model)
+        print(f"Saved model to {args.model}")
+        if test:
+            print(f"Held-out evaluation ({len(test)} examples):")
+            print_report(evaluate(classifier, test, args.threshold))
+    else:
+        print_report(evaluate(IntentClassifier.load(args.model), examples, args.threshold))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""
+Vishwakarma AI - Intent Router
+© 2025 Vishwakarma Industries
+
+This module maps a spoken command to an intent and its slots. Intents are
+declared once in INTENTS; their patterns are compiled into a single regular
+expression, so routing is one pass over the query, and words only match on
+word boundaries ("open" no longer fires on "reopen" or "opening hours").
+Patterns that are only a verb followed by free text ("call ...", "text
+...") are loose: they score below INTENT_ROUTER_MIN_SCORE, and the caller
+acts on them only when the slot names a known contact or application.
+"""
+import re
+import threading
+
+from engine.config import ASSISTANT_NAME, INTENT_ROUTER_MIN_SCORE
+
+# Polite lead-ins allowed before any command
+PREFIX = r'(?:(?:please|kindly|can you|could you|would you|will you|hey|ok|okay|and|now)\s+)*'
+# Allowed after any command
+SUFFIX = r'(?:\s+(?:please|for me|now))*'
+FILLER_WORDS = {'please', 'kindly', 'can', 'could', 'would', 'will', 'you', 'hey', 'ok', 'okay',
+                'and', 'now', 'for', 'me', 'i', 'want', 'to', 'go', 'ahead', 'just'}
+
+
+class Intent:
+    """A command the assistant can execute without the chatbot."""
+
+    def __init__(self, name, patterns, description='', slot=None, keywords=(), loose_patterns=()):
+        """
+        Args:
+            name (str): The intent name, e.g. 'open_app'.
+            patterns (list): Regexes over the normalized query. Named groups
+                become slots. Each is anchored to the whole query.
+            description (str): What the intent does.
+            slot (str, optional): The slot filled by extract_slots().
+            keywords (iterable): Words that express the intent rather than
+                the slot value, e.g. 'call' or 'whatsapp'.
+            loose_patterns (list): Like patterns, but too general on their
+                own ("call of duty release date"); their matches score below
+                INTENT_ROUTER_MIN_SCORE.
+        """
+        self.name = name
+        self.patterns = patterns
+        self.loose_patterns = loose_patterns
+        self.description = description
+        self.slot = slot
+        self.keywords = frozenset(keywords)
+
+    def extract_slots(self, text):
+        """
+        Fills the slot of a paraphrased command by trimming intent keywords.
+
+        Used when the command was recognized by the classifier rather than
+        by a pattern, e.g. "ring mom on whatsapp" -> {'contact': 'mom'}.
+
+        Args:
+            text (str): The normalized query.
+
+        Returns:
+            dict: The slot, or {} if nothing is left after the keywords.
+        """
+        if self.slot is None:
+            return {}
+        # Only the edges are trimmed, so "how to make pasta" keeps its "to"
+        words = text.split()
+        while words and (words[0] in self.keywords or words[0] in FILLER_WORDS):
+            words.pop(0)
+        while words and (words[-1] in self.keywords or words[-1] in FILLER_WORDS):
+            words.pop()
+        return {self.slot: ' '.join(words)} if words else {}
+
+
+class IntentMatch:
+    """The result of routing a query."""
+
+    def __init__(self, name, slots, score):
+        self.name = name
+        self.slots = slots
+        self.score = score
+
+    @property
+    def loose(self):
+        """Whether the match should only be acted on if its slot resolves."""
+        return self.score < INTENT_ROUTER_MIN_SCORE
+
+    def __repr__(self):
+        return f"IntentMatch({self.name!r}, {self.slots!r}, score={self.score:.2f})"
+
+
+INTENTS = [
+    Intent('play_youtube', [
+        r'(?:play|search)\s+(?P<term>.+?)\s+on\s+youtube',
+        r'(?:play|search)\s+(?:on\s+)?youtube\s+(?:for\s+)?(?P<term>.+?)',
+    ], "Play a video on YouTube", slot='term',
+        keywords={'play', 'search', 'find', 'show', 'put', 'on', 'youtube', 'video', 'videos',
+                  'some', 'a', 'the', 'of', 'watch'}),
+    Intent('video_call', [
+        r'(?:make|start|place|do)?\s*(?:a\s+)?(?:whatsapp\s+)?video\s+call\s+(?:to\s+|with\s+)?(?P<contact>.+?)',
+        r'video\s+call\s+(?P<contact>.+?)',
+    ], "Start a video call with a contact", slot='contact',
+        keywords={'make', 'start', 'place', 'do', 'a', 'whatsapp', 'video', 'call', 'calling',
+                  'with', 'on', 'facetime', 'up'}),
+    Intent('phone_call', [
+        r'(?:(?:make|place|do)\s+)?(?:a\s+)?(?:phone|voice|whatsapp)\s+call\s+(?:to\s+|with\s+)?(?P<contact>.+?)',
+        r'(?:make|place|do)\s+(?:a\s+)?call\s+(?:to\s+|with\s+)?(?P<contact>.+?)',
+    ], "Call a contact", slot='contact',
+        keywords={'make', 'place', 'do', 'give', 'a', 'phone', 'voice', 'call', 'ring', 'dial',
+                  'up', 'with', 'on', 'whatsapp', 'mobile', 'calling'},
+        loose_patterns=[r'(?:call|phone|ring|dial)\s+(?:up\s+)?(?P<contact>.+?)']),
+    Intent('send_message', [
+        r'send\s+(?:an?\s+)?(?:whatsapp\s+|text\s+|sms\s+)?(?:message|msg|text|sms)\s+to\s+(?P<contact>.+?)',
+    ], "Send a message to a contact", slot='contact',
+        keywords={'send', 'a', 'an', 'whatsapp', 'text', 'sms', 'message', 'msg', 'on', 'drop',
+                  'write', 'shoot', 'quick'},
+        loose_patterns=[r'(?:message|text)\s+(?P<contact>.+?)']),
+    Intent('open_app', [
+        r'(?:open|launch)\s+(?:up\s+)?(?:the\s+)?(?P<app>[\w .+&-]+?)\s+(?:app|application|website)',
+        r'(?:open|launch)\s+(?P<app>[\w-]+(?:\.[\w-]+)+)',
+    ], "Open an application or website", slot='app',
+        keywords={'open', 'launch', 'start', 'run', 'fire', 'up', 'the', 'app', 'application',
+                  'website', 'bring'},
+        loose_patterns=[r'(?:open|launch)\s+(?:up\s+)?(?:the\s+)?(?P<app>[\w .+&-]+?)']),
+]
+
+
+def normalize_command(query, wake_word=ASSISTANT_NAME):
+    """
+    Prepares a query for matching.
+
+    Args:
+        query (str): The raw command.
+        wake_word (str): Removed wherever it appears.
+
+    Returns:
+        str: Lowercase text without the wake word, punctuation or extra spaces.
+    """
+    text = query.lower()
+    if wake_word:
+        text = re.sub(rf'\b{re.escape(wake_word)}\b', ' ', text)
+    text = re.sub(r"[^\w\s'.+&-]", ' ', text)
+    text = re.sub(r'(?<!\w)[.]|[.](?!\w)', ' ', text)
+    return ' '.join(text.split())
+
+
+class IntentRouter:
+    """Matches queries against all intents with one compiled regex."""
+
+    def __init__(self, intents=None):
+        """
+        Args:
+            intents (list): Intent declarations, in priority order.
+                Defaults to INTENTS.
+        """
+        self.intents = intents if intents is not None else INTENTS
+        self._alternatives = {}  # group name -> (intent name, {group: slot}, loose)
+        branches = []
+
+        for i, intent in enumerate(self.intents):
+            patterns = [(pattern, False) for pattern in intent.patterns]
+            patterns += [(pattern, True) for pattern in intent.loose_patterns]
+            for j, (pattern, loose) in enumerate(patterns):
+                branch = f'p{i}_{j}'
+                slots = {}
+
+                def rename(match, branch=branch, slots=slots):
+                    group = f'{branch}_{match.group(1)}'
+                    slots[group] = match.group(1)
+                    return f'(?P<{group}>'
+
+                body = re.sub(r'\(\?P<(\w+)>', rename, pattern)
+                branches.append(f'(?P<{branch}>{body})')
+                self._alternatives[branch] = (intent.name, slots, loose)
+
+        self._regex = re.compile(rf'^{PREFIX}(?:{"|".join(branches)}){SUFFIX}$')
+
+    def route(self, query):
+        """
+        Finds the intent of a query.
+
+        Args:
+            query (str): The raw command.
+
+        Returns:
+            IntentMatch: The intent with its slots and a score in (0, 1],
+                         or None if the query is not a known command.
+                         Loose matches score below INTENT_ROUTER_MIN_SCORE.
+        """
+        text = normalize_command(query)
+        match = self._regex.match(text)
+        if not match:
+            return None
+
+        branch = match.lastgroup
+        name, slot_groups, loose = self._alternatives[branch]
+        slots = {slot: match.group(group) for group, slot in slot_groups.items()
+                 if match.group(group)}
+        if not slots and slot_groups:
+            return None
+
+        # Commands made mostly of free text (long slots) are less certain
+        slot_chars = sum(len(value) for value in slots.values())
+        score = 1.0 - 0.5 * slot_chars / max(len(text), 1)
+        if loose:
+            score *= INTENT_ROUTER_MIN_SCORE
+        return IntentMatch(name, slots, score)
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_intent_router():
+    """Returns the process-wide intent router."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = IntentRouter()
+        return _router
@@ -0,0 +1,434 @@
+"""
+Vishwakarma AI - Continuous Listening Module
+© 2025 Vishwakarma Industries
+
+This module keeps one microphone stream open for the whole session. A
+capture thread fills a ring buffer, and a processing thread splits the audio
+into utterances with voice activity detection (VAD). An optional wake word
+gates what reaches the command queue.
+"""
+import array
+import collections
+import math
+import queue
+import re
+import threading
+import time
+
+import speech_recognition as sr
+
+from engine.config import (LISTENER_FOLLOW_UP_SECONDS, LISTENER_FRAME_MS,
+                           LISTENER_MAX_UTTERANCE_SECONDS,
+                           LISTENER_PRE_ROLL_MS, LISTENER_RESTART_BACKOFF,
+                           LISTENER_RESTART_MAX_BACKOFF, LISTENER_RING_SECONDS,
+                           LISTENER_SAMPLE_RATE, LISTENER_SILENCE_MS,
+                           LISTENER_UTTERANCE_MAX_AGE, VAD_AGGRESSIVENESS,
+                           VAD_MODE)
+
+SAMPLE_WIDTH = 2
+
+
+def frame_rms(frame):
+    """
+    Computes the RMS energy of a frame of 16-bit PCM.
+
+    Args:
+        frame (bytes): The audio frame.
+
+    Returns:
+        float: The root mean square sample value.
+    """
+    samples = array.array('h', frame)
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class EnergyVAD:
+    """Flags frames whose energy rises well above the tracked noise floor."""
+
+    def __init__(self, ratio=3.0, min_energy=300, adapt_rate=0.05):
+        self.ratio = ratio
+        self.min_energy = min_energy
+        self.adapt_rate = adapt_rate
+        self.noise_floor = None
+
+    def is_speech(self, frame):
+        """Classifies one frame, updating the noise floor on silence."""
+        energy = frame_rms(frame)
+        if self.noise_floor is None:
+            self.noise_floor = energy
+        speech = energy > max(self.min_energy, self.noise_floor * self.ratio)
+        if not speech:
+            self.noise_floor += self.adapt_rate * (energy - self.noise_floor)
+        return speech
+
+
+class WebRtcVAD:
+    """Frame classifier backed by the WebRTC VAD (10, 20 or 30 ms frames)."""
+
+    def __init__(self, sample_rate, aggressiveness=VAD_AGGRESSIVENESS):
+        import webrtcvad
+        self.sample_rate = sample_rate
+        self._vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame):
+        """Classifies one frame."""
+        return self._vad.is_speech(frame, self.sample_rate)
+
+
+def make_vad(mode=VAD_MODE, sample_rate=LISTENER_SAMPLE_RATE):
+    """
+    Builds the configured VAD, falling back to energy detection.
+
+    Args:
+        mode (str): 'energy' or 'webrtc'.
+        sample_rate (int): The audio sample rate.
+
+    Returns:
+        EnergyVAD or WebRtcVAD: The detector.
+    """
+    if mode == 'webrtc':
+        try:
+            return WebRtcVAD(sample_rate)
+        except ImportError:
+            print("webrtcvad not installed. Using energy-based VAD.")
+    return EnergyVAD()
+
+
+def strip_wake_word(text, wake_word):
+    """
+    Finds the wake word in a transcript and returns what follows it.
+
+    Args:
+        text (str): The transcript.
+        wake_word (str): The wake word, e.g. ASSISTANT_NAME.
+
+    Returns:
+        str: The command after the wake word ('' if none), or None if the
+             wake word was not spoken.
+    """
+    match = re.search(rf'\b{re.escape(wake_word)}\b', text, re.IGNORECASE)
+    if not match:
+        return None
+    return text[match.end():].strip(' ,.!?')
+
+
+class FrameRingBuffer:
+    """A bounded frame buffer that drops the oldest audio when full."""
+
+    def __init__(self, max_frames):
+        self._frames = collections.deque(maxlen=max_frames)
+        self._condition = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, frame):
+        """Appends a frame without ever blocking the capture thread."""
+        with self._condition:
+            if len(self._frames) == self._frames.maxlen:
+                self.dropped += 1
+            self._frames.append(frame)
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """
+        Removes the oldest frame.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            bytes: The frame, or None on timeout or after close().
+        """
+        with self._condition:
+            if not self._frames and not self._closed:
+                self._condition.wait(timeout)
+            return self._frames.popleft() if self._frames else None
+
+    def close(self):
+        """Wakes up any reader so it can exit."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class UtteranceSegmenter:
+    """Groups VAD-labelled frames into utterances."""
+
+    def __init__(self, vad, frame_ms=LISTENER_FRAME_MS, pre_roll_ms=LISTENER_PRE_ROLL_MS,
+                 silence_ms=LISTENER_SILENCE_MS,
+                 max_seconds=LISTENER_MAX_UTTERANCE_SECONDS, start_frames=3):
+        """
+        Args:
+            vad: An object with is_speech(frame).
+            frame_ms (int): Duration of one frame.
+            pre_roll_ms (int): Audio kept from before speech was detected.
+            silence_ms (int): Trailing silence that ends an utterance.
+            max_seconds (float): Hard limit on utterance length.
+            start_frames (int): Consecutive voiced frames that start one.
+        """
+        self.vad = vad
+        self.start_frames = start_frames
+        self.silence_frames = max(1, silence_ms // frame_ms)
+        self.max_frames = int(max_seconds * 1000 // frame_ms)
+        self._pre_roll = collections.deque(maxlen=pre_roll_ms // frame_ms + start_frames)
+        self._frames = None
+        self._voiced = 0
+        self._silent = 0
+
+    def push(self, frame):
+        """
+        Feeds one frame.
+
+        Args:
+            frame (bytes): The audio frame.
+
+        Returns:
+            bytes: The PCM of a completed utterance, or None.
+        """
+        speech = self.vad.is_speech(frame)
+
+        if self._frames is None:
+            self._pre_roll.append(frame)
+            self._voiced = self._voiced + 1 if speech else 0
+            if self._voiced >= self.start_frames:
+                self._frames = list(self._pre_roll)
+                self._pre_roll.clear()
+                self._silent = 0
+            return None
+
+        self._frames.append(frame)
+        self._silent = 0 if speech else self._silent + 1
+        if self._silent >= self.silence_frames or len(self._frames) >= self.max_frames:
+            data = b''.join(self._frames)
+            self.reset()
+            return data
+        return None
+
+    def reset(self):
+        """Discards any partial utterance."""
+        self._frames = None
+        self._voiced = 0
+        self._silent = 0
+        self._pre_roll.clear()
+
+
+class Utterance:
+    """A segmented utterance waiting to be read."""
+
+    def __init__(self, audio, text=None, captured_at=None):
+        self.audio = audio
+        self.text = text
+        self.captured_at = captured_at if captured_at is not None else time.monotonic()
+
+
+class MicrophoneFrameSource:
+    """Reads fixed-size frames from a single, persistent microphone stream."""
+
+    def __init__(self, sample_rate=LISTENER_SAMPLE_RATE, frame_ms=LISTENER_FRAME_MS,
+                 device_index=None):
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self._microphone = sr.Microphone(device_index=device_index, sample_rate=sample_rate,
+                                         chunk_size=self.frame_samples)
+        self._source = None
+
+    def open(self):
+        """Opens the input device."""
+        self._source = self._microphone.__enter__()
+
+    def read(self):
+        """Returns the next frame of 16-bit mono PCM."""
+        return self._source.stream.read(self.frame_samples)
+
+    def close(self):
+        """Releases the input device."""
+        if self._source is not None:
+            self._microphone.__exit__(None, None, None)
+            self._source = None
+
+
+class ContinuousListener:
+    """
+    Captures audio continuously and queues the utterances meant for us.
+
+    Without a wake word, every utterance is queued. With one, an utterance
+    is only queued if it contains the wake word, while a reader is already
+    waiting (a follow-up prompt), or shortly after the wake word was heard.
+    """
+
+    def __init__(self, source, vad=None, wake_word=None, transcriber=None, on_wake=None,
+                 mute_fn=None, sample_rate=LISTENER_SAMPLE_RATE, frame_ms=LISTENER_FRAME_MS,
+                 ring_seconds=LISTENER_RING_SECONDS,
+                 follow_up_seconds=LISTENER_FOLLOW_UP_SECONDS,
+                 max_age=LISTENER_UTTERANCE_MAX_AGE,
+                 restart_backoff=LISTENER_RESTART_BACKOFF,
+                 max_restart_backoff=LISTENER_RESTART_MAX_BACKOFF, clock=time.monotonic):
+        """
+        Args:
+            source: A frame source with open(), read() and close().
+            vad: A frame classifier; defaults to make_vad().
+            wake_word (str, optional): Gate utterances on this word.
+            transcriber (callable, optional): audio -> text, used for the wake word.
+            on_wake (callable, optional): Called when the wake word is heard.
+            mute_fn (callable, optional): Returns True while input should be
+                ignored, e.g. while the assistant itself is speaking.
+            restart_backoff (float): Seconds to wait before reopening the
+                source after a capture error; doubled on each further failure.
+            max_restart_backoff (float): Upper bound for that wait.
+        """
+        self.source = source
+        self.sample_rate = sample_rate
+        self.wake_word = wake_word
+        self.transcriber = transcriber
+        self.on_wake = on_wake
+        self.mute_fn = mute_fn
+        self.follow_up_seconds = follow_up_seconds
+        self.max_age = max_age
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+        self.utterances = queue.Queue()
+        self.segmenter = UtteranceSegmenter(vad or make_vad(sample_rate=sample_rate),
+                                            frame_ms=frame_ms)
+        self._ring = FrameRingBuffer(ring_seconds * 1000 // frame_ms)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._waiters = 0
+        self._awake_until = 0.0
+        self._running = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Opens the source and starts the capture and processing threads."""
+        if self._running.is_set():
+            return
+        self.source.open()
+        self._stopping.clear()
+        self._running.set()
+        self._threads = [
+            threading.Thread(target=self._capture, name="listener-capture", daemon=True),
+            threading.Thread(target=self._process, name="listener-vad", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=None):
+        """Stops both threads and closes the source."""
+        self._running.clear()
+        self._stopping.set()
+        self._ring.close()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self.source.close()
+
+    def is_running(self):
+        """Returns True between start() and stop()."""
+        return self._running.is_set()
+
+    def next_utterance(self, timeout=None):
+        """
+        Waits for the next queued utterance.
+
+        While a caller is waiting, the wake word is not required, so
+        follow-up answers are accepted directly.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            Utterance: The utterance, or None on timeout.
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._lock:
+            self._waiters += 1
+        try:
+            while True:
+                remaining = None if deadline is None else deadline - self._clock()
+                if remaining is not None and remaining <= 0:
+                    return None
+                try:
+                    utterance = self.utterances.get(timeout=remaining)
+                except queue.Empty:
+                    return None
+                if self._clock() - utterance.captured_at <= self.max_age:
+                    return utterance
+        finally:
+            with self._lock:
+                self._waiters -= 1
+
+    def clear(self):
+        """Drops all queued utterances."""
+        while True:
+            try:
+                self.utterances.get_nowait()
+            except queue.Empty:
+                return
+
+    def _accepting(self):
+        with self._lock:
+            return self._waiters > 0 or self._clock() < self._awake_until
+
+    def _capture(self):
+        backoff = self.restart_backoff
+        while self._running.is_set():
+            try:
+                self._ring.put(self.source.read())
+                backoff = self.restart_backoff
+            except Exception as e:
+                print(f"Audio capture error: {e}")
+                self._restart_source(backoff)
+                backoff = min(backoff * 2, self.max_restart_backoff)
+
+    def _restart_source(self, delay):
+        # A device that was unplugged or grabbed by another app usually
+        # comes back; keep the listener alive instead of going deaf
+        try:
+            self.source.close()
+        except Exception as e:
+            print(f"Audio device close error: {e}")
+        if self._stopping.wait(delay):
+            return
+        try:
+            self.source.open()
+        except Exception as e:
+            print(f"Audio device reopen error: {e}")
+
+    def _process(self):
+        while self._running.is_set():
+            frame = self._ring.get(timeout=0.5)
+            if frame is None:
+                continue
+            if self.mute_fn is not None and self.mute_fn():
+                self.segmenter.reset()
+                continue
+            data = self.segmenter.push(frame)
+            if data:
+                self._handle(data)
+
+    def _handle(self, data):
+        audio = sr.AudioData(data, self.sample_rate, SAMPLE_WIDTH)
+        if not self.wake_word or self._accepting():
+            self.utterances.put(Utterance(audio))
+            return
+
+        try:
+            text = self.transcriber(audio)
+        except (sr.UnknownValueError, sr.RequestError):
+            return
+        except Exception as e:
+            print(f"Wake word recognition error: {e}")
+            return
+
+        command = strip_wake_word(text, self.wake_word)
+        if command is None:
+            return
+
+        with self._lock:
+            self._awake_until = self._clock() + self.follow_up_seconds
+        if command:
+            self.utterances.put(Utterance(audio, text=command))
+        if self.on_wake is not None:
+            self.on_wake()
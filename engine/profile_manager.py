@@ -5,51 +5,39 @@ Vishwakarma AI - User Profile Manager
 This module manages user profiles for personalized experience.
 """
 
-import sqlite3
 import json
 from datetime import datetime
 
 
 from engine.config import DATABASE_NAME
+from engine.database import get_database
+
+
+def build_greeting(profile=None):
+    """
+    Builds the spoken greeting for a profile.
+
+    Args:
+        profile (dict): The authenticated user's profile (optional)
+
+    Returns:
+        str: The greeting text
+    """
+    if profile:
+        return (f"Hello {profile['name']}, Welcome back! "
+                f"I am Vishwakarma AI, How can I assist you today?")
+    return "Hello, Welcome! I am Vishwakarma AI, How can I assist you today?"
 
 class ProfileManager:
     """Manages user profiles and preferences"""
     
     def __init__(self, db_name=DATABASE_NAME):
         self.db_name = db_name
-        self.init_database()
+        self.db = get_database(db_name)
     
     def init_database(self):
-        """Initialize the profiles table"""
-        con = sqlite3.connect(self.db_name)
-        cursor = con.cursor()
-        
-        # Create profiles table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS profiles (
-                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name VARCHAR(100) NOT NULL,
-                age INTEGER,
-                preferences TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP,
-                is_active BOOLEAN DEFAULT 1
-            )
-        ''')
-        
-        # Create profile settings table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS profile_settings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                setting_key VARCHAR(100),
-                setting_value TEXT,
-                FOREIGN KEY (user_id) REFERENCES profiles(user_id)
-            )
-        ''')
-        
-        con.commit()
-        con.close()
+        """Initialize the profiles table (done once, on first connection)"""
+        self.db.query_one('SELECT 1')
     
     def create_profile(self, name, age=None, preferences=None):
         """
@@ -63,21 +51,14 @@ class ProfileManager:
         Returns:
             int: User ID of created profile
         """
-        con = sqlite3.connect(self.db_name)
-        cursor = con.cursor()
-        
         preferences_json = json.dumps(preferences) if preferences else "{}"
         
-        cursor.execute('''
+        cursor = self.db.execute('''
             INSERT INTO profiles (name, age, preferences, created_at)
             VALUES (?, ?, ?, ?)
         ''', (name, age, preferences_json, datetime.now()))
         
-        user_id = cursor.lastrowid
-        con.commit()
-        con.close()
-        
-        return user_id
+        return cursor.lastrowid
     
     def get_profile(self, user_id):
         """
@@ -89,18 +70,12 @@ class ProfileManager:
         Returns:
             dict: User profile data
         """
-        con = sqlite3.connect(self.db_name)
-        cursor = con.cursor()
-        
-        cursor.execute('''
+        row = self.db.query_one('''
             SELECT user_id, name, age, preferences, created_at, last_login, is_active
             FROM profiles
             WHERE user_id = ?
         ''', (user_id,))
         
-        row = cursor.fetchone()
-        con.close()
-        
         if row:
             return {
                 'user_id': row[0],
@@ -120,19 +95,13 @@ class ProfileManager:
         Returns:
             list: List of all profiles
         """
-        con = sqlite3.connect(self.db_name)
-        cursor = con.cursor()
-        
-        cursor.execute('''
+        rows = self.db.query('''
             SELECT user_id, name, age, preferences, created_at, last_login, is_active
             FROM profiles
             WHERE is_active = 1
             ORDER BY last_login DESC
         ''')
         
-        rows = cursor.fetchall()
-        con.close()
-        
         profiles = []
         for row in rows:
             profiles.append({
@@ -158,9 +127,6 @@ class ProfileManager:
         Returns:
             bool: Success status
         """
-        con = sqlite3.connect(self.db_name)
-        cursor = con.cursor()
-        
         update_fields = []
         values = []
         
@@ -182,25 +148,17 @@ class ProfileManager:
         values.append(user_id)
         query = f"UPDATE profiles SET {', '.join(update_fields)} WHERE user_id = ?"
         
-        cursor.execute(query, values)
-        con.commit()
-        con.close()
+        self.db.execute(query, values)
         
         return True
     
     def update_last_login(self, user_id):
         """Update last login timestamp"""
-        con = sqlite3.connect(self.db_name)
-        cursor = con.cursor()
-        
-        cursor.execute('''
+        self.db.execute('''
             UPDATE profiles
             SET last_login = ?
             WHERE user_id = ?
         ''', (datetime.now(), user_id))
-        
-        con.commit()
-        con.close()
     
     def delete_profile(self, user_id):
         """
@@ -212,18 +170,12 @@ class ProfileManager:
         Returns:
             bool: Success status
         """
-        con = sqlite3.connect(self.db_name)
-        cursor = con.cursor()
-        
-        cursor.execute('''
+        self.db.execute('''
             UPDATE profiles
             SET is_active = 0
             WHERE user_id = ?
         ''', (user_id,))
         
-        con.commit()
-        con.close()
-        
         return True
     
     def has_profiles(self):
@@ -233,12 +185,7 @@ class ProfileManager:
         Returns:
             bool: True if profiles exist
         """
-        con = sqlite3.connect(self.db_name)
-        cursor = con.cursor()
-        
-        cursor.execute('SELECT COUNT(*) FROM profiles WHERE is_active = 1')
-        count = cursor.fetchone()[0]
-        con.close()
+        count = self.db.query_one('SELECT COUNT(*) FROM profiles WHERE is_active = 1')[0]
         
         return count > 0
     
@@ -251,31 +198,12 @@ class ProfileManager:
             key (str): Setting key
             value (str): Setting value
         """
-        con = sqlite3.connect(self.db_name)
-        cursor = con.cursor()
-        
-        # Check if setting exists
-        cursor.execute('''
-            SELECT id FROM profile_settings
-            WHERE user_id = ? AND setting_key = ?
-        ''', (user_id, key))
-        
-        if cursor.fetchone():
-            # Update existing
-            cursor.execute('''
-                UPDATE profile_settings
-                SET setting_value = ?
-                WHERE user_id = ? AND setting_key = ?
-            ''', (value, user_id, key))
-        else:
-            # Insert new
-            cursor.execute('''
-                INSERT INTO profile_settings (user_id, setting_key, setting_value)
-                VALUES (?, ?, ?)
-            ''', (user_id, key, value))
-        
-        con.commit()
-        con.close()
+        # One statement thanks to the unique (user_id, setting_key) index
+        self.db.execute('''
+            INSERT INTO profile_settings (user_id, setting_key, setting_value)
+            VALUES (?, ?, ?)
+            ON CONFLICT (user_id, setting_key) DO UPDATE SET setting_value = excluded.setting_value
+        ''', (user_id, key, value))
     
     def get_preference(self, user_id, key, default=None):
         """
@@ -289,15 +217,9 @@ class ProfileManager:
         Returns:
             str: Setting value
         """
-        con = sqlite3.connect(self.db_name)
-        cursor = con.cursor()
-        
-        cursor.execute('''
+        row = self.db.query_one('''
             SELECT setting_value FROM profile_settings
             WHERE user_id = ? AND setting_key = ?
         ''', (user_id, key))
         
-        row = cursor.fetchone()
-        con.close()
-        
         return row[0] if row else default
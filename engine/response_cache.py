@@ -0,0 +1,296 @@
+"""
+Vishwakarma AI - Chatbot Response Cache
+© 2025 Vishwakarma Industries
+
+This module answers repeated chatbot questions from memory. Queries are
+normalized and matched exactly first, then by character trigram similarity
+among queries with the same content words, so "who are you" and "who are
+you?" share one LLM round trip. Entries are kept per user, expire after a
+TTL, the least recently used are evicted first, and time-sensitive or
+personal questions are never cached.
+"""
+import re
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from engine.config import (ASSISTANT_NAME, RESPONSE_CACHE_ENABLED,
+                           RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_SIMILARITY,
+                           RESPONSE_CACHE_TTL)
+
+# Pronouns and modals change the question ("can you" vs "can I"), so they stay
+FILLER_WORDS = {'please', 'hey', 'hi', 'ok', 'okay', 'so', 'um', 'uh', 'just', 'a', 'an', 'the',
+                ASSISTANT_NAME}
+CONTRACTIONS = {"what's": 'what is', 'whats': 'what is', "who's": 'who is', 'whos': 'who is',
+                "where's": 'where is', "how's": 'how is', "it's": 'it is', "i'm": 'i am'}
+
+# Answers to these change with time or place, so they always go to the model
+TIME_SENSITIVE = re.compile(
+    r'\b(time|date|day|today|tonight|tomorrow|yesterday|now|current|currently|latest|'
+    r'recent|news|weather|forecast|temperature|score|price|stock|rate|live|this week|'
+    r'this month|this year)\b')
+
+# Follow-ups that refer back to the conversation can't be answered out of context
+CONTEXT_DEPENDENT = re.compile(
+    r'\b(it|that|this|those|these|he|she|him|her|they|them|his|their|more|again|'
+    r'else|above|previous|last one)\b')
+
+# Questions about the user or what they said earlier have per-person answers
+PERSONAL = re.compile(
+    r"\b(i|i'm|i've|i'd|i'll|my|mine|myself|we|our|ours|us|remember|recall|told|said|"
+    r"forget|forgot)\b")
+
+
+def normalize_query(query):
+    """
+    Normalizes a query for cache lookup.
+
+    Args:
+        query (str): The user's input.
+
+    Returns:
+        str: Lowercase words without punctuation and filler words.
+    """
+    words = []
+    for word in re.findall(r"[a-z0-9']+", query.lower()):
+        words.extend(CONTRACTIONS.get(word, word).split())
+    kept = [word for word in words if word not in FILLER_WORDS]
+    return ' '.join(kept or words)
+
+
+def content_words(text):
+    """
+    Returns the words of a normalized query that must match exactly.
+
+    Only a plural "s" is ignored, so "telephone" and "telephones" are the
+    same word but "india" and "indiana" are not.
+
+    Args:
+        text (str): A normalized query.
+
+    Returns:
+        frozenset: The words.
+    """
+    return frozenset(word[:-1] if len(word) > 3 and word.endswith('s') and not word.endswith('ss')
+                     else word for word in text.split())
+
+
+def trigrams(text):
+    """Returns the set of character trigrams of a padded string."""
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def is_cacheable(query):
+    """
+    Checks whether a reply to this query may be cached.
+
+    Args:
+        query (str): The user's input.
+
+    Returns:
+        bool: False for time-sensitive, context-dependent or personal questions.
+    """
+    text = query.lower()
+    return not (TIME_SENSITIVE.search(text) or CONTEXT_DEPENDENT.search(text)
+                or PERSONAL.search(text))
+
+
+class CacheEntry:
+    """A cached reply and what it cost to produce."""
+
+    __slots__ = ('key', 'response', 'grams', 'words', 'expires_at', 'latency')
+
+    def __init__(self, key, response, expires_at, latency):
+        self.key = key  # (user_id, normalized query)
+        self.response = response
+        self.grams = trigrams(key[1])
+        self.words = content_words(key[1])
+        self.expires_at = expires_at
+        self.latency = latency
+
+
+class ResponseCache:
+    """An in-memory TTL and LRU cache of chatbot replies."""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL,
+                 similarity=RESPONSE_CACHE_SIMILARITY, clock=time.monotonic):
+        """
+        Args:
+            max_entries (int): Entries kept before the oldest is evicted.
+            ttl (float): Seconds a reply stays valid.
+            similarity (float): Minimum trigram Jaccard similarity for a
+                fuzzy hit; None disables similarity lookup.
+            clock (callable): Time source, for tests.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (user_id, normalized query) -> CacheEntry, oldest first
+        self._postings = {}  # trigram -> set of entry keys
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.latency_saved = 0.0
+
+    def get(self, query, user_id=None):
+        """
+        Looks up a reply.
+
+        Args:
+            query (str): The user's input.
+            user_id (int, optional): The profile asking; replies are never
+                shared between profiles.
+
+        Returns:
+            str: The cached reply, or None.
+        """
+        if not is_cacheable(query):
+            with self._lock:
+                self.bypassed += 1
+            return None
+
+        key = (user_id, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._live(entry):
+                self.exact_hits += 1
+            else:
+                entry = self._find_similar(key)
+                if entry is None:
+                    self.misses += 1
+                    return None
+                self.similar_hits += 1
+
+            self._entries.move_to_end(entry.key)
+            self.latency_saved += entry.latency
+            return entry.response
+
+    def put(self, query, response, latency=0.0, user_id=None):
+        """
+        Stores a reply.
+
+        Args:
+            query (str): The user's input.
+            response (str): The chatbot's reply.
+            latency (float): Seconds the model took, counted as saved on hits.
+            user_id (int, optional): The profile that asked.
+
+        Returns:
+            bool: Whether the reply was cached.
+        """
+        if not response or not is_cacheable(query):
+            return False
+
+        key = (user_id, normalize_query(query))
+        entry = CacheEntry(key, response, self._clock() + self.ttl, latency)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for gram in entry.grams:
+                self._postings.setdefault(gram, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+        return True
+
+    def clear(self):
+        """Drops all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+
+    def stats(self):
+        """
+        Returns cache statistics.
+
+        Returns:
+            dict: entries, hits, misses, bypassed, hit_rate, latency_saved
+                  (seconds) and memory_bytes.
+        """
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            lookups = hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'exact_hits': self.exact_hits,
+                'similar_hits': self.similar_hits,
+                'hits': hits,
+                'misses': self.misses,
+                'bypassed': self.bypassed,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'latency_saved': self.latency_saved,
+                'memory_bytes': self._memory_bytes(),
+            }
+
+    def _live(self, entry):
+        if entry.expires_at > self._clock():
+            return True
+        self._remove(entry.key)
+        return False
+
+    def _find_similar(self, key):
+        if self.similarity is None:
+            return None
+
+        user_id, text = key
+        grams = trigrams(text)
+        words = content_words(text)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+
+        best, best_score = None, self.similarity
+        for candidate, overlap in shared.items():
+            entry = self._entries[candidate]
+            score = overlap / (len(grams) + len(entry.grams) - overlap)
+            # Similar spelling is not enough: "capital of india" must not
+            # answer "capital of indiana", nor "5 minutes" "10 minutes"
+            if candidate[0] == user_id and score >= best_score and entry.words == words:
+                best, best_score = entry, score
+
+        if best is not None and not self._live(best):
+            return None
+        return best
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        for gram in entry.grams:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def _memory_bytes(self):
+        size = sys.getsizeof(self._entries) + sys.getsizeof(self._postings)
+        for entry in self._entries.values():
+            size += (sys.getsizeof(entry) + sys.getsizeof(entry.key[1])
+                     + sys.getsizeof(entry.response) + sys.getsizeof(entry.grams))
+        for gram, keys in self._postings.items():
+            size += sys.getsizeof(gram) + sys.getsizeof(keys)
+        return size
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Returns the process-wide response cache.
+
+    Returns:
+        ResponseCache: The cache, or None if RESPONSE_CACHE_ENABLED is off.
+    """
+    global _response_cache
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
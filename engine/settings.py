@@ -12,15 +12,182 @@ load_dotenv()
 # General
 ASSISTANT_NAME = "vishwakarma"
 DATABASE_NAME = "vishwakarma.db"
+# SQLite tuning for the shared connection (engine/database.py)
+DATABASE_BUSY_TIMEOUT_MS = 5000
+DATABASE_CACHE_KB = 8192
+DATABASE_STATEMENT_CACHE = 256
 
 # APIs
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 ELEVENLABS_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID")
 NVIDIA_API_KEY = os.getenv("NVIDIA_API_KEY")
 NVIDIA_MODEL = "nvidia/llama2-70b"
+NVIDIA_BASE_URL = os.getenv("NVIDIA_BASE_URL", "https://integrate.api.nvidia.com/v1")
+
+# HTTP connection pooling shared by the TTS and chatbot clients
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_KEEPALIVE_EXPIRY = 60
+HTTP_MAX_RETRIES = 2
+# Negotiate HTTP/2 for the LLM client when the h2 package is installed
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+
+# Chatbot
+CHATBOT_SYSTEM_PROMPT = ("You are Vishwakarma AI, an intelligent voice assistant. "
+                         "Keep responses brief and conversational.")
+# Speak each sentence as soon as the model has produced it
+CHATBOT_STREAMING = os.getenv("CHATBOT_STREAMING", "true").lower() == "true"
+# Per-profile conversation memory: recent turns within a token budget,
+# older turns folded into a rolling summary
+CONVERSATION_MEMORY = os.getenv("CONVERSATION_MEMORY", "true").lower() == "true"
+CONVERSATION_CONTEXT_TOKENS = int(os.getenv("CONVERSATION_CONTEXT_TOKENS", "1200"))
+CONVERSATION_SUMMARY_TOKENS = 300
+# Replies to repeated questions are served from memory; time-sensitive and
+# follow-up questions always go to the model
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_MAX_ENTRIES = 256
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+# Minimum character trigram similarity for a fuzzy match
+RESPONSE_CACHE_SIMILARITY = 0.8
+
+# Intent router matches scoring below this (a bare verb before free text, e.g.
+# "call ...") are only executed when the contact or application is known
+INTENT_ROUTER_MIN_SCORE = 0.5
+
+# Local intent classifier for paraphrased commands the intent patterns miss;
+# skipped until a model is trained at INTENT_MODEL_PATH
+INTENT_CLASSIFIER_ENABLED = os.getenv("INTENT_CLASSIFIER_ENABLED", "true").lower() == "true"
+INTENT_MODEL_PATH = os.getenv("INTENT_MODEL_PATH", "engine/models/intent_classifier.json")
+# Predictions below this probability go to the chatbot instead
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.85"))
+
+# Contact search: lowest match score (0-1) findContact() acts on. Fuzzy or
+# tied matches above it are confirmed with the user first
+CONTACT_SEARCH_MIN_SCORE = float(os.getenv("CONTACT_SEARCH_MIN_SCORE", "0.6"))
+# Calling code for numbers stored without one
+DEFAULT_COUNTRY_CODE = os.getenv("DEFAULT_COUNTRY_CODE", "91")
+# The in-memory "open ..." catalog looks for changes made by other
+# processes this often (seconds); changes made by this one show at once
+CATALOG_RECHECK_SECONDS = 5
+# Installed applications found for "open ..." on Linux, cached on disk and
+# rescanned when their directories change (checked at most this often)
+APP_INDEX_PATH = os.getenv("APP_INDEX_PATH", "engine/cache/app_index.json")
+APP_INDEX_REFRESH_SECONDS = 300
+# Contact import: rows per executemany() and records per resumable commit
+CONTACT_IMPORT_BATCH_SIZE = 5000
+CONTACT_IMPORT_CHECKPOINT = 50000
+
+# Android over ADB: one persistent `adb shell` session per device
+ADB_PATH = os.getenv("ADB_PATH", "adb")
+ADB_COMMAND_TIMEOUT = 10
+# Waiting for the phone's screen to change: give up after / poll every (seconds)
+ADB_WAIT_TIMEOUT = float(os.getenv("ADB_WAIT_TIMEOUT", "5"))
+ADB_POLL_INTERVAL = 0.1
+# UI hierarchy dumps (uiautomator): device path, and screens kept cached
+UI_DUMP_PATH = "/sdcard/window_dump.xml"
+UI_CACHE_ACTIVITIES = 32
+# A cached screen lacking the wanted control is dumped again after this long
+UI_SETTLE_SECONDS = 1.0
+# SMS: "intent" (compose screen opened pre-filled, then Send is tapped) or
+# "service_call" (no UI; SMS_SERVICE_CALL is the `service call isms ...`
+# command for the phone's Android version, with {number} and {text})
+SMS_BACKEND = os.getenv("SMS_BACKEND", "intent")
+SMS_SERVICE_CALL = os.getenv("SMS_SERVICE_CALL", "")
+# Bulk sends per device; Android asks for confirmation past ~30 per 30 min
+SMS_RATE_PER_MINUTE = float(os.getenv("SMS_RATE_PER_MINUTE", "10"))
+SMS_MAX_ATTEMPTS = 2
+# WhatsApp Desktop: a chat is ready once a window with this title is in
+# front and, if a screenshot of the control to use (send.png,
+# voice_call.png, video_call.png) is in the template directory, that control
+# is on screen; without one, the chat gets WHATSAPP_SETTLE_SECONDS to load
+WHATSAPP_WINDOW_TITLE = os.getenv("WHATSAPP_WINDOW_TITLE", "WhatsApp")
+WHATSAPP_READY_TIMEOUT = float(os.getenv("WHATSAPP_READY_TIMEOUT", "15"))
+WHATSAPP_POLL_INTERVAL = 0.1
+WHATSAPP_SETTLE_SECONDS = float(os.getenv("WHATSAPP_SETTLE_SECONDS", "1"))
+WHATSAPP_TEMPLATE_DIR = os.getenv("WHATSAPP_TEMPLATE_DIR", "engine/whatsapp_templates")
+WHATSAPP_MATCH_THRESHOLD = 0.85
+# Bulk WhatsApp messages are spaced out to this many per minute
+WHATSAPP_RATE_PER_MINUTE = float(os.getenv("WHATSAPP_RATE_PER_MINUTE", "20"))
+
+# Text-to-Speech
+ELEVENLABS_API_URL = os.getenv("ELEVENLABS_API_URL", "https://api.elevenlabs.io")
+ELEVENLABS_MODEL_ID = "eleven_multilingual_v2"
+ELEVENLABS_VOICE_SETTINGS = {
+    "stability": 0.61,
+    "similarity_boost": 0.24,
+    "style": 0.0,
+    "use_speaker_boost": True
+}
+# Stream raw PCM from the /stream endpoint and play it as it arrives
+ELEVENLABS_STREAMING = os.getenv("ELEVENLABS_STREAMING", "true").lower() == "true"
+ELEVENLABS_STREAM_FORMAT = "pcm_22050"
+ELEVENLABS_STREAM_CHUNK_SIZE = 4096
+ELEVENLABS_DOWNLOAD_FORMAT = "mp3_44100_128"
+
+# Offline pyttsx3 fallback; the driver is picked per platform when unset
+TTS_RATE = int(os.getenv("TTS_RATE", "174"))
+TTS_VOICE_INDEX = int(os.getenv("TTS_VOICE_INDEX", "0"))
+TTS_FALLBACK_DRIVER = os.getenv("TTS_FALLBACK_DRIVER")
+
+# Rendered speech is cached on disk, keyed by text, voice and settings
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "true").lower() == "true"
+TTS_CACHE_PATH = 'www/assets/audio/cache'
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_MB", "100")) * 1024 * 1024
+
+# Speech-to-Text ("google", "vosk" or "whispercpp")
+STT_BACKEND = os.getenv("STT_BACKEND", "google")
+STT_LANGUAGE = "en-in"
+STT_PAUSE_THRESHOLD = 1
+# Ambient noise is re-measured at most this often (seconds)
+STT_CALIBRATION_INTERVAL = int(os.getenv("STT_CALIBRATION_INTERVAL", "300"))
+STT_CALIBRATION_DURATION = 0.5
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", "engine/models/vosk")
+WHISPER_CPP_BINARY = os.getenv("WHISPER_CPP_BINARY", "whisper-cli")
+WHISPER_CPP_MODEL = os.getenv("WHISPER_CPP_MODEL", "engine/models/ggml-base.en.bin")
+WHISPER_CPP_THREADS = int(os.getenv("WHISPER_CPP_THREADS", "4"))
+
+# Continuous listening: one persistent microphone stream segmented by VAD
+CONTINUOUS_LISTENING = os.getenv("CONTINUOUS_LISTENING", "false").lower() == "true"
+WAKE_WORD_ENABLED = os.getenv("WAKE_WORD_ENABLED", "false").lower() == "true"
+VAD_MODE = os.getenv("VAD_MODE", "energy")  # "energy" or "webrtc"
+VAD_AGGRESSIVENESS = 2
+LISTENER_SAMPLE_RATE = 16000
+LISTENER_FRAME_MS = 30
+LISTENER_RING_SECONDS = 10
+LISTENER_PRE_ROLL_MS = 300
+LISTENER_SILENCE_MS = 800
+LISTENER_MAX_UTTERANCE_SECONDS = 10
+# After the wake word, utterances are accepted without it for this long
+LISTENER_FOLLOW_UP_SECONDS = 8
+# Utterances left unread for longer than this are discarded
+LISTENER_UTTERANCE_MAX_AGE = 15
+# After a capture error the microphone is reopened, waiting this long at
+# first and twice as long after each further failure, up to the maximum
+LISTENER_RESTART_BACKOFF = 0.5
+LISTENER_RESTART_MAX_BACKOFF = 30
 
 # Paths
 SAMPLES_PATH = 'engine/auth/samples'
 TRAINER_PATH = 'engine/auth/trainer'
 TRAINER_FILE = os.path.join(TRAINER_PATH, 'trainer.yml')
 CASCADE_PATH = 'engine/auth/haarcascade_frontalface_default.xml'
+
+# Face authentication performance mode: detect on frames shrunk to this
+# width, fully only every FACE_DETECT_EVERY frames (tracking faces in
+# between), and reuse a prediction that came out the same this many times
+# in a row, re-checking it every FACE_RECHECK_FRAMES frames
+FACE_PERFORMANCE_MODE = os.getenv("FACE_PERFORMANCE_MODE", "true").lower() == "true"
+FACE_DETECTION_WIDTH = 320
+FACE_DETECT_EVERY = int(os.getenv("FACE_DETECT_EVERY", "3"))
+FACE_STABLE_MATCHES = 3
+FACE_RECHECK_FRAMES = 15
+# "haar" or "dnn" (OpenCV's res10 SSD; its two files from OpenCV's
+# samples/dnn/face_detector go in engine/auth)
+FACE_DETECTOR = os.getenv("FACE_DETECTOR", "haar")
+FACE_DNN_MODEL = 'engine/auth/res10_300x300_ssd_iter_140000.caffemodel'
+FACE_DNN_CONFIG = 'engine/auth/deploy.prototxt'
+FACE_DNN_CONFIDENCE = 0.6
+FACE_SHOW_PREVIEW = os.getenv("FACE_SHOW_PREVIEW", "true").lower() == "true"
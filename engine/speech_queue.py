@@ -0,0 +1,174 @@
+"""
+Vishwakarma AI - Speech Queue Module
+© 2025 Vishwakarma Industries
+
+This module plays speech on a single background worker so callers (eel
+handlers in particular) return immediately instead of blocking on audio.
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+
+# Lower values are spoken first; equal priorities keep their queue order
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+
+class SpeechHandle:
+    """
+    Tracks a queued utterance.
+
+    Call wait() to block until it has been spoken, or await the handle from
+    asyncio code.
+    """
+
+    def __init__(self, text, priority):
+        self.text = text
+        self.priority = priority
+        self.spoken = False
+        self.cancel_event = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self):
+        """Whether the utterance was cancelled before it finished."""
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        """Skips the utterance, or stops it if it is already playing."""
+        self.cancel_event.set()
+
+    def done(self):
+        """Whether the utterance has finished, been skipped or cancelled."""
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Blocks until the utterance has finished.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            bool: True if the utterance finished within the timeout.
+        """
+        return self._done.wait(timeout)
+
+    def __await__(self):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(None, self.wait).__await__()
+
+    def _finish(self, spoken):
+        self.spoken = spoken
+        self._done.set()
+
+
+class SpeechWorker:
+    """Speaks queued utterances one at a time on a background thread."""
+
+    def __init__(self, speak_fn):
+        """
+        Args:
+            speak_fn (callable): Called as speak_fn(text, cancel_event) on the
+                worker thread; it should return early once the event is set.
+        """
+        self._speak_fn = speak_fn
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        # The queue is a heap guarded by the same lock as _current, so an
+        # utterance is dequeued and marked current in one step
+        self._queue = []
+        self._ready = threading.Condition(self._lock)
+        self._current = None
+        self._thread = None
+
+    def say(self, text, priority=PRIORITY_NORMAL, interrupt=False):
+        """
+        Queues text to be spoken.
+
+        Args:
+            text (str): The text to speak.
+            priority (int): Lower values are spoken first.
+            interrupt (bool): Cancel current and pending speech first.
+
+        Returns:
+            SpeechHandle: A handle to wait on or cancel the utterance.
+        """
+        if interrupt:
+            self.interrupt()
+
+        handle = SpeechHandle(text, priority)
+        self._ensure_started()
+        self._put(priority, handle)
+        return handle
+
+    def interrupt(self):
+        """Stops the current utterance and drops everything still queued."""
+        with self._lock:
+            pending = [handle for _, _, handle in self._queue if handle is not None]
+            # Keep a pending stop() request
+            self._queue = [item for item in self._queue if item[2] is None]
+            if self._current is not None:
+                self._current.cancel()
+        for handle in pending:
+            handle.cancel()
+            handle._finish(False)
+
+    def is_speaking(self):
+        """Whether an utterance is playing right now."""
+        with self._lock:
+            return self._current is not None
+
+    def stop(self, timeout=None):
+        """
+        Stops the worker thread after cancelling outstanding speech.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait for the thread.
+        """
+        self.interrupt()
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._put(float('inf'), None)
+            thread.join(timeout)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="speech-worker",
+                                                daemon=True)
+                self._thread.start()
+
+    def _put(self, priority, handle):
+        with self._ready:
+            heapq.heappush(self._queue, (priority, next(self._order), handle))
+            self._ready.notify()
+
+    def _run(self):
+        while True:
+            with self._ready:
+                while not self._queue:
+                    self._ready.wait()
+                _, _, handle = heapq.heappop(self._queue)
+                self._current = handle
+            if handle is None:
+                break
+            # interrupt() either drained it or cancelled it as current
+            if handle.cancelled:
+                with self._lock:
+                    self._current = None
+                handle._finish(False)
+                continue
+
+            try:
+                self._speak_fn(handle.text, handle.cancel_event)
+            except Exception as e:
+                print(f"Error in speech worker: {e}")
+            finally:
+                with self._lock:
+                    self._current = None
+                handle._finish(not handle.cancelled)
@@ -0,0 +1,226 @@
+"""
+Vishwakarma AI - Speech-to-Text Backends
+© 2025 Vishwakarma Industries
+
+This module provides interchangeable speech recognition backends: the
+Google Web Speech API and offline, CPU-only engines (Vosk and whisper.cpp).
+It also keeps the shared recognizer and its ambient noise calibration.
+"""
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+import speech_recognition as sr
+
+from engine.config import (STT_BACKEND, STT_CALIBRATION_DURATION,
+                           STT_CALIBRATION_INTERVAL, STT_LANGUAGE,
+                           STT_PAUSE_THRESHOLD, VOSK_MODEL_PATH,
+                           WHISPER_CPP_BINARY, WHISPER_CPP_MODEL,
+                           WHISPER_CPP_THREADS)
+
+
+class STTBackend:
+    """
+    Base class for speech recognition backends.
+
+    Subclasses implement transcribe() and raise sr.UnknownValueError when no
+    speech was recognized, or sr.RequestError when the engine failed.
+    """
+
+    name = None
+
+    def transcribe(self, audio):
+        """
+        Converts speech to text.
+
+        Args:
+            audio (sr.AudioData): The recorded utterance.
+
+        Returns:
+            str: The recognized text.
+        """
+        raise NotImplementedError
+
+
+class GoogleSTT(STTBackend):
+    """Online recognition through the Google Web Speech API."""
+
+    name = 'google'
+
+    def __init__(self, language=STT_LANGUAGE):
+        self.language = language
+        self._recognizer = sr.Recognizer()
+
+    def transcribe(self, audio):
+        return self._recognizer.recognize_google(audio, language=self.language)
+
+
+class VoskSTT(STTBackend):
+    """Offline recognition with a Vosk (Kaldi) model."""
+
+    name = 'vosk'
+    SAMPLE_RATE = 16000
+
+    def __init__(self, model_path=VOSK_MODEL_PATH):
+        try:
+            import vosk
+        except ImportError as e:
+            raise sr.RequestError("Vosk is not installed (pip install vosk)") from e
+        if not os.path.isdir(model_path):
+            raise sr.RequestError(f"No Vosk model found at {model_path}")
+
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self._model = vosk.Model(model_path)
+
+    def transcribe(self, audio):
+        recognizer = self._vosk.KaldiRecognizer(self._model, self.SAMPLE_RATE)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=self.SAMPLE_RATE,
+                                                     convert_width=2))
+        text = json.loads(recognizer.FinalResult()).get('text', '')
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class WhisperCppSTT(STTBackend):
+    """Offline recognition with the whisper.cpp command line tool."""
+
+    name = 'whispercpp'
+
+    def __init__(self, binary=WHISPER_CPP_BINARY, model_path=WHISPER_CPP_MODEL,
+                 threads=WHISPER_CPP_THREADS, language=STT_LANGUAGE):
+        if not os.path.exists(model_path):
+            raise sr.RequestError(f"No whisper.cpp model found at {model_path}")
+        self.binary = binary
+        self.model_path = model_path
+        self.threads = threads
+        self.language = language.split('-')[0]
+
+    def transcribe(self, audio):
+        # whisper.cpp expects 16 kHz 16-bit mono WAV input
+        wav_data = audio.get_wav_data(convert_rate=16000, convert_width=2)
+        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
+            f.write(wav_data)
+            wav_path = f.name
+
+        try:
+            result = subprocess.run(
+                [self.binary, '-m', self.model_path, '-f', wav_path,
+                 '-l', self.language, '-t', str(self.threads), '-nt', '-np'],
+                capture_output=True, text=True, check=True)
+        except FileNotFoundError as e:
+            raise sr.RequestError(f"whisper.cpp binary not found: {self.binary}") from e
+        except subprocess.CalledProcessError as e:
+            raise sr.RequestError(f"whisper.cpp failed: {e.stderr}") from e
+        finally:
+            os.remove(wav_path)
+
+        text = ' '.join(result.stdout.split())
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+STT_BACKENDS = {
+    GoogleSTT.name: GoogleSTT,
+    VoskSTT.name: VoskSTT,
+    WhisperCppSTT.name: WhisperCppSTT,
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_stt_backend(name=None):
+    """
+    Returns the shared instance of a speech recognition backend.
+
+    Models are loaded once, on first use.
+
+    Args:
+        name (str, optional): 'google', 'vosk' or 'whispercpp'. Defaults to
+            the STT_BACKEND setting.
+
+    Returns:
+        STTBackend: The backend.
+    """
+    name = (name or STT_BACKEND).lower()
+    if name not in STT_BACKENDS:
+        raise ValueError(f"Unknown STT backend '{name}'. "
+                         f"Choose from: {', '.join(STT_BACKENDS)}")
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = STT_BACKENDS[name]()
+        return _backends[name]
+
+
+class NoiseCalibrator:
+    """Re-measures ambient noise on a schedule instead of before every listen."""
+
+    def __init__(self, recognizer, interval=STT_CALIBRATION_INTERVAL,
+                 duration=STT_CALIBRATION_DURATION, clock=time.monotonic):
+        self.recognizer = recognizer
+        self.interval = interval
+        self.duration = duration
+        self._clock = clock
+        self._calibrated_at = None
+
+    def is_due(self):
+        """Whether the calibration is missing or older than the interval."""
+        return (self._calibrated_at is None
+                or self._clock() - self._calibrated_at >= self.interval)
+
+    def calibrate(self, source, force=False):
+        """
+        Adjusts the energy threshold to the room if calibration is due.
+
+        Args:
+            source (sr.AudioSource): An open microphone.
+            force (bool): Calibrate even if the last result is still fresh.
+
+        Returns:
+            bool: True if a calibration was performed.
+        """
+        if not force and not self.is_due():
+            return False
+        self.recognizer.adjust_for_ambient_noise(source, duration=self.duration)
+        self._calibrated_at = self._clock()
+        return True
+
+
+_recognizer = None
+_calibrator = None
+
+
+def get_recognizer():
+    """Returns the shared recognizer and its noise calibrator."""
+    global _recognizer, _calibrator
+    if _recognizer is None:
+        _recognizer = sr.Recognizer()
+        _recognizer.pause_threshold = STT_PAUSE_THRESHOLD
+        _calibrator = NoiseCalibrator(_recognizer)
+    return _recognizer, _calibrator
+
+
+def transcribe_file(path, backend=None):
+    """
+    Transcribes a recorded WAV/AIFF/FLAC file, e.g. a test fixture.
+
+    Args:
+        path (str): The audio file.
+        backend (STTBackend, optional): Defaults to the configured backend.
+
+    Returns:
+        tuple: The recognized text and the recognition latency in seconds.
+    """
+    backend = backend or get_stt_backend()
+    with sr.AudioFile(path) as source:
+        audio = sr.Recognizer().record(source)
+
+    start = time.perf_counter()
+    text = backend.transcribe(audio)
+    return text, time.perf_counter() - start
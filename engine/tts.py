@@ -0,0 +1,331 @@
+"""
+Vishwakarma AI - Streaming Text-to-Speech Module
+© 2025 Vishwakarma Industries
+
+This module streams speech from the ElevenLabs streaming endpoint and plays
+the audio chunks as they arrive, without writing a temporary file. Rendered
+audio is kept in the on-disk TTS cache so repeated phrases skip the network.
+"""
+import os
+import time
+from playsound import playsound
+from engine.audio_cache import get_audio_cache, speech_cache_key
+from engine.config import (ELEVENLABS_API_KEY, ELEVENLABS_API_URL,
+                           ELEVENLABS_DOWNLOAD_FORMAT, ELEVENLABS_MODEL_ID,
+                           ELEVENLABS_STREAM_CHUNK_SIZE,
+                           ELEVENLABS_STREAM_FORMAT, ELEVENLABS_STREAMING,
+                           ELEVENLABS_VOICE_ID, ELEVENLABS_VOICE_SETTINGS,
+                           TTS_CACHE_ENABLED)
+from engine.http_pool import get_http_session, http_timeout
+
+# Bytes per sample of the 16-bit mono PCM returned for "pcm_*" formats
+PCM_SAMPLE_WIDTH = 2
+
+
+class PartialPlaybackError(RuntimeError):
+    """The stream failed after some of the speech had already been played."""
+
+
+def elevenlabs_headers(api_key=None):
+    """
+    Builds the request headers for the ElevenLabs API.
+
+    Args:
+        api_key (str, optional): Overrides the configured API key.
+
+    Returns:
+        dict: The request headers.
+    """
+    return {
+        "xi-api-key": api_key or ELEVENLABS_API_KEY,
+        "Content-Type": "application/json"
+    }
+
+
+def elevenlabs_payload(text):
+    """
+    Builds the JSON payload for an ElevenLabs text-to-speech request.
+
+    Args:
+        text (str): The text to synthesize.
+
+    Returns:
+        dict: The request payload.
+    """
+    return {
+        "text": text,
+        "model_id": ELEVENLABS_MODEL_ID,
+        "voice_settings": dict(ELEVENLABS_VOICE_SETTINGS)
+    }
+
+
+def pcm_sample_rate(output_format):
+    """
+    Extracts the sample rate from a PCM output format such as 'pcm_22050'.
+
+    Args:
+        output_format (str): The ElevenLabs output format.
+
+    Returns:
+        int: The sample rate in Hz.
+    """
+    return int(output_format.split('_')[1])
+
+
+class BufferSink:
+    """Collects streamed audio in memory instead of playing it."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        """Stores a block of audio."""
+        self.chunks.append(data)
+
+    def close(self):
+        """Nothing to release for an in-memory sink."""
+
+    def getvalue(self):
+        """Returns all audio written so far."""
+        return b''.join(self.chunks)
+
+
+class RecordingSink:
+    """Passes audio through to another sink while keeping a copy."""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.recording = BufferSink()
+
+    def write(self, data):
+        """Forwards and records a block of audio."""
+        self.sink.write(data)
+        self.recording.write(data)
+
+    def close(self):
+        """Closes the wrapped sink."""
+        self.sink.close()
+
+    def getvalue(self):
+        """Returns all audio recorded so far."""
+        return self.recording.getvalue()
+
+
+class PyAudioSink:
+    """Plays 16-bit mono PCM through PyAudio as soon as it is written."""
+
+    def __init__(self, sample_rate):
+        import pyaudio
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(format=pyaudio.paInt16, channels=1,
+                                        rate=sample_rate, output=True)
+
+    def write(self, data):
+        """Plays a block of PCM frames."""
+        self._stream.write(data)
+
+    def close(self):
+        """Drains and releases the output device."""
+        try:
+            self._stream.stop_stream()
+            self._stream.close()
+        finally:
+            self._audio.terminate()
+
+
+def open_audio_sink(output_format=ELEVENLABS_STREAM_FORMAT):
+    """
+    Opens a playback sink for the given streaming format.
+
+    Args:
+        output_format (str): The ElevenLabs output format.
+
+    Returns:
+        PyAudioSink: The sink, or None if no audio output is available.
+    """
+    try:
+        return PyAudioSink(pcm_sample_rate(output_format))
+    except ImportError:
+        print("PyAudio not installed. Streaming TTS unavailable.")
+    except Exception as e:
+        print(f"Could not open audio output: {e}")
+    return None
+
+
+def stream_speech(text, sink, base_url=None, api_key=None, voice_id=None,
+                  output_format=ELEVENLABS_STREAM_FORMAT,
+                  chunk_size=ELEVENLABS_STREAM_CHUNK_SIZE, cancel_event=None):
+    """
+    Streams speech for the given text into an audio sink.
+
+    Chunks are written to the sink as they arrive from the network, so
+    playback starts after the first chunk rather than after the whole
+    response has been synthesized.
+
+    Args:
+        text (str): The text to synthesize.
+        sink: An object with write(bytes) and close() methods.
+        base_url (str, optional): Overrides the ElevenLabs API URL.
+        api_key (str, optional): Overrides the configured API key.
+        voice_id (str, optional): Overrides the configured voice ID.
+        output_format (str): The ElevenLabs output format.
+        chunk_size (int): The network read size in bytes.
+        cancel_event (threading.Event, optional): Stops playback when set.
+
+    Returns:
+        dict: Timing stats with 'ttfb', 'total' (seconds), 'bytes' and
+              whether the stream was 'cancelled'.
+    """
+    url = (f"{base_url or ELEVENLABS_API_URL}/v1/text-to-speech/"
+           f"{voice_id or ELEVENLABS_VOICE_ID}/stream")
+    start = time.perf_counter()
+    ttfb = None
+    received = 0
+    remainder = b''
+    cancelled = False
+
+    try:
+        with get_http_session().post(url, headers=elevenlabs_headers(api_key),
+                                     json=elevenlabs_payload(text),
+                                     params={"output_format": output_format},
+                                     stream=True, timeout=http_timeout()) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                if not chunk:
+                    continue
+                if ttfb is None:
+                    ttfb = time.perf_counter() - start
+                received += len(chunk)
+
+                # Only hand whole samples to the sink
+                data = remainder + chunk
+                usable = len(data) - (len(data) % PCM_SAMPLE_WIDTH)
+                remainder = data[usable:]
+                if usable:
+                    sink.write(data[:usable])
+    finally:
+        sink.close()
+
+    stats = {
+        'ttfb': ttfb,
+        'total': time.perf_counter() - start,
+        'bytes': received,
+        'cancelled': cancelled
+    }
+    if ttfb is not None:
+        print(f"ElevenLabs stream: first byte in {ttfb * 1000:.0f} ms, "
+              f"{received} bytes in {stats['total'] * 1000:.0f} ms")
+    return stats
+
+
+def render_speech(text, output_format, base_url=None, api_key=None, voice_id=None):
+    """
+    Downloads the complete audio for the given text.
+
+    Args:
+        text (str): The text to synthesize.
+        output_format (str): The ElevenLabs output format.
+        base_url (str, optional): Overrides the ElevenLabs API URL.
+        api_key (str, optional): Overrides the configured API key.
+        voice_id (str, optional): Overrides the configured voice ID.
+
+    Returns:
+        bytes: The encoded audio.
+    """
+    url = (f"{base_url or ELEVENLABS_API_URL}/v1/text-to-speech/"
+           f"{voice_id or ELEVENLABS_VOICE_ID}")
+    response = get_http_session().post(url, headers=elevenlabs_headers(api_key),
+                                       json=elevenlabs_payload(text),
+                                       params={"output_format": output_format},
+                                       timeout=http_timeout())
+    response.raise_for_status()
+    return response.content
+
+
+def cache_format():
+    """Returns the output format that playback requests and caches."""
+    return ELEVENLABS_STREAM_FORMAT if ELEVENLABS_STREAMING else ELEVENLABS_DOWNLOAD_FORMAT
+
+
+def play_pcm_file(path, sink, chunk_size=ELEVENLABS_STREAM_CHUNK_SIZE,
+                  cancel_event=None):
+    """
+    Plays a cached PCM file through a sink.
+
+    Args:
+        path (str): The PCM file.
+        sink: An object with write(bytes) and close() methods.
+        chunk_size (int): Bytes written per block; must be even.
+        cancel_event (threading.Event, optional): Stops playback when set.
+    """
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(chunk_size), b''):
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                sink.write(block)
+    finally:
+        sink.close()
+
+
+def play_elevenlabs(text, cancel_event=None):
+    """
+    Speaks text with ElevenLabs, using the TTS cache when enabled.
+
+    Cached phrases are played straight from disk. Otherwise the audio is
+    streamed when possible, or downloaded in full, and then cached.
+
+    Args:
+        text (str): The text to speak.
+        cancel_event (threading.Event, optional): Stops streamed or cached
+            PCM playback when set. Downloaded MP3 clips play to the end.
+
+    Raises:
+        PartialPlaybackError: If streaming failed after audio was played.
+    """
+    cache = get_audio_cache() if TTS_CACHE_ENABLED else None
+    sink = open_audio_sink() if ELEVENLABS_STREAMING else None
+    output_format = ELEVENLABS_STREAM_FORMAT if sink else ELEVENLABS_DOWNLOAD_FORMAT
+    key = speech_cache_key(text, output_format)
+
+    cached_path = cache.get(key, output_format) if cache else None
+    if cached_path:
+        if sink:
+            play_pcm_file(cached_path, sink, cancel_event=cancel_event)
+        else:
+            playsound(cached_path)
+        return
+
+    if sink:
+        recorder = RecordingSink(sink)
+        try:
+            stats = stream_speech(text, recorder, cancel_event=cancel_event)
+        except Exception as e:
+            if recorder.recording.chunks:
+                # Speaking it again from the start would repeat what was heard
+                raise PartialPlaybackError(f"Stream failed mid-utterance: {e}") from e
+            raise
+        if cache and not stats['cancelled']:
+            cache.put(key, output_format, recorder.getvalue())
+        return
+
+    audio = render_speech(text, output_format)
+    if cache:
+        playsound(cache.put(key, output_format, audio))
+        return
+
+    audio_file = "www/assets/audio/temp_speech.mp3"
+    os.makedirs(os.path.dirname(audio_file), exist_ok=True)
+
+    with open(audio_file, 'wb') as f:
+        f.write(audio)
+
+    playsound(audio_file)
+
+    try:
+        os.remove(audio_file)
+    except OSError as e:
+        print(f"Error removing temp audio file: {e}")
@@ -0,0 +1,664 @@
+"""
+Vishwakarma AI - WhatsApp Automation
+© 2025 Vishwakarma Industries
+
+This module drives WhatsApp Desktop. It replaces a fixed five-second sleep
+and counted Tab presses with waits on readiness signals. A chat counts as
+open once a window titled WHATSAPP_WINDOW_TITLE is in front, the chat
+header has changed since the chat link was opened (so a chat that was
+already in front does not pass) and, when a screenshot of the control to
+use is available in WHATSAPP_TEMPLATE_DIR, that control is visible on
+screen. A message counts as sent only when the compose box changes after
+Send. Both changes must hold for two snapshots in a row, so a blinking
+caret or typing indicator does not count, and changes elsewhere in the
+window (a new message, a presence dot) are not looked at. When nothing
+can confirm a send, it is reported as unconfirmed rather than as done. Controls are addressed by locators: a
+template matched on screen (templates are loaded once and searched first
+near their last position), else a keyboard sequence. One session keeps
+the window open for several messages, and each action's latency is
+recorded. WhatsAppBroadcast sends one template, filled in per recipient,
+to a list of contacts in that session at a steady pace.
+"""
+import os
+import string
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import quote
+
+from engine.android_messaging import (FAILED, QUEUED, SENDING, SENT, UNKNOWN, RateLimiter,
+                                      dial_string)
+from engine.config import (WHATSAPP_MATCH_THRESHOLD, WHATSAPP_POLL_INTERVAL,
+                           WHATSAPP_RATE_PER_MINUTE, WHATSAPP_READY_TIMEOUT,
+                           WHATSAPP_SETTLE_SECONDS, WHATSAPP_TEMPLATE_DIR,
+                           WHATSAPP_WINDOW_TITLE)
+
+
+class WhatsAppError(RuntimeError):
+    """A WhatsApp action could not be completed."""
+
+
+class WhatsAppUnconfirmedError(WhatsAppError):
+    """Send was pressed but nothing confirmed that the message went out."""
+
+
+class Locator:
+    """How to reach one control: a screenshot of it, else keys to press."""
+
+    def __init__(self, name, template=None, keys=()):
+        """
+        Args:
+            name (str): The control, for messages and timings.
+            template (str): Image file name in the template directory.
+            keys (list): Key combinations pressed in order when the template
+                is missing or not found, e.g. [('ctrl', 'f'), ('tab',)].
+        """
+        self.name = name
+        self.template = template
+        self.keys = list(keys)
+
+    def __repr__(self):
+        return f"Locator({self.name!r})"
+
+
+# The URL opens the chat with the text already in the focused compose box,
+# so Enter sends it whatever the layout. The call buttons have no shortcut:
+# without a template they are reached by tabbing from the search box, which
+# only holds for the layout these counts were taken from.
+# Parts of the window, as (left, top, width, height) fractions of it,
+# watched for the chat opening and the message leaving the compose box
+CHAT_HEADER = (0.3, 0.0, 0.7, 0.1)
+COMPOSE_BOX = (0.3, 0.88, 0.7, 0.12)
+
+LOCATORS = {
+    'send': Locator('send', 'send.png', [('enter',)]),
+    'call': Locator('call', 'voice_call.png', [('ctrl', 'f')] + [('tab',)] * 7 + [('enter',)]),
+    'video_call': Locator('video_call', 'video_call.png', [('ctrl', 'f')] + [('tab',)] * 6 + [('enter',)]),
+}
+
+
+def chat_url(number, text=''):
+    """
+    Builds the link that opens a chat.
+
+    Args:
+        number (str): The phone number, in any format.
+        text (str): Text to put in the compose box.
+
+    Returns:
+        str: E.g. "whatsapp://send?phone=919876543210&text=hi".
+    """
+    return f"whatsapp://send?phone={dial_string(number).lstrip('+')}&text={quote(text or '')}"
+
+
+def open_url(url):
+    """Hands a URL to the application registered for it, without a shell."""
+    if hasattr(os, 'startfile'):
+        os.startfile(url)
+    else:
+        subprocess.Popen(['open' if sys.platform == 'darwin' else 'xdg-open', url],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class WhatsAppStep:
+    """The timing of one action, shaped like AdbResult for format_timings()."""
+
+    __slots__ = ('command', 'elapsed', 'ok')
+
+    def __init__(self, command, elapsed, ok):
+        self.command = command
+        self.elapsed = elapsed
+        self.ok = ok
+
+    def __repr__(self):
+        return f"WhatsAppStep({self.command!r}, {self.elapsed * 1000:.1f} ms)"
+
+
+class TemplateMatcher:
+    """Finds control screenshots on screen, with templates loaded once."""
+
+    def __init__(self, gui, directory=WHATSAPP_TEMPLATE_DIR, threshold=WHATSAPP_MATCH_THRESHOLD):
+        """
+        Args:
+            gui: pyautogui, or anything with its screenshot().
+            directory (str): Where the template images are.
+            threshold (float): Lowest normalized correlation (0-1) that
+                counts as a match.
+
+        Raises:
+            ImportError: If OpenCV is not installed.
+        """
+        import cv2
+        import numpy
+        self._cv2 = cv2
+        self._numpy = numpy
+        self.gui = gui
+        self.directory = directory
+        self.threshold = threshold
+        self._templates = {}   # name -> grayscale image, or None if missing
+        self._last_seen = {}   # name -> screen position of its top-left corner
+        self._lock = threading.Lock()
+
+    def available(self, name):
+        """Whether a template for this name exists."""
+        return self._template(name) is not None
+
+    def locate(self, name, region=None):
+        """
+        Finds a template on screen.
+
+        Args:
+            name (str): The template's file name.
+            region (tuple): (left, top, width, height) to search; the whole
+                screen if None.
+
+        Returns:
+            tuple: The (x, y) screen position of its center, or None.
+        """
+        template = self._template(name)
+        if template is None:
+            return None
+        image = self._gray(self.gui.screenshot(region=region))
+        origin = region[:2] if region else (0, 0)
+        height, width = template.shape[:2]
+
+        # Controls rarely move, so search around the last hit before the rest
+        last = self._last_seen.get(name)
+        if last is not None:
+            x, y = last[0] - origin[0], last[1] - origin[1]
+            left, top = max(x - width, 0), max(y - height, 0)
+            found = self._match(image[top:y + 2 * height, left:x + 2 * width], template)
+            if found is not None:
+                found = (found[0] + left, found[1] + top)
+        if last is None or found is None:
+            found = self._match(image, template)
+        if found is None:
+            return None
+        with self._lock:
+            self._last_seen[name] = (found[0] + origin[0], found[1] + origin[1])
+        return found[0] + origin[0] + width // 2, found[1] + origin[1] + height // 2
+
+    def _template(self, name):
+        with self._lock:
+            if name not in self._templates:
+                path = os.path.join(self.directory, name)
+                image = self._cv2.imread(path, self._cv2.IMREAD_GRAYSCALE) if os.path.isfile(path) else None
+                self._templates[name] = image
+            return self._templates[name]
+
+    def _gray(self, screenshot):
+        image = self._numpy.asarray(screenshot)
+        if image.ndim == 3:
+            image = self._cv2.cvtColor(image, self._cv2.COLOR_RGB2GRAY)
+        return image
+
+    def _match(self, image, template):
+        if image.shape[0] < template.shape[0] or image.shape[1] < template.shape[1]:
+            return None
+        scores = self._cv2.matchTemplate(image, template, self._cv2.TM_CCOEFF_NORMED)
+        _, best, _, position = self._cv2.minMaxLoc(scores)
+        return position if best >= self.threshold else None
+
+
+def create_template_matcher(gui, directory=WHATSAPP_TEMPLATE_DIR):
+    """
+    Creates a template matcher if there is anything to match.
+
+    Returns:
+        TemplateMatcher: The matcher, or None without OpenCV or templates.
+    """
+    if not os.path.isdir(directory) or not os.listdir(directory):
+        return None
+    try:
+        return TemplateMatcher(gui, directory)
+    except ImportError:
+        print("OpenCV not installed. Locating WhatsApp controls by keyboard only.")
+        return None
+
+
+class WhatsAppSession:
+    """One WhatsApp Desktop window, driven action by action."""
+
+    def __init__(self, gui=None, matcher=None, opener=open_url, title=WHATSAPP_WINDOW_TITLE,
+                 timeout=WHATSAPP_READY_TIMEOUT, interval=WHATSAPP_POLL_INTERVAL,
+                 settle_seconds=WHATSAPP_SETTLE_SECONDS, locators=None,
+                 clock=time.monotonic, sleep=time.sleep):
+        """
+        Args:
+            gui: pyautogui, or anything with its hotkey(), click() and
+                (optionally) screenshot() and getActiveWindowTitle().
+            matcher (TemplateMatcher): Finds controls on screen; keyboard
+                locators only if None.
+            opener (callable): Opens a whatsapp:// URL.
+            title (str): Part of the WhatsApp window's title.
+            timeout (float): Seconds to wait for a chat to be ready.
+            interval (float): Seconds between readiness checks.
+            settle_seconds (float): Pause after the window is in front when
+                no template shows that the chat itself has loaded.
+            locators (dict): Action name -> Locator; LOCATORS if None.
+        """
+        if gui is None:
+            import pyautogui as gui
+        self.gui = gui
+        self.matcher = matcher
+        self.opener = opener
+        self.title = title
+        self.timeout = timeout
+        self.interval = interval
+        self.settle_seconds = settle_seconds
+        self.locators = dict(LOCATORS if locators is None else locators)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.RLock()
+        self._recorders = []
+        self._totals = {}  # action -> [count, seconds]
+
+    def send_message(self, number, text):
+        """
+        Opens a chat with the text filled in and sends it.
+
+        Args:
+            number (str): The recipient.
+            text (str): The message.
+
+        Raises:
+            WhatsAppError: If the chat did not open or Send was not found.
+            WhatsAppUnconfirmedError: If Send was pressed but the screen
+                did not show the message leaving; it may have been sent.
+        """
+        if not text:
+            raise ValueError("Nothing to send")
+        send = self.locators['send']
+        with self._lock:
+            self.open_chat(number, text, ready=send)
+            before = self._snapshot(COMPOSE_BOX)
+            self.activate(send)
+            try:
+                with self._step("wait sent"):
+                    if self._has_template(send):
+                        # The send button turns back into the microphone once
+                        # the compose box is empty, i.e. the message has left it
+                        self._wait(lambda: self._locate(send) is None, "the message to be sent")
+                    elif before is not None:
+                        # The compose box empties
+                        self._wait_changed(COMPOSE_BOX, before, "the message to be sent")
+                    else:
+                        raise WhatsAppError("nothing on screen can be checked")
+            except WhatsAppError as e:
+                raise WhatsAppUnconfirmedError(f"Pressed Send, but could not confirm the message: {e}") from e
+
+    @contextmanager
+    def batch(self):
+        """
+        Holds the window for several actions, so that no other caller's
+        message or call lands in between.
+
+        Yields:
+            WhatsAppSession: This session.
+        """
+        with self._lock:
+            yield self
+
+    def send_messages(self, messages, progress=None):
+        """
+        Sends several messages in this window, one after the other.
+
+        Args:
+            messages (list): (number, text) tuples.
+            progress (callable): Called with (index, number, error) after
+                each message; error is None when it was sent.
+
+        Returns:
+            list: The error message of each message, None where it was sent.
+        """
+        errors = []
+        for index, (number, text) in enumerate(messages):
+            try:
+                self.send_message(number, text)
+                error = None
+            except (WhatsAppError, ValueError) as e:
+                error = str(e)
+            errors.append(error)
+            if progress is not None:
+                progress(index, number, error)
+        return errors
+
+    def call(self, number, video=False):
+        """
+        Opens a chat and starts a voice or video call.
+
+        Args:
+            number (str): The person to call.
+            video (bool): Start a video call.
+        """
+        locator = self.locators['video_call' if video else 'call']
+        with self._lock:
+            self.open_chat(number, ready=locator)
+            self.activate(locator)
+
+    def open_chat(self, number, text='', ready=None):
+        """
+        Opens a chat and waits until it can be used.
+
+        Args:
+            number (str): The contact's number.
+            text (str): Text to fill the compose box with.
+            ready (Locator): The control that shows the chat is ready.
+
+        Raises:
+            WhatsAppError: If the window, the chat or the control did not
+                appear in time.
+        """
+        with self._lock:
+            # A window that is already in front passes the title check at
+            # once, so the chat opening is seen as its header changing
+            before = self._snapshot(CHAT_HEADER)
+            with self._step("open chat"):
+                self.opener(chat_url(number, text))
+            with self._step("wait window"):
+                self._wait(self._window_active, f"a window titled '{self.title}'")
+            if before is not None:
+                with self._step("wait chat"):
+                    self._wait_changed(CHAT_HEADER, before, "the chat to open")
+            if ready is not None and self._has_template(ready):
+                with self._step(f"wait {ready.name}"):
+                    self._wait(lambda: self._locate(ready) is not None, f"the {ready.name} control")
+            elif self.settle_seconds:
+                # Nothing to watch for: give the chat a moment to load
+                with self._step("settle"):
+                    self._sleep(self.settle_seconds)
+
+    def activate(self, locator):
+        """
+        Clicks a control, or presses its keys when it cannot be found.
+
+        Args:
+            locator (Locator or str): The control, or its action name.
+
+        Raises:
+            WhatsAppError: If the control has no template on screen and no keys.
+        """
+        if isinstance(locator, str):
+            locator = self.locators[locator]
+        with self._lock, self._step(locator.name):
+            position = self._locate(locator)
+            if position is not None:
+                self.gui.click(*position)
+            elif locator.keys:
+                for keys in locator.keys:
+                    self.gui.hotkey(*keys)
+            else:
+                raise WhatsAppError(f"The {locator.name} control is not on screen")
+
+    @contextmanager
+    def record(self):
+        """
+        Collects the timings of the actions that finish inside the block.
+
+        Yields:
+            list: WhatsAppStep objects, in order.
+        """
+        steps = []
+        with self._lock:
+            self._recorders.append(steps)
+        try:
+            yield steps
+        finally:
+            with self._lock:
+                self._recorders.remove(steps)
+
+    def stats(self):
+        """
+        Reports the latency of each kind of action so far.
+
+        Returns:
+            dict: Action -> {'count', 'mean_ms', 'total_ms'}.
+        """
+        with self._lock:
+            return {action: {'count': count, 'mean_ms': seconds * 1000 / count,
+                             'total_ms': seconds * 1000}
+                    for action, (count, seconds) in self._totals.items()}
+
+    @contextmanager
+    def _step(self, action):
+        start = self._clock()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            elapsed = self._clock() - start
+            with self._lock:
+                total = self._totals.setdefault(action, [0, 0.0])
+                total[0] += 1
+                total[1] += elapsed
+                for steps in self._recorders:
+                    steps.append(WhatsAppStep(action, elapsed, ok))
+
+    def _wait(self, condition, what):
+        deadline = self._clock() + self.timeout
+        while not condition():
+            if self._clock() >= deadline:
+                raise WhatsAppError(f"Timed out after {self.timeout:g}s waiting for {what}")
+            self._sleep(self.interval)
+
+    def _window_active(self):
+        get_title = getattr(self.gui, 'getActiveWindowTitle', None)
+        if get_title is None:
+            # No window titles on this platform
+            return True
+        try:
+            return self.title.casefold() in (get_title() or '').casefold()
+        except Exception:
+            return True
+
+    def _wait_changed(self, area, before, what):
+        """Waits until a part of the window differs from `before` in two snapshots in a row."""
+        last = [None]
+
+        def changed():
+            now = self._snapshot(area)
+            settled = now is not None and now != before and now == last[0]
+            last[0] = now
+            return settled
+
+        self._wait(changed, what)
+
+    def _snapshot(self, area):
+        """
+        The pixels of a part of the window, to tell whether it changed.
+
+        Args:
+            area (tuple): (left, top, width, height) fractions of the window.
+
+        Returns:
+            bytes: The pixels, or None if they cannot be read.
+        """
+        screenshot = getattr(self.gui, 'screenshot', None)
+        if screenshot is None:
+            return None
+        try:
+            window = self._window_region()
+            if window is None:
+                # No window geometry on this platform: assume it fills the screen
+                window = (0, 0) + tuple(self.gui.size())
+            left, top, width, height = window
+            region = (left + int(area[0] * width), top + int(area[1] * height),
+                      max(int(area[2] * width), 1), max(int(area[3] * height), 1))
+            image = screenshot(region=region)
+        except Exception:
+            # E.g. no screenshot tool on this desktop
+            return None
+        return image.tobytes() if hasattr(image, 'tobytes') else image
+
+    def _has_template(self, locator):
+        return self.matcher is not None and locator.template is not None \
+            and self.matcher.available(locator.template)
+
+    def _locate(self, locator):
+        if not self._has_template(locator):
+            return None
+        return self.matcher.locate(locator.template, self._window_region())
+
+    def _window_region(self):
+        get_window = getattr(self.gui, 'getActiveWindow', None)
+        try:
+            window = get_window() if get_window is not None else None
+            return (window.left, window.top, window.width, window.height) if window else None
+        except Exception:
+            return None
+
+
+class _KeepMissing(dict):
+    def __missing__(self, key):
+        return '{' + key + '}'
+
+
+def render_message(template, fields):
+    """
+    Fills a message template in for one recipient.
+
+    Args:
+        template (str): E.g. "Hi {first_name}, the meeting moved to 5pm".
+        fields (dict): Values for the placeholders; placeholders without
+            one are left as they are.
+
+    Returns:
+        str: The message.
+    """
+    try:
+        return string.Formatter().vformat(template, (), _KeepMissing(fields))
+    except (ValueError, IndexError, AttributeError, KeyError):
+        # Stray braces or {0}-style fields: send the text as written
+        return template
+
+
+class WhatsAppStatus:
+    """The state of one message of a broadcast."""
+
+    __slots__ = ('index', 'recipient', 'name', 'number', 'text', 'state', 'error', 'elapsed')
+
+    def __init__(self, index, recipient):
+        self.index = index
+        self.recipient = recipient
+        self.name = None
+        self.number = None
+        self.text = None
+        self.state = QUEUED
+        self.error = None
+        self.elapsed = 0.0
+
+    def as_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self):
+        return f"WhatsAppStatus({self.recipient!r}, {self.state!r})"
+
+
+class WhatsAppBroadcast:
+    """Sends one template to many contacts in a single WhatsApp session."""
+
+    def __init__(self, session, resolve, rate_per_minute=WHATSAPP_RATE_PER_MINUTE,
+                 clock=time.monotonic, sleep=time.sleep):
+        """
+        Args:
+            session (WhatsAppSession): The window to send from.
+            resolve (callable): Name -> (number, name) of the one contact
+                the name surely refers to (e.g. an exact match), else
+                (None, None). Nobody confirms a guess during a broadcast,
+                so a loose match would message the wrong person.
+            rate_per_minute (float): Messages per minute; 0 for no pause.
+        """
+        self.session = session
+        self.resolve = resolve
+        self.limiter = RateLimiter(rate_per_minute, clock=clock, sleep=sleep)
+
+    def send(self, recipients, template, progress=None):
+        """
+        Sends the template to each recipient, in order.
+
+        Args:
+            recipients (list): Contact names, or dicts with a 'name', an
+                optional 'number' (skips the lookup) and any other fields
+                the template uses.
+            template (str): The message, with {name}, {first_name},
+                {number} and per-recipient placeholders.
+            progress (callable): Called with a WhatsAppStatus whenever one
+                changes state.
+
+        Returns:
+            list: A WhatsAppStatus per recipient, in the given order.
+        """
+        statuses = [WhatsAppStatus(index, recipient) for index, recipient in enumerate(recipients)]
+        # Unknown contacts fail before anything is sent
+        ready = [status for status in statuses if self._prepare(status, template)]
+        for status in statuses:
+            _notify(progress, status)
+
+        # Hold the window for the whole batch so nothing interleaves
+        with self.session.batch():
+            for status in ready:
+                self.limiter.wait()
+                status.state = SENDING
+                _notify(progress, status)
+                with self.session.record() as steps:
+                    try:
+                        self.session.send_message(status.number, status.text)
+                        status.state = SENT
+                    except WhatsAppUnconfirmedError as e:
+                        status.state, status.error = UNKNOWN, str(e)
+                    except (WhatsAppError, ValueError) as e:
+                        status.state, status.error = FAILED, str(e)
+                status.elapsed = sum(step.elapsed for step in steps)
+                _notify(progress, status)
+        return statuses
+
+    def _prepare(self, status, template):
+        recipient = status.recipient
+        fields = dict(recipient) if isinstance(recipient, dict) else {'name': recipient}
+        query = str(fields.get('name') or '').strip()
+        number, name = fields.get('number'), query
+        try:
+            if not number:
+                number, name = self.resolve(query)
+                if not number:
+                    raise LookupError(f"Contact not found (or not an exact match): {query!r}")
+            status.number = dial_string(number)
+        except (LookupError, ValueError) as e:
+            status.state, status.error = FAILED, str(e)
+            return False
+        status.name = name or query
+        fields.update(name=status.name, first_name=status.name.split()[0] if status.name else '',
+                      number=status.number)
+        status.text = render_message(template, fields)
+        return True
+
+
+def _notify(progress, status):
+    if progress is None:
+        return
+    try:
+        progress(status)
+    except Exception as e:
+        print(f"Error reporting WhatsApp progress: {e}")
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_whatsapp_session():
+    """
+    Returns the shared WhatsApp session, created on first use.
+
+    Returns:
+        WhatsAppSession: The session.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            import pyautogui
+            _session = WhatsAppSession(pyautogui, create_template_matcher(pyautogui))
+        return _session
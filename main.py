@@ -5,11 +5,17 @@ Vishwakarma AI - Main Application
 This module initializes and runs the Vishwakarma AI application.
 """
 import os
+import threading
+import time
 import eel
-from engine.features import playAssistantSound
-from engine.command import speak
+from engine.features import playAssistantSound, whatsAppBulk
+from engine.app_index import get_app_index
+from engine.command import get_listener, speak
+from engine.command_catalog import get_command_catalog
+from engine.config import CONTINUOUS_LISTENING
+from engine.conversation import set_active_user
 from engine.auth.recognize import FaceAuthenticator
-from engine.profile_manager import ProfileManager
+from engine.profile_manager import ProfileManager, build_greeting
 
 @eel.expose
 def init_app():
@@ -33,18 +39,17 @@ def handle_successful_authentication(profile_manager, authenticator):
     """Handles the logic after a successful face authentication."""
     user_id = authenticator.get_authenticated_user_id()
     profile = profile_manager.get_profile(user_id)
+    set_active_user(user_id)
 
     eel.hideFaceAuth()
     speak("Face Authentication Successful")
     eel.hideFaceAuthSuccess()
 
-    greeting = (f"Hello {profile['name']}, Welcome back! "
-                f"I am Vishwakarma AI, How can I assist you today?") \
-        if profile else \
-        "Hello, Welcome! I am Vishwakarma AI, How can I assist you today?"
-
-    speak(greeting)
+    greeting = speak(build_greeting(profile))
     eel.hideStart()
+
+    # Let the greeting finish before the listening cue plays
+    greeting.wait()
     playAssistantSound()
 
 @eel.expose
@@ -73,15 +78,67 @@ def switchProfile(user_id):
     """Switches to a different profile."""
     profile = ProfileManager().get_profile(user_id)
     if profile:
+        set_active_user(user_id)
         speak(f"Switching to {profile['name']}'s profile")
         return {"success": True, "profile": profile}
     return {"success": False}
 
+@eel.expose
+def getCommands(kind=None):
+    """Lists the commands "open ..." understands."""
+    return [entry.as_dict() for entry in get_command_catalog().list_commands(kind)]
+
+@eel.expose
+def addCommands(commands):
+    """Adds or replaces commands given as {name, target, aliases} objects."""
+    try:
+        return {"success": True, "count": get_command_catalog().add_commands(commands)}
+    except Exception as e:
+        print(f"Error adding commands: {e}")
+        return {"success": False, "error": str(e)}
+
+@eel.expose
+def removeCommands(names):
+    """Removes commands by name or alias."""
+    return {"success": True, "count": get_command_catalog().remove_commands(names)}
+
+@eel.expose
+def sendWhatsAppBulk(recipients, template):
+    """
+    Sends a WhatsApp message to several contacts in the background.
+
+    Each recipient's progress and any failure reaches the UI through
+    whatsAppProgress(job, status, total).
+    """
+    if not recipients or not (template or '').strip():
+        return {"success": False, "error": "Recipients and a message are required"}
+    job = f"whatsapp-{time.monotonic_ns()}"
+    total = len(recipients)
+
+    def run():
+        try:
+            whatsAppBulk(recipients, template, progress=lambda status: eel.whatsAppProgress(
+                job, status.as_dict(), total))
+        except Exception as e:
+            print(f"Error sending WhatsApp messages: {e}")
+
+    threading.Thread(target=run, name=job, daemon=True).start()
+    return {"success": True, "job": job, "count": total}
+
 def start():
     """Starts the Vishwakarma AI application."""
     eel.init("www")
     
     playAssistantSound()
 
+    if CONTINUOUS_LISTENING:
+        # Open the microphone once for the whole session
+        get_listener()
+
+    app_index = get_app_index()
+    if app_index is not None:
+        # Find installed applications before the first "open ..."
+        app_index.refresh_in_background()
+
     # os.system('start msedge.exe --app="http://localhost:8000/index.html"')
     eel.start('index.html', mode=None, host='localhost', block=True)
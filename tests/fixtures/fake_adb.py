@@ -0,0 +1,154 @@
+"""
+Vishwakarma AI - Fake ADB
+© 2025 Vishwakarma Industries
+
+Stands in for `adb` in the tests. `shell` runs a local sh in which
+`input`, `dumpsys`, `uiautomator`, `cmd`, `am` and `service` behave like
+a small phone, with its state in $FAKE_ADB_DIR:
+
+    input.log   input events, `am` and `service` calls, one per line,
+                prefixed with the device serial
+    focus       the focused window ("package/activity"); each device
+                picked with -s has its own, focus.<serial>
+    screens     "<input arguments> <component>" lines: that event focuses
+                the component shortly afterwards, as if it started an
+                activity (e.g. "tap 393 2202 com.android.mms/.ui.Compose";
+                "am <action> <component>" for intents)
+    ui          "<component> <xml file>" lines: what `uiautomator dump`
+                writes while the component has focus; /sdcard/ paths are
+                kept under $FAKE_ADB_DIR, in a <serial> directory for a
+                device picked with -s
+
+`am` and `service` fail when their arguments contain $FAKE_ADB_FAIL, and
+`devices` lists the serials in $FAKE_ADB_DEVICES.
+
+Usage:
+    python fake_adb.py [-s SERIAL] devices
+    python fake_adb.py [-s SERIAL] shell [COMMAND...]
+"""
+import os
+import subprocess
+import sys
+import threading
+
+LAUNCHER = "com.android.launcher3/.Launcher"
+
+PRELUDE = r'''
+FOCUS_FILE="$FAKE_ADB_DIR/focus"
+DEVICE_DIR="$FAKE_ADB_DIR"
+if [ "$ADB_SERIAL" != default ]; then
+    FOCUS_FILE="$FOCUS_FILE.$ADB_SERIAL"
+    DEVICE_DIR="$FAKE_ADB_DIR/$ADB_SERIAL"
+fi
+focus_later() {
+    ( sleep "${FAKE_ADB_SCREEN_DELAY:-0.2}"; echo "$1" > "$FOCUS_FILE" ) >/dev/null 2>&1 &
+}
+input() {
+    echo "$ADB_SERIAL input $*" >> "$FAKE_ADB_DIR/input.log"
+    if [ "$1" = keyevent ] && [ "$2" = 3 ]; then focus_later "%(launcher)s"; fi
+    if [ -f "$FAKE_ADB_DIR/screens" ]; then
+        target=$(awk -v event="$*" 'index($0, event " ") == 1 { print $NF; exit }' "$FAKE_ADB_DIR/screens")
+        if [ -n "$target" ]; then focus_later "$target"; fi
+    fi
+    return 0
+}
+uiautomator() {
+    focus=$(command cat "$FOCUS_FILE" 2>/dev/null)
+    fixture=$(awk -v focus="$focus" '$1 == focus { print $2; exit }' "$FAKE_ADB_DIR/ui" 2>/dev/null)
+    if [ -z "$fixture" ]; then
+        echo "ERROR: could not get idle state."
+        return 1
+    fi
+    mkdir -p "$(dirname "$DEVICE_DIR$2")"
+    command cat "$fixture" > "$DEVICE_DIR$2"
+    echo "UI hierchary dumped to: $2"
+}
+cat() {
+    case "$1" in
+        /sdcard/*) command cat "$DEVICE_DIR$1" ;;
+        *) command cat "$@" ;;
+    esac
+}
+dumpsys() {
+    echo "WINDOW MANAGER WINDOWS (dumpsys window windows)"
+    if [ -s "$FOCUS_FILE" ]; then
+        echo "  mCurrentFocus=Window{4f2a1c u0 $(cat "$FOCUS_FILE")}"
+    else
+        echo "  mCurrentFocus=null"
+    fi
+}
+cmd() {
+    echo "priority=0 preferredOrder=0 match=0x108000 specificIndex=-1 isDefault=true"
+    echo "%(launcher)s"
+}
+am() {
+    echo "$ADB_SERIAL am $*" >> "$FAKE_ADB_DIR/input.log"
+    if fails "$@"; then
+        echo "Error: Activity not started, unable to resolve Intent"
+        return 0
+    fi
+    action=""
+    previous=""
+    for arg in "$@"; do
+        if [ "$previous" = -a ]; then action=$arg; fi
+        previous=$arg
+    done
+    # Like -W: the activity has focus when am returns
+    if [ -f "$FAKE_ADB_DIR/screens" ]; then
+        target=$(awk -v event="am $action" 'index($0, event " ") == 1 { print $NF; exit }' "$FAKE_ADB_DIR/screens")
+        if [ -n "$target" ]; then echo "$target" > "$FOCUS_FILE"; fi
+    fi
+    echo "Starting: Intent { act=$action }"
+    echo "Status: ok"
+}
+service() {
+    echo "$ADB_SERIAL service $*" >> "$FAKE_ADB_DIR/input.log"
+    if fails "$@"; then
+        echo "Result: Parcel(fffffffc ffffffff '........')"
+    else
+        echo "Result: Parcel(00000000    '....')"
+    fi
+}
+fails() {
+    [ -n "$FAKE_ADB_FAIL" ] && case "$*" in *"$FAKE_ADB_FAIL"*) true ;; *) false ;; esac
+}
+''' % {'launcher': LAUNCHER}
+
+
+def main():
+    args = sys.argv[1:]
+    serial = 'default'
+    if args[:1] == ['-s']:
+        serial, args = args[1], args[2:]
+    env = dict(os.environ, ADB_SERIAL=serial)
+
+    if args[:1] == ['devices']:
+        print("List of devices attached")
+        for device in os.environ.get('FAKE_ADB_DEVICES', 'emulator-5554').split(','):
+            print(f"{device}\tdevice")
+        return 0
+    if args[:1] != ['shell']:
+        print(f"fake adb: unsupported command {args}", file=sys.stderr)
+        return 1
+
+    if len(args) > 1:
+        return subprocess.call(['sh', '-c', PRELUDE + ' '.join(args[1:])], env=env)
+
+    # Interactive session: feed the prelude, then forward stdin line by
+    # line; like adb, exit as soon as the shell does
+    shell = subprocess.Popen(['sh'], stdin=subprocess.PIPE, env=env)
+    shell.stdin.write(PRELUDE.encode())
+    shell.stdin.flush()
+    threading.Thread(target=lambda: os._exit(shell.wait()), daemon=True).start()
+    try:
+        for line in iter(sys.stdin.buffer.readline, b''):
+            shell.stdin.write(line)
+            shell.stdin.flush()
+        shell.stdin.close()
+    except BrokenPipeError:
+        pass
+    return shell.wait()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Vishwakarma AI - ADB Session Manager Tests
+© 2025 Vishwakarma Industries
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+
+from engine import helper
+from engine.adb import AdbError, AdbShell, format_timings
+
+FAKE_ADB = [sys.executable, os.path.join(os.path.dirname(__file__), 'fixtures', 'fake_adb.py')]
+MESSAGES = "com.google.android.apps.messaging"
+
+
+@unittest.skipIf(shutil.which('sh') is None, "the fake adb needs a POSIX shell")
+class TestAdbShell(unittest.TestCase):
+    """Unit tests for the persistent adb shell session, against a fake adb."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.env = patch.dict(os.environ, {'FAKE_ADB_DIR': self.directory})
+        self.env.start()
+        self.shell = AdbShell(adb=FAKE_ADB, timeout=5)
+
+    def tearDown(self):
+        self.shell.close()
+        self.env.stop()
+        shutil.rmtree(self.directory)
+
+    def set_focus(self, component):
+        with open(os.path.join(self.directory, 'focus'), 'w') as f:
+            f.write(component)
+
+    def set_screens(self, *screens):
+        with open(os.path.join(self.directory, 'screens'), 'w') as f:
+            f.writelines(f"tap {x} {y} {component}\n" for x, y, component in screens)
+
+    def events(self):
+        path = os.path.join(self.directory, 'input.log')
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [line.split(' ', 1)[1].strip() for line in f]
+
+    def test_output_and_status(self):
+        self.assertEqual(self.shell.run("echo hello").output, "hello\n")
+        self.assertEqual(self.shell.run("printf 'no newline'").output, "no newline")
+        self.assertEqual(self.shell.run("true").output, "")
+        failed = self.shell.run("echo oops >&2; false")
+        self.assertEqual((failed.output, failed.status, failed.ok), ("oops\n", 1, False))
+        with self.assertRaises(AdbError):
+            self.shell.run("ls /does-not-exist", check=True)
+
+    def test_one_process_for_many_commands(self):
+        with patch.object(subprocess, 'Popen', wraps=subprocess.Popen) as popen:
+            results = self.shell.run_batch([f"echo {i}" for i in range(100)])
+            self.shell.run("echo again")
+        self.assertEqual([r.output for r in results], [f"{i}\n" for i in range(100)])
+        self.assertEqual(popen.call_count, 1)
+        self.assertEqual(self.shell.commands, 101)
+        self.assertTrue(all(r.elapsed >= 0 for r in results))
+
+    def test_input_events(self):
+        self.shell.tap(540, 1200.4)
+        self.shell.back(3)
+        self.shell.text("it's me")
+        self.assertEqual(self.events(), ["input tap 540 1200", "input keyevent 4", "input keyevent 4",
+                                         "input keyevent 4", "input text it's%sme"])
+
+    def test_wait_for_screen_changes(self):
+        self.set_focus("com.android.settings/.Settings")
+        self.set_screens((136, 2220, f"{MESSAGES}/.ConversationListActivity"))
+
+        self.assertEqual(self.shell.home(), "com.android.launcher3/.Launcher")
+        home = self.shell.current_focus()
+        self.shell.tap(136, 2220)
+        self.assertEqual(self.shell.wait_for_focus_change(home), f"{MESSAGES}/.ConversationListActivity")
+
+        start = time.monotonic()
+        self.assertIsNone(self.shell.wait_for_focus("com.whatsapp", timeout=0.3, interval=0.05))
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_timeout_restarts_session(self):
+        with self.assertRaises(AdbError):
+            self.shell.run("sleep 5", timeout=0.3)
+        self.assertEqual(self.shell.run("echo back").output, "back\n")
+        self.assertEqual(self.shell.restarts, 1)
+
+    def test_shell_exit_fails_pending_and_restarts(self):
+        with self.assertRaises(AdbError):
+            self.shell.run("exit 3")
+        self.assertEqual(self.shell.run("echo back").output, "back\n")
+        self.assertEqual(self.shell.restarts, 1)
+
+    def test_restart_ignores_the_old_session_output(self):
+        self.shell.run("true")
+        old_process, old_marker = self.shell._process, self.shell._marker
+        self.shell.close()
+        future = self.shell.submit("sleep 0.3; echo new")
+        # The old session's reader still had a marker line in its pipe
+        old_process = MagicMock(stdout=iter(["stale\n", "\n", f"{old_marker}1:7\n"]))
+        self.shell._read(old_process, old_marker)
+        result = future.result(5)
+        self.assertEqual((result.output, result.status), ("new\n", 0))
+
+    def test_marker_must_match_the_pending_command(self):
+        shell = AdbShell(adb=FAKE_ADB)
+        process = MagicMock(stdout=iter(["early\n", "\n", "__m_1:3\n", "mine\n", "\n", "__m_2:0\n"]))
+        future = Future()
+        shell._process = process
+        shell._pending.append((future, "echo mine", time.perf_counter(), 2))
+        shell._read(process, "__m_")
+        self.assertEqual((future.result(0).output, future.result(0).status), ("mine\n", 0))
+
+    def test_missing_adb(self):
+        shell = AdbShell(adb="/nonexistent/adb")
+        with self.assertRaises(AdbError):
+            shell.run("echo hi")
+
+    def test_record_timings(self):
+        with self.shell.record() as steps:
+            self.shell.run_batch(["input keyevent 3", "false"])
+        self.assertEqual([s.command for s in steps], ["input keyevent 3", "false"])
+        report = format_timings(steps)
+        self.assertIn("ERR  false", report)
+        self.assertIn("total (2 steps)", report)
+
+    def test_helpers_use_the_session(self):
+        with patch.object(helper, 'get_adb_shell', return_value=self.shell):
+            helper.goback(4)
+            helper.keyEvent(3)
+            helper.tapEvents(10, 20)
+            helper.adbInput("hi%sthere")
+        self.assertEqual(self.events(), ["input keyevent 4"] * 4 + ["input keyevent 3", "input tap 10 20",
+                                                                    "input text hi%sthere"])
+        self.assertEqual(self.shell.commands, 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
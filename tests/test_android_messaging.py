@@ -0,0 +1,196 @@
+"""
+Vishwakarma AI - Android Messaging Tests
+© 2025 Vishwakarma Industries
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault('pyautogui', MagicMock())
+sys.modules.setdefault('pywhatkit', MagicMock())
+sys.modules.setdefault('playsound', MagicMock())
+
+from engine import android_messaging, features
+from engine.adb import AdbError, AdbShell
+from engine.android_messaging import (FAILED, SENT, UNKNOWN, IntentSmsSender, RateLimiter,
+                                      ServiceCallSmsSender, SmsDispatcher, SmsUnconfirmedError,
+                                      create_sms_sender, dial_string, list_devices, place_call)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+FAKE_ADB = [sys.executable, os.path.join(FIXTURES, 'fake_adb.py')]
+CONVERSATION = "com.google.android.apps.messaging/.ui.conversation.ConversationActivity"
+CONVERSATION_LIST = "com.google.android.apps.messaging/.ui.ConversationListActivity"
+
+
+class TestHelpers(unittest.TestCase):
+    """Unit tests for number cleanup and pacing."""
+
+    def test_dial_string(self):
+        self.assertEqual(dial_string("+91 98765-43210"), "+919876543210")
+        self.assertEqual(dial_string("(022) 2345 6789"), "02223456789")
+        with self.assertRaises(ValueError):
+            dial_string("mom")
+
+    def test_rate_limiter(self):
+        now = [100.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        limiter = RateLimiter(30, clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            limiter.wait()
+        self.assertEqual(sleeps, [2.0, 2.0])
+
+        # Time already spent elsewhere counts towards the interval
+        now[0] += 1.5
+        limiter.wait()
+        self.assertEqual(sleeps, [2.0, 2.0, 0.5])
+        RateLimiter(0, sleep=sleep).wait()
+        self.assertEqual(len(sleeps), 3)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_sms_sender(MagicMock(), backend='carrier-pigeon')
+        with self.assertRaises(ValueError):
+            ServiceCallSmsSender(MagicMock(), template='')
+
+
+@unittest.skipIf(shutil.which('sh') is None, "the fake adb needs a POSIX shell")
+class TestAgainstFakeAdb(unittest.TestCase):
+    """Sends messages and calls through a fake adb with two phones."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open(os.path.join(self.directory, 'ui'), 'w') as f:
+            f.write(f"{CONVERSATION} {os.path.join(FIXTURES, 'ui', 'conversation.xml')}\n")
+        self.write_screens(f"am android.intent.action.SENDTO {CONVERSATION}",
+                           # Sent: exit_on_sent leaves the compose screen
+                           f"tap 969 2215 {CONVERSATION_LIST}")
+        self.env = patch.dict(os.environ, {'FAKE_ADB_DIR': self.directory,
+                                           'FAKE_ADB_DEVICES': 'emulator-5554,R58M12345',
+                                           'FAKE_ADB_FAIL': '+910000000000'})
+        self.env.start()
+        self.shell = AdbShell(adb=FAKE_ADB, timeout=5)
+
+    def tearDown(self):
+        self.shell.close()
+        self.env.stop()
+        shutil.rmtree(self.directory)
+
+    def write_screens(self, *lines):
+        with open(os.path.join(self.directory, 'screens'), 'w') as f:
+            f.writelines(f"{line}\n" for line in lines)
+
+    def log(self):
+        with open(os.path.join(self.directory, 'input.log'), encoding='utf-8') as f:
+            return [line.strip() for line in f]
+
+    def test_list_devices(self):
+        self.assertEqual(list_devices(FAKE_ADB), ['emulator-5554', 'R58M12345'])
+        self.assertEqual(list_devices(['/nonexistent/adb']), [])
+
+    def test_intent_sender(self):
+        sender = IntentSmsSender(self.shell)
+        sender.send("+91 98765 43210", "नमस्ते, it's 5pm")
+        sender.send("9876543211", "second")
+        log = self.log()
+        self.assertEqual(log[0], "default am start -W -a android.intent.action.SENDTO -d smsto:+919876543210 "
+                                 "--es sms_body नमस्ते, it's 5pm --ez exit_on_sent true")
+        self.assertEqual(log[1], "default input tap 969 2215")
+        self.assertEqual(len(log), 4)
+        # Send is always looked up on a fresh dump, never a cached layout
+        self.assertEqual(sender.ui.dumps, 2)
+
+        with self.assertRaises(AdbError):
+            sender.send("+910000000000", "unreachable")
+
+    def test_intent_sender_unconfirmed(self):
+        # The compose screen stays open after Send
+        self.write_screens(f"am android.intent.action.SENDTO {CONVERSATION}")
+        sender = IntentSmsSender(self.shell, timeout=0.3)
+        with self.assertRaises(SmsUnconfirmedError):
+            sender.send("9876543210", "hello")
+        self.assertEqual(self.log()[-1], "default input tap 969 2215")
+
+    def test_unconfirmed_send_is_not_retried(self):
+        sender = MagicMock()
+        sender.send.side_effect = [SmsUnconfirmedError("Tapped Send, but the compose screen stayed open"), None]
+        dispatcher = SmsDispatcher(devices=['emulator-5554'], rate_per_minute=0, adb=FAKE_ADB)
+        try:
+            with patch.object(android_messaging, 'create_sms_sender', return_value=sender):
+                statuses = dispatcher.broadcast(["9876543210", "9876543211"], "hi")
+        finally:
+            dispatcher.close()
+        self.assertEqual([(s.state, s.attempts) for s in statuses], [(UNKNOWN, 1), (SENT, 1)])
+        self.assertIn("stayed open", statuses[0].error)
+
+    def test_service_call_sender(self):
+        sender = ServiceCallSmsSender(self.shell, template="service call isms 5 s16 {number} s16 {text}")
+        sender.send("98765 43210", "hi there")
+        self.assertEqual(self.log(), ["default service call isms 5 s16 9876543210 s16 hi there"])
+        with self.assertRaises(AdbError):
+            sender.send("+910000000000", "hi")
+
+    def test_place_call(self):
+        place_call("+91 98765 43210", shell=self.shell)
+        self.assertEqual(self.log(), ["default am start -W -a android.intent.action.CALL -d tel:+919876543210"])
+
+    def test_bulk_send_over_two_phones(self):
+        updates = []
+        dispatcher = SmsDispatcher(rate_per_minute=600, adb=FAKE_ADB)
+        try:
+            messages = [(f"98765432{i:02d}", f"Reminder {i}", f"friend {i}") for i in range(8)]
+            messages.insert(3, ("+910000000000", "Reminder", "nobody"))
+            messages.append(("not a number", "Reminder"))
+            statuses = dispatcher.send(messages, progress=lambda s: updates.append((s.number, s.state)))
+        finally:
+            dispatcher.close()
+
+        self.assertEqual([s.number for s in statuses], [m[0] for m in messages])
+        self.assertEqual(sum(s.state == SENT for s in statuses), 8)
+        # Both phones took part
+        self.assertEqual({s.device for s in statuses if s.state == SENT}, {'emulator-5554', 'R58M12345'})
+        sent_by = {line.split()[0] for line in self.log() if 'SENDTO' in line}
+        self.assertEqual(sent_by, {'emulator-5554', 'R58M12345'})
+
+        # Retried once, then failed with the reason
+        unreachable = statuses[3]
+        self.assertEqual((unreachable.state, unreachable.attempts), (FAILED, 2))
+        self.assertIn("unable to resolve Intent", unreachable.error)
+        self.assertEqual([state for number, state in updates if number == "+910000000000"],
+                         ['sending', 'queued', 'sending', 'failed'])
+        # Not retried: it can never work
+        self.assertEqual((statuses[-1].state, statuses[-1].attempts), (FAILED, 1))
+        self.assertEqual(statuses[0].as_dict()['name'], "friend 0")
+
+    def test_unexpected_error_does_not_hang(self):
+        sender = MagicMock()
+        sender.send.side_effect = [RuntimeError("sender crashed"), None]
+        dispatcher = SmsDispatcher(devices=['emulator-5554'], rate_per_minute=0, adb=FAKE_ADB)
+        try:
+            with patch.object(android_messaging, 'create_sms_sender', return_value=sender):
+                statuses = dispatcher.broadcast(["9876543210", "9876543211"], "hi")
+        finally:
+            dispatcher.close()
+        self.assertEqual([s.state for s in statuses], [FAILED, SENT])
+        self.assertEqual(statuses[0].error, "sender crashed")
+
+    def test_features(self):
+        with patch.object(features, 'get_adb_shell', return_value=self.shell), \
+                patch.object(android_messaging, 'get_adb_shell', return_value=self.shell), \
+                patch.object(features, 'speak') as speak, patch('builtins.print'):
+            features.sendMessage("see you soon", "+91 98765 43210", "mom")
+            speak.assert_called_with("Message sent successfully to mom")
+            features.makeCall("mom", "+91 98765 43210")
+            speak.assert_called_with("Calling mom")
+        self.assertEqual(self.log()[-1], "default am start -W -a android.intent.action.CALL -d tel:+919876543210")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+"""
+Vishwakarma AI - Android UI Automation Tests
+© 2025 Vishwakarma Industries
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from engine.adb import AdbError, AdbResult, AdbShell
+from engine.android_ui import UiAutomator, UiHierarchy, get_ui_automator, parse_bounds
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+FAKE_ADB = [sys.executable, os.path.join(FIXTURES, 'fake_adb.py')]
+LAUNCHER = "com.android.launcher3/.Launcher"
+MESSAGES = "com.google.android.apps.messaging"
+SCREENS = {
+    LAUNCHER: 'launcher.xml',
+    f"{MESSAGES}/.ui.ConversationListActivity": 'conversation_list.xml',
+    f"{MESSAGES}/.ui.conversation.NewConversationActivity": 'new_conversation.xml',
+    f"{MESSAGES}/.ui.conversation.ConversationActivity": 'conversation.xml',
+}
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, 'ui', name), encoding='utf-8') as f:
+        return f.read()
+
+
+class FakeShell:
+    """Replays recorded screens: each dump shows the next one."""
+
+    def __init__(self, *screens):
+        self.screens = list(screens)
+        self.focus = screens[0]
+        self.keyboard = False
+        self.taps = []
+
+    def run(self, command):
+        return AdbResult(command, f"  mCurrentFocus=Window{{1 u0 {self.focus}}}\n"
+                         f"  mCurrentRotation=ROTATION_0\n"
+                         f"  mInputShown={str(self.keyboard).lower()}\n", 0, 0.0)
+
+    def run_batch(self, commands):
+        if len(self.screens) > 1:
+            self.focus = self.screens.pop(0)
+        else:
+            self.focus = self.screens[0]
+        dump = AdbResult(commands[1], "UI hierchary dumped to: /sdcard/window_dump.xml\n"
+                         + fixture(SCREENS[self.focus]), 0, 0.0)
+        return [self.run(commands[0]), dump]
+
+    def tap(self, x, y):
+        self.taps.append((x, y))
+
+
+class TestUiHierarchy(unittest.TestCase):
+    """Unit tests for parsing and indexing uiautomator dumps."""
+
+    def setUp(self):
+        self.list = UiHierarchy(fixture('conversation_list.xml'))
+
+    def test_parse_bounds(self):
+        self.assertEqual(parse_bounds("[0,63][1080,210]"), (0, 63, 1080, 210))
+        self.assertIsNone(parse_bounds("0,63,1080,210"))
+
+    def test_find(self):
+        fab = self.list.find(resource_id="start_chat_fab")
+        self.assertIs(self.list.find(resource_id=f"{MESSAGES}:id/start_chat_fab"), fab)
+        self.assertIs(self.list.find(text="  START chat "), fab)
+        self.assertIs(self.list.find(desc="start chat"), fab)
+        self.assertEqual(fab.center, (864, 2173))
+        self.assertTrue(fab.clickable)
+        self.assertEqual(self.list.find(class_name="android.widget.Button"), fab)
+        self.assertIsNone(self.list.find(resource_id="start_chat_fab", class_name="android.widget.TextView"))
+        self.assertIsNone(self.list.find(text="Dad"))
+
+    def test_invisible_elements_are_skipped(self):
+        self.assertIsNone(self.list.find(resource_id="hidden_banner"))
+        self.assertEqual(len(self.list), 8)
+
+    def test_tree(self):
+        name = self.list.find(text="Mom")
+        row = name.parent
+        self.assertEqual(row.short_id, "swipeableContainer")
+        self.assertEqual([child.text for child in row.children], ["Mom", "See you at 7"])
+        self.assertEqual(len(self.list.find_all(class_name="android.widget.TextView")), 3)
+
+    def test_find_any_in_order(self):
+        launcher = UiHierarchy(fixture('launcher.xml'))
+        selectors = [{'resource_id': 'messages_icon'}, {'desc': 'Messages'}, {'text': 'Phone'}]
+        self.assertEqual(launcher.find_any(selectors).text, "Messages")
+        self.assertEqual(launcher.find_any({'text': 'Chrome'}).center, (687, 2202))
+
+    def test_malformed(self):
+        with self.assertRaises(ValueError):
+            UiHierarchy("<hierarchy><node></hierarchy>")
+
+
+class TestUiAutomator(unittest.TestCase):
+    """Unit tests for polling, tapping and the per-activity cache."""
+
+    def test_polls_until_the_control_appears(self):
+        shell = FakeShell(LAUNCHER, LAUNCHER, f"{MESSAGES}/.ui.ConversationListActivity")
+        ui = UiAutomator(shell, settle_seconds=0)
+        ui.tap([{'resource_id': 'start_chat_fab'}], timeout=5)
+        self.assertEqual(shell.taps, [(864, 2173)])
+        self.assertEqual(ui.dumps, 3)
+
+    def test_missing_control(self):
+        ui = UiAutomator(FakeShell(LAUNCHER))
+        with patch('time.sleep'):
+            with self.assertRaises(LookupError):
+                ui.tap({'text': 'Start chat'}, timeout=0)
+        self.assertEqual(ui.dumps, 1)
+
+    def test_cached_per_activity(self):
+        shell = FakeShell(LAUNCHER)
+        ui = UiAutomator(shell)
+        ui.tap({'desc': 'Messages'})
+        ui.tap({'text': 'Chrome'})
+        ui.tap({'text': 'Camera'})
+        self.assertEqual((ui.dumps, ui.cache_hits), (1, 2))
+        self.assertEqual(shell.taps, [(393, 2202), (687, 2202), (942, 2202)])
+
+        ui.tap({'text': 'Chrome'}, cached=False)
+        self.assertEqual(ui.dumps, 2)
+        ui.invalidate(LAUNCHER)
+        ui.tap({'text': 'Chrome'})
+        self.assertEqual(ui.dumps, 3)
+
+    def test_keyboard_is_another_screen(self):
+        shell = FakeShell(LAUNCHER)
+        ui = UiAutomator(shell, settle_seconds=0)
+        ui.tap({'text': 'Chrome'})
+        # The keyboard coming up moves controls: the cached layout is stale
+        shell.keyboard = True
+        ui.tap({'text': 'Chrome'})
+        self.assertEqual((ui.dumps, ui.cache_hits), (2, 0))
+        ui.tap({'text': 'Chrome'})
+        self.assertEqual((ui.dumps, ui.cache_hits), (2, 1))
+        ui.invalidate(LAUNCHER)
+        self.assertEqual(len(ui._cache), 0)
+
+    def test_cache_is_bounded(self):
+        shell = FakeShell(LAUNCHER, f"{MESSAGES}/.ui.ConversationListActivity")
+        ui = UiAutomator(shell, max_activities=1)
+        ui.dump()
+        ui.dump()
+        self.assertEqual([activity for activity, _ in ui._cache], [f"{MESSAGES}/.ui.ConversationListActivity"])
+
+    def test_failed_dump(self):
+        shell = MagicMock()
+        shell.run_batch.return_value = [AdbResult('focus', '', 0, 0.0),
+                                        AdbResult('dump', 'ERROR: could not get idle state.\n', 1, 0.0)]
+        with self.assertRaises(AdbError):
+            UiAutomator(shell).dump()
+
+    def test_shared_per_session(self):
+        shell = AdbShell()
+        self.assertIs(get_ui_automator(shell), get_ui_automator(shell))
+        self.assertIsNot(get_ui_automator(shell), get_ui_automator(AdbShell()))
+
+
+
+@unittest.skipIf(shutil.which('sh') is None, "the fake adb needs a POSIX shell")
+class TestAgainstFakeAdb(unittest.TestCase):
+    """Drives the recorded screens through a fake adb's uiautomator."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open(os.path.join(self.directory, 'ui'), 'w') as f:
+            f.writelines(f"{component} {os.path.join(FIXTURES, 'ui', name)}\n"
+                         for component, name in SCREENS.items())
+        with open(os.path.join(self.directory, 'screens'), 'w') as f:
+            f.write(f"tap 393 2202 {MESSAGES}/.ui.ConversationListActivity\n"
+                    f"tap 864 2173 {MESSAGES}/.ui.conversation.NewConversationActivity\n"
+                    f"keyevent 66 {MESSAGES}/.ui.conversation.ConversationActivity\n")
+        self.env = patch.dict(os.environ, {'FAKE_ADB_DIR': self.directory})
+        self.env.start()
+        self.shell = AdbShell(adb=FAKE_ADB, timeout=5)
+        self.ui = UiAutomator(self.shell)
+
+    def tearDown(self):
+        self.shell.close()
+        self.env.stop()
+        shutil.rmtree(self.directory)
+
+    def events(self):
+        with open(os.path.join(self.directory, 'input.log')) as f:
+            return [line.split(' ', 1)[1].strip() for line in f]
+
+    def start_chat(self):
+        self.shell.home()
+        self.ui.tap([{'desc': 'Messages'}])
+        self.ui.tap([{'resource_id': 'start_chat_fab'}])
+        self.ui.set_text([{'resource_id': 'recipient_text_view'}], "+91 98765 43210")
+        self.shell.key(66)
+        self.ui.tap([{'desc': 'Send SMS'}])
+
+    def test_walks_the_screens(self):
+        self.start_chat()
+        self.assertEqual(self.events(), [
+            "input keyevent 3", "input tap 393 2202", "input tap 864 2173", "input tap 594 230",
+            "input text +91%s98765%s43210", "input keyevent 66", "input tap 969 2215"])
+
+        # The second time every control comes from the cached screens
+        dumps = self.ui.dumps
+        self.start_chat()
+        self.assertEqual(self.ui.dumps, dumps)
+        self.assertEqual(len(self.events()), 14)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+"""
+Vishwakarma AI - Installed Application Index Tests
+© 2025 Vishwakarma Industries
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault('pyautogui', MagicMock())
+sys.modules.setdefault('pywhatkit', MagicMock())
+sys.modules.setdefault('playsound', MagicMock())
+
+from engine import features
+from engine.app_index import AppIndex, parse_exec, read_desktop_entry
+
+FIREFOX = """[Desktop Entry]
+Name=Firefox Web Browser
+Name[de]=Firefox-Webbrowser
+GenericName=Web Browser
+Keywords=Internet;WWW;
+Exec=firefox %u
+Type=Application
+
+[Desktop Action new-window]
+Name=New Window
+Exec=firefox --new-window %u
+"""
+
+GEDIT = """[Desktop Entry]
+Name=Text Editor
+Exec="/opt/My Apps/gedit" --new-window %F
+Type=Application
+"""
+
+HIDDEN = """[Desktop Entry]
+Name=Helper
+Exec=helper
+Type=Application
+NoDisplay=true
+"""
+
+CHROME = """[Desktop Entry]
+Name=Google Chrome
+Exec=/usr/bin/google-chrome-stable %U
+Type=Application
+"""
+
+VSCODE = """[Desktop Entry]
+Name=Visual Studio Code
+Exec=/usr/share/code/code --unity-launch %F
+Type=Application
+"""
+
+HTOP = """[Desktop Entry]
+Name=Htop
+Exec=htop
+Terminal=true
+Type=Application
+"""
+
+
+class TestAppIndex(unittest.TestCase):
+    """Unit tests for finding and launching installed applications."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.apps = os.path.join(self.directory, 'applications')
+        self.bin = os.path.join(self.directory, 'bin')
+        os.makedirs(self.apps)
+        os.makedirs(self.bin)
+        self.cache_path = os.path.join(self.directory, 'cache', 'apps.json')
+        self.write_desktop('org.mozilla.firefox.desktop', FIREFOX)
+        self.write_desktop('org.gnome.gedit.desktop', GEDIT)
+        self.write_desktop('helper.desktop', HIDDEN)
+        self.write_executable('firefox')
+        self.write_executable('gnome-calculator')
+        with open(os.path.join(self.bin, 'README'), 'w') as f:
+            f.write("not executable")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_desktop(self, name, content):
+        with open(os.path.join(self.apps, name), 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def write_executable(self, name):
+        path = os.path.join(self.bin, name)
+        with open(path, 'w') as f:
+            f.write("#!/bin/sh\n")
+        os.chmod(path, 0o755)
+        return path
+
+    def index(self):
+        return AppIndex([self.apps], [self.bin], cache_path=self.cache_path)
+
+    def test_parse_exec(self):
+        self.assertEqual(parse_exec('firefox %u'), ['firefox'])
+        self.assertEqual(parse_exec('"/opt/My Apps/app" --name=%c --x 100%%'),
+                         ['/opt/My Apps/app', '--name=', '--x', '100%'])
+        self.assertEqual(parse_exec('broken "quote'), [])
+
+    def test_read_desktop_entry(self):
+        app = read_desktop_entry(os.path.join(self.apps, 'org.mozilla.firefox.desktop'))
+        self.assertEqual(app['name'], 'Firefox Web Browser')
+        self.assertEqual(app['argv'], ['firefox'])
+        self.assertIn('web browser', app['keys'])
+        self.assertIn('internet', app['keys'])
+        self.assertIsNone(read_desktop_entry(os.path.join(self.apps, 'helper.desktop')))
+        self.write_desktop('htop.desktop', HTOP)
+        self.assertIsNone(read_desktop_entry(os.path.join(self.apps, 'htop.desktop')))
+
+    def test_lookup(self):
+        index = self.index()
+        self.assertEqual(index.lookup("firefox").name, 'Firefox Web Browser')
+        self.assertEqual(index.lookup("text editor").argv, ['/opt/My Apps/gedit', '--new-window'])
+        self.assertEqual(index.lookup("gedit").name, 'Text Editor')
+        # Executables without a desktop entry
+        self.assertEqual(index.lookup("gnome calculator").argv, [os.path.join(self.bin, 'gnome-calculator')])
+        # Prefix and misheard names
+        self.assertEqual(index.lookup("fire").name, 'Firefox Web Browser')
+        self.assertEqual(index.lookup("text editer").name, 'Text Editor')
+        self.assertIsNone(index.lookup("helper"))
+        self.assertIsNone(index.lookup("readme"))
+        self.assertIsNone(index.lookup("spotify"))
+
+    def test_any_word_of_the_name(self):
+        self.write_desktop('google-chrome.desktop', CHROME)
+        self.write_desktop('vscode.desktop', VSCODE)
+        index = self.index()
+        self.assertEqual(index.lookup("chrome").name, 'Google Chrome')
+        self.assertEqual(index.lookup("code").name, 'Visual Studio Code')
+        self.assertEqual(index.lookup("studio code").name, 'Visual Studio Code')
+        self.assertEqual(index.lookup("gogle chrome").name, 'Google Chrome')
+
+    def test_system_tools_are_not_opened(self):
+        for name in ('poweroff', 'reboot', 'shutdown', 'halt', 'killall', 'mkfs.ext4', 'tail'):
+            self.write_executable(name)
+        index = self.index()
+        # Executables only by their exact name, and never a system tool
+        self.assertEqual(index.lookup("tail").source, 'path')
+        for query in ("power", "reb", "reboot", "shut", "halt", "killer", "mk", "mail"):
+            self.assertIsNone(index.lookup(query), query)
+
+    def test_cache_and_incremental_rescan(self):
+        index = self.index()
+        index.lookup("firefox")
+        self.assertEqual(index.rescanned, 2)
+        self.assertTrue(os.path.exists(self.cache_path))
+
+        # A new process answers from the cache and checks it off the main path
+        cached = self.index()
+        with patch.object(cached, 'refresh_in_background') as refresh_in_background:
+            self.assertEqual(cached.lookup("gedit").name, 'Text Editor')
+        refresh_in_background.assert_called_once_with()
+        self.assertEqual(cached.refresh(), 0)
+
+        # Only the directory that changed is read again
+        self.write_executable('spotify')
+        self.assertEqual(cached.refresh(), 1)
+        self.assertEqual(cached.lookup("spotify").source, 'path')
+
+    def test_corrupt_cache_is_ignored(self):
+        os.makedirs(os.path.dirname(self.cache_path))
+        with open(self.cache_path, 'w') as f:
+            f.write("{not json")
+        with patch('builtins.print'):
+            index = self.index()
+        self.assertEqual(index.lookup("firefox").name, 'Firefox Web Browser')
+
+    def test_launch_without_shell(self):
+        index = self.index()
+        entry = index.lookup("text editor")
+        with patch.object(subprocess, 'Popen') as popen:
+            index.launch(entry)
+        args, kwargs = popen.call_args
+        self.assertEqual(args[0], ['/opt/My Apps/gedit', '--new-window'])
+        self.assertNotIn('shell', kwargs)
+        self.assertTrue(kwargs['start_new_session'])
+
+    def test_open_command(self):
+        index = self.index()
+        catalog = MagicMock()
+        catalog.lookup.return_value = None
+        with patch.object(features, 'get_command_catalog', return_value=catalog), \
+                patch.object(features, 'get_app_index', return_value=index), \
+                patch.object(features, 'speak') as speak, \
+                patch.object(features.os, 'system') as system, \
+                patch.object(index, 'launch') as launch:
+            features.openCommand("open firefox")
+            features.openCommand("open spotify")
+        launch.assert_called_once_with(index.lookup("firefox"))
+        speak.assert_any_call("Opening Firefox Web Browser")
+        speak.assert_any_call("Sorry, I couldn't find spotify on this computer.")
+        system.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
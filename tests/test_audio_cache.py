@@ -0,0 +1,121 @@
+"""
+Vishwakarma AI - TTS Audio Cache Tests
+© 2025 Vishwakarma Industries
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault('playsound', MagicMock())
+
+from engine import tts
+from engine.audio_cache import AudioCache, _speak_literals, speech_cache_key
+
+
+class TestAudioCache(unittest.TestCase):
+    """Unit tests for the on-disk audio cache."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = AudioCache(cache_dir=self.cache_dir, max_bytes=100)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_key_covers_voice_and_settings(self):
+        """Test that any change in voice parameters changes the key."""
+        base = speech_cache_key("Hello", "pcm_22050", voice_id="a", model_id="m",
+                                voice_settings={"stability": 0.5})
+        self.assertEqual(base, speech_cache_key("Hello", "pcm_22050", voice_id="a", model_id="m",
+                                                voice_settings={"stability": 0.5}))
+        self.assertNotEqual(base, speech_cache_key("Hello!", "pcm_22050", voice_id="a", model_id="m",
+                                                   voice_settings={"stability": 0.5}))
+        self.assertNotEqual(base, speech_cache_key("Hello", "pcm_22050", voice_id="b", model_id="m",
+                                                   voice_settings={"stability": 0.5}))
+        self.assertNotEqual(base, speech_cache_key("Hello", "pcm_22050", voice_id="a", model_id="n",
+                                                   voice_settings={"stability": 0.5}))
+        self.assertNotEqual(base, speech_cache_key("Hello", "pcm_22050", voice_id="a", model_id="m",
+                                                   voice_settings={"stability": 0.6}))
+        self.assertNotEqual(base, speech_cache_key("Hello", "mp3_44100_128", voice_id="a", model_id="m",
+                                                   voice_settings={"stability": 0.5}))
+
+    def test_hit_and_miss_counters(self):
+        """Test hit and miss accounting."""
+        self.assertIsNone(self.cache.get("k1", "pcm_22050"))
+        self.cache.put("k1", "pcm_22050", b"audio")
+        path = self.cache.get("k1", "pcm_22050")
+
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b"audio")
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        self.cache.put("old", "pcm_22050", b"x" * 40)
+        self.cache.put("used", "pcm_22050", b"x" * 40)
+        self.cache.get("old", "pcm_22050")
+        self.cache.put("new", "pcm_22050", b"x" * 40)
+
+        self.assertTrue(self.cache.has("old", "pcm_22050"))
+        self.assertFalse(self.cache.has("used", "pcm_22050"))
+        self.assertTrue(self.cache.has("new", "pcm_22050"))
+        self.assertLessEqual(self.cache.stats()['bytes'], 100)
+
+    def test_persists_across_instances(self):
+        """Test that a new cache instance finds existing entries."""
+        self.cache.put("k1", "mp3_44100_128", b"audio")
+        reopened = AudioCache(cache_dir=self.cache_dir, max_bytes=100)
+        self.assertIsNotNone(reopened.get("k1", "mp3_44100_128"))
+
+    def test_speak_literals(self):
+        """Test collecting static phrases from source code."""
+        phrases = list(_speak_literals(os.path.join(os.path.dirname(__file__), '..', 'main.py')))
+        self.assertIn("Ready for Face Authentication", phrases)
+        self.assertIn("Face Authentication Successful", phrases)
+
+
+class TestCachedPlayback(unittest.TestCase):
+    """Tests that cached phrases play without network calls."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = AudioCache(cache_dir=self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_repeated_phrase_skips_network(self):
+        """Test that only the first of two identical prompts is synthesized."""
+        sinks = []
+
+        def new_sink():
+            sinks.append(tts.BufferSink())
+            return sinks[-1]
+
+        def fake_stream(text, sink, cancel_event=None):
+            sink.write(b"\x01\x02\x03\x04")
+            sink.close()
+            return {'cancelled': False}
+
+        with patch.object(tts, 'get_audio_cache', return_value=self.cache), \
+                patch.object(tts, 'TTS_CACHE_ENABLED', True), \
+                patch.object(tts, 'ELEVENLABS_STREAMING', True), \
+                patch.object(tts, 'open_audio_sink', side_effect=new_sink), \
+                patch.object(tts, 'stream_speech', side_effect=fake_stream) as stream, \
+                patch.object(tts, 'get_http_session') as session:
+            tts.play_elevenlabs("Face Authentication Successful")
+            tts.play_elevenlabs("Face Authentication Successful")
+
+        self.assertEqual(stream.call_count, 1)
+        session.assert_not_called()
+        self.assertEqual(sinks[1].getvalue(), b"\x01\x02\x03\x04")
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
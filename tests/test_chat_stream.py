@@ -0,0 +1,124 @@
+"""
+Vishwakarma AI - Streaming Chatbot Tests
+© 2025 Vishwakarma Industries
+"""
+import json
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault('pyautogui', MagicMock())
+sys.modules.setdefault('pywhatkit', MagicMock())
+sys.modules.setdefault('playsound', MagicMock())
+
+from engine import features
+from engine.chat_stream import SentenceSplitter
+
+TOKENS = ["Hello", " there", "!", " I am", " Vishwakarma", " AI", ".", " Dr.",
+          " Rao", " says", " hi", " to", " you", "."]
+TOKEN_DELAY = 0.03
+
+
+class FakeSSEHandler(BaseHTTPRequestHandler):
+    """Stands in for an OpenAI-compatible streaming chat endpoint."""
+
+    protocol_version = 'HTTP/1.1'
+    last_body = None
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        FakeSSEHandler.last_body = json.loads(self.rfile.read(length))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        for token in TOKENS:
+            chunk = {
+                "id": "chatcmpl-1", "object": "chat.completion.chunk", "created": 0,
+                "model": "test-model",
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(TOKEN_DELAY)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestSentenceSplitter(unittest.TestCase):
+    """Unit tests for sentence boundary detection."""
+
+    def test_splits_streamed_text(self):
+        """Test that sentences are released once their boundary arrives."""
+        splitter = SentenceSplitter(min_chars=1)
+        self.assertEqual(splitter.feed("It is sunny"), [])
+        self.assertEqual(splitter.feed(" today. Take"), ["It is sunny today."])
+        self.assertEqual(splitter.feed(" a hat!"), [])
+        self.assertEqual(splitter.flush(), "Take a hat!")
+
+    def test_keeps_abbreviations_and_numbers(self):
+        """Test that abbreviations and decimals don't end a sentence."""
+        splitter = SentenceSplitter(min_chars=1)
+        sentences = splitter.feed("Dr. Rao measured 3.5 degrees. Next ")
+        self.assertEqual(sentences, ["Dr. Rao measured 3.5 degrees."])
+
+    def test_short_fragments_are_merged(self):
+        """Test that very short sentences are joined to the next one."""
+        splitter = SentenceSplitter(min_chars=12)
+        self.assertEqual(splitter.feed("Hi! How are you today? "), ["Hi! How are you today?"])
+
+
+class TestStreamingChatBot(unittest.TestCase):
+    """Tests chatBot() against a local fake SSE server."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeSSEHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/v1"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_first_sentence_spoken_before_stream_ends(self):
+        """Test sentence-level pipelining of a streamed reply."""
+        spoken = []
+
+        def fake_speak(text, **kwargs):
+            spoken.append((text, time.perf_counter()))
+
+        with patch.object(features, 'NVIDIA_API_KEY', 'test-key'), \
+                patch.object(features, 'NVIDIA_BASE_URL', self.base_url), \
+                patch.object(features, 'CHATBOT_STREAMING', True), \
+                patch.object(features, 'get_response_cache', return_value=None), \
+                patch.object(features, 'speak', side_effect=fake_speak), \
+                patch.object(features, 'eel') as eel:
+            start = time.perf_counter()
+            response = features.chatBot("introduce yourself")
+            end = time.perf_counter()
+
+        self.assertEqual(response, ''.join(TOKENS))
+        self.assertEqual([text for text, _ in spoken],
+                         ["Hello there!", "I am Vishwakarma AI.", "Dr. Rao says hi to you."])
+        # The first sentence was queued well before the last token arrived
+        self.assertLess(spoken[0][1] - start, (end - start) - 4 * TOKEN_DELAY)
+        self.assertTrue(FakeSSEHandler.last_body['stream'])
+
+        partials = [c.args for c in eel.receiverText.call_args_list]
+        self.assertEqual(len(partials), len(TOKENS))
+        self.assertEqual(partials[-1][0], response)
+        self.assertEqual(len({message_id for _, message_id in partials}), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
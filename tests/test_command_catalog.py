@@ -0,0 +1,149 @@
+"""
+Vishwakarma AI - Command Catalog Tests
+© 2025 Vishwakarma Industries
+"""
+import os
+import sqlite3
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault('pyautogui', MagicMock())
+sys.modules.setdefault('pywhatkit', MagicMock())
+sys.modules.setdefault('playsound', MagicMock())
+
+from engine import features
+from engine.command_catalog import (CommandCatalog, get_command_catalog,
+                                    normalize_command_name)
+from engine.database import close_database, get_database
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCommandCatalog(unittest.TestCase):
+    """Unit tests for the in-memory command catalog."""
+
+    def setUp(self):
+        self.db_name = "test_command_catalog.db"
+        self.db = get_database(self.db_name)
+        self.db.executemany("INSERT INTO sys_command (name, path) VALUES (?, ?)",
+                            [("Notepad", "C:\\Windows\\notepad.exe"),
+                             ("vs code", "C:\\Code\\Code.exe"),
+                             ("google chrome", "C:\\Chrome\\chrome.exe"),
+                             ("youtube", "C:\\YouTube\\app.exe")])
+        self.db.executemany("INSERT INTO web_command (name, url) VALUES (?, ?)",
+                            [("youtube", "https://www.youtube.com/"),
+                             ("github", "https://github.com/")])
+        self.clock = FakeClock()
+        self.catalog = CommandCatalog(self.db, recheck_seconds=5, clock=self.clock)
+
+    def tearDown(self):
+        close_database(self.db_name)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.db_name + suffix):
+                os.remove(self.db_name + suffix)
+
+    def target(self, query):
+        entry = self.catalog.lookup(query)
+        return entry.target if entry else None
+
+    def test_normalize(self):
+        self.assertEqual(normalize_command_name("  The YouTube Website "), "youtube")
+        self.assertEqual(normalize_command_name("VS Code app"), "vs code")
+        self.assertEqual(normalize_command_name("notepad++"), "notepad++")
+
+    def test_exact_word_and_prefix_matches(self):
+        self.assertEqual(self.target("notepad"), "C:\\Windows\\notepad.exe")
+        self.assertEqual(self.target("the github website"), "https://github.com/")
+        self.assertEqual(self.target("chrome"), "C:\\Chrome\\chrome.exe")
+        self.assertEqual(self.target("vs"), "C:\\Code\\Code.exe")
+        self.assertEqual(self.target("note"), "C:\\Windows\\notepad.exe")
+        self.assertIsNone(self.target("spotify"))
+        self.assertIsNone(self.target("n"))
+
+    def test_programs_win_over_websites(self):
+        self.assertEqual(self.catalog.lookup("youtube").kind, "app")
+
+    def test_lookups_do_not_query_the_database(self):
+        self.catalog.lookup("notepad")
+        with patch.object(self.db, 'query_one') as query_one, patch.object(self.db, 'query') as query:
+            for _ in range(100):
+                self.catalog.lookup("github")
+        query_one.assert_not_called()
+        query.assert_not_called()
+        self.assertEqual(self.catalog.reloads, 1)
+
+    def test_reloads_after_in_process_write(self):
+        self.catalog.lookup("notepad")
+        self.db.execute("UPDATE sys_command SET path = 'D:\\notepad.exe' WHERE name = 'Notepad'")
+        self.assertEqual(self.target("notepad"), "D:\\notepad.exe")
+        self.assertEqual(self.catalog.reloads, 2)
+
+    def test_sees_other_processes_after_recheck_interval(self):
+        self.catalog.lookup("notepad")
+        con = sqlite3.connect(self.db_name)
+        con.execute("INSERT INTO web_command (name, url) VALUES ('gmail', 'https://mail.google.com/')")
+        con.commit()
+        con.close()
+
+        self.assertIsNone(self.target("gmail"))
+        self.clock.now += 6
+        self.assertEqual(self.target("gmail"), "https://mail.google.com/")
+
+    def test_unrelated_writes_do_not_reload(self):
+        self.catalog.lookup("notepad")
+        self.db.execute("INSERT INTO contacts (name, mobile_no) VALUES ('mom', '+919876543210')")
+        self.catalog.lookup("notepad")
+        self.assertEqual(self.catalog.reloads, 1)
+
+    def test_bulk_management(self):
+        count = self.catalog.add_commands([
+            ("Spotify", "C:\\Spotify\\Spotify.exe", ["music", "songs"]),
+            {"name": "Gmail", "target": "https://mail.google.com/", "aliases": "mail"},
+            ("notepad", "C:\\Tools\\notepad2.exe"),
+        ])
+        self.assertEqual(count, 3)
+        self.assertEqual(self.target("music"), "C:\\Spotify\\Spotify.exe")
+        self.assertEqual(self.target("mail"), "https://mail.google.com/")
+        # Replaced, not duplicated
+        self.assertEqual(self.target("notepad"), "C:\\Tools\\notepad2.exe")
+        self.assertEqual(self.db.query_one("SELECT COUNT(*) FROM sys_command WHERE LOWER(name) = 'notepad'")[0], 1)
+
+        names = [entry.name for entry in self.catalog.list_commands()]
+        self.assertEqual(names, sorted(names))
+        self.assertEqual([e.name for e in self.catalog.list_commands('web')], ['github', 'gmail'])
+        self.assertEqual(self.catalog.lookup("spotify").aliases, ["music", "songs"])
+
+        # Removing by alias removes the command and all its aliases
+        self.assertEqual(self.catalog.remove_commands(["music", "github"]), 2)
+        self.assertIsNone(self.target("spotify"))
+        self.assertIsNone(self.target("songs"))
+        self.assertIsNone(self.target("github"))
+
+        with self.assertRaises(ValueError):
+            self.catalog.add_commands([("", "C:\\x.exe")])
+
+    def test_open_command(self):
+        with patch.object(features, 'get_database', return_value=self.db), \
+                patch.object(features, 'get_app_index', return_value=None), \
+                patch.object(features, 'speak'), \
+                patch.object(features.os, 'startfile', create=True) as startfile, \
+                patch.object(features.webbrowser, 'open') as browser_open, \
+                patch.object(features.os, 'system') as system:
+            features.openCommand("open chrome")
+            features.openCommand("open github website")
+            features.openCommand("open paint")
+        startfile.assert_called_once_with("C:\\Chrome\\chrome.exe")
+        browser_open.assert_called_once_with("https://github.com/")
+        system.assert_called_once_with("start paint")
+        self.assertIs(get_command_catalog(self.db), get_command_catalog(self.db))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Vishwakarma AI - Concurrent Command Stress Tests
+© 2025 Vishwakarma Industries
+"""
+import os
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault('pyautogui', MagicMock())
+sys.modules.setdefault('pywhatkit', MagicMock())
+sys.modules.setdefault('playsound', MagicMock())
+
+from engine import command, features
+from engine.database import close_database, get_database
+from engine.profile_manager import ProfileManager
+
+CALLS = 400
+WORKERS = 32
+
+
+class TestConcurrentCommands(unittest.TestCase):
+    """Fires hundreds of allCommands() calls at once against a stubbed backend."""
+
+    def setUp(self):
+        self.db_name = "test_concurrency.db"
+        self.db = get_database(self.db_name)
+        self.db.executemany("INSERT INTO sys_command (name, path) VALUES (?, ?)",
+                            [(f"app{i}", f"C:\\apps\\app{i}.exe") for i in range(50)])
+        self.db.executemany("INSERT INTO web_command (name, url) VALUES (?, ?)",
+                            [(f"site{i}", f"https://site{i}.example") for i in range(50)])
+        self.db.executemany("INSERT INTO contacts (name, mobile_no) VALUES (?, ?)",
+                            [(f"friend{i}", f"98765{i:05d}") for i in range(50)])
+        self.user_id = ProfileManager(self.db_name).create_profile("Stress Test")
+
+    def tearDown(self):
+        close_database(self.db_name)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.db_name + suffix):
+                os.remove(self.db_name + suffix)
+
+    def test_concurrent_all_commands(self):
+        """Test that concurrent commands each get their own correct lookup result."""
+        profiles = ProfileManager(self.db_name)
+        readers = []
+
+        def run(i):
+            kind = i % 4
+            if kind == 0:
+                command.allCommands(f"open app{i % 50}")
+            elif kind == 1:
+                command.allCommands(f"open site{i % 50}")
+            elif kind == 2:
+                command.allCommands(f"phone call to friend{i % 50}")
+            else:
+                # Writes interleaved with the lookups
+                profiles.set_preference(self.user_id, f"key{i}", str(i))
+            readers.append(self.db.reader_count())
+
+        with patch.object(features, 'get_database', return_value=self.db), \
+                patch.object(command, 'eel'), \
+                patch.object(command, 'stop_speaking'), \
+                patch.object(command, 'speak') as command_speak, \
+                patch.object(command, 'takecommand', return_value="mobile"), \
+                patch.object(command, 'get_intent_classifier', return_value=None), \
+                patch.object(features, 'speak'), \
+                patch.object(features.os, 'startfile', create=True) as startfile, \
+                patch.object(features.webbrowser, 'open') as browser_open, \
+                patch.object(features, 'makeCall') as make_call, \
+                patch.object(features, 'chatBot') as chat_bot:
+            with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+                list(pool.map(run, range(CALLS)))
+
+        errors = [c for c in command_speak.call_args_list
+                  if "encountered an error" in str(c.args[0])]
+        self.assertEqual(errors, [])
+        chat_bot.assert_not_called()
+
+        self.assertEqual(sorted(c.args[0] for c in startfile.call_args_list),
+                         sorted(f"C:\\apps\\app{i % 50}.exe" for i in range(0, CALLS, 4)))
+        self.assertEqual(sorted(c.args[0] for c in browser_open.call_args_list),
+                         sorted(f"https://site{i % 50}.example" for i in range(1, CALLS, 4)))
+        self.assertEqual(sorted(c.args for c in make_call.call_args_list),
+                         sorted((f"friend{i % 50}", f"+9198765{i % 50:05d}")
+                                for i in range(2, CALLS, 4)))
+
+        # Lookups ran on per-thread read connections
+        self.assertGreater(max(readers), 1)
+        for i in range(3, CALLS, 4):
+            self.assertEqual(profiles.get_preference(self.user_id, f"key{i}"), str(i))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+"""
+Vishwakarma AI - Contact Importer Tests
+© 2025 Vishwakarma Industries
+"""
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from engine.contact_import import (import_contacts, normalize_phone, read_csv,
+                                   read_vcards)
+from engine.contact_index import get_contact_index
+from engine.database import SCHEMA, close_database, get_database
+
+GOOGLE_CSV = (
+    "Name,Given Name,Family Name,Phonetic First Name,E-mail 1 - Type,E-mail 1 - Value,"
+    "Phone 1 - Type,Phone 1 - Value,Phone 2 - Type,Phone 2 - Value\n"
+    "Pooja Sharma,Pooja,Sharma,,* Home,pooja@example.com,Home,022 2345 6789,Mobile,+91 98765 43210\n"
+    ",Kunal,Mehta,,,,Mobile,98765-43211 ::: 98765-43212,,\n"
+)
+
+VCARDS = (
+    "BEGIN:VCARD\r\n"
+    "VERSION:3.0\r\n"
+    "FN:Anita\r\n"
+    "  Desai\r\n"
+    "TEL;TYPE=HOME:022-23456789\r\n"
+    "item1.TEL;TYPE=CELL:+91 99887 76655\r\n"
+    "EMAIL;TYPE=INTERNET:anita@example.com\r\n"
+    "END:VCARD\r\n"
+    "BEGIN:VCARD\r\n"
+    "VERSION:2.1\r\n"
+    "N;CHARSET=UTF-8;ENCODING=QUOTED-PRINTABLE:=4B=75=6D=61=72;Ra=\r\n"
+    "vi;;;\r\n"
+    "TEL;CELL:09988776644\r\n"
+    "END:VCARD\r\n"
+)
+
+
+class TestParsing(unittest.TestCase):
+    """Unit tests for number normalization and the file parsers."""
+
+    def test_normalize_phone(self):
+        for raw in ["9876543210", "+91 98765 43210", "098765-43210", "919876543210",
+                    "0091 (98765) 43210", "tel 98765.43210"]:
+            self.assertEqual(normalize_phone(raw), "+919876543210", raw)
+        self.assertEqual(normalize_phone("+1 (555) 123-4567"), "+15551234567")
+        self.assertEqual(normalize_phone("5551234567", country_code="1"), "+15551234567")
+        for invalid in ["", None, "100", "n/a"]:
+            self.assertIsNone(normalize_phone(invalid), invalid)
+
+    def test_google_csv(self):
+        records = list(read_csv(io.StringIO(GOOGLE_CSV)))
+        self.assertEqual([r.name for r in records], ["Pooja Sharma", "Kunal Mehta"])
+        # Numbers labelled mobile come first, whatever their position
+        self.assertEqual(records[0].phones, ["+91 98765 43210", "022 2345 6789"])
+        self.assertEqual(records[0].email, "pooja@example.com")
+        self.assertEqual(records[1].phones, ["98765-43211", "98765-43212"])
+
+    def test_headerless_csv(self):
+        records = list(read_csv(io.StringIO("mom,9876543210\ndad,9876543211\n")))
+        self.assertEqual([(r.name, r.phones) for r in records],
+                         [("mom", ["9876543210"]), ("dad", ["9876543211"])])
+
+    def test_explicit_columns(self):
+        stream = io.StringIO("id,x,nick,y,cell\n1,a,mom,b,9876543210\n")
+        records = list(read_csv(stream, name_column=2, phone_column=4))
+        self.assertEqual((records[0].name, records[0].phones), ("mom", ["9876543210"]))
+
+    def test_vcards(self):
+        records = list(read_vcards(io.StringIO(VCARDS)))
+        self.assertEqual([r.name for r in records], ["Anita Desai", "Ravi Kumar"])
+        self.assertEqual(records[0].phones, ["+91 99887 76655", "022-23456789"])
+        self.assertEqual(records[0].email, "anita@example.com")
+        self.assertEqual(records[1].phones, ["09988776644"])
+
+
+class TestImport(unittest.TestCase):
+    """Unit tests for importing into the contacts table."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.directory, "contacts.db")
+        self.db = get_database(self.db_name)
+
+    def tearDown(self):
+        close_database(self.db_name)
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def contacts(self):
+        return self.db.query("SELECT name, mobile_no FROM contacts ORDER BY id")
+
+    def test_import_and_deduplicate(self):
+        self.db.execute("INSERT INTO contacts (name, mobile_no) VALUES ('Kunal', '+919876543211')")
+        path = self.write("contacts.csv", "Name,Mobile\nmom,98765 43210\ndad,no number\n"
+                                          "mother,+919876543210\nkunal m,9876543211\nsis,9876543213\n")
+        result = import_contacts(path, db=self.db)
+
+        self.assertTrue(result.done)
+        self.assertEqual((result.records, result.imported, result.duplicates, result.invalid),
+                         (5, 2, 2, 1))
+        self.assertEqual(self.contacts(), [('Kunal', '+919876543211'), ('mom', '+919876543210'),
+                                           ('sis', '+919876543213')])
+
+    def test_numbers_stored_the_old_way_are_duplicates(self):
+        # A file from before the migrations, with numbers as they were typed
+        close_database(self.db_name)
+        con = sqlite3.connect(self.db_name)
+        for statement in SCHEMA:
+            con.execute(statement)
+        con.execute("INSERT INTO contacts (name, mobile_no) VALUES ('Mom', '9876543210')")
+        con.execute("INSERT INTO contacts (name, mobile_no) VALUES ('Dad', '+91 98765 43211')")
+        con.commit()
+        con.close()
+        self.db = get_database(self.db_name)
+        self.assertEqual(self.contacts(), [('Mom', '+919876543210'), ('Dad', '+919876543211')])
+
+        path = self.write("contacts.csv", "Name,Mobile\nmom,+919876543210\ndad,09876543211\n")
+        result = import_contacts(path, db=self.db)
+        self.assertEqual((result.imported, result.duplicates), (0, 2))
+        self.assertEqual(self.contacts(), [('Mom', '+919876543210'), ('Dad', '+919876543211')])
+
+    def test_one_index_rebuild_instead_of_a_change_per_contact(self):
+        index = get_contact_index(self.db)
+        self.assertEqual(index.full_rebuilds, 1)
+        rows = ''.join(f"contact {i},98765{i:05d}\n" for i in range(300))
+        import_contacts(self.write("big.csv", rows), db=self.db, checkpoint_every=100)
+
+        self.assertEqual(self.db.query("SELECT contact_id FROM contact_changes"), [(0,)])
+        index = get_contact_index(self.db)
+        self.assertEqual(index.full_rebuilds, 2)
+        self.assertEqual(len(index), 300)
+        # Single edits are still logged and applied incrementally
+        self.db.execute("INSERT INTO contacts (name, mobile_no) VALUES ('Anita', '+919000000010')")
+        self.assertEqual(get_contact_index(self.db).search("anita")[0].mobile_no, '+919000000010')
+        self.assertEqual((index.full_rebuilds, index.incremental_updates), (2, 1))
+
+    def test_vcard_import(self):
+        path = self.write("contacts.vcf", VCARDS)
+        result = import_contacts(path, db=self.db)
+        self.assertEqual(result.imported, 2)
+        self.assertEqual(self.contacts(), [('Anita Desai', '+919988776655'),
+                                           ('Ravi Kumar', '+919988776644')])
+
+    def test_resume_after_interruption(self):
+        rows = ''.join(f"contact {i},98765{i:05d}\n" for i in range(1000))
+        path = self.write("big.csv", rows)
+        reports = []
+
+        def fail_midway(progress):
+            reports.append(progress.records)
+            if progress.records == 600:
+                raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            import_contacts(path, db=self.db, progress=fail_midway, batch_size=100, checkpoint_every=250)
+        # The interrupted checkpoint was rolled back; the two before it were kept
+        self.assertEqual(len(self.contacts()), 500)
+
+        result = import_contacts(path, db=self.db, progress=reports.append,
+                                 batch_size=100, checkpoint_every=250)
+        self.assertEqual(result.resumed_from, 500)
+        self.assertEqual((result.records, result.imported, result.duplicates), (1000, 1000, 0))
+        self.assertEqual(len(self.contacts()), 1000)
+        self.assertEqual(result.percent, 100.0)
+
+        # A finished import is not repeated
+        again = import_contacts(path, db=self.db)
+        self.assertTrue(again.done)
+        self.assertEqual(again.resumed_from, 1000)
+
+        # Restarting re-reads the file and finds only duplicates
+        restarted = import_contacts(path, db=self.db, resume=False)
+        self.assertEqual((restarted.imported, restarted.duplicates), (0, 1000))
+
+    def test_single_transaction(self):
+        path = self.write("contacts.csv", "mom,9876543210\ndad,9876543211\n")
+        result = import_contacts(path, db=self.db, checkpoint_every=None)
+        self.assertTrue(result.done)
+        self.assertEqual(result.imported, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+"""
+Vishwakarma AI - Contact Search Index Tests
+© 2025 Vishwakarma Industries
+"""
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault('pyautogui', MagicMock())
+sys.modules.setdefault('pywhatkit', MagicMock())
+sys.modules.setdefault('playsound', MagicMock())
+
+from engine import features
+from engine.contact_index import (ContactIndex, get_contact_index,
+                                  normalize_name, phonetic_key)
+from engine.database import close_database, get_database
+
+CONTACTS = [
+    (1, "Pooja Sharma", "9000000001"),
+    (2, "Kunal Mehta", "9000000002"),
+    (3, "Pawan Kumar", "9000000003"),
+    (4, "Mom", "9000000004"),
+    (5, "Mohan Lal", "9000000005"),
+    (6, "Rahul Verma", "9000000006"),
+    (7, "Rahul", "9000000007"),
+]
+
+
+class TestPhonetics(unittest.TestCase):
+    """Unit tests for name normalization and phonetic keys."""
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("  Dr. Pooja-Sharma "), "dr pooja sharma")
+        self.assertEqual(normalize_name(None), "")
+
+    def test_spelling_variants_share_a_key(self):
+        for a, b in [("pooja", "puja"), ("kunal", "conal"), ("pawan", "pavan"),
+                     ("sharma", "sarma"), ("seeta", "sita"), ("bhavesh", "bavesh")]:
+            self.assertEqual(phonetic_key(a), phonetic_key(b), (a, b))
+
+    def test_different_names_differ(self):
+        self.assertNotEqual(phonetic_key("kunal"), phonetic_key("mohan"))
+        self.assertEqual(phonetic_key("aaa"), "aaa")
+
+
+class TestContactIndex(unittest.TestCase):
+    """Unit tests for the standalone index."""
+
+    def setUp(self):
+        self.index = ContactIndex(min_score=0.5)
+        for contact in CONTACTS:
+            self.index.add(*contact)
+
+    def names(self, query, limit=5):
+        return [match.name for match in self.index.search(query, limit)]
+
+    def test_exact_match_ranks_first(self):
+        self.assertEqual(self.names("rahul")[:2], ["Rahul", "Rahul Verma"])
+        self.assertEqual(self.names("mom", limit=1), ["Mom"])
+
+    def test_partial_and_reordered_names(self):
+        self.assertEqual(self.names("sharma pooja", limit=1), ["Pooja Sharma"])
+        self.assertEqual(self.names("mehta", limit=1), ["Kunal Mehta"])
+
+    def test_typos(self):
+        self.assertEqual(self.names("kunaal", limit=1), ["Kunal Mehta"])
+        self.assertEqual(self.names("kunla mehat", limit=1), ["Kunal Mehta"])
+        self.assertEqual(self.names("poja", limit=1), ["Pooja Sharma"])
+
+    def test_phonetic_match(self):
+        match = self.index.search("conal", limit=1)[0]
+        self.assertEqual(match.name, "Kunal Mehta")
+        self.assertEqual(match.mobile_no, "9000000002")
+        self.assertEqual(self.names("puja", limit=1), ["Pooja Sharma"])
+
+    def test_no_match(self):
+        self.assertEqual(self.index.search("zebediah"), [])
+        self.assertEqual(self.index.search("  "), [])
+
+    def test_lookalike_names_are_not_matched(self):
+        """Test that a shared key or one changed first letter is not a match."""
+        index = ContactIndex(min_score=0.6)
+        for contact in [(1, "Amit Singh", "1"), (2, "Mohan Das", "2"), (3, "Bhai", "3"),
+                        (4, "Kunal", "4"), (5, "Pooja", "5")]:
+            index.add(*contact)
+        self.assertEqual(index.search("mohit"), [])
+        self.assertEqual(index.search("rohan"), [])
+        # Each matches half the query; neither is good enough
+        self.assertEqual(index.search("kunal bhai"), [])
+        # Respellings still match, but not exactly
+        self.assertEqual([(m.name, m.exact) for m in index.search("puja")], [("Pooja", False)])
+        self.assertTrue(index.search("kunal")[0].exact)
+
+    def test_remove_and_replace(self):
+        self.index.remove(2)
+        self.assertEqual(self.index.search("kunal"), [])
+        self.index.add(4, "Mummy", "9000000009")
+        self.assertNotIn("Mom", self.names("mom"))
+        self.assertEqual(self.index.search("mummy")[0].mobile_no, "9000000009")
+        self.assertEqual(len(self.index), 6)
+
+
+class TestDatabaseSync(unittest.TestCase):
+    """Unit tests for following the contacts table."""
+
+    def setUp(self):
+        self.db_name = "test_contact_index.db"
+        self.db = get_database(self.db_name)
+        self.db.executemany("INSERT INTO contacts (id, name, mobile_no) VALUES (?, ?, ?)", CONTACTS)
+
+    def tearDown(self):
+        close_database(self.db_name)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.db_name + suffix):
+                os.remove(self.db_name + suffix)
+
+    def test_incremental_refresh(self):
+        index = get_contact_index(self.db)
+        self.assertEqual(len(index), len(CONTACTS))
+        self.assertEqual(index.full_rebuilds, 1)
+        self.assertEqual(index.refresh(), 0)
+
+        self.db.execute("INSERT INTO contacts (name, mobile_no) VALUES ('Anita Desai', '9000000010')")
+        self.db.execute("UPDATE contacts SET name = 'Mother' WHERE id = 4")
+        self.db.execute("DELETE FROM contacts WHERE id = 2")
+
+        index = get_contact_index(self.db)
+        self.assertEqual(index.full_rebuilds, 1)
+        self.assertEqual(index.incremental_updates, 1)
+        self.assertEqual(index.search("anita")[0].mobile_no, "9000000010")
+        self.assertEqual(index.search("mother")[0].mobile_no, "9000000004")
+        self.assertEqual(index.search("kunal"), [])
+        # The applied log entries are trimmed
+        self.assertEqual(self.db.query_one("SELECT COUNT(*) FROM contact_changes")[0], 0)
+
+    def test_find_contact(self):
+        with patch.object(features, 'get_database', return_value=self.db), \
+                patch.object(features, 'takecommand', return_value="yes") as takecommand, \
+                patch.object(features, 'speak') as speak:
+            self.assertEqual(features.findContact("call mom"), ("+919000000004", "mom"))
+            takecommand.assert_not_called()
+            # A phonetic match is confirmed first
+            self.assertEqual(features.findContact("phone call to conal"), ("+919000000002", "conal"))
+            speak.assert_called_with("Did you mean Kunal Mehta?")
+            takecommand.return_value = "no"
+            self.assertEqual(features.findContact("call conal"), (None, None))
+            self.assertEqual(features.findContact("call zebediah"), (None, None))
+        speak.assert_called_with('Contact not found in your list.')
+
+    def test_resolve_contact_asks_on_a_tie(self):
+        self.db.execute("INSERT INTO contacts (name, mobile_no) VALUES ('Rahul', '9000000011')")
+        picked = []
+
+        def confirm(candidates):
+            picked.append([match.name for match in candidates])
+            return candidates[1]
+
+        with patch.object(features, 'get_database', return_value=self.db):
+            # Two contacts called exactly "Rahul": never picked silently
+            self.assertEqual(features.resolve_contact("rahul"), (None, None))
+            self.assertEqual(features.resolve_contact("rahul", confirm)[0], "+919000000011")
+            self.assertEqual(features.resolve_contact("rahul verma")[1], "Rahul Verma")
+        self.assertEqual(picked, [["Rahul", "Rahul"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Vishwakarma AI - Conversation Memory Tests
+© 2025 Vishwakarma Industries
+"""
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault('pyautogui', MagicMock())
+sys.modules.setdefault('pywhatkit', MagicMock())
+sys.modules.setdefault('playsound', MagicMock())
+
+from engine import features
+from engine.conversation import (ConversationMemory, ConversationStore,
+                                 estimate_tokens, message_tokens)
+from engine.database import close_database
+
+
+def exchange(i):
+    return (f"Question number {i}: tell me something about topic {i}, please.",
+            f"Topic {i} is interesting. Here are a few more details about it that go on.")
+
+
+class TestConversationMemory(unittest.TestCase):
+    """Unit tests for the token-budgeted conversation window."""
+
+    def setUp(self):
+        self.db_name = "test_conversation.db"
+        self.store = ConversationStore(db_name=self.db_name)
+
+    def tearDown(self):
+        close_database(self.db_name)
+        if os.path.exists(self.db_name):
+            os.remove(self.db_name)
+
+    def make_memory(self, user_id=1):
+        return ConversationMemory(user_id, store=self.store, context_tokens=300,
+                                  summary_tokens=80)
+
+    def test_history_is_sent_with_the_next_message(self):
+        """Test that earlier turns are included in the prompt."""
+        memory = self.make_memory()
+        memory.add_exchange("My favourite colour is blue.", "Noted, blue it is.")
+        messages = memory.build_messages("System prompt", "What is my favourite colour?")
+
+        self.assertEqual([m['role'] for m in messages], ['system', 'user', 'assistant', 'user'])
+        self.assertEqual(messages[1]['content'], "My favourite colour is blue.")
+        self.assertEqual(messages[-1]['content'], "What is my favourite colour?")
+
+    def test_context_stays_within_budget(self):
+        """Test that a long session is summarized instead of growing."""
+        memory = self.make_memory()
+        for i in range(200):
+            memory.add_exchange(*exchange(i))
+            self.assertLessEqual(memory.context_size(), 300)
+
+        messages = memory.build_messages("System prompt", "And now?")
+        self.assertIn("Summary of the earlier conversation", messages[0]['content'])
+        self.assertEqual(messages[1]['role'], 'user')
+        self.assertIn("Topic 199", messages[-2]['content'])
+        self.assertLessEqual(sum(message_tokens(m) for m in messages),
+                             300 + message_tokens(messages[0]) + message_tokens(messages[-1]))
+
+    def test_reload_restores_summary_and_recent_turns(self):
+        """Test that a new memory object continues where the last one stopped."""
+        memory = self.make_memory()
+        for i in range(50):
+            memory.add_exchange(*exchange(i))
+
+        reloaded = self.make_memory()
+        self.assertEqual(reloaded.summary, memory.summary)
+        self.assertEqual([t['turn_id'] for t in reloaded.turns],
+                         [t['turn_id'] for t in memory.turns])
+
+    def test_profiles_are_isolated(self):
+        """Test that each profile has its own conversation."""
+        self.make_memory(user_id=1).add_exchange("I am user one.", "Hello user one.")
+        other = self.make_memory(user_id=2)
+        self.assertEqual(other.turns, [])
+
+        other.add_exchange("I am user two.", "Hello user two.")
+        other.clear()
+        self.assertEqual(self.make_memory(user_id=2).turns, [])
+        self.assertEqual(len(self.make_memory(user_id=1).turns), 2)
+
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("abcdefgh"), 2)
+
+
+class TestChatBotMemory(unittest.TestCase):
+    """Tests that chatBot() sends and records the conversation."""
+
+    def setUp(self):
+        self.db_name = "test_conversation.db"
+        self.memory = ConversationMemory(1, store=ConversationStore(db_name=self.db_name))
+
+    def tearDown(self):
+        close_database(self.db_name)
+        if os.path.exists(self.db_name):
+            os.remove(self.db_name)
+
+    def test_chatbot_uses_memory(self):
+        client = MagicMock()
+        client.chat.completions.create.return_value.choices[0].message.content = "Blue."
+
+        with patch.object(features, 'NVIDIA_API_KEY', 'test-key'), \
+                patch.object(features, 'CHATBOT_STREAMING', False), \
+                patch.object(features, 'get_conversation', return_value=self.memory), \
+                patch.object(features, 'get_response_cache', return_value=None), \
+                patch.object(features, 'get_llm_client', return_value=client), \
+                patch.object(features, 'speak'):
+            features.chatBot("My favourite colour is blue.")
+            features.chatBot("What is my favourite colour?")
+
+        messages = client.chat.completions.create.call_args.kwargs['messages']
+        self.assertEqual([m['content'] for m in messages[1:]],
+                         ["My favourite colour is blue.", "Blue.",
+                          "What is my favourite colour?"])
+        self.assertEqual(len(self.memory.turns), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
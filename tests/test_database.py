@@ -0,0 +1,149 @@
+"""
+Vishwakarma AI - Database Connection Manager Tests
+© 2025 Vishwakarma Industries
+"""
+import os
+import sqlite3
+import threading
+import unittest
+
+from engine.database import MIGRATIONS, SCHEMA, Database, close_database, get_database
+from engine.profile_manager import ProfileManager
+
+
+class TestDatabase(unittest.TestCase):
+    """Unit tests for the shared SQLite connection."""
+
+    def setUp(self):
+        self.db_name = "test_database.db"
+        self.db = get_database(self.db_name)
+
+    def tearDown(self):
+        close_database(self.db_name)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.db_name + suffix):
+                os.remove(self.db_name + suffix)
+
+    def test_pragmas_and_schema(self):
+        """Test that the connection runs in WAL mode with the schema in place."""
+        self.assertEqual(self.db.query_one("PRAGMA journal_mode")[0], 'wal')
+        self.assertEqual(self.db.query_one("PRAGMA foreign_keys")[0], 1)
+        tables = {row[0] for row in self.db.query("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertTrue({'profiles', 'profile_settings', 'sys_command', 'web_command',
+                         'contacts', 'conversation_turns'} <= tables)
+
+    def test_one_manager_per_file(self):
+        """Test that profile managers share one connection."""
+        self.assertIs(ProfileManager(self.db_name).db, ProfileManager(self.db_name).db)
+        self.assertIs(get_database(self.db_name), self.db)
+
+    def test_transaction_rolls_back_on_error(self):
+        with self.assertRaises(ValueError):
+            with self.db.transaction() as con:
+                con.execute("INSERT INTO contacts (name, mobile_no) VALUES ('a', '1')")
+                raise ValueError
+        self.assertEqual(self.db.query_one("SELECT COUNT(*) FROM contacts")[0], 0)
+
+    def test_concurrent_writers(self):
+        """Test that threads can share the manager without errors."""
+        errors = []
+
+        def worker(n):
+            try:
+                manager = ProfileManager(self.db_name)
+                for i in range(50):
+                    user_id = manager.create_profile(f"user {n}-{i}")
+                    manager.set_preference(user_id, 'theme', 'dark')
+                    self.assertEqual(manager.get_preference(user_id, 'theme'), 'dark')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.db.query_one("SELECT COUNT(*) FROM profiles")[0], 400)
+
+
+    def test_in_memory_reads_hold_the_lock(self):
+        """Test that reads on the shared in-memory connection can't interleave with a transaction."""
+        db = Database(':memory:')
+        unlocked = []
+        db._connection().set_trace_callback(
+            lambda sql: None if db._lock._is_owned() else unlocked.append(sql))
+        db.execute("INSERT INTO contacts (name, mobile_no) VALUES ('a', '1')")
+        self.assertEqual(db.query("SELECT name FROM contacts"), [('a',)])
+        self.assertEqual(db.query_one("SELECT COUNT(*) FROM contacts"), (1,))
+        self.assertEqual(unlocked, [])
+
+class TestMigrations(unittest.TestCase):
+    """Unit tests for the versioned schema migrations and their indexes."""
+
+    def setUp(self):
+        self.db_name = "test_migrations.db"
+
+    def tearDown(self):
+        close_database(self.db_name)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.db_name + suffix):
+                os.remove(self.db_name + suffix)
+
+    def assertUsesIndex(self, sql, params, index):
+        plan = get_database(self.db_name).query_plan(sql, params)
+        self.assertTrue(any(index in line for line in plan), plan)
+        self.assertFalse(any('TEMP B-TREE' in line for line in plan), plan)
+
+    def test_new_database_is_current(self):
+        self.assertEqual(get_database(self.db_name).schema_version(), MIGRATIONS[-1][0])
+
+    def test_upgrades_legacy_database(self):
+        """Test that an unversioned file with duplicate settings is upgraded."""
+        con = sqlite3.connect(self.db_name)
+        for statement in SCHEMA:
+            con.execute(statement)
+        con.execute("INSERT INTO profiles (name) VALUES ('Asha')")
+        con.executemany("INSERT INTO profile_settings (user_id, setting_key, setting_value) VALUES (?, ?, ?)",
+                        [(1, 'theme', 'light'), (1, 'theme', 'dark'), (1, 'voice', 'default')])
+        con.commit()
+        con.close()
+
+        db = get_database(self.db_name)
+        self.assertEqual(db.schema_version(), MIGRATIONS[-1][0])
+        self.assertEqual(db.query("SELECT setting_key, setting_value FROM profile_settings ORDER BY id"),
+                         [('theme', 'dark'), ('voice', 'default')])
+
+        manager = ProfileManager(self.db_name)
+        manager.set_preference(1, 'theme', 'blue')
+        self.assertEqual(manager.get_preference(1, 'theme'), 'blue')
+        self.assertEqual(db.query_one("SELECT COUNT(*) FROM profile_settings")[0], 2)
+
+    def test_migrations_run_once(self):
+        get_database(self.db_name).execute("INSERT INTO contacts (name, mobile_no) VALUES ('a', '1')")
+        close_database(self.db_name)
+        db = get_database(self.db_name)
+        self.assertEqual(db.schema_version(), MIGRATIONS[-1][0])
+        self.assertEqual(db.query_one("SELECT COUNT(*) FROM contacts")[0], 1)
+
+    def test_name_lookups_use_indexes(self):
+        """Test the plans of the openCommand and findContact lookups."""
+        self.assertUsesIndex('SELECT path FROM sys_command WHERE LOWER(name) = ?',
+                             ('notepad',), 'idx_sys_command_name')
+        self.assertUsesIndex('SELECT url FROM web_command WHERE LOWER(name) = ?',
+                             ('youtube',), 'idx_web_command_name')
+        self.assertUsesIndex('SELECT mobile_no FROM contacts WHERE LOWER(name) >= ? AND LOWER(name) < ? '
+                             'ORDER BY LOWER(name) LIMIT 1', ('mo', 'mp'), 'idx_contacts_name')
+
+    def test_profile_queries_use_indexes(self):
+        self.assertUsesIndex('SELECT setting_value FROM profile_settings WHERE user_id = ? AND setting_key = ?',
+                             (1, 'theme'), 'idx_profile_settings_key')
+        self.assertUsesIndex('SELECT user_id, name FROM profiles WHERE is_active = 1 ORDER BY last_login DESC',
+                             (), 'idx_profiles_active_login')
+        self.assertUsesIndex('SELECT COUNT(*) FROM profiles WHERE is_active = 1',
+                             (), 'idx_profiles_active_login')
+
+
+if __name__ == '__main__':
+    unittest.main()
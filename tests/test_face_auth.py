@@ -0,0 +1,163 @@
+"""
+Vishwakarma AI - Face Authentication Tests
+© 2025 Vishwakarma Industries
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+try:
+    import cv2
+    import numpy
+    from engine.auth import recognize
+except ImportError:
+    cv2 = None
+
+FACE = (200, 100, 160, 160)
+
+
+class FakeCapture:
+    """A recorded video of blank 640x480 frames."""
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def read(self):
+        if self.frames <= 0:
+            return False, None
+        self.frames -= 1
+        return True, numpy.zeros((480, 640, 3), dtype=numpy.uint8)
+
+    def release(self):
+        pass
+
+
+class FakeDetector:
+    """Sees one face at FACE, in the whole frame or in a region around it."""
+
+    def __init__(self):
+        self.full_frames = 0
+        self.regions = 0
+
+    def detect(self, img, gray_img, min_size):
+        if gray_img.shape[:2] == (480, 640):
+            self.full_frames += 1
+            return [FACE]
+        self.regions += 1
+        # The tracking region starts half a face up and left of it
+        return [(80, 80, 160, 160)]
+
+
+class FakeRecognizer:
+    """Recognizes nobody until a given frame."""
+
+    def __init__(self, recognized_from=None):
+        self.recognized_from = recognized_from
+        self.calls = 0
+
+    def predict(self, face):
+        self.calls += 1
+        if self.recognized_from is not None and self.calls > self.recognized_from:
+            return 1, 40.0
+        return 1, 150.0
+
+
+@unittest.skipIf(cv2 is None, "OpenCV is not installed")
+class TestHelpers(unittest.TestCase):
+    """Unit tests for box geometry, tracks and detectors."""
+
+    def test_box_overlap(self):
+        self.assertEqual(recognize.box_overlap(FACE, FACE), 1.0)
+        self.assertEqual(recognize.box_overlap((0, 0, 10, 10), (20, 20, 10, 10)), 0.0)
+        self.assertAlmostEqual(recognize.box_overlap((0, 0, 10, 10), (5, 0, 10, 10)), 1 / 3)
+
+    def test_expand_box(self):
+        self.assertEqual(recognize.expand_box(FACE, 0.5, 640, 480), (120, 20, 320, 320))
+        self.assertEqual(recognize.expand_box((600, 440, 40, 40), 0.5, 640, 480), (580, 420, 60, 60))
+
+    def test_stable_track(self):
+        track = recognize.FaceTrack(FACE)
+        for frame in range(3):
+            self.assertTrue(track.needs_prediction(frame, 3, 15))
+            track.update(2, 150.0 + frame, frame)
+        self.assertEqual(track.streak, 3)
+        self.assertFalse(track.needs_prediction(3, 3, 15))
+        self.assertTrue(track.needs_prediction(17, 3, 15))
+        self.assertTrue(track.needs_prediction(3, 0, 15))
+        # A different outcome starts over
+        track.update(1, 40.0, 17)
+        self.assertEqual((track.streak, track.recognized), (1, True))
+
+    def test_haar_detection_is_downscaled(self):
+        detector = recognize.HaarDetector(detection_width=320)
+        detector.cascade = MagicMock()
+        detector.cascade.detectMultiScale.return_value = [(50, 25, 40, 40)]
+        gray = numpy.zeros((480, 640), dtype=numpy.uint8)
+        self.assertEqual(detector.detect(None, gray, (64, 48)), [(100, 50, 80, 80)])
+        image, = detector.cascade.detectMultiScale.call_args.args
+        self.assertEqual(image.shape, (240, 320))
+        self.assertEqual(detector.cascade.detectMultiScale.call_args.kwargs['minSize'], (32, 24))
+
+    def test_dnn_without_model_falls_back(self):
+        with patch.object(recognize, 'FACE_DNN_MODEL', '/nonexistent/model'), patch('builtins.print'):
+            detector = recognize.create_face_detector('dnn')
+        self.assertIsInstance(detector, recognize.HaarDetector)
+
+
+@unittest.skipIf(cv2 is None, "OpenCV is not installed")
+class TestAuthenticate(unittest.TestCase):
+    """Authentication over a recorded video with a fake detector and recognizer."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.trainer_file = os.path.join(self.directory, 'trainer.yml')
+        model = cv2.face.LBPHFaceRecognizer_create()
+        model.train([numpy.zeros((20, 20), dtype=numpy.uint8)] * 2, numpy.array([1, 1]))
+        model.write(self.trainer_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def authenticate(self, performance, recognizer, frames=12):
+        detector = FakeDetector()
+        with patch.object(recognize, 'TRAINER_FILE', self.trainer_file), \
+                patch.object(recognize, 'FACE_DETECT_EVERY', 3), \
+                patch.object(recognize, 'FACE_STABLE_MATCHES', 3), \
+                patch.object(recognize, '_open_capture', return_value=FakeCapture(frames)):
+            authenticator = recognize.FaceAuthenticator(performance=performance, detector=detector)
+            authenticator.recognizer = recognizer
+            result = authenticator.authenticate('video.mp4', show_preview=False)
+        return result, authenticator, detector
+
+    def test_baseline_detects_and_predicts_every_frame(self):
+        result, authenticator, detector = self.authenticate(False, FakeRecognizer())
+        self.assertFalse(result)
+        self.assertEqual((detector.full_frames, detector.regions), (12, 0))
+        self.assertEqual(authenticator.last_stats['predictions'], 12)
+        self.assertIsNone(authenticator.last_stats['time_to_auth'])
+
+    def test_performance_mode_tracks_and_skips_predictions(self):
+        recognizer = FakeRecognizer()
+        result, authenticator, detector = self.authenticate(True, recognizer)
+        self.assertFalse(result)
+        # Full detections on frames 0, 3, 6 and 9, tracking in between
+        self.assertEqual((detector.full_frames, detector.regions), (4, 8))
+        # Unknown three times in a row: not predicted again before frame 17
+        self.assertEqual(recognizer.calls, 3)
+        stats = authenticator.last_stats
+        self.assertEqual((stats['frames'], stats['detections'], stats['predictions']), (12, 12, 3))
+        self.assertGreater(stats['fps'], 0)
+
+    def test_time_to_authenticate(self):
+        result, authenticator, _ = self.authenticate(True, FakeRecognizer(recognized_from=1))
+        self.assertTrue(result)
+        self.assertEqual(authenticator.get_authenticated_user_id(), 1)
+        # Stopped at the second frame
+        self.assertEqual(authenticator.last_stats['frames'], 2)
+        self.assertIsNotNone(authenticator.last_stats['time_to_auth'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Vishwakarma AI - Fallback TTS Engine Tests
+© 2025 Vishwakarma Industries
+"""
+import threading
+import time
+import unittest
+
+from engine.fallback_tts import FallbackTTSEngine, default_driver
+
+
+class FakeVoice:
+    def __init__(self, voice_id):
+        self.id = voice_id
+
+
+class FakeDriverEngine:
+    """Stands in for a pyttsx3 engine and records how it is used."""
+
+    def __init__(self):
+        self.properties = {'voices': [FakeVoice('v0'), FakeVoice('v1')]}
+        self.spoken = []
+        self.callbacks = {}
+        self.threads = set()
+        self.stopped = False
+        self.words = []
+        self.word_delay = 0
+        self.speaking = threading.Event()
+
+    def getProperty(self, name):
+        self.threads.add(threading.get_ident())
+        return self.properties.get(name)
+
+    def setProperty(self, name, value):
+        self.threads.add(threading.get_ident())
+        self.properties[name] = value
+
+    def connect(self, topic, cb):
+        self.callbacks[topic] = cb
+
+    def say(self, text):
+        self.threads.add(threading.get_ident())
+        self.pending = text
+
+    def runAndWait(self):
+        self.threads.add(threading.get_ident())
+        self.stopped = False
+        for location, word in enumerate(self.pending.split()):
+            self.callbacks['started-word']('utterance', location, len(word))
+            if self.stopped:
+                return
+            self.words.append(word)
+            self.speaking.set()
+            time.sleep(self.word_delay)
+        self.spoken.append(self.pending)
+
+    def stop(self):
+        self.stopped = True
+
+
+class TestFallbackTTSEngine(unittest.TestCase):
+    """Unit tests for the long-lived fallback TTS engine."""
+
+    def setUp(self):
+        self.driver = FakeDriverEngine()
+        self.init_calls = []
+
+        def init_fn(driver_name):
+            self.init_calls.append(driver_name)
+            return self.driver
+
+        self.engine = FallbackTTSEngine(driver_name='espeak', rate=150, voice_index=1,
+                                        init_fn=init_fn)
+
+    def tearDown(self):
+        self.engine.shutdown(timeout=1)
+
+    def test_driver_initialized_once(self):
+        """Test that the driver starts once and is reused for every utterance."""
+        for text in ["one", "two", "three"]:
+            self.assertTrue(self.engine.say(text, timeout=1))
+        self.assertEqual(self.init_calls, ['espeak'])
+        self.assertEqual(self.driver.spoken, ["one", "two", "three"])
+        self.assertEqual(self.driver.properties['voice'], 'v1')
+        self.assertEqual(self.driver.properties['rate'], 150)
+
+    def test_engine_owned_by_one_thread(self):
+        """Test that the driver is only touched from the engine thread."""
+        self.engine.say("hello", timeout=1)
+        self.engine.set_property('rate', 200, timeout=1)
+        self.assertEqual(len(self.driver.threads), 1)
+        self.assertNotIn(threading.get_ident(), self.driver.threads)
+        self.assertEqual(self.driver.properties['rate'], 200)
+
+    def test_cancel_stops_speech(self):
+        """Test that a set cancel event stops the utterance."""
+        cancel_event = threading.Event()
+        cancel_event.set()
+        self.engine.say("never spoken", cancel_event=cancel_event, timeout=1)
+        self.assertEqual(self.driver.spoken, [])
+
+    def test_cancel_mid_utterance(self):
+        """Test that cancelling while speaking stops at the next word."""
+        self.driver.word_delay = 0.02
+        cancel_event = threading.Event()
+        text = " ".join(f"word{i}" for i in range(50))
+        speaker = threading.Thread(target=self.engine.say, args=(text,),
+                                   kwargs={'cancel_event': cancel_event, 'timeout': 5})
+        speaker.start()
+        self.assertTrue(self.driver.speaking.wait(timeout=1))
+        cancel_event.set()
+        speaker.join(timeout=5)
+
+        self.assertFalse(speaker.is_alive())
+        self.assertEqual(self.driver.spoken, [])
+        self.assertGreater(len(self.driver.words), 0)
+        self.assertLess(len(self.driver.words), 50)
+        # The engine keeps working afterwards
+        self.driver.word_delay = 0
+        self.assertTrue(self.engine.say("next one", timeout=1))
+        self.assertEqual(self.driver.spoken, ["next one"])
+
+    def test_init_failure_reported(self):
+        """Test that a missing driver fails fast instead of hanging."""
+        def broken_init(driver_name):
+            raise RuntimeError("no driver")
+
+        engine = FallbackTTSEngine(driver_name='espeak', init_fn=broken_init)
+        try:
+            self.assertFalse(engine.say("hello", timeout=1))
+        finally:
+            engine.shutdown(timeout=1)
+
+    def test_init_retried_after_failure(self):
+        """Test that a failed driver start is retried on the next utterance."""
+        attempts = []
+
+        def flaky_init(driver_name):
+            attempts.append(driver_name)
+            if len(attempts) == 1:
+                raise RuntimeError("audio device busy")
+            return self.driver
+
+        engine = FallbackTTSEngine(driver_name='espeak', init_fn=flaky_init)
+        try:
+            self.assertFalse(engine.say("first", timeout=1))
+            self.assertTrue(engine.say("second", timeout=1))
+            self.assertTrue(engine.say("third", timeout=1))
+        finally:
+            engine.shutdown(timeout=1)
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(self.driver.spoken, ["second", "third"])
+
+    def test_default_driver(self):
+        """Test driver auto-selection by platform."""
+        self.assertEqual(default_driver('win32'), 'sapi5')
+        self.assertEqual(default_driver('darwin'), 'nsss')
+        self.assertEqual(default_driver('linux'), 'espeak')
+
+
+if __name__ == '__main__':
+    unittest.main()
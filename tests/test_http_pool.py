@@ -0,0 +1,110 @@
+"""
+Vishwakarma AI - HTTP Connection Pool Tests
+© 2025 Vishwakarma Industries
+"""
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from engine.http_pool import (ConnectionStats, _record_httpx_response,
+                              create_http_session, connection_stats, get_llm_client)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Answers every request on a keep-alive HTTP/1.1 connection."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestPooledSession(unittest.TestCase):
+    """Tests connection reuse through the pooled session."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/v1/text-to-speech/x"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        connection_stats.reset()
+
+    def test_connection_reused_across_requests(self):
+        """Test that sequential requests share one keep-alive connection."""
+        session = create_http_session()
+        responses = [session.post(self.url, json={"text": str(i)}, timeout=5) for i in range(5)]
+
+        self.assertEqual([r.raw.connection_reused for r in responses],
+                         [False, True, True, True, True])
+        stats = connection_stats.snapshot()['127.0.0.1']
+        self.assertEqual(stats['requests'], 5)
+        self.assertEqual(stats['new_connections'], 1)
+        self.assertEqual(stats['reuse_rate'], 0.8)
+
+
+class TestConnectionStats(unittest.TestCase):
+    """Unit tests for the reuse counters."""
+
+    def test_counts_per_host(self):
+        stats = ConnectionStats()
+        stats.record("api.elevenlabs.io", False)
+        stats.record("api.elevenlabs.io", True)
+        stats.record("integrate.api.nvidia.com", False)
+
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot["api.elevenlabs.io"]["reused"], 1)
+        self.assertEqual(snapshot["integrate.api.nvidia.com"]["reuse_rate"], 0.0)
+
+
+class TestLLMClientCache(unittest.TestCase):
+    """Tests the cached LLM clients."""
+
+    def test_one_client_per_base_url_and_key(self):
+        """Test that clients are built once per (base_url, api_key)."""
+        first = get_llm_client("http://127.0.0.1:1/v1", "key-a")
+        self.assertIs(first, get_llm_client("http://127.0.0.1:1/v1", "key-a"))
+        self.assertIsNot(first, get_llm_client("http://127.0.0.1:1/v1", "key-b"))
+        self.assertIsNot(first, get_llm_client("http://127.0.0.1:2/v1", "key-a"))
+
+    def test_reuse_tracked_on_the_stream(self):
+        """Test that a new stream counts as a new connection even at a recycled address."""
+        connection_stats.reset()
+
+        class Stream:
+            pass
+
+        def respond(stream):
+            _record_httpx_response(SimpleNamespace(
+                extensions={'network_stream': stream},
+                request=SimpleNamespace(url=SimpleNamespace(host="llm.test"))))
+
+        first = Stream()
+        respond(first)
+        respond(first)
+        del first
+        # Typically allocated where the first stream was
+        respond(Stream())
+
+        stats = connection_stats.snapshot()["llm.test"]
+        self.assertEqual((stats['requests'], stats['reused']), (3, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
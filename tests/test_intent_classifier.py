@@ -0,0 +1,110 @@
+"""
+Vishwakarma AI - Local Intent Classifier Tests
+© 2025 Vishwakarma Industries
+"""
+import itertools
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault('pyautogui', MagicMock())
+sys.modules.setdefault('pywhatkit', MagicMock())
+sys.modules.setdefault('playsound', MagicMock())
+
+from engine import command, features, intent_classifier
+from engine.intent_classifier import (IntentClassifier, classify_command, evaluate,
+                                      get_intent_classifier, load_dataset)
+from engine.intents import get_intent_router, normalize_command
+
+TEMPLATES = {
+    'open_app': ["launch {app}", "fire up {app}", "bring up {app}", "start {app} app"],
+    'phone_call': ["ring {contact}", "give {contact} a call", "ring {contact} on whatsapp"],
+    'send_message': ["drop {contact} a text", "whatsapp {contact}", "text {contact} quickly"],
+    'chat': ["tell me about {app}", "what did {contact} say", "is {app} any good",
+             "how old is {contact}", "why is the sky blue", "tell me a joke"],
+}
+APPS = ["chrome", "spotify", "notepad", "vs code", "calculator", "telegram"]
+CONTACTS = ["mom", "dad", "rahul", "priya", "uncle ravi", "john"]
+
+
+def dataset():
+    examples = []
+    for label, templates in TEMPLATES.items():
+        for template, app, contact in itertools.product(templates, APPS, CONTACTS):
+            examples.append((normalize_command(template.format(app=app, contact=contact)), label))
+    return examples
+
+
+class TestIntentClassifier(unittest.TestCase):
+    """Tests training, prediction and persistence."""
+
+    @classmethod
+    def setUpClass(cls):
+        examples = dataset()
+        cls.classifier = IntentClassifier().fit([t for t, _ in examples],
+                                                [l for _, l in examples], epochs=6)
+
+    def test_paraphrases_are_recognized(self):
+        """Test that commands the patterns miss are classified with their slots."""
+        self.assertIsNone(get_intent_router().route("fire up spotify"))
+
+        match = classify_command("fire up spotify", self.classifier, threshold=0.7)
+        self.assertEqual((match.name, match.slots), ('open_app', {'app': 'spotify'}))
+        match = classify_command("ring uncle ravi on whatsapp", self.classifier, threshold=0.7)
+        self.assertEqual((match.name, match.slots), ('phone_call', {'contact': 'uncle ravi'}))
+
+    def test_chat_and_unsure_predictions_are_not_routed(self):
+        self.assertIsNone(classify_command("tell me about chrome", self.classifier))
+        self.assertIsNone(classify_command("fire up spotify", self.classifier, threshold=1.01))
+
+    def test_save_load_and_evaluate(self):
+        """Test that a saved model predicts the same and the tooling reads JSONL."""
+        with tempfile.TemporaryDirectory() as directory:
+            model_path = os.path.join(directory, 'model.json')
+            data_path = os.path.join(directory, 'data.jsonl')
+            self.classifier.save(model_path)
+            with open(data_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'text': "Launch Chrome!", 'intent': 'open_app'}) + '\n')
+                f.write(json.dumps({'text': "why is the sky blue", 'intent': 'chat'}) + '\n')
+
+            loaded = IntentClassifier.load(model_path)
+            examples = load_dataset(data_path)
+
+        self.assertEqual(examples[0], ("launch chrome", 'open_app'))
+        self.assertEqual(loaded.predict("launch chrome"), self.classifier.predict("launch chrome"))
+        report = evaluate(loaded, examples, threshold=0.5)
+        self.assertEqual(report['accuracy'], 1.0)
+        self.assertEqual(report['routed'], 1.0)
+
+    def test_process_command_skips_chatbot(self):
+        """Test that a confident prediction is executed without the chatbot."""
+        # A bare "launch" is only a loose pattern match, and chrome is not indexed
+        with patch.object(features, 'app_available', return_value=False), \
+                patch.object(command, 'get_intent_classifier', return_value=self.classifier), \
+                patch.object(command, 'classify_command',
+                             side_effect=lambda q, c: classify_command(q, c, threshold=0.7)), \
+                patch.object(features, 'openCommand') as open_command, \
+                patch.object(features, 'chatBot') as chat_bot:
+            command.process_command("launch chrome")
+            command.process_command("tell me about notepad")
+
+        open_command.assert_called_once_with('chrome')
+        chat_bot.assert_called_once_with("tell me about notepad")
+
+    def test_missing_model_is_reported_once(self):
+        with patch.object(intent_classifier, 'INTENT_MODEL_PATH', '/nonexistent/model.json'), \
+                patch.object(intent_classifier, '_classifier', None), \
+                patch.object(intent_classifier, '_classifier_loaded', False), \
+                patch('builtins.print') as log:
+            self.assertIsNone(get_intent_classifier())
+            self.assertIsNone(get_intent_classifier())
+        log.assert_called_once()
+        with patch.object(intent_classifier, 'INTENT_CLASSIFIER_ENABLED', False):
+            self.assertIsNone(get_intent_classifier())
+
+
+if __name__ == '__main__':
+    unittest.main()
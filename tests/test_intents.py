@@ -0,0 +1,107 @@
+"""
+Vishwakarma AI - Intent Router Tests
+© 2025 Vishwakarma Industries
+"""
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault('pyautogui', MagicMock())
+sys.modules.setdefault('pywhatkit', MagicMock())
+sys.modules.setdefault('playsound', MagicMock())
+
+from engine import command, features
+from engine.intents import Intent, IntentRouter, get_intent_router, normalize_command
+
+
+class TestIntentRouter(unittest.TestCase):
+    """Unit tests for intent matching and slot extraction."""
+
+    def setUp(self):
+        self.router = get_intent_router()
+
+    def assertRoutes(self, query, name, **slots):
+        match = self.router.route(query)
+        self.assertIsNotNone(match, query)
+        self.assertEqual(match.name, name, query)
+        self.assertEqual(match.slots, slots, query)
+        self.assertTrue(0 < match.score <= 1)
+
+    def test_commands(self):
+        self.assertRoutes("open chrome", 'open_app', app='chrome')
+        self.assertRoutes("Vishwakarma, launch the Spotify app please", 'open_app', app='spotify')
+        self.assertRoutes("play lofi beats on YouTube", 'play_youtube', term='lofi beats')
+        self.assertRoutes("can you make a phone call to mom", 'phone_call', contact='mom')
+        self.assertRoutes("call priya sharma", 'phone_call', contact='priya sharma')
+        self.assertRoutes("start a video call with rahul", 'video_call', contact='rahul')
+        self.assertRoutes("send a whatsapp message to dad", 'send_message', contact='dad')
+
+    def test_words_match_on_boundaries_only(self):
+        """Test that keywords inside other words or sentences don't trigger commands."""
+        for query in ["reopen the discussion", "what are the opening hours of the bank",
+                      "how do i open a bank account", "i missed a call from mom",
+                      "what is a video call", "tell me a joke", "open"]:
+            self.assertIsNone(self.router.route(query), query)
+
+    def test_bare_verbs_are_loose(self):
+        """Test that a verb before free text scores below the dispatch threshold."""
+        for query in ["call of duty release date", "call me later", "text summarization techniques",
+                      "open source licenses explained", "call priya sharma", "open notepad"]:
+            self.assertTrue(self.router.route(query).loose, query)
+        for query in ["make a phone call to mom", "send a message to dad", "video call rahul",
+                      "open the notepad app", "open google.com", "play lofi beats on youtube"]:
+            self.assertFalse(self.router.route(query).loose, query)
+        self.assertIsNone(self.router.route("find my phone on youtube"))
+
+    def test_first_declared_intent_wins(self):
+        """Test that intents are tried in registry order."""
+        router = IntentRouter([Intent('first', [r'go\s+(?P<place>.+)']),
+                               Intent('second', [r'go\s+home'])])
+        self.assertEqual(router.route("go home").name, 'first')
+
+    def test_normalize_command(self):
+        self.assertEqual(normalize_command("Hey Vishwakarma!  Open google.com."),
+                         "hey open google.com")
+
+
+class TestProcessCommand(unittest.TestCase):
+    """Tests that process_command() dispatches on the routed intent."""
+
+    def test_dispatch(self):
+        with patch.object(features, 'openCommand') as open_command, \
+                patch.object(features, 'app_available', return_value=True), \
+                patch.object(features, 'chatBot') as chat_bot, \
+                patch.object(command, 'handle_communication_command') as communicate:
+            command.process_command("open notepad")
+            command.process_command("what are the opening hours of the bank")
+            command.process_command("video call to rahul")
+
+        open_command.assert_called_once_with('notepad')
+        chat_bot.assert_called_once_with("what are the opening hours of the bank")
+        self.assertEqual(communicate.call_args.args[0], 'rahul')
+        self.assertEqual(communicate.call_args.kwargs['action'], 'video_call')
+
+    def test_loose_matches_need_a_known_slot(self):
+        """Test that bare verbs only act on known contacts and apps."""
+        queries = ["call of duty release date", "call me later", "text summarization techniques",
+                   "open source licenses explained", "find my phone on youtube", "call priya",
+                   "open spotify"]
+        with patch.object(features, 'contact_known', side_effect=lambda name: name == 'priya'), \
+                patch.object(features, 'app_available', side_effect=lambda name: name == 'spotify'), \
+                patch.object(command, 'get_intent_classifier', return_value=None), \
+                patch.object(features, 'openCommand') as open_command, \
+                patch.object(features, 'PlayYoutube') as play_youtube, \
+                patch.object(features, 'chatBot') as chat_bot, \
+                patch.object(command, 'handle_communication_command') as communicate:
+            for query in queries:
+                command.process_command(query)
+
+        self.assertEqual([c.args[0] for c in chat_bot.call_args_list], queries[:5])
+        communicate.assert_called_once()
+        self.assertEqual(communicate.call_args.args[0], 'priya')
+        open_command.assert_called_once_with('spotify')
+        play_youtube.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+"""
+Vishwakarma AI - Continuous Listener Tests
+© 2025 Vishwakarma Industries
+"""
+import math
+import struct
+import threading
+import unittest
+from unittest.mock import patch
+
+from engine.listener import (ContinuousListener, EnergyVAD, FrameRingBuffer,
+                             UtteranceSegmenter, strip_wake_word)
+
+RATE = 16000
+FRAME_MS = 30
+FRAME_SAMPLES = RATE * FRAME_MS // 1000
+
+
+def silence():
+    return b'\x00\x00' * FRAME_SAMPLES
+
+
+def tone(amplitude=6000):
+    return b''.join(struct.pack('<h', int(amplitude * math.sin(2 * math.pi * 440 * i / RATE)))
+                    for i in range(FRAME_SAMPLES))
+
+
+class ScriptedSource:
+    """Plays back a fixed list of frames, then signals when exhausted."""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.opened = 0
+        self.exhausted = threading.Event()
+
+    def open(self):
+        self.opened += 1
+
+    def read(self):
+        if not self.frames:
+            self.exhausted.set()
+            threading.Event().wait(0.01)
+            return silence()
+        return self.frames.pop(0)
+
+    def close(self):
+        pass
+
+
+class FlakySource(ScriptedSource):
+    """Fails to read a number of times before playing back its frames."""
+
+    def __init__(self, frames, failures):
+        super().__init__(frames)
+        self.failures = failures
+        self.closed = 0
+
+    def read(self):
+        if self.failures > 0:
+            self.failures -= 1
+            raise OSError("Input overflowed")
+        return super().read()
+
+    def close(self):
+        self.closed += 1
+
+
+def speech_segment(frames=10):
+    return [silence()] * 20 + [tone()] * frames + [silence()] * 40
+
+
+class TestSegmenter(unittest.TestCase):
+    """Tests VAD segmentation."""
+
+    def test_segments_one_utterance_with_pre_roll(self):
+        """Test that speech surrounded by silence becomes one utterance."""
+        segmenter = UtteranceSegmenter(EnergyVAD(), frame_ms=FRAME_MS, pre_roll_ms=90,
+                                       silence_ms=300, max_seconds=5)
+        results = [segmenter.push(frame) for frame in speech_segment(frames=10)]
+        utterances = [r for r in results if r]
+
+        self.assertEqual(len(utterances), 1)
+        frames = len(utterances[0]) // len(silence())
+        # pre-roll + speech + trailing silence
+        self.assertEqual(frames, 3 + 10 + 10)
+
+    def test_max_length(self):
+        """Test that continuous speech is cut at the maximum length."""
+        segmenter = UtteranceSegmenter(EnergyVAD(), frame_ms=FRAME_MS, max_seconds=0.3)
+        results = [segmenter.push(frame) for frame in [silence()] * 5 + [tone()] * 30]
+        self.assertGreaterEqual(len([r for r in results if r]), 2)
+
+
+class TestRingBuffer(unittest.TestCase):
+    """Tests the capture ring buffer."""
+
+    def test_drops_oldest_when_full(self):
+        """Test that a full buffer keeps the newest frames."""
+        ring = FrameRingBuffer(max_frames=2)
+        for frame in [b'1', b'2', b'3']:
+            ring.put(frame)
+        self.assertEqual(ring.dropped, 1)
+        self.assertEqual([ring.get(timeout=0), ring.get(timeout=0)], [b'2', b'3'])
+        self.assertIsNone(ring.get(timeout=0))
+
+
+class TestWakeWord(unittest.TestCase):
+    """Tests wake word matching."""
+
+    def test_strip_wake_word(self):
+        self.assertEqual(strip_wake_word("Vishwakarma, open chrome", "vishwakarma"), "open chrome")
+        self.assertEqual(strip_wake_word("hey vishwakarma", "vishwakarma"), "")
+        self.assertIsNone(strip_wake_word("open chrome", "vishwakarma"))
+        self.assertIsNone(strip_wake_word("vishwakarmas", "vishwakarma"))
+
+
+class TestContinuousListener(unittest.TestCase):
+    """Tests the capture and segmentation threads end to end."""
+
+    def run_listener(self, frames, **kwargs):
+        source = ScriptedSource(frames)
+        listener = ContinuousListener(source, vad=EnergyVAD(), frame_ms=FRAME_MS, **kwargs)
+        listener.start()
+        source.exhausted.wait(timeout=5)
+        return listener, source
+
+    def test_queues_utterances_from_one_device_session(self):
+        """Test that several utterances arrive from one open device."""
+        listener, source = self.run_listener(speech_segment() + speech_segment())
+        try:
+            first = listener.next_utterance(timeout=2)
+            second = listener.next_utterance(timeout=2)
+        finally:
+            listener.stop(timeout=1)
+
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        self.assertEqual(first.audio.sample_rate, RATE)
+        self.assertEqual(source.opened, 1)
+
+    def test_wake_word_gate(self):
+        """Test that only utterances with the wake word are queued."""
+        transcripts = iter(["what a nice day", "vishwakarma open chrome"])
+        woken = threading.Event()
+        listener, _ = self.run_listener(speech_segment() + speech_segment(),
+                                        wake_word="vishwakarma",
+                                        transcriber=lambda audio: next(transcripts),
+                                        on_wake=woken.set)
+        try:
+            self.assertTrue(woken.wait(timeout=2))
+            self.assertEqual(listener.utterances.qsize(), 1)
+            utterance = listener.next_utterance(timeout=0.5)
+        finally:
+            listener.stop(timeout=1)
+
+        self.assertEqual(utterance.text, "open chrome")
+
+    def test_muted_while_speaking(self):
+        """Test that audio is ignored while the mute function is true."""
+        listener, _ = self.run_listener(speech_segment(), mute_fn=lambda: True)
+        try:
+            self.assertIsNone(listener.next_utterance(timeout=0.2))
+        finally:
+            listener.stop(timeout=1)
+
+    def test_reopens_source_after_capture_error(self):
+        """Test that a failing device is reopened with backoff instead of killing the listener."""
+        source = FlakySource(speech_segment(), failures=3)
+        listener = ContinuousListener(source, vad=EnergyVAD(), frame_ms=FRAME_MS,
+                                      restart_backoff=0.01, max_restart_backoff=0.02)
+        with patch('builtins.print'):
+            listener.start()
+            try:
+                utterance = listener.next_utterance(timeout=2)
+                self.assertTrue(listener.is_running())
+            finally:
+                listener.stop(timeout=1)
+
+        self.assertIsNotNone(utterance)
+        self.assertEqual((source.opened, source.closed), (4, 4))
+        self.assertFalse(listener.is_running())
+
+
+if __name__ == '__main__':
+    unittest.main()
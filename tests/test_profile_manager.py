@@ -5,6 +5,7 @@ Vishwakarma AI - Profile Manager Tests
 import unittest
 import os
 import json
+from engine.database import close_database
 from engine.profile_manager import ProfileManager
 
 class TestProfileManager(unittest.TestCase):
@@ -17,6 +18,7 @@ class TestProfileManager(unittest.TestCase):
 
     def tearDown(self):
         """Remove the temporary database after testing."""
+        close_database(self.db_name)
         if os.path.exists(self.db_name):
             os.remove(self.db_name)
 
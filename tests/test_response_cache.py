@@ -0,0 +1,136 @@
+"""
+Vishwakarma AI - Chatbot Response Cache Tests
+© 2025 Vishwakarma Industries
+"""
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault('pyautogui', MagicMock())
+sys.modules.setdefault('pywhatkit', MagicMock())
+sys.modules.setdefault('playsound', MagicMock())
+
+from engine import features
+from engine.response_cache import ResponseCache, is_cacheable, normalize_query
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(unittest.TestCase):
+    """Unit tests for lookup, expiry and eviction."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResponseCache(max_entries=3, ttl=60, similarity=0.8, clock=self.clock)
+
+    def test_exact_and_normalized_hits(self):
+        """Test that punctuation, case and filler words don't matter."""
+        self.cache.put("Who are you?", "I am Vishwakarma AI.", latency=1.5)
+        self.assertEqual(self.cache.get("who are you"), "I am Vishwakarma AI.")
+        self.assertEqual(self.cache.get("Hey Vishwakarma, who are you please"),
+                         "I am Vishwakarma AI.")
+        self.cache.put("What's the capital of France?", "Paris.")
+        self.assertEqual(self.cache.get("what is the capital of france"), "Paris.")
+
+        stats = self.cache.stats()
+        self.assertEqual(stats['exact_hits'], 3)
+        self.assertAlmostEqual(stats['latency_saved'], 3.0)
+        self.assertGreater(stats['memory_bytes'], 0)
+
+    def test_similar_hit(self):
+        """Test that a near-identical query is served by trigram similarity."""
+        self.cache.put("who invented the telephone", "Alexander Graham Bell.")
+        self.assertEqual(self.cache.get("who invented the telephones"), "Alexander Graham Bell.")
+        self.assertEqual(self.cache.stats()['similar_hits'], 1)
+        self.assertIsNone(self.cache.get("who invented the television"))
+
+    def test_numbers_must_match(self):
+        """Test that queries differing only in a number are not merged."""
+        self.cache.put("convert 10 dollars to rupees", "Ten dollars is about 830 rupees.")
+        self.assertIsNone(self.cache.get("convert 12 dollars to rupees"))
+
+    def test_content_words_must_match(self):
+        """Test that similar spelling with different words is a miss."""
+        self.cache.put("what is the capital of india", "New Delhi.")
+        self.assertIsNone(self.cache.get("what is the capital of indiana"))
+        self.cache.put("can you sing a song", "La la la.")
+        self.assertIsNone(self.cache.get("can alexa sing a song"))
+        self.assertIsNone(self.cache.get("could you sing a song"))
+        self.assertEqual(self.cache.stats()['similar_hits'], 0)
+
+    def test_personal_questions_bypass(self):
+        """Test that questions about the user are never cached."""
+        for question in ["what is my name", "what did I just tell you", "do you remember where we met"]:
+            self.assertFalse(is_cacheable(question))
+            self.assertFalse(self.cache.put(question, "Ravi."))
+
+    def test_replies_kept_per_user(self):
+        """Test that one profile's reply is not served to another."""
+        self.cache.put("who are you", "I am Vishwakarma AI.", user_id=1)
+        self.assertEqual(self.cache.get("who are you?", user_id=1), "I am Vishwakarma AI.")
+        self.assertIsNone(self.cache.get("who are you", user_id=2))
+        self.assertIsNone(self.cache.get("who are you"))
+
+    def test_ttl_expiry(self):
+        """Test that entries expire."""
+        self.cache.put("who made you", "Vishwakarma Industries.")
+        self.clock.now = 61
+        self.assertIsNone(self.cache.get("who made you"))
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        for question in ["first question asked", "second question asked", "third question asked"]:
+            self.cache.put(question, question.upper())
+        self.cache.get("first question asked")
+        self.cache.put("fourth question asked", "FOURTH")
+
+        self.assertIsNone(self.cache.get("second question asked"))
+        self.assertEqual(self.cache.get("first question asked"), "FIRST QUESTION ASKED")
+
+    def test_time_sensitive_and_follow_up_bypass(self):
+        """Test that time-sensitive and context-dependent queries are not cached."""
+        self.assertFalse(is_cacheable("what time is it"))
+        self.assertFalse(is_cacheable("what's the weather today"))
+        self.assertFalse(is_cacheable("tell me more about it"))
+        self.assertTrue(is_cacheable("tell me a joke"))
+
+        self.assertFalse(self.cache.put("what's the latest news", "Nothing new."))
+        self.assertIsNone(self.cache.get("what's the latest news"))
+        self.assertEqual(self.cache.stats()['bypassed'], 1)
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("Hey, Vishwakarma! Who are YOU?"), "who are you")
+
+
+class TestChatBotCache(unittest.TestCase):
+    """Tests that chatBot() skips the model on a cache hit."""
+
+    def test_second_query_is_served_from_cache(self):
+        client = MagicMock()
+        client.chat.completions.create.return_value.choices[0].message.content = "I am an AI."
+        cache = ResponseCache()
+
+        with patch.object(features, 'NVIDIA_API_KEY', 'test-key'), \
+                patch.object(features, 'CHATBOT_STREAMING', False), \
+                patch.object(features, 'get_conversation', return_value=None), \
+                patch.object(features, 'get_response_cache', return_value=cache), \
+                patch.object(features, 'get_llm_client', return_value=client), \
+                patch.object(features, 'speak') as speak:
+            first = features.chatBot("Who are you?")
+            second = features.chatBot("who are you")
+
+        self.assertEqual(first, second)
+        self.assertEqual(client.chat.completions.create.call_count, 1)
+        self.assertEqual(speak.call_count, 2)
+        self.assertEqual(cache.stats()['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
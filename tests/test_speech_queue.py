@@ -0,0 +1,149 @@
+"""
+Vishwakarma AI - Speech Queue Tests
+© 2025 Vishwakarma Industries
+"""
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault('playsound', MagicMock())
+
+from engine import command
+from engine.speech_queue import (PRIORITY_LOW, PRIORITY_URGENT, SpeechWorker)
+
+
+class FakeSpeaker:
+    """Records utterances and plays each for a fixed time unless cancelled."""
+
+    def __init__(self, duration=0.05):
+        self.duration = duration
+        self.spoken = []
+        self.started = threading.Event()
+
+    def __call__(self, text, cancel_event):
+        self.started.set()
+        deadline = time.monotonic() + self.duration
+        while time.monotonic() < deadline:
+            if cancel_event.is_set():
+                return
+            time.sleep(0.005)
+        self.spoken.append(text)
+
+
+class SlowWorkerLock:
+    """A lock the speech worker thread is slow to take, widening any race."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def acquire(self, blocking=True, timeout=-1):
+        if threading.current_thread().name == "speech-worker":
+            time.sleep(0.01)
+        return self._lock.acquire(blocking, timeout)
+
+    def release(self):
+        self._lock.release()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class TestSpeechWorker(unittest.TestCase):
+    """Unit tests for the background speech worker."""
+
+    def setUp(self):
+        self.speaker = FakeSpeaker()
+        self.worker = SpeechWorker(self.speaker)
+
+    def tearDown(self):
+        self.worker.stop(timeout=1)
+
+    def test_say_returns_before_audio_finishes(self):
+        """Test that queueing speech does not block the caller."""
+        start = time.perf_counter()
+        handle = self.worker.say("Hello")
+        self.assertLess(time.perf_counter() - start, self.speaker.duration)
+        self.assertTrue(handle.wait(timeout=1))
+        self.assertTrue(handle.spoken)
+        self.assertEqual(self.speaker.spoken, ["Hello"])
+
+    def test_priority_order(self):
+        """Test that urgent speech jumps the queue and equal priorities keep order."""
+        first = self.worker.say("first")
+        self.speaker.started.wait(timeout=1)
+        self.worker.say("low", priority=PRIORITY_LOW)
+        self.worker.say("normal one")
+        self.worker.say("normal two")
+        last = self.worker.say("urgent", priority=PRIORITY_URGENT)
+        first.wait(timeout=1)
+        self.worker.say("end", priority=PRIORITY_LOW).wait(timeout=2)
+
+        self.assertEqual(self.speaker.spoken,
+                         ["first", "urgent", "normal one", "normal two", "low", "end"])
+        self.assertTrue(last.spoken)
+
+    def test_interrupt_cancels_current_and_pending(self):
+        """Test barge-in stops the current utterance and drops the queue."""
+        self.speaker.duration = 5
+        current = self.worker.say("a long answer")
+        self.speaker.started.wait(timeout=1)
+        pending = self.worker.say("more")
+
+        self.worker.interrupt()
+
+        self.assertTrue(current.wait(timeout=1))
+        self.assertTrue(pending.wait(timeout=1))
+        self.assertFalse(current.spoken)
+        self.assertFalse(pending.spoken)
+        self.assertEqual(self.speaker.spoken, [])
+
+    def test_interrupt_right_after_dequeue(self):
+        """Test that an utterance the worker just took off the queue is not missed."""
+        self.speaker.duration = 5
+        self.worker._lock = SlowWorkerLock()
+        self.worker._ready = threading.Condition(self.worker._lock)
+        for _ in range(20):
+            handle = self.worker.say("hello")
+            # Let the worker take it off the queue
+            time.sleep(0.002)
+            self.worker.interrupt()
+            # Either drained from the queue or cancelled as the current one
+            self.assertTrue(handle.cancelled)
+            self.assertTrue(handle.wait(timeout=1))
+        self.assertEqual(self.speaker.spoken, [])
+
+    def test_await_handle(self):
+        """Test awaiting a handle from asyncio code."""
+        async def speak_and_wait():
+            return await self.worker.say("async hello")
+
+        self.assertTrue(asyncio.run(speak_and_wait()))
+        self.assertEqual(self.speaker.spoken, ["async hello"])
+
+
+class TestSpeak(unittest.TestCase):
+    """Tests for the non-blocking speak() entry point."""
+
+    def test_ui_updates_before_audio(self):
+        """Test that the UI callbacks fire before the audio has played."""
+        speaker = FakeSpeaker(duration=0.2)
+        worker = SpeechWorker(speaker)
+        try:
+            with patch.object(command, 'eel') as eel, \
+                    patch.object(command, 'get_speech_worker', return_value=worker):
+                handle = command.speak("Face Authentication Successful")
+                eel.DisplayMessage.assert_called_once_with("Face Authentication Successful")
+                eel.receiverText.assert_called_once_with("Face Authentication Successful")
+                self.assertFalse(handle.done())
+                handle.wait(timeout=1)
+        finally:
+            worker.stop(timeout=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Vishwakarma AI - Speech-to-Text Tests
+© 2025 Vishwakarma Industries
+"""
+import math
+import os
+import struct
+import tempfile
+import unittest
+import wave
+from unittest.mock import MagicMock
+
+import speech_recognition as sr
+
+from engine.stt import (NoiseCalibrator, STTBackend, get_stt_backend,
+                        transcribe_file)
+
+
+def write_tone_wav(path, seconds=0.5, rate=16000):
+    """Writes a short 16-bit mono sine tone as a WAV fixture."""
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        frames = b''.join(
+            struct.pack('<h', int(8000 * math.sin(2 * math.pi * 440 * i / rate)))
+            for i in range(int(seconds * rate)))
+        wav.writeframes(frames)
+
+
+class EchoBackend(STTBackend):
+    """Returns a fixed transcript and records what it was given."""
+
+    name = 'echo'
+
+    def __init__(self, text):
+        self.text = text
+        self.audio = None
+
+    def transcribe(self, audio):
+        self.audio = audio
+        if not self.text:
+            raise sr.UnknownValueError()
+        return self.text
+
+
+class TestTranscribeFile(unittest.TestCase):
+    """Tests recognition from recorded WAV fixtures."""
+
+    def setUp(self):
+        fd, self.wav_path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        write_tone_wav(self.wav_path)
+
+    def tearDown(self):
+        os.remove(self.wav_path)
+
+    def test_transcribe_file_reports_latency(self):
+        """Test that a WAV fixture is decoded and timed without a microphone."""
+        backend = EchoBackend("open chrome")
+        text, latency = transcribe_file(self.wav_path, backend=backend)
+
+        self.assertEqual(text, "open chrome")
+        self.assertGreaterEqual(latency, 0)
+        self.assertEqual(backend.audio.sample_rate, 16000)
+        self.assertEqual(len(backend.audio.get_raw_data()), 16000)
+
+    def test_unrecognized_audio(self):
+        """Test that backends signal silence with UnknownValueError."""
+        with self.assertRaises(sr.UnknownValueError):
+            transcribe_file(self.wav_path, backend=EchoBackend(""))
+
+
+class TestNoiseCalibrator(unittest.TestCase):
+    """Tests cached ambient noise calibration."""
+
+    def test_calibrates_on_schedule(self):
+        """Test that calibration only re-runs once the interval has passed."""
+        now = [0.0]
+        recognizer = MagicMock()
+        calibrator = NoiseCalibrator(recognizer, interval=60, duration=0.5,
+                                     clock=lambda: now[0])
+        source = object()
+
+        self.assertTrue(calibrator.calibrate(source))
+        now[0] = 30
+        self.assertFalse(calibrator.calibrate(source))
+        now[0] = 61
+        self.assertTrue(calibrator.calibrate(source))
+        self.assertTrue(calibrator.calibrate(source, force=True))
+        self.assertEqual(recognizer.adjust_for_ambient_noise.call_count, 3)
+
+
+class TestBackendRegistry(unittest.TestCase):
+    """Tests backend selection."""
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend name is rejected."""
+        with self.assertRaises(ValueError):
+            get_stt_backend('nonexistent')
+
+    def test_google_backend_is_shared(self):
+        """Test that backends are created once and reused."""
+        self.assertIs(get_stt_backend('google'), get_stt_backend('GOOGLE'))
+
+
+if __name__ == '__main__':
+    unittest.main()
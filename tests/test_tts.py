@@ -0,0 +1,163 @@
+"""
+Vishwakarma AI - Streaming TTS Tests
+© 2025 Vishwakarma Industries
+"""
+import json
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.modules.setdefault('playsound', MagicMock())
+
+import requests
+
+from engine import command, tts
+from engine.tts import (BufferSink, PartialPlaybackError, pcm_sample_rate, play_elevenlabs,
+                        stream_speech)
+
+CHUNKS = [b'\x01\x02\x03', b'\x04\x05', b'\x06\x07\x08\x09', b'\x0a']
+CHUNK_DELAY = 0.05
+
+
+class TrickleHandler(BaseHTTPRequestHandler):
+    """Stands in for the ElevenLabs streaming endpoint."""
+
+    protocol_version = 'HTTP/1.1'
+    requests_seen = []
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        TrickleHandler.requests_seen.append({
+            'path': self.path,
+            'api_key': self.headers['xi-api-key'],
+            'body': json.loads(self.rfile.read(length))
+        })
+        self.send_response(200)
+        self.send_header('Content-Type', 'audio/pcm')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for chunk in CHUNKS:
+            self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.flush()
+            time.sleep(CHUNK_DELAY)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TimedSink(BufferSink):
+    """Records when each block reached the sink."""
+
+    def __init__(self):
+        super().__init__()
+        self.write_times = []
+        self.closed = False
+
+    def write(self, data):
+        self.write_times.append(time.perf_counter())
+        super().write(data)
+
+    def close(self):
+        self.closed = True
+
+
+class TestStreamSpeech(unittest.TestCase):
+    """Unit tests for streaming speech playback."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), TrickleHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        TrickleHandler.requests_seen.clear()
+
+    def test_plays_chunks_as_they_arrive(self):
+        """Test that audio reaches the sink before the stream has finished."""
+        sink = TimedSink()
+        start = time.perf_counter()
+        stats = stream_speech("Hello there", sink, base_url=self.base_url,
+                              api_key="test-key", voice_id="voice-1", chunk_size=1)
+        end = time.perf_counter()
+
+        self.assertEqual(stats['bytes'], sum(len(c) for c in CHUNKS))
+        self.assertLess(stats['ttfb'], stats['total'])
+        self.assertLess(sink.write_times[0] - start, end - start - CHUNK_DELAY)
+        self.assertTrue(sink.closed)
+
+    def test_writes_whole_samples_only(self):
+        """Test that odd-sized network chunks are realigned to 16-bit samples."""
+        sink = TimedSink()
+        stream_speech("Hello", sink, base_url=self.base_url, voice_id="voice-1")
+
+        self.assertTrue(all(len(block) % 2 == 0 for block in sink.chunks))
+        self.assertEqual(sink.getvalue(), b''.join(CHUNKS)[:10])
+
+    def test_request_format(self):
+        """Test the streaming endpoint, format and payload sent."""
+        stream_speech("Hello", BufferSink(), base_url=self.base_url,
+                      api_key="test-key", voice_id="voice-1",
+                      output_format="pcm_16000")
+        request = TrickleHandler.requests_seen[0]
+
+        self.assertEqual(request['path'],
+                         "/v1/text-to-speech/voice-1/stream?output_format=pcm_16000")
+        self.assertEqual(request['api_key'], "test-key")
+        self.assertEqual(request['body']['text'], "Hello")
+
+    def test_pcm_sample_rate(self):
+        """Test parsing the sample rate from an output format."""
+        self.assertEqual(pcm_sample_rate("pcm_22050"), 22050)
+
+
+
+class TestBrokenStream(unittest.TestCase):
+    """A stream that breaks mid-sentence is not spoken again from the start."""
+
+    def play(self, chunks_before_failure):
+        sink = TimedSink()
+
+        def broken_stream(text, recorder, cancel_event=None):
+            for chunk in CHUNKS[:chunks_before_failure]:
+                recorder.write(chunk)
+            raise requests.exceptions.ChunkedEncodingError("connection reset")
+
+        with patch.object(tts, 'open_audio_sink', return_value=sink), \
+                patch.object(tts, 'ELEVENLABS_STREAMING', True), \
+                patch.object(tts, 'TTS_CACHE_ENABLED', False), \
+                patch.object(tts, 'stream_speech', side_effect=broken_stream):
+            play_elevenlabs("Hello there, how are you")
+        return sink
+
+    def test_partial_playback(self):
+        with self.assertRaises(PartialPlaybackError):
+            self.play(2)
+        # Nothing was heard yet: the caller may still fall back
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            self.play(0)
+
+    def test_speak_now_does_not_repeat(self):
+        with patch.object(command, 'ELEVENLABS_API_KEY', 'key'), \
+                patch.object(command, 'fallback_speak') as fallback, patch('builtins.print'):
+            with patch.object(command, 'play_elevenlabs', side_effect=PartialPlaybackError("reset")):
+                command.speak_now("Hello there")
+            fallback.assert_not_called()
+            with patch.object(command, 'play_elevenlabs',
+                              side_effect=requests.exceptions.ConnectionError("down")):
+                command.speak_now("Hello there")
+            fallback.assert_called_once_with("Hello there", None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,367 @@
+"""
+Vishwakarma AI - WhatsApp Automation Tests
+© 2025 Vishwakarma Industries
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault('pyautogui', MagicMock())
+sys.modules.setdefault('pywhatkit', MagicMock())
+sys.modules.setdefault('playsound', MagicMock())
+
+from engine import features
+from engine.adb import format_timings
+from engine.android_messaging import FAILED, SENT, UNKNOWN
+from engine.contact_index import ContactMatch
+from engine.whatsapp import (Locator, TemplateMatcher, WhatsAppBroadcast, WhatsAppError,
+                             WhatsAppSession, WhatsAppUnconfirmedError, chat_url,
+                             create_template_matcher, render_message)
+
+try:
+    import cv2
+    import numpy
+except ImportError:
+    cv2 = numpy = None
+
+
+class FakeClock:
+    """Time that only passes when slept through."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeGui:
+    """
+    A 1000x1000 desktop whose WhatsApp window comes to the front after a
+    few polls. Opening a chat redraws its header and compose box, a key or
+    click the compose box; other parts of the window are "elsewhere".
+    """
+
+    def __init__(self, polls_until_open=3, title="WhatsApp"):
+        self.polls_until_open = polls_until_open
+        self.title = title
+        self.keys = []
+        self.clicks = []
+        self.urls = []
+        self.frames = {'header': 0, 'compose': 0, 'elsewhere': 0}
+        self.on_open = ('header', 'compose')
+        self.on_input = ('compose',)
+
+    def open(self, url):
+        self.urls.append(url)
+        self.redraw(self.on_open)
+
+    def redraw(self, parts):
+        for part in parts:
+            self.frames[part] += 1
+
+    def size(self):
+        return 1000, 1000
+
+    def screenshot(self, region=None):
+        return self.frames['header' if region[1] < 100 else 'compose' if region[1] >= 800 else 'elsewhere']
+
+    def getActiveWindowTitle(self):
+        if self.polls_until_open > 0:
+            self.polls_until_open -= 1
+            return "Vishwakarma AI"
+        return self.title
+
+    def hotkey(self, *keys):
+        self.keys.append(keys)
+        self.redraw(self.on_input)
+
+    def click(self, x, y):
+        self.clicks.append((x, y))
+        self.redraw(self.on_input)
+
+
+class FakeMatcher:
+    """Templates that are on screen after a number of looks."""
+
+    def __init__(self, **looks_until_visible):
+        self.looks = looks_until_visible
+        self.positions = {'send.png': (1800, 1000), 'voice_call.png': (1700, 60)}
+
+    def available(self, name):
+        return name in self.looks
+
+    def locate(self, name, region=None):
+        looks = self.looks[name]
+        if isinstance(looks, list):
+            # A sequence of visible/hidden answers
+            return self.positions[name] if looks.pop(0) else None
+        self.looks[name] -= 1
+        return self.positions[name] if looks <= 0 else None
+
+
+class TestWhatsAppSession(unittest.TestCase):
+    """Unit tests for readiness waits, locators and timings."""
+
+    def session(self, gui=None, matcher=None, **kwargs):
+        self.clock = FakeClock()
+        gui = gui or FakeGui()
+        self.urls = gui.urls
+        return WhatsAppSession(gui, matcher, opener=gui.open,
+                               clock=self.clock, sleep=self.clock.sleep, **kwargs)
+
+    def test_chat_url(self):
+        self.assertEqual(chat_url("+91 98765 43210", "Hi & bye"),
+                         "whatsapp://send?phone=919876543210&text=Hi%20%26%20bye")
+        with self.assertRaises(ValueError):
+            chat_url("mom")
+
+    def test_waits_for_the_window_instead_of_sleeping(self):
+        session = self.session(settle_seconds=0.5, interval=0.1)
+        session.send_message("9876543210", "hello")
+        self.assertEqual(self.urls, ["whatsapp://send?phone=9876543210&text=hello"])
+        self.assertEqual(session.gui.keys, [('enter',)])
+        # Three polls while another window was in front, two header
+        # snapshots, the settle pause, then two compose box snapshots
+        self.assertAlmostEqual(self.clock.now, 1.0)
+
+    def test_window_that_never_appears(self):
+        session = self.session(FakeGui(polls_until_open=10 ** 6), timeout=2)
+        with self.assertRaises(WhatsAppError):
+            session.call("9876543210")
+        self.assertEqual(session.gui.keys, [])
+
+    def test_templates_replace_the_keyboard_and_the_pause(self):
+        matcher = FakeMatcher(**{'send.png': [False, False, True, True, False], 'voice_call.png': 0})
+        session = self.session(FakeGui(polls_until_open=0), matcher)
+        with session.record() as steps:
+            session.send_message("9876543210", "hello")
+        self.assertEqual([step.command for step in steps],
+                         ["open chat", "wait window", "wait chat", "wait send", "send", "wait sent"])
+        self.assertTrue(all(step.ok for step in steps))
+        self.assertEqual(session.gui.clicks, [(1800, 1000)])
+        self.assertEqual(session.gui.keys, [])
+        self.assertIn("total (6 steps)", format_timings(steps))
+
+        session.call("9876543210")
+        self.assertEqual(session.gui.clicks[-1], (1700, 60))
+        # No template: tab through the layout
+        session.call("9876543210", video=True)
+        self.assertEqual(session.gui.keys[0], ('ctrl', 'f'))
+        self.assertEqual(session.gui.keys.count(('tab',)), 6)
+
+    def test_chat_already_in_front_must_change(self):
+        gui = FakeGui(polls_until_open=0)
+        # Only an unrelated part of the window changes, e.g. a new message
+        gui.on_open = ('elsewhere',)
+        session = self.session(gui, timeout=1)
+        # The title matches at once, but the chat never opened
+        with self.assertRaises(WhatsAppError) as raised:
+            session.send_message("9876543210", "hello")
+        self.assertIn("the chat to open", str(raised.exception))
+        self.assertEqual(gui.keys, [])
+
+    def test_flickering_header_is_not_a_chat(self):
+        gui = FakeGui(polls_until_open=0)
+        gui.on_open = ()
+        # A typing indicator or caret: the header changes on every look
+        frames = iter(range(1, 10 ** 6))
+        gui.screenshot = lambda region: next(frames) if region[1] < 100 else 0
+        with self.assertRaises(WhatsAppError):
+            self.session(gui, timeout=1).call("9876543210")
+
+    def test_send_needs_the_compose_box_to_change(self):
+        gui = FakeGui(polls_until_open=0)
+        gui.on_input = ('elsewhere',)
+        session = self.session(gui, timeout=1)
+        with self.assertRaises(WhatsAppUnconfirmedError):
+            session.send_message("9876543210", "hello")
+
+    def test_unconfirmed_send(self):
+        gui = FakeGui(polls_until_open=0)
+        gui.screenshot = MagicMock(side_effect=OSError("no screenshot tool"))
+        session = self.session(gui, settle_seconds=0.5)
+        # Nothing shows that Enter sent it: not reported as sent
+        with self.assertRaises(WhatsAppUnconfirmedError):
+            session.send_message("9876543210", "hello")
+        self.assertEqual(gui.keys, [('enter',)])
+
+    def test_control_without_template_or_keys(self):
+        session = self.session(locators={'send': Locator('send', 'send.png')})
+        with self.assertRaises(WhatsAppError):
+            session.activate('send')
+
+    def test_queue_in_one_session(self):
+        session = self.session(FakeGui(polls_until_open=1), settle_seconds=0.2)
+        reported = []
+        errors = session.send_messages([("9876543210", "one"), ("mom", "two"), ("9876543211", "three")],
+                                       progress=lambda *args: reported.append(args))
+        self.assertEqual(errors[0], None)
+        self.assertIn("Not a phone number", errors[1])
+        self.assertEqual(errors[2], None)
+        self.assertEqual([index for index, _, _ in reported], [0, 1, 2])
+        self.assertEqual(session.gui.keys, [('enter',), ('enter',)])
+
+        stats = session.stats()
+        self.assertEqual(stats['send']['count'], 2)
+        self.assertAlmostEqual(stats['settle']['mean_ms'], 200.0)
+        self.assertAlmostEqual(stats['wait window']['total_ms'], 100.0)
+
+
+CONTACTS = {"mom": ("+919876543210", "Mom"), "ravi": ("+919876543211", "Ravi Kumar")}
+
+
+class TestWhatsAppBroadcast(unittest.TestCase):
+    """One template sent to several contacts in one session."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        gui = FakeGui(polls_until_open=0)
+        self.urls = gui.urls
+        self.session = WhatsAppSession(gui, opener=gui.open,
+                                       settle_seconds=0.5, clock=self.clock, sleep=self.clock.sleep)
+
+    def broadcast(self, rate_per_minute=20):
+        return WhatsAppBroadcast(self.session, lambda name: CONTACTS.get(name.lower(), (None, None)),
+                                 rate_per_minute, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_render_message(self):
+        fields = {'name': "Ravi Kumar", 'first_name': "Ravi", 'time': "5pm"}
+        self.assertEqual(render_message("Hi {first_name}, see you at {time}", fields), "Hi Ravi, see you at 5pm")
+        self.assertEqual(render_message("Hi {first_name}, bring {item}", fields), "Hi Ravi, bring {item}")
+        self.assertEqual(render_message("Use {} or {0} :-{", fields), "Use {} or {0} :-{")
+
+    def test_send(self):
+        updates = []
+        recipients = ["Mom", "nobody", {'name': "ravi", 'time': "6pm"},
+                     {'name': "Office", 'number': "+91 98765 43212"}]
+        statuses = self.broadcast().send(recipients, "Hi {first_name}, dinner at {time}",
+                                         progress=lambda s: updates.append((s.index, s.state)))
+
+        self.assertEqual([s.state for s in statuses], [SENT, FAILED, SENT, SENT])
+        self.assertIn("Contact not found", statuses[1].error)
+        self.assertEqual([s.text for s in statuses if s.state == SENT],
+                         ["Hi Mom, dinner at {time}", "Hi Ravi, dinner at 6pm", "Hi Office, dinner at {time}"])
+        self.assertEqual(statuses[2].name, "Ravi Kumar")
+        self.assertEqual(self.urls[-1], "whatsapp://send?phone=919876543212&text=Hi%20Office%2C%20dinner%20at%20%7Btime%7D")
+        # The failure is reported before anything is sent
+        self.assertEqual(updates[:4], [(0, 'queued'), (1, 'failed'), (2, 'queued'), (3, 'queued')])
+        self.assertEqual(updates[4:], [(0, 'sending'), (0, 'sent'), (2, 'sending'), (2, 'sent'),
+                                       (3, 'sending'), (3, 'sent')])
+
+        # Three messages at 20 a minute: two 3 s gaps, less the time spent sending
+        self.assertEqual(self.session.gui.keys, [('enter',)] * 3)
+        self.assertAlmostEqual(self.clock.now, 6.7)
+        # Settle pause and a second look at the header and the compose box
+        self.assertAlmostEqual(statuses[0].elapsed, 0.7)
+
+    def test_failed_send_continues(self):
+        self.session.timeout = 1
+        self.session.gui.title = "Something else"
+        statuses = self.broadcast(rate_per_minute=0).send(["mom", "ravi"], "Hi")
+        self.assertEqual([s.state for s in statuses], [FAILED, FAILED])
+        self.assertIn("Timed out", statuses[1].error)
+
+    def test_unconfirmed_send_is_unknown(self):
+        self.session.gui.screenshot = MagicMock(return_value=None)
+        statuses = self.broadcast(rate_per_minute=0).send(["mom"], "Hi")
+        self.assertEqual(statuses[0].state, UNKNOWN)
+        self.assertIn("could not confirm", statuses[0].error)
+
+    def test_batch_holds_the_window(self):
+        with self.session.batch() as session:
+            self.assertIs(session, self.session)
+            self.assertTrue(self.session._lock._is_owned())
+        self.assertFalse(self.session._lock._is_owned())
+
+    def test_feature_skips_loose_matches(self):
+        index = MagicMock()
+        index.search.side_effect = lambda name, limit: {
+            'mom': [ContactMatch(1, "Mom", "+919876543210", 1.0, exact=True)],
+            # Misheard: a lookalike is no reason to message Ravi
+            'ravee': [ContactMatch(2, "Ravi Kumar", "+919876543211", 0.8)],
+        }.get(name, [])
+        with patch.object(features, 'get_whatsapp_session', return_value=self.session), \
+                patch.object(features, 'get_contact_index', return_value=index), \
+                patch.object(features, 'get_database'), \
+                patch.object(features, 'speak'), patch('builtins.print'), \
+                patch('engine.whatsapp.RateLimiter.wait'):
+            statuses = features.whatsAppBulk(["mom", "ravee"], "Hi {first_name}")
+        self.assertEqual([s.state for s in statuses], [SENT, FAILED])
+        self.assertIn("not an exact match", statuses[1].error)
+        self.assertEqual(len(self.urls), 1)
+
+    def test_feature(self):
+        with patch.object(features, 'get_whatsapp_session', return_value=self.session), \
+                patch.object(features, 'resolve_contact', side_effect=lambda n: CONTACTS.get(n, (None, None))), \
+                patch.object(features, 'speak') as speak, patch('builtins.print'), \
+                patch('engine.whatsapp.RateLimiter.wait'):
+            statuses = features.whatsAppBulk(["mom", "ravi", "dad"], "Reminder for {name}")
+        speak.assert_called_with("Sent 2 of 3 WhatsApp messages")
+        self.assertEqual(statuses[1].text, "Reminder for Ravi Kumar")
+
+
+class TestTemplateMatcher(unittest.TestCase):
+    """Template lookup and matching on synthetic screenshots."""
+
+    def test_no_templates(self):
+        directory = tempfile.mkdtemp()
+        try:
+            self.assertIsNone(create_template_matcher(MagicMock(), directory))
+        finally:
+            shutil.rmtree(directory)
+        self.assertIsNone(create_template_matcher(MagicMock(), '/nonexistent'))
+
+    @unittest.skipIf(cv2 is None, "OpenCV is not installed")
+    def test_locate(self):
+        rng = numpy.random.default_rng(7)
+        screen = rng.integers(0, 255, (400, 600), dtype=numpy.uint8)
+        directory = tempfile.mkdtemp()
+        try:
+            cv2.imwrite(os.path.join(directory, 'send.png'), screen[300:340, 500:540])
+            gui = MagicMock()
+            gui.screenshot.side_effect = lambda region=None: screen if region is None else \
+                screen[region[1]:region[1] + region[3], region[0]:region[0] + region[2]]
+            matcher = TemplateMatcher(gui, directory)
+            self.assertEqual(matcher.locate('send.png'), (520, 320))
+            # Near the last hit first, in a window region
+            self.assertEqual(matcher.locate('send.png', region=(100, 50, 500, 350)), (520, 320))
+            self.assertIsNone(matcher.locate('missing.png'))
+            self.assertFalse(matcher.available('missing.png'))
+        finally:
+            shutil.rmtree(directory)
+
+
+class TestWhatsAppFeature(unittest.TestCase):
+    """whatsApp() goes through the shared session."""
+
+    def test_message_and_call(self):
+        session = MagicMock()
+        session.record.return_value.__enter__.return_value = []
+        with patch.object(features, 'get_whatsapp_session', return_value=session), \
+                patch.object(features, 'speak') as speak, patch('builtins.print'):
+            features.whatsApp("9876543210", "hi", 'message', "mom")
+            session.send_message.assert_called_once_with("9876543210", "hi")
+            speak.assert_called_with("Message sent successfully to mom")
+            features.whatsApp("9876543210", "", 'video_call', "mom")
+            session.call.assert_called_once_with("9876543210", video=True)
+
+            session.call.side_effect = WhatsAppError("Timed out")
+            features.whatsApp("9876543210", "", 'call', "mom")
+            speak.assert_called_with("Failed to open WhatsApp.")
+            features.whatsApp("9876543210", "", 'fax', "mom")
+            speak.assert_called_with("Invalid WhatsApp action.")
+
+            session.send_message.side_effect = WhatsAppUnconfirmedError("Pressed Send")
+            features.whatsApp("9876543210", "hi", 'message', "mom")
+            self.assertIn("could not confirm", speak.call_args.args[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -23,6 +23,14 @@ $(document).ready(function () {
         $("#SiriWave").attr("hidden", true);
     }
 
+    // Wake word heard by the continuous listener
+    eel.expose(wakeWordDetected)
+    function wakeWordDetected() {
+        $("#Oval").attr("hidden", true);
+        $("#SiriWave").attr("hidden", false);
+        eel.allCommands()()
+    }
+
     eel.expose(senderText)
     function senderText(message) {
         var chatBox = document.getElementById("chat-canvas-body");
@@ -37,14 +45,21 @@ $(document).ready(function () {
         }
     }
 
+    // Pass a messageId to keep updating one bubble while a reply streams in
     eel.expose(receiverText)
-    function receiverText(message) {
+    function receiverText(message, messageId) {
 
         var chatBox = document.getElementById("chat-canvas-body");
+        var existing = messageId ? document.getElementById(messageId) : null;
+        if (existing) {
+            existing.textContent = message;
+            chatBox.scrollTop = chatBox.scrollHeight;
+            return;
+        }
         if (message.trim() !== "") {
             chatBox.innerHTML += `<div class="row justify-content-start mb-4">
             <div class = "width-size">
-            <div class="receiver_message">${message}</div>
+            <div class="receiver_message"${messageId ? ` id="${messageId}"` : ""}>${message}</div>
             </div>
         </div>`; 
     
@@ -54,7 +69,38 @@ $(document).ready(function () {
         
     }
 
-    
+    // Progress of a bulk WhatsApp send: one bubble per job, updated in place
+    var whatsAppJobs = {};
+    eel.expose(whatsAppProgress)
+    function whatsAppProgress(job, status, total) {
+
+        var statuses = whatsAppJobs[job] = whatsAppJobs[job] || {};
+        statuses[status.index] = status;
+        var sent = 0, unknown = 0, failures = [];
+        for (var index in statuses) {
+            if (statuses[index].state === "sent") {
+                sent++;
+            } else if (statuses[index].state === "unknown") {
+                // Send was pressed but could not be confirmed
+                unknown++;
+            } else if (statuses[index].state === "failed") {
+                failures.push(`${statuses[index].name || statuses[index].recipient}: ${statuses[index].error}`);
+            }
+        }
+        var summary = `WhatsApp: ${sent} of ${total} sent`;
+        if (unknown) {
+            summary += `, ${unknown} unconfirmed, check the chat`;
+        }
+        if (failures.length) {
+            summary += `, ${failures.length} failed (${failures.join("; ")})`;
+        }
+        receiverText(summary, job);
+        if (sent + unknown + failures.length === total) {
+            delete whatsAppJobs[job];
+        }
+    }
+
+
     // Hide Loader and display Face Auth animation
     eel.expose(hideLoader)
     function hideLoader() {